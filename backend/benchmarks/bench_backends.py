@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+추론 백엔드 벤치마크 (torch / onnxruntime / openvino, 정밀도별)
+고정 이미지 세트에서 단건 지연 (p50 / p95), 배치 처리량, 기준 백엔드 대비 mAP50 변화 비교
+
+첫 번째 모델이 기준이다. 기준 결과를 정답으로 보고 나머지 백엔드의 mAP50 을 계산하므로
+1.000 이면 기준과 같은 탐지, 낮을수록 양자화 / 런타임 차이로 결과가 달라진 것이다.
+모든 백엔드는 VisionDetector 의 같은 전처리 / 후처리 (decode_predictions → parse_boxes) 를 거친다.
+
+--models 를 주지 않으면 작은 ONNX 모델 (AveragePool → Conv1x1 → Sigmoid, 3 클래스) 을
+임시 디렉터리에 만들고 numpy 참조 구현과 onnxruntime / openvino FP32·FP16·INT8 변형을 비교한다.
+
+실행:
+    python -m benchmarks.bench_backends
+    python -m benchmarks.bench_backends --models torch=yolov8n.pt onnxruntime=models/yolov8n.onnx \\
+        onnxruntime=models/yolov8n-int8.onnx openvino=models/yolov8n.xml --images data/bench
+"""
+
+import argparse
+import glob
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from vision_service.core import backends
+from vision_service.core.detector import VisionDetector
+from vision_service.core.model_export import IMAGE_EXTENSIONS, PRECISIONS, convert_onnx, write_metadata
+
+WIDTH, HEIGHT = 640, 480
+TINY_SIZE = 320
+TINY_STRIDE = 32
+TINY_NAMES = {0: "person", 1: "laptop", 2: "cup"}
+
+
+# ===========================================
+# 테스트용 작은 모델
+# ===========================================
+
+def tiny_weights(seed: int = 0) -> Dict[str, np.ndarray]:
+    """AveragePool(32) → Conv1x1 → Sigmoid → (×scale + grid) 의 파라미터"""
+    rng = np.random.default_rng(seed)
+    channels = 4 + len(TINY_NAMES)
+    cells = TINY_SIZE // TINY_STRIDE
+    gy, gx = np.mgrid[0:cells, 0:cells].astype(np.float32)
+    scale = np.array([TINY_STRIDE, TINY_STRIDE, 160, 160] + [1] * len(TINY_NAMES), np.float32)
+    bias = np.zeros((channels, cells, cells), np.float32)
+    bias[0], bias[1] = gx * TINY_STRIDE, gy * TINY_STRIDE
+    return {
+        "weight": rng.normal(0, 3, (channels, 3, 1, 1)).astype(np.float32),
+        "conv_bias": np.array([0, 0, 0, 0] + [-3.5] * len(TINY_NAMES), np.float32),
+        "scale": scale.reshape(1, channels, 1, 1),
+        "grid": bias[None]
+    }
+
+
+def tiny_forward(batch: np.ndarray, weights: Dict[str, np.ndarray]) -> np.ndarray:
+    """tiny 모델의 numpy 참조 구현 (ONNX 그래프와 같은 계산)"""
+    b, c, h, w = batch.shape
+    pooled = batch.reshape(b, c, h // TINY_STRIDE, TINY_STRIDE, w // TINY_STRIDE, TINY_STRIDE).mean(axis=(3, 5))
+    conv = np.einsum("oc,bchw->bohw", weights["weight"][:, :, 0, 0], pooled)
+    conv += weights["conv_bias"][None, :, None, None]
+    out = 1.0 / (1.0 + np.exp(-conv)) * weights["scale"] + weights["grid"]
+    return out.reshape(b, out.shape[1], -1).astype(np.float32)
+
+
+def build_tiny_onnx(path: str, weights: Dict[str, np.ndarray]) -> str:
+    """tiny 모델을 ONNX 로 저장 (배치 가변, YOLOv8 head 와 같은 (B, 4 + nc, N) 출력)"""
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+
+    channels = weights["weight"].shape[0]
+    initializers = [
+        numpy_helper.from_array(weights["weight"], "weight"),
+        numpy_helper.from_array(weights["conv_bias"], "conv_bias"),
+        numpy_helper.from_array(weights["scale"], "scale"),
+        numpy_helper.from_array(weights["grid"], "grid"),
+        numpy_helper.from_array(np.array([0, channels, -1], np.int64), "shape")
+    ]
+    nodes = [
+        helper.make_node("AveragePool", ["images"], ["pooled"],
+                         kernel_shape=[TINY_STRIDE, TINY_STRIDE], strides=[TINY_STRIDE, TINY_STRIDE]),
+        helper.make_node("Conv", ["pooled", "weight", "conv_bias"], ["conv"]),
+        helper.make_node("Sigmoid", ["conv"], ["sigmoid"]),
+        helper.make_node("Mul", ["sigmoid", "scale"], ["scaled"]),
+        helper.make_node("Add", ["scaled", "grid"], ["decoded"]),
+        helper.make_node("Reshape", ["decoded", "shape"], ["output0"])
+    ]
+    graph = helper.make_graph(
+        nodes, "tiny_detector",
+        [helper.make_tensor_value_info("images", TensorProto.FLOAT, ["batch", 3, TINY_SIZE, TINY_SIZE])],
+        [helper.make_tensor_value_info("output0", TensorProto.FLOAT, ["batch", channels, None])],
+        initializers
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+    onnx.checker.check_model(model)
+    onnx.save(model, path)
+    write_metadata(path, {"source": "tiny", "format": "onnx", "precision": "fp32",
+                          "input_size": TINY_SIZE, "names": TINY_NAMES})
+    return path
+
+
+class TinyNumpyBackend(backends.InferenceBackend):
+    """tiny 모델 numpy 참조 백엔드 (ONNX 변형의 기준)"""
+    name = "numpy"
+
+    def load(self) -> "TinyNumpyBackend":
+        self.weights = tiny_weights()
+        self.input_size = TINY_SIZE
+        self._fill_names(TINY_NAMES)
+        return self
+
+    def infer(self, batch: np.ndarray) -> np.ndarray:
+        return tiny_forward(batch, self.weights)
+
+
+def tiny_models(directory: str) -> List[Tuple[str, str]]:
+    """(백엔드, 모델 경로) 목록: numpy 참조 + 만들 수 있는 ONNX 변형"""
+    backends.BACKENDS[TinyNumpyBackend.name] = TinyNumpyBackend
+    models = [("numpy", "tiny-reference")]
+    try:
+        source = build_tiny_onnx(os.path.join(directory, "tiny.onnx"), tiny_weights())
+    except ImportError as e:
+        print(f"⚠️ onnx 없음 ({e}): numpy 참조만 실행")
+        return models
+
+    for precision in PRECISIONS:
+        target = source if precision == "fp32" else os.path.join(directory, f"tiny-{precision}.onnx")
+        try:
+            convert_onnx(source, target, precision, None, TINY_SIZE)
+        except ImportError as e:
+            print(f"⚠️ {precision} 변형 건너뜀 ({e})")
+            continue
+        write_metadata(target, {"source": "tiny", "format": "onnx", "precision": precision,
+                                "input_size": TINY_SIZE, "names": TINY_NAMES})
+        models.append(("onnxruntime", target))
+        if precision != "int8":
+            models.append(("openvino", target))  # OpenVINO 는 .onnx 를 바로 컴파일
+    return models
+
+
+# ===========================================
+# 이미지 / 측정
+# ===========================================
+
+def make_images(count: int, seed: int = 0) -> List[np.ndarray]:
+    """색 박스가 있는 고정 합성 이미지"""
+    rng = np.random.default_rng(seed)
+    images = []
+    for _ in range(count):
+        noise = rng.integers(0, 255, (HEIGHT // 32, WIDTH // 32, 3), dtype=np.uint8)
+        image = cv2.resize(noise, (WIDTH, HEIGHT), interpolation=cv2.INTER_CUBIC)
+        for _ in range(rng.integers(2, 6)):
+            x, y = int(rng.integers(0, WIDTH - 120)), int(rng.integers(0, HEIGHT - 120))
+            w, h = int(rng.integers(40, 120)), int(rng.integers(40, 120))
+            image[y:y + h, x:x + w] = rng.integers(0, 255, 3)
+        images.append(image)
+    return images
+
+
+def load_images(directory: str) -> List[np.ndarray]:
+    paths = sorted(path for path in glob.glob(os.path.join(directory, "*"))
+                   if path.lower().endswith(IMAGE_EXTENSIONS))
+    return [image for image in (cv2.imread(path, cv2.IMREAD_COLOR) for path in paths) if image is not None]
+
+
+def box_iou(box: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / np.maximum(area + areas - inter, 1e-9)
+
+
+def _xyxy(obj: dict) -> List[float]:
+    box = obj["bbox"]
+    return [box["x"], box["y"], box["x"] + box["width"], box["y"] + box["height"]]
+
+
+def map50(reference: List[List[dict]], predictions: List[List[dict]]) -> float:
+    """기준 탐지를 정답으로 본 클래스 평균 AP@0.5 (all-point 보간)"""
+    labels = {obj["label"] for objects in reference for obj in objects}
+    if not labels:
+        return 1.0
+    aps = []
+    for label in sorted(labels):
+        truths = [np.array([_xyxy(o) for o in objects if o["label"] == label]).reshape(-1, 4)
+                  for objects in reference]
+        total = sum(len(t) for t in truths)
+        scored = sorted(((obj["confidence"], i, _xyxy(obj)) for i, objects in enumerate(predictions)
+                         for obj in objects if obj["label"] == label), key=lambda item: -item[0])
+        matched = [np.zeros(len(t), bool) for t in truths]
+        hits = []
+        for _, i, box in scored:
+            ious = box_iou(np.array(box), truths[i]) if len(truths[i]) else np.zeros(0)
+            ious[matched[i]] = 0.0  # 이미 맞춘 정답은 제외
+            best = int(ious.argmax()) if ious.size else -1
+            hit = best >= 0 and ious[best] >= 0.5 and not matched[i][best]
+            if hit:
+                matched[i][best] = True
+            hits.append(hit)
+        if not hits:
+            aps.append(0.0)
+            continue
+        tp = np.cumsum(hits)
+        recall = np.concatenate([[0.0], tp / total, [1.0]])
+        precision = np.concatenate([[1.0], tp / np.arange(1, len(hits) + 1), [0.0]])
+        precision = np.maximum.accumulate(precision[::-1])[::-1]
+        aps.append(float(np.sum((recall[1:] - recall[:-1]) * precision[1:])))
+    return float(np.mean(aps))
+
+
+def run(backend: str, model_path: str, images: List[np.ndarray], batch_size: int,
+        repeat: int) -> Optional[dict]:
+    detector = VisionDetector(model_path, backend=backend).load()
+    if not detector.model_loaded:
+        return None
+    detector.detect_batch(images[:batch_size])  # warm-up
+
+    latencies, detections = [], []
+    for _ in range(repeat):
+        for image in images:
+            start = time.perf_counter()
+            result = detector.detect_objects(image)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            detections.append(result["objects"])
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for i in range(0, len(images), batch_size):
+            detector.detect_batch(images[i:i + batch_size])
+    throughput = repeat * len(images) / (time.perf_counter() - start)
+    return {
+        "latencies": np.array(latencies),
+        "throughput": throughput,
+        "detections": detections[:len(images)],
+        "precision": detector.backend.describe()["precision"]
+    }
+
+
+def parse_models(specs: List[str]) -> List[Tuple[str, str]]:
+    models = []
+    for spec in specs:
+        backend, _, path = spec.partition("=")
+        if not path:
+            raise SystemExit(f"--models 는 backend=path 형식: {spec}")
+        models.append((backend, path))
+    return models
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="+", default=None, help="backend=path (첫 번째가 기준)")
+    parser.add_argument("--images", default=None, help="이미지 디렉터리 (없으면 합성 이미지)")
+    parser.add_argument("--count", type=int, default=32, help="합성 이미지 수")
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    images = load_images(args.images) if args.images else make_images(args.count)
+    if not images:
+        raise SystemExit(f"이미지 없음: {args.images}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        models = parse_models(args.models) if args.models else tiny_models(directory)
+        rows = []
+        for backend, path in models:
+            stats = run(backend, path, images, args.batch, args.repeat)
+            if stats is None:
+                print(f"⚠️ {backend} ({path}) 로드 실패: 건너뜀")
+                continue
+            rows.append((backend, os.path.basename(path), stats))
+
+    if not rows:
+        raise SystemExit("실행할 수 있는 백엔드 없음")
+    reference = rows[0][2]["detections"]
+    print(f"images: {len(images)} ({'dir ' + args.images if args.images else 'synthetic'}), "
+          f"batch {args.batch}, repeat {args.repeat}")
+    print("=" * 96)
+    print(f"{'backend':>12} | {'model':>18} | {'prec':>4} | {'p50 ms':>7} | {'p95 ms':>7} | "
+          f"{'batch img/s':>11} | {'objects':>7} | {'mAP50 vs ref':>12}")
+    print("-" * 96)
+    for backend, name, stats in rows:
+        objects = sum(len(objects) for objects in stats["detections"]) / len(images)
+        print(f"{backend:>12} | {name[-18:]:>18} | {stats['precision']:>4} | "
+              f"{np.percentile(stats['latencies'], 50):>7.2f} | {np.percentile(stats['latencies'], 95):>7.2f} | "
+              f"{stats['throughput']:>11.1f} | {objects:>7.1f} | {map50(reference, stats['detections']):>12.3f}")
+    print("=" * 96)
+    print(f"기준: {rows[0][0]} ({rows[0][1]}), 지연은 전처리 + forward + NMS + 파싱 포함")
+
+
+if __name__ == "__main__":
+    main()
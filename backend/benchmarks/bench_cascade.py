@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+모델 cascade 벤치마크 (작은 / 큰 스텁 모델 두 개)
+
+합성 프레임을 작은 스텁으로 탐지하고 CascadeStage 로 애매한 객체만 큰 스텁에 보낸다.
+모드 (region / frame) × escalation 예산별로 escalation 비율, 보정 / 제거 / 추가된 객체 수,
+프레임당 모델 비용 (작은 모델만 / cascade / 매 프레임 큰 모델 실측) 을 비교하고,
+CascadeStage 가 /vision/status 로 보고하는 매 프레임 큰 모델 비용 추정값도 함께 보여 준다.
+스텁 지연은 BENCH_STUB_FORWARD_MS / BENCH_STUB_LARGE_FORWARD_MS 등으로 바꿀 수 있다 (benchmarks.stubs).
+
+실행: python -m benchmarks.bench_cascade [--frames 200 --budgets 0.1,0.2,0.5 --band 0.3,0.6]
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.load_test import make_jpegs
+from benchmarks.stubs import load_stub_detector, load_stub_large_detector
+from vision_service.core.cascade import FRAME, MODEL_STAGES, REGION, CascadeStage
+from vision_service.core.frames import decode_frame
+
+
+async def run(small, large, frames, mode: str, budget: float, band):
+    large.backend.mode = mode
+    stage = CascadeStage(lambda: large, low=band[0], high=band[1], mode=mode, budget=budget, max_pending=1)
+    started = time.perf_counter()
+    for frame in frames:
+        result = small.detect_batch([frame], confidence_thresholds=[band[0]])[0]
+        refinement = stage.submit(frame, result, "bench")
+        if refinement is not None:
+            await refinement
+    return stage.stats(), time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--budgets", default="0.1,0.2,0.5,1.0", help="escalation 프레임 비율 상한 목록")
+    parser.add_argument("--band", default="0.3,0.6", help="애매한 신뢰도 구간 low,high")
+    args = parser.parse_args()
+    budgets = [float(v) for v in args.budgets.split(",")]
+    band = tuple(float(v) for v in args.band.split(","))
+
+    small, large = load_stub_detector(), load_stub_large_detector()
+    frames = [decode_frame(jpeg, [640, 480]) for jpeg in make_jpegs(args.frames, 1280, 720)]
+
+    # 매 프레임 큰 모델 실측
+    large_ms = 0.0
+    for frame in frames:
+        timings = large.detect_batch([frame])[0]["timings_ms"]
+        large_ms += sum(timings.get(stage, 0.0) for stage in MODEL_STAGES)
+    large_ms /= len(frames)
+    print(f"매 프레임 큰 모델: {large_ms:.2f} ms / 프레임")
+
+    print("=" * 118)
+    print(f"{'mode':>6} | {'budget':>6} | {'escalated':>9} | {'refined':>7} | {'dropped':>7} | {'added':>5} | "
+          f"{'small ms':>8} | {'cascade ms':>10} | {'savings':>7} | {'estimated large':>14} | {'wall s':>6}")
+    print("-" * 118)
+    for mode in (REGION, FRAME):
+        for budget in budgets:
+            stats, wall = asyncio.run(run(small, large, frames, mode, budget, band))
+            cost = stats["cost_per_frame"]
+            print(f"{mode:>6} | {budget:>6.2f} | {stats['escalation_rate']:>9.1%} | {stats['refined']:>7} | "
+                  f"{stats['dropped']:>7} | {stats['added']:>5} | {cost['small_only_ms']:>8.2f} | "
+                  f"{cost['cascade_ms']:>10.2f} | {1.0 - cost['cascade_ms'] / large_ms:>7.1%} | "
+                  f"{cost['always_large_ms']:>14.2f} | {wall:>6.1f}")
+    print("=" * 118)
+    print("ms = 프레임당 모델 단계 시간, savings = 1 - cascade / 매 프레임 큰 모델 실측")
+
+
+if __name__ == "__main__":
+    main()
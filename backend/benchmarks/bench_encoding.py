@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+탐지 결과 직렬화 벤치마크
+기존 경로(DetectionResponse 검증 + jsonable_encoder + json.dumps)와
+orjson / msgpack / packed 형식의 프레임당 인코딩 시간과 바이트 수 비교 (객체 10 / 50 / 200 개)
+
+실행: python -m benchmarks.bench_encoding [--objects 10 50 200]
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+from vision_service.api.vision_router import DetectionResponse
+from vision_service.core.encoding import JSON, MSGPACK, PACKED, available_formats, encode_result, unpack_detections
+
+LABELS = ("person", "helmet", "forklift", "cone", "car", "laptop", "cup", "chair")
+
+
+def make_result(objects: int, seed: int = 0) -> dict:
+    """detect_objects + 추적기 형식 결과"""
+    rng = np.random.default_rng(seed)
+    items = []
+    for i in range(objects):
+        x, y = int(rng.integers(0, 1800)), int(rng.integers(0, 1000))
+        w, h = int(rng.integers(20, 200)), int(rng.integers(20, 200))
+        class_id = int(rng.integers(len(LABELS)))
+        items.append({
+            "id": i + 1,
+            "label": LABELS[class_id],
+            "confidence": round(float(rng.uniform(0.25, 0.99)), 4),
+            "bbox": {"x": x, "y": y, "width": w, "height": h},
+            "center": [x + w // 2, y + h // 2],
+            "metadata": {"class_id": class_id, "improved_by": ["tracker"], "track_id": i + 1}
+        })
+    return {
+        "frame_id": 1_700_000_000_000,
+        "timestamp": datetime.now().isoformat(),
+        "fps": 29.97,
+        "resolution": [1920, 1080],
+        "scene_context": "general",
+        "objects": items,
+        "processing_time_ms": 21.5,
+        "timings_ms": {"decode": 2.1, "preprocess": 1.4, "forward": 15.2, "postprocess": 0.9},
+        "model_version": "yolov8n",
+        "status": "success"
+    }
+
+
+def encode_pydantic(result: dict) -> bytes:
+    """기존 응답 경로: response_model 검증 후 jsonable_encoder + 표준 json"""
+    response = DetectionResponse(**result)
+    content = jsonable_encoder(response)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def time_encode(fn, result: dict, repeat: int) -> float:
+    fn(result)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(result)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--objects", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    encoders = [("pydantic+json", encode_pydantic)]
+    for fmt in (JSON, MSGPACK, PACKED):
+        if fmt in available_formats():
+            encoders.append((fmt, lambda result, fmt=fmt: encode_result(result, fmt)))
+
+    print("=" * 72)
+    print(f"{'objects':>7} | {'encoder':>14} | {'encode us':>9} | {'speedup':>7} | {'bytes':>7} | {'size':>6}")
+    print("-" * 72)
+    for objects in args.objects:
+        result = make_result(objects)
+        unpacked = unpack_detections(encode_result(result, PACKED))
+        assert [o["bbox"] for o in unpacked["objects"]] == [o["bbox"] for o in result["objects"]]
+
+        base_us = base_bytes = None
+        for name, fn in encoders:
+            encode_us = time_encode(fn, result, max(50, args.repeat * 10 // objects))
+            size = len(fn(result))
+            base_us, base_bytes = base_us or encode_us, base_bytes or size
+            print(f"{objects:>7} | {name:>14} | {encode_us:>9.1f} | {base_us / encode_us:>6.1f}x | "
+                  f"{size:>7} | {size / base_bytes:>5.0%}")
+        print("-" * 72)
+    print("pydantic+json: 변경 전 detect_image 응답 경로 / size: pydantic+json 대비 바이트 비율")
+
+
+if __name__ == "__main__":
+    main()
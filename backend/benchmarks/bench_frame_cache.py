@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+프레임 결과 캐시 벤치마크 (합성 정지 → 이동 → 정지 시퀀스)
+캐시 유무에 따른 모델 호출 수, 구간별 hit rate, hash 비용, 오래된 결과 재사용 비교
+
+프레임은 질감 있는 배경 + 박스에 센서 노이즈를 더하고 JPEG 로 한 번 왕복시킨다.
+탐지기 스텁은 정답 박스를 그대로 돌려준다.
+
+실행: python -m benchmarks.bench_frame_cache [--static 150 --moving 150 --distance 4]
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from rag_service.core.metrics import StageTimings
+from vision_service.core.frame_cache import FrameResultCache
+
+WIDTH, HEIGHT = 640, 480
+
+
+def make_background(seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 255, (HEIGHT // 16, WIDTH // 16, 3), dtype=np.uint8)
+    return cv2.resize(noise, (WIDTH, HEIGHT), interpolation=cv2.INTER_CUBIC)
+
+
+def make_sequence(static: int, moving: int, seed: int = 0):
+    """(구간 이름, JPEG 왕복 프레임, 정답 박스 xyxy) 목록"""
+    rng = np.random.default_rng(seed)
+    background = make_background(seed)
+    boxes = np.array([[100, 120, 220, 300], [380, 200, 470, 330], [250, 60, 330, 140]], dtype=float)
+    velocity = np.array([[3, 1], [-2, 2], [1, -1]], dtype=float)
+    sequence = []
+    for phase, count in (("static", static), ("moving", moving), ("static", static)):
+        for _ in range(count):
+            if phase == "moving":
+                boxes += np.tile(velocity, 2)
+            frame = background.copy()
+            for i, (x1, y1, x2, y2) in enumerate(boxes.astype(int)):
+                frame[y1:y2, x1:x2] = (40 + 60 * i, 200 - 50 * i, 90)
+            frame = np.clip(frame + rng.normal(0, 3, frame.shape), 0, 255).astype(np.uint8)
+            _, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+            sequence.append((phase, cv2.imdecode(jpeg, cv2.IMREAD_COLOR), boxes.copy()))
+    return sequence
+
+
+def detect(boxes: np.ndarray) -> dict:
+    return {
+        "status": "success",
+        "processing_time_ms": 25.0,
+        "objects": [
+            {"id": i + 1, "label": "box", "confidence": 0.9,
+             "bbox": {"x": int(x1), "y": int(y1), "width": int(x2 - x1), "height": int(y2 - y1)},
+             "metadata": {"class_id": 0, "improved_by": []}}
+            for i, (x1, y1, x2, y2) in enumerate(boxes)
+        ]
+    }
+
+
+def run(sequence, hash_size: int, max_distance: int, max_age_sec: float, fps: float):
+    # 실제 시간 대신 프레임 간격만큼 진행하는 시계로 max_age 를 fps 기준으로 적용
+    clock = [0.0]
+    cache = FrameResultCache(hash_size=hash_size, max_distance=max_distance,
+                             max_age_sec=max_age_sec, clock=lambda: clock[0])
+    calls, hits, stale = 0, {}, 0
+    hash_us = []
+    for index, (phase, frame, boxes) in enumerate(sequence):
+        clock[0] = index / fps
+        start = time.perf_counter()
+        frame_hash = cache.hash(frame)
+        hash_us.append((time.perf_counter() - start) * 1e6)
+        result = cache.lookup("stream", frame_hash, StageTimings("vision"))
+        total, hit = hits.get(phase, (0, 0))
+        if result is None:
+            calls += 1
+            cache.store("stream", frame_hash, detect(boxes))
+        else:
+            hit += 1
+            cached = np.array([[o["bbox"]["x"], o["bbox"]["y"]] for o in result["objects"]])
+            if np.abs(cached - boxes[:, :2].astype(int)).max() > 8:
+                stale += 1
+        hits[phase] = (total + 1, hit)
+    return calls, hits, stale, float(np.median(hash_us))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--static", type=int, default=150, help="정지 구간 프레임 수 (앞뒤 두 번)")
+    parser.add_argument("--moving", type=int, default=150)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--hash-size", type=int, nargs="+", default=[8, 16])
+    parser.add_argument("--distance", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--max-age", type=float, default=1.0)
+    args = parser.parse_args()
+
+    sequence = make_sequence(args.static, args.moving)
+    print(f"frames: {len(sequence)} (static {args.static} → moving {args.moving} → static {args.static}) "
+          f"@ {args.fps:g}fps, max_age {args.max_age:g}s")
+    print("=" * 79)
+    print(f"{'hash/dist':>9} | {'model calls':>11} | {'reduction':>9} | {'static hit':>10} | "
+          f"{'moving hit':>10} | {'stale':>5} | {'hash us':>7}")
+    print("-" * 79)
+    print(f"{'no cache':>9} | {len(sequence):>11} | {0:>9.0%} | {'-':>10} | {'-':>10} | {'-':>5} | {'-':>7}")
+    for hash_size in args.hash_size:
+        for distance in args.distance:
+            calls, hits, stale, hash_us = run(sequence, hash_size, distance, args.max_age, args.fps)
+            static_total, static_hit = hits["static"]
+            moving_total, moving_hit = hits["moving"]
+            print(f"{f'{hash_size}/{distance}':>9} | {calls:>11} | {1 - calls / len(sequence):>9.0%} | "
+                  f"{static_hit / static_total:>10.0%} | {moving_hit / moving_total:>10.0%} | "
+                  f"{stale:>5} | {hash_us:>7.1f}")
+    print("=" * 79)
+    print("stale: 재사용한 결과의 박스가 실제 위치와 8px 넘게 어긋난 프레임 수 (기본값: 16/4)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+적응형 해상도 / 프레임 스킵 조절기 시뮬레이션 (가상 시간)
+스트림 수가 갑자기 늘었다 줄어드는 동안 고정 640 과 LatencyGovernor 의 지연 / SLO 위반 / 입력 크기 비교
+
+추론기는 워커 하나 (FIFO) 이고 프레임당 비용 = BASE_MS + AREA_MS × (입력 크기 / 640)².
+스트림은 30fps 로 프레임을 보내고, 라우터처럼 스트림마다 최신 프레임 하나만 대기하며
+이전 결과가 나오기 전 도착한 프레임은 덮어쓴다. 지연은 라우터와 같이 처리 시작 → 결과까지.
+
+실행: python -m benchmarks.bench_governor [--burst 10 --slo 150]
+"""
+
+import argparse
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from vision_service.core.governor import LatencyGovernor
+
+BASE_MS = 3.0  # 입력 크기와 무관한 비용 (디코딩 / NMS / 직렬화)
+AREA_MS = 25.0  # 640x640 입력의 추론 비용
+FPS = 30.0
+
+
+def cost_ms(input_size: int) -> float:
+    return BASE_MS + AREA_MS * (input_size / 640.0) ** 2
+
+
+class SimStream:
+    def __init__(self, index: int, start: float, end: float):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.pending: Optional[float] = None
+        self.busy = False
+        self.governor = None
+        self.job: Optional[Tuple[float, int]] = None  # (시작 시각, 입력 크기)
+
+
+def simulate(phases: List[Tuple[float, int]], slo_ms: float, adaptive: bool, seed: int = 0):
+    """phases: [(구간 길이 초, 스트림 수)] → 추론 프레임 기록 [(시각, 스트림, 지연 ms, 입력 크기)]"""
+    rng = np.random.default_rng(seed)
+    clock = [0.0]
+    governor = LatencyGovernor(slo_ms=slo_ms, clock=lambda: clock[0])
+
+    # 구간마다 스트림 수를 맞추도록 연결 / 종료 시각 결정
+    streams: List[SimStream] = []
+    t = 0.0
+    active: List[SimStream] = []
+    for duration, count in phases:
+        while len(active) < count:
+            stream = SimStream(len(streams), t + rng.uniform(0, 0.2), float("inf"))
+            streams.append(stream)
+            active.append(stream)
+        while len(active) > count:
+            active.pop().end = t
+        t += duration
+    for stream in active:
+        stream.end = t
+
+    events: List[Tuple[float, int, str, int]] = []
+    counter = 0
+    for stream in streams:
+        heapq.heappush(events, (stream.start, counter, "connect", stream.index))
+        counter += 1
+
+    queue: List[SimStream] = []
+    server_busy = False
+    records = []
+    skipped = {"adaptive": 0}
+
+    def take(stream: SimStream):
+        if stream.pending is None or stream.busy:
+            return
+        stream.pending = None
+        if stream.governor is not None and not stream.governor.admit():
+            skipped["adaptive"] += 1
+            return
+        size = stream.governor.point.input_size if stream.governor is not None else 640
+        stream.busy = True
+        stream.job = (clock[0], size)
+        queue.append(stream)
+        start_server()
+
+    def start_server():
+        nonlocal server_busy, counter
+        if server_busy or not queue:
+            return
+        stream = queue.pop(0)
+        server_busy = True
+        heapq.heappush(events, (clock[0] + cost_ms(stream.job[1]) / 1000.0, counter, "done", stream.index))
+        counter += 1
+
+    while events:
+        now, _, kind, index = heapq.heappop(events)
+        if now > t:
+            break
+        clock[0] = now
+        stream = streams[index]
+        if kind == "connect":
+            if adaptive:
+                stream.governor = governor.register(f"s{index}")
+            heapq.heappush(events, (now, counter, "frame", index))
+            counter += 1
+        elif kind == "frame":
+            if now >= stream.end:
+                governor.discard(f"s{index}")
+                continue
+            stream.pending = now
+            take(stream)
+            heapq.heappush(events, (now + 1.0 / FPS, counter, "frame", index))
+            counter += 1
+        else:
+            server_busy = False
+            started, size = stream.job
+            latency_ms = (now - started) * 1000.0
+            records.append((now, index, latency_ms, size))
+            stream.busy = False
+            if stream.governor is not None:
+                stream.governor.observe(latency_ms)
+            take(stream)
+            start_server()
+    return records, skipped["adaptive"]
+
+
+def summarize(records, phases, slo_ms: float):
+    rows = []
+    start = 0.0
+    for duration, count in phases:
+        # 구간 시작 직후 전환 구간도 포함 (조절기가 따라잡는 시간까지 보이도록)
+        selected = [r for r in records if start <= r[0] < start + duration]
+        latencies = np.array([r[2] for r in selected])
+        sizes = np.array([r[3] for r in selected])
+        rows.append({
+            "streams": count,
+            "p50": float(np.percentile(latencies, 50)),
+            "p95": float(np.percentile(latencies, 95)),
+            "miss": float((latencies > slo_ms).mean()),
+            "fps": len(selected) / duration / count,
+            "size": float(sizes.mean())
+        })
+        start += duration
+    return rows
+
+
+def timeline(records, end: float, step: float) -> List[str]:
+    lines = []
+    for t in np.arange(0.0, end, step):
+        window = [r for r in records if t <= r[0] < t + step]
+        if not window:
+            continue
+        sizes: Dict[int, int] = {}
+        for r in window:
+            sizes[r[3]] = sizes.get(r[3], 0) + 1
+        mix = " ".join(f"{size}:{sizes[size] / len(window):.0%}" for size in sorted(sizes, reverse=True))
+        lines.append(f"{t:>5.0f}s | p95 {np.percentile([r[2] for r in window], 95):>6.1f} ms | {mix}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base", type=int, default=2, help="평소 스트림 수")
+    parser.add_argument("--burst", type=int, default=10, help="동시 접속 시 스트림 수")
+    parser.add_argument("--slo", type=float, default=150.0)
+    parser.add_argument("--duration", type=float, nargs=3, default=[10.0, 30.0, 20.0],
+                        help="평소 / 동시 접속 / 평소 구간 길이 (초)")
+    args = parser.parse_args()
+
+    phases = [(args.duration[0], args.base), (args.duration[1], args.burst), (args.duration[2], args.base)]
+    end = sum(duration for duration, _ in phases)
+    print(f"streams: {args.base} → {args.burst} → {args.base} @ {FPS:g}fps, SLO {args.slo:g} ms, "
+          f"cost {BASE_MS:g} + {AREA_MS:g}×(s/640)² ms (640: {cost_ms(640):.1f}, 480: {cost_ms(480):.1f}, "
+          f"320: {cost_ms(320):.1f})")
+    print("=" * 78)
+    print(f"{'mode':>9} | {'streams':>7} | {'p50 ms':>7} | {'p95 ms':>7} | {'SLO miss':>8} | "
+          f"{'fps/stream':>10} | {'avg input':>9}")
+    print("-" * 78)
+    adaptive_records, adaptive_skipped = None, 0
+    for adaptive in (False, True):
+        records, skipped = simulate(phases, args.slo, adaptive)
+        name = "governor" if adaptive else "fixed640"
+        for i, row in enumerate(summarize(records, phases, args.slo)):
+            print(f"{name if i == 0 else '':>9} | {row['streams']:>7} | {row['p50']:>7.1f} | {row['p95']:>7.1f} | "
+                  f"{row['miss']:>8.1%} | {row['fps']:>10.1f} | {row['size']:>9.0f}")
+        if adaptive:
+            adaptive_records, adaptive_skipped = records, skipped
+    print("=" * 78)
+    print(f"governor 프레임 스킵: {adaptive_skipped} 프레임 (가장 작은 입력으로도 SLO 를 넘을 때만)")
+    print("governor 입력 크기 분포 (5초 구간)")
+    for line in timeline(adaptive_records, end, 5.0):
+        print("  " + line)
+
+
+if __name__ == "__main__":
+    main()
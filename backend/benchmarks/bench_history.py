@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+탐지 이력 저장소 벤치마크
+링 버퍼(구조화 배열)와 기존 dict-per-object 리스트의 100만 탐지당 메모리,
+시간 범위 조회 지연(이진 탐색 vs 선형 탐색), 디스크 spill 경로 비교
+
+실행: python -m benchmarks.bench_history [--detections 200000 --objects 8]
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from vision_service.core.history import DetectionHistory
+
+LABELS = ("person", "helmet", "forklift", "cone", "car", "laptop", "cup", "chair")
+
+
+def make_frames(detections: int, objects: int, seed: int = 0):
+    """(frame_id, timestamp, detect_objects 형식 객체 목록) 시퀀스 (30fps)"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for frame_id in range(detections // objects):
+        frames.append((frame_id, 1_700_000_000.0 + frame_id / 30.0, [
+            {
+                "id": i + 1,
+                "label": LABELS[int(rng.integers(len(LABELS)))],
+                "confidence": float(rng.uniform(0.3, 0.95)),
+                "bbox": {"x": int(rng.integers(600)), "y": int(rng.integers(440)), "width": 40, "height": 40},
+                "center": [20, 20],
+                "metadata": {"class_id": i, "improved_by": [], "track_id": i + 1}
+            }
+            for i in range(objects)
+        ]))
+    return frames
+
+
+def as_dict_records(frame_id: int, timestamp: float, objects):
+    """기존 방식: 탐지마다 응답과 같은 형태의 dict 를 리스트에 보관"""
+    stamp = datetime.fromtimestamp(timestamp).isoformat()
+    return [
+        {
+            "frame_id": frame_id,
+            "timestamp": stamp,
+            "label": obj["label"],
+            "confidence": obj["confidence"],
+            "bbox": dict(obj["bbox"]),
+            "center": list(obj["center"]),
+            "metadata": {"class_id": obj["metadata"]["class_id"], "improved_by": []}
+        }
+        for obj in objects
+    ]
+
+
+def measure_memory(frames, detections: int):
+    tracemalloc.start()
+    history = DetectionHistory(capacity=detections)
+    for frame_id, timestamp, objects in frames:
+        history.record(frame_id, timestamp, objects)
+    ring_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    records = []
+    for frame_id, timestamp, objects in frames:
+        records.extend(as_dict_records(frame_id, timestamp, objects))
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return history, records, ring_bytes, dict_bytes
+
+
+def time_call(fn, repeat: int = 20) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1000.0
+
+
+def linear_query(records, since: str, until: str, label: str, limit: int):
+    matched = [r for r in records if since <= r["timestamp"] <= until and r["label"] == label]
+    counts = {}
+    for r in records:
+        if since <= r["timestamp"] <= until:
+            counts[r["label"]] = counts.get(r["label"], 0) + 1
+    return matched[::-1][:limit], len(matched), counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--detections", type=int, default=200_000)
+    parser.add_argument("--objects", type=int, default=8, help="프레임당 탐지 수")
+    args = parser.parse_args()
+
+    frames = make_frames(args.detections, args.objects)
+    n = len(frames) * args.objects
+    history, records, ring_bytes, dict_bytes = measure_memory(frames, n)
+
+    print("=" * 64)
+    print(f"{'store':>20} | {'bytes/det':>10} | {'MB per 1M detections':>20}")
+    print("-" * 64)
+    for name, total in (("ring (structured)", ring_bytes), ("dict per object", dict_bytes)):
+        print(f"{name:>20} | {total / n:>10.1f} | {total / n:>20.1f}")
+    print(f"{'':>20}   {dict_bytes / ring_bytes:.1f}x smaller  (measured over {n:,} detections)")
+
+    # 마지막 1분 구간 + 라벨 필터 + 첫 페이지
+    last = frames[-1][1]
+    since, until = last - 60.0, last
+    since_iso, until_iso = (datetime.fromtimestamp(t).isoformat() for t in (since, until))
+    ring_ms = time_call(lambda: history.query(since, until, "person", 0, 50))
+    linear_ms = time_call(lambda: linear_query(records, since_iso, until_iso, "person", 50), repeat=5)
+    print("-" * 64)
+    print("range query (last 60s, label=person, limit=50)")
+    print(f"{'ring searchsorted':>20} | {ring_ms:>8.3f} ms")
+    print(f"{'dict linear scan':>20} | {linear_ms:>8.3f} ms  ({linear_ms / ring_ms:.0f}x)")
+
+    # spill: 링 버퍼를 1/8 로 줄이고 나머지는 디스크 segment 로 조회
+    with tempfile.TemporaryDirectory() as spill_dir:
+        spilled = DetectionHistory(capacity=n // 8, segment_size=8192, spill_dir=spill_dir)
+        start = time.perf_counter()
+        for frame_id, timestamp, objects in frames:
+            spilled.record(frame_id, timestamp, objects)
+        record_us = (time.perf_counter() - start) / len(frames) * 1e6
+        first = frames[0][1]
+        old_ms = time_call(lambda: spilled.query(first, first + 60.0, "person", 0, 50))
+        full_ms = time_call(lambda: spilled.query(limit=50), repeat=5)
+        _, total, _ = spilled.query(limit=0)
+        stats = spilled.stats()
+        spilled.close()
+    print("-" * 64)
+    print(f"spill (ring {stats['capacity']:,} + {stats['spilled_segments']} segments, {total:,} queryable)")
+    print(f"{'record / frame':>20} | {record_us:>8.1f} us")
+    print(f"{'oldest 60s (mmap)':>20} | {old_ms:>8.3f} ms")
+    print(f"{'full count (mmap)':>20} | {full_ms:>8.3f} ms")
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    main()
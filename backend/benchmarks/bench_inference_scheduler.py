@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+추론 스케줄러 부하 테스트
+고정 호출 비용을 가진 스텁 모델로 동시성 증가에 따른 처리량 / p50 / p99 지연 측정
+
+실행: python -m benchmarks.bench_inference_scheduler
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+import numpy as np
+
+from vision_service.core.scheduler import InferenceScheduler
+
+
+class StubModel:
+    """forward pass 1회당 고정 비용 + 프레임당 추가 비용을 갖는 스텁 모델"""
+
+    def __init__(self, call_cost_ms: float, per_frame_cost_ms: float):
+        self.call_cost = call_cost_ms / 1000.0
+        self.per_frame_cost = per_frame_cost_ms / 1000.0
+        self.calls = 0
+
+    def __call__(self, frames: List) -> List[dict]:
+        self.calls += 1
+        # torch 처럼 GIL 을 놓고 연산하는 상황을 sleep 으로 흉내
+        time.sleep(self.call_cost + self.per_frame_cost * len(frames))
+        return [{"objects": []} for _ in frames]
+
+
+async def run_load(scheduler: InferenceScheduler, concurrency: int, requests_per_client: int):
+    """closed-loop 클라이언트 concurrency 개가 연속으로 요청"""
+    latencies = []
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+
+    async def client():
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            await scheduler.submit(frame)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await scheduler.stop()
+    return np.array(latencies) * 1000.0, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--call-cost-ms", type=float, default=20.0)
+    parser.add_argument("--per-frame-cost-ms", type=float, default=1.0)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--requests", type=int, default=20, help="클라이언트당 요청 수")
+    args = parser.parse_args()
+
+    print("=" * 84)
+    print(f"stub model: {args.call_cost_ms}ms/call + {args.per_frame_cost_ms}ms/frame")
+    print(f"{'mode':>10} | {'conc':>4} | {'req/s':>8} | {'p50 ms':>8} | {'p99 ms':>8} | {'calls':>6} | {'avg batch':>9}")
+    print("-" * 84)
+
+    for concurrency in (1, 4, 16, 64):
+        for mode, batch_size in (("unbatched", 1), ("batched", args.max_batch_size)):
+            model = StubModel(args.call_cost_ms, args.per_frame_cost_ms)
+            scheduler = InferenceScheduler(model, max_batch_size=batch_size, max_wait_ms=args.max_wait_ms)
+            latencies, elapsed = asyncio.run(run_load(scheduler, concurrency, args.requests))
+            stats = scheduler.stats()
+            print(f"{mode:>10} | {concurrency:>4} | {len(latencies) / elapsed:>8.1f} | "
+                  f"{np.percentile(latencies, 50):>8.1f} | {np.percentile(latencies, 99):>8.1f} | "
+                  f"{model.calls:>6} | {stats['avg_batch_size']:>9.2f}")
+
+    print("=" * 84)
+
+
+if __name__ == "__main__":
+    main()
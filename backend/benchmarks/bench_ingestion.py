@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+증분 문서 수집 벤치마크 (오프라인, 해시 스텁 임베더)
+합성 매뉴얼 코퍼스 전체 수집 → 변경 없음 재실행 → 일부 수정/삭제 후 재실행
+
+실행: python -m benchmarks.bench_ingestion [--files 500]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+
+from rag_service.services.embedder import HashEmbedder
+from rag_service.services.ingestion import IngestionPipeline
+from rag_service.services.vector_store import FaissVectorStore
+
+WORDS = ("reset", "unit", "forklift", "helmet", "valve", "pressure", "sensor", "error", "code",
+         "E-104", "P/N", "점검", "안전", "교체", "압력", "센서", "절차", "주의", "경고", "배터리")
+
+
+def write_manual(path: str, rng: random.Random, paragraphs: int = 20):
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(paragraphs):
+            f.write(" ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120))) + ".\n\n")
+
+
+def make_corpus(root: str, files: int, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(files):
+        domain = ("construction", "logistics", "manufacturing")[i % 3]
+        os.makedirs(os.path.join(root, domain), exist_ok=True)
+        write_manual(os.path.join(root, domain, f"manual_{i:05d}.txt"), rng)
+
+
+def run(label: str, pipeline: IngestionPipeline):
+    report = pipeline.run()
+    print(f"{label:>22} | {report.files_scanned:>6} | {report.files_skipped:>6} | {report.files_updated:>6} | "
+          f"{report.files_removed:>6} | {report.chunks:>7} | {report.elapsed_sec:>7.2f} | "
+          f"{report.documents_per_sec:>8.1f} | {report.chunks_per_sec:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_ingestion_")
+    documents_path = os.path.join(workdir, "documents")
+    try:
+        make_corpus(documents_path, args.files)
+
+        def pipeline():
+            store = FaissVectorStore(os.path.join(workdir, "embeddings"), 384, mmap=False)
+            return IngestionPipeline(store, HashEmbedder(384), documents_path,
+                                     batch_size=args.batch_size, workers=args.workers)
+
+        print("=" * 104)
+        print(f"{'run':>22} | {'scan':>6} | {'skip':>6} | {'update':>6} | {'remove':>6} | "
+              f"{'chunks':>7} | {'sec':>7} | {'docs/s':>8} | {'chunks/s':>9}")
+        print("-" * 104)
+        run("full", pipeline())
+        run("unchanged", pipeline())
+
+        # 5% 수정 + 1% 삭제
+        rng = random.Random(1)
+        names = sorted(os.path.join(dp, f) for dp, _, fs in os.walk(documents_path) for f in fs)
+        for path in rng.sample(names, max(1, len(names) // 20)):
+            write_manual(path, rng)
+        for path in rng.sample(names, max(1, len(names) // 100)):
+            if os.path.exists(path):
+                os.remove(path)
+        run("5% changed, 1% deleted", pipeline())
+        print("=" * 104)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+탐지 라벨 → RAG 지식 참조 벤치마크 (스텁 탐지기 + 해시 임베더, 합성 문서 인덱스)
+
+합성 매뉴얼 청크 (COCO 클래스 이름 / 부품 코드 PX-0001 ~ 를 섞은 문장) 로 FAISS + BM25 인덱스를 만들고
+  1. 프레임당 지식 참조 비용: KnowledgeLinkIndex.enrich (미리 검색한 dict 조회) vs
+     객체마다 RetrievalService.search 를 직접 호출 (임베딩 캐시 적중 / 미적중)
+  2. 문서 증분 추가 / 삭제 후 refresh 가 다시 검색한 키 수와 시간 vs 전체 다시 검색
+  3. 처음 보는 라벨 / OCR 코드: 첫 조회는 빈손, 백그라운드 검색 후 채워지기까지 시간
+
+실행: python -m benchmarks.bench_knowledge [--chunks 20000 --frames 300 --add 50 --remove 20]
+(객체 수는 BENCH_STUB_OBJECTS, 기본 8)
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("BENCH_STUB_OBJECTS", "8")
+
+import numpy as np
+
+from benchmarks.load_test import make_jpegs
+from benchmarks.stubs import load_stub_detector
+from rag_service.models.document import DocumentChunk
+from rag_service.services.embedder import HashEmbedder
+from rag_service.services.knowledge_links import KnowledgeLinkIndex
+from rag_service.services.lexical_index import LexicalIndex
+from rag_service.services.query_cache import LRUCache
+from rag_service.services.retrieval_service import RetrievalService
+from rag_service.services.vector_store import FaissVectorStore
+from vision_service.core.frames import decode_frame
+
+DIMENSION = 384
+WORDS = ("점검", "교체", "주기", "토크", "체결", "누유", "마모", "경고", "절차", "안전", "분해", "조립",
+         "inspect", "replace", "torque", "bolt", "seal", "bearing", "filter", "valve")
+
+
+def make_chunks(labels, start: int, count: int, document: str, seed: int):
+    """라벨 하나 / 부품 코드 하나 + 정비 용어로 된 합성 청크"""
+    rng = np.random.default_rng(seed)
+    chunks = []
+    for i in range(start, start + count):
+        label = labels[rng.integers(0, len(labels))]
+        words = " ".join(rng.choice(WORDS, 12))
+        chunks.append(DocumentChunk(
+            id=f"{document}-{i}", document_id=document, title=f"{document} 매뉴얼",
+            content=f"{label} {words} 부품 PX-{i % 5000:04d} {words[:20]}",
+            domain="plant", file_path=f"{document}.pdf", page_number=i // 20 + 1, chunk_index=i
+        ))
+    return chunks
+
+
+def add_document(retrieval: RetrievalService, labels, start: int, count: int, document: str, seed: int):
+    chunks = make_chunks(labels, start, count, document, seed)
+    retrieval.store.add(chunks, retrieval.embedder.embed([chunk.content for chunk in chunks]))
+
+
+def wait_idle(links: KnowledgeLinkIndex):
+    while links._refreshing or links._pending:
+        time.sleep(0.001)
+
+
+def per_frame(links: KnowledgeLinkIndex, retrieval: RetrievalService, results, cached: bool):
+    """프레임당 µs: inline 참조 vs 객체마다 직접 검색"""
+    started = time.perf_counter()
+    for result in results:
+        links.enrich(result["objects"])
+    enrich_us = (time.perf_counter() - started) / len(results) * 1e6
+
+    if not cached:
+        retrieval.embedding_cache = LRUCache("embedding_cache", max_size=0)
+    started = time.perf_counter()
+    for result in results:
+        for obj in result["objects"]:
+            retrieval.search(obj["label"], top_k=links.top_k, threshold=links.threshold)
+    direct_us = (time.perf_counter() - started) / len(results) * 1e6
+    return enrich_us, direct_us
+
+
+def timed_refresh(links: KnowledgeLinkIndex):
+    started = time.perf_counter()
+    summary = links.refresh()
+    return summary, (time.perf_counter() - started) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--add", type=int, default=50, help="증분으로 추가할 청크 수")
+    parser.add_argument("--remove", type=int, default=20, help="증분으로 삭제할 문서의 청크 수")
+    args = parser.parse_args()
+
+    detector = load_stub_detector()
+    labels = list(detector.backend.names.values())
+    frames = [decode_frame(jpeg, [640, 480]) for jpeg in make_jpegs(args.frames, 640, 480)]
+    results = detector.detect_batch(frames)
+    objects = np.mean([len(result["objects"]) for result in results])
+
+    with tempfile.TemporaryDirectory() as workdir:
+        store = FaissVectorStore(workdir, DIMENSION, lexical=LexicalIndex(os.path.join(workdir, "lexical")))
+        retrieval = RetrievalService(store, HashEmbedder(DIMENSION),
+                                     embedding_cache=LRUCache("embedding_cache", max_size=4096))
+        started = time.perf_counter()
+        add_document(retrieval, labels, 0, args.chunks - args.remove, "base", 0)
+        add_document(retrieval, labels, args.chunks, args.remove, "old", 1)
+        retrieval.loaded = True
+        print(f"합성 인덱스: {store.size} 청크, 라벨 {len(labels)} 개 (생성 {time.perf_counter() - started:.1f}s)")
+
+        links = KnowledgeLinkIndex(lambda: retrieval, label_source=lambda: labels)
+        summary, full_ms = timed_refresh(links)
+        print(f"초기 구축: 키 {summary['keys']} 개 검색 {full_ms:.0f} ms")
+
+        print(f"\n프레임당 지식 참조 비용 (객체 {objects:.1f} 개, {args.frames} 프레임)")
+        print("=" * 60)
+        print(f"{'direct search':>22} | {'enrich µs':>10} | {'direct µs':>10} | {'speedup':>8}")
+        print("-" * 60)
+        for cached in (True, False):
+            enrich_us, direct_us = per_frame(links, retrieval, results, cached)
+            name = "embed cache hit" if cached else "embed cache off"
+            print(f"{name:>22} | {enrich_us:>10.1f} | {direct_us:>10.0f} | {direct_us / enrich_us:>7.0f}x")
+        print("=" * 60)
+        linked = sum("knowledge" in obj for result in results for obj in result["objects"])
+        print(f"참조가 붙은 객체 {linked} / {sum(len(result['objects']) for result in results)}")
+
+        print("\n문서 인덱스 변경 후 갱신")
+        print("=" * 60)
+        print(f"{'change':>24} | {'keys searched':>13} | {'full':>5} | {'ms':>8}")
+        print("-" * 60)
+        changes = [
+            (f"+{args.add} 청크", lambda: add_document(retrieval, labels, args.chunks * 2, args.add, "new", 2)),
+            (f"-{args.remove} 청크 (문서 삭제)", lambda: store.remove_documents(["old"])),
+            ("+5 청크 (라벨 1 개)", lambda: add_document(retrieval, labels[:1], args.chunks * 3, 5, "one", 3))
+        ]
+        for name, change in changes:
+            change()
+            summary, ms = timed_refresh(links)
+            print(f"{name:>24} | {summary['searched']:>13} | {str(summary['full']):>5} | {ms:>8.1f}")
+        links.next_id = None
+        summary, ms = timed_refresh(links)
+        print(f"{'전체 다시 검색':>24} | {summary['searched']:>13} | {str(summary['full']):>5} | {ms:>8.1f}")
+        print("=" * 60)
+
+        print("\n처음 보는 라벨 / OCR 코드 (cold path)")
+        started = time.perf_counter()
+        refs = links.lookup_text("PART NO. PX-0042 REV B")
+        wait_idle(links)
+        filled = links.lookup_text("PART NO. PX-0042 REV B")
+        print(f"  첫 조회 참조 {len(refs)} 개 → 백그라운드 검색 {(time.perf_counter() - started) * 1000:.1f} ms 후 "
+              f"{len(filled)} 개 ({filled[0]['document']} p.{filled[0]['page']})" if filled else "  채워지지 않음")
+        print(f"  {links.stats()}")
+
+
+if __name__ == "__main__":
+    main()
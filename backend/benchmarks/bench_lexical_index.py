@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+BM25 역색인 벤치마크 (합성 코퍼스, 기본 100만 청크)
+색인 / 저장 / 메모리 매핑 로드 시간, 디스크 크기, 쿼리 종류별 지연 (도메인 필터 포함),
+매 쿼리 전체 스캔 대비 지연과 RRF 합치기 비용 측정
+
+코퍼스: 청크마다 Zipf 분포 영문 단어 + 한글 단어 + 부품 번호 (PX-12345) / 에러 코드 (E-123),
+도메인 8개. 쿼리는 코퍼스의 청크에서 뽑은 부품 번호 / 그 청크에서 가장 드문 한글 단어 둘 /
+코드 + 단어 조합, 그리고 최악의 경우로 가장 흔한 한글 단어 둘 (모든 용어가 흔해 postings 전체를 읽음).
+
+실행: python -m benchmarks.bench_lexical_index [--chunks 1000000 --queries 300]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from rag_service.services.lexical_index import LexicalIndex, reciprocal_rank_fusion
+
+DOMAINS = ["construction", "electric", "plant", "safety", "logistics", "hvac", "water", "vehicle"]
+SYLLABLES = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후기니디리미비시이지치키티피히"
+
+
+def make_vocabulary(rng, english: int, korean: int):
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    english_words = sorted({"".join(rng.choice(letters, rng.integers(3, 9))) for _ in range(english * 2)})[:english]
+    syllables = np.array(list(SYLLABLES))
+    korean_words = sorted({"".join(rng.choice(syllables, rng.integers(2, 4))) for _ in range(korean * 2)})[:korean]
+    return np.array(english_words), np.array(korean_words)
+
+
+def make_corpus(n: int, words: int, seed: int = 0):
+    """청크 텍스트 / 도메인 / 청크별 코드"""
+    rng = np.random.default_rng(seed)
+    english, korean = make_vocabulary(rng, 50000, 20000)
+    parts = np.array([f"PX-{i:05d}" for i in range(100000)])
+    errors = np.array([f"E-{i:03d}" for i in range(1000)])
+
+    texts, codes = [], []
+    domains = rng.integers(0, len(DOMAINS), n)
+    english_words = int(words * 0.6)
+    korean_words = words - english_words - 2
+    for start in range(0, n, 100000):
+        end = min(start + 100000, n)
+        e = english[np.minimum(rng.zipf(1.3, (end - start, english_words)) - 1, len(english) - 1)]
+        ranks = np.minimum(rng.zipf(1.3, (end - start, korean_words)) - 1, len(korean) - 1)
+        k = korean[ranks]
+        by_rank = np.argsort(ranks, axis=1)
+        p = parts[rng.integers(0, len(parts), end - start)]
+        c = errors[rng.integers(0, len(errors), end - start)]
+        for i in range(end - start):
+            texts.append(f"{' '.join(e[i])} {p[i]} {' '.join(k[i])} {c[i]}")
+            rare = k[i][by_rank[i][-2:]]
+            common = k[i][by_rank[i][:2]]
+            codes.append((p[i], c[i], f"{rare[0]} {rare[1]}", e[i][-1], f"{common[0]} {common[1]}"))
+    return texts, [DOMAINS[d] for d in domains], codes
+
+
+def make_queries(codes, domains, count: int, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(codes), count)
+    return {
+        "part no.": [(codes[i][0], i, domains[i]) for i in picks],
+        "korean": [(codes[i][2], i, domains[i]) for i in picks],
+        "code+word": [(f"{codes[i][1]} {codes[i][3]} {codes[i][0].lower().replace('-', '')}", i, domains[i]) for i in picks],
+        "common": [(codes[i][4], i, domains[i]) for i in picks]
+    }
+
+
+def measure(index: LexicalIndex, queries, domain: bool, k: int):
+    latencies, hits = [], 0
+    for text, target, target_domain in queries:
+        start = time.perf_counter()
+        results = index.search(text, top_k=k, domain=target_domain if domain else None, min_match=0.5)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        hits += any(doc_id == target for doc_id, _ in results)
+    return np.percentile(latencies, [50, 95, 99]), hits / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=1000000)
+    parser.add_argument("--words", type=int, default=40, help="청크당 단어 수")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=50, help="검색기별 후보 수 (hybrid_candidates)")
+    parser.add_argument("--scan-queries", type=int, default=5, help="전체 스캔 비교에 쓸 쿼리 수")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    texts, domains, codes = make_corpus(args.chunks, args.words)
+    print(f"corpus: {args.chunks:,} chunks × {args.words} words, {len(DOMAINS)} domains "
+          f"(생성 {time.perf_counter() - started:.1f}s)")
+
+    path = tempfile.mkdtemp(prefix="bench_lexical_")
+    try:
+        index = LexicalIndex(path, mmap=False)
+        started = time.perf_counter()
+        for start in range(0, len(texts), 10000):
+            end = min(start + 10000, len(texts))
+            index.add(list(range(start, end)), texts[start:end], domains[start:end])
+        indexed = time.perf_counter() - started
+        started = time.perf_counter()
+        index.save("bench")
+        saved = time.perf_counter() - started
+        disk = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+        mapped = LexicalIndex(path, mmap=True)
+        started = time.perf_counter()
+        mapped.load()
+        loaded = time.perf_counter() - started
+        stats = mapped.stats()
+        print(f"index: {stats['terms']:,} terms, {stats['postings']:,} postings, {disk / 2 ** 20:.0f} MB on disk")
+        print(f"build {indexed:.1f}s ({len(texts) / indexed:,.0f} chunks/s), merge + save {saved:.1f}s, "
+              f"mmap load {loaded * 1000:.0f} ms")
+
+        queries = make_queries(codes, domains, args.queries)
+        print("=" * 72)
+        print(f"{'query':>10} | {'domain':>6} | {'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7} | {f'hit@{args.k}':>7}")
+        print("-" * 72)
+        for name, items in queries.items():
+            for domain in (False, True):
+                (p50, p95, p99), hit = measure(mapped, items, domain, args.k)
+                print(f"{name:>10} | {'yes' if domain else 'no':>6} | {p50:>7.2f} | {p95:>7.2f} | {p99:>7.2f} | {hit:>7.1%}")
+        print("=" * 72)
+
+        # 매 쿼리 전체 스캔 (부분 문자열 일치만 해도 이 정도)
+        scan = []
+        for text, _, _ in queries["part no."][:args.scan_queries]:
+            start = time.perf_counter()
+            [i for i, chunk in enumerate(texts) if text in chunk]
+            scan.append((time.perf_counter() - start) * 1000.0)
+        print(f"전체 스캔 (부분 문자열): p50 {np.percentile(scan, 50):.0f} ms / 쿼리")
+
+        rng = np.random.default_rng(2)
+        rankings = [rng.choice(len(texts), args.k, replace=False).tolist() for _ in range(2)]
+        started = time.perf_counter()
+        for _ in range(1000):
+            reciprocal_rank_fusion(rankings)
+        print(f"RRF ({args.k} + {args.k} 후보): {(time.perf_counter() - started):.3f} ms / 쿼리")
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+LLM 게이트웨이 벤치마크 (로컬 가짜 provider 서버)
+요청마다 새 연결 + 비스트리밍 / 게이트웨이 / 게이트웨이 + 동일 요청 합치기의
+upstream 호출 수, 서버 연결 수, time-to-first-token, tokens/sec 비교
+
+가짜 서버는 OpenAI 호환 /v1/chat/completions 를 흉내 낸다: 첫 토큰까지 --first-token-ms,
+이후 토큰마다 --token-ms, 동시에 생성하는 요청은 --server-slots 개까지 (나머지는 대기).
+부하는 --distinct 개의 프롬프트에서 --requests 개를 뽑아 --concurrency 개씩 동시에 보낸다.
+
+실행:
+    python -m benchmarks.bench_llm_gateway [--requests 96 --distinct 12 --concurrency 32]
+    python -m benchmarks.bench_llm_gateway --serve --port 8089
+        # LLM_PROVIDER=local LLM_BASE_URL=http://127.0.0.1:8089/v1 python main.py
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from rag_service.services.llm_gateway import LLMGateway, OpenAIProvider
+
+
+# ===========================================
+# 가짜 provider 서버
+# ===========================================
+
+class FakeProvider:
+    """지연을 흉내 내는 OpenAI 호환 스트리밍 서버"""
+
+    def __init__(self, first_token_ms: float = 300.0, token_ms: float = 15.0, tokens: int = 48,
+                 slots: int = 16):
+        self.first_token_ms = first_token_ms
+        self.token_ms = token_ms
+        self.tokens = tokens
+        self.slots = slots
+        self.calls = 0
+        self.connections = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._runner = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        from aiohttp import web
+
+        self._semaphore = asyncio.Semaphore(self.slots)
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}/v1"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def reset(self):
+        self.calls = 0
+        self.connections = set()
+
+    async def handle(self, request):
+        from aiohttp import web
+
+        self.calls += 1
+        self.connections.add(id(request.transport))
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        words = [f"{prompt[-8:]}-{i} " for i in range(min(self.tokens, body.get("max_tokens", self.tokens)))]
+
+        async with self._semaphore:
+            await asyncio.sleep(self.first_token_ms / 1000.0)
+            if not body.get("stream"):
+                await asyncio.sleep(self.token_ms * (len(words) - 1) / 1000.0)
+                return web.json_response({"choices": [{"message": {"role": "assistant", "content": "".join(words)}}]})
+
+            response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+            await response.prepare(request)
+            for i, word in enumerate(words):
+                if i:
+                    await asyncio.sleep(self.token_ms / 1000.0)
+                event = {"choices": [{"index": 0, "delta": {"content": word}}]}
+                await response.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            await response.write(b"data: [DONE]\n\n")
+            await response.write_eof()
+            return response
+
+
+# ===========================================
+# 부하
+# ===========================================
+
+def make_prompts(requests: int, distinct: int, seed: int = 0) -> List[List[Dict[str, str]]]:
+    rng = np.random.default_rng(seed)
+    return [[{"role": "user", "content": f"설비 점검 절차 질문 #{int(i):03d}"}]
+            for i in rng.integers(0, distinct, requests)]
+
+
+async def naive_call(url: str, messages) -> Dict[str, Any]:
+    """요청마다 새 세션 (새 연결) + 비스트리밍 응답"""
+    import aiohttp
+
+    started = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{url}/chat/completions",
+                                json={"model": "fake", "messages": messages, "stream": False}) as response:
+            body = await response.json()
+    elapsed = time.perf_counter() - started
+    text = body["choices"][0]["message"]["content"]
+    # 전체 응답을 받아야 첫 글자를 보여줄 수 있으므로 TTFT = 전체 시간
+    return {"ttft_ms": elapsed * 1000.0, "total_ms": elapsed * 1000.0, "tokens": len(text.split()),
+            "tokens_per_sec": 0.0}
+
+
+async def gateway_call(gateway: LLMGateway, messages) -> Dict[str, Any]:
+    info: Dict[str, Any] = {}
+    async for _ in gateway.stream(messages, info=info):
+        pass
+    return info
+
+
+async def drive(call, prompts, concurrency: int) -> Tuple[List[Dict[str, Any]], float]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(messages):
+        async with semaphore:
+            return await call(messages)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one(messages) for messages in prompts))
+    return results, time.perf_counter() - started
+
+
+async def run(args):
+    server = FakeProvider(args.first_token_ms, args.token_ms, args.tokens, args.server_slots)
+    url = await server.start()
+    prompts = make_prompts(args.requests, args.distinct)
+
+    modes = [
+        ("naive", lambda messages: naive_call(url, messages)),
+        ("gateway", None),
+        ("gateway+coalesce", None)
+    ]
+    print(f"requests: {args.requests} ({args.distinct} distinct), concurrency {args.concurrency}, "
+          f"server: first token {args.first_token_ms:g} ms + {args.token_ms:g} ms/token × {args.tokens}, "
+          f"{args.server_slots} slots")
+    print("=" * 96)
+    print(f"{'mode':>16} | {'upstream':>8} | {'conns':>5} | {'TTFT p50':>8} | {'TTFT p95':>8} | "
+          f"{'total p95':>9} | {'tok/s':>6} | {'wall s':>6} | {'coalesced':>9}")
+    print("-" * 96)
+    try:
+        for name, call in modes:
+            server.reset()
+            gateway = None
+            if call is None:
+                gateway = LLMGateway(OpenAIProvider("local", url), "fake",
+                                     max_concurrency=args.gateway_concurrency,
+                                     max_tokens=args.tokens, coalesce=name.endswith("coalesce"))
+                call = lambda messages, gateway=gateway: gateway_call(gateway, messages)
+            results, wall = await drive(call, prompts, args.concurrency)
+            ttft = np.array([r["ttft_ms"] for r in results])
+            total = np.array([r["total_ms"] for r in results])
+            rates = [r["tokens_per_sec"] for r in results if r["tokens_per_sec"]]
+            coalesced = gateway.coalesced if gateway is not None else 0
+            print(f"{name:>16} | {server.calls:>8} | {len(server.connections):>5} | "
+                  f"{np.percentile(ttft, 50):>8.0f} | {np.percentile(ttft, 95):>8.0f} | "
+                  f"{np.percentile(total, 95):>9.0f} | {(np.mean(rates) if rates else 0):>6.1f} | "
+                  f"{wall:>6.2f} | {coalesced:>9}")
+            if gateway is not None:
+                await gateway.close()
+    finally:
+        await server.stop()
+    print("=" * 96)
+    print("TTFT / total 단위 ms, tok/s 는 첫 토큰 이후 생성 속도 (naive 는 비스트리밍이라 TTFT = 전체 시간)")
+
+
+async def serve(args):
+    server = FakeProvider(args.first_token_ms, args.token_ms, args.tokens, args.server_slots)
+    url = await server.start(port=args.port)
+    print(f"가짜 LLM provider: {url} (LLM_PROVIDER=local LLM_BASE_URL={url})")
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=96)
+    parser.add_argument("--distinct", type=int, default=12, help="서로 다른 프롬프트 수")
+    parser.add_argument("--concurrency", type=int, default=32, help="동시에 보내는 요청 수")
+    parser.add_argument("--gateway-concurrency", type=int, default=16, help="게이트웨이 provider 동시 호출 제한")
+    parser.add_argument("--first-token-ms", type=float, default=300.0)
+    parser.add_argument("--token-ms", type=float, default=15.0)
+    parser.add_argument("--tokens", type=int, default=48)
+    parser.add_argument("--server-slots", type=int, default=16, help="가짜 서버 동시 생성 수")
+    parser.add_argument("--serve", action="store_true", help="가짜 서버만 실행")
+    parser.add_argument("--port", type=int, default=8089)
+    args = parser.parse_args()
+    asyncio.run(serve(args) if args.serve else run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+MJPEG 오버레이 출력 벤치마크
+
+1. 프레임당 오버레이 + JPEG 인코딩 비용: 매 프레임 복사 + cv2.rectangle / putText (기준) vs
+   OverlayRenderer (라벨 패치 캐시 + 재사용 버퍼)
+2. 시청자 1 명 vs N 명 (--viewers) 일 때 프로세스 CPU 사용률: 시청자마다 그리고 인코딩 (기준) vs
+   MjpegBroadcaster fan-out (프레임당 한 번 인코딩, 같은 bytes 공유). 시청자 중 하나는 느린 클라이언트
+   (--slow-fps) 로 두어 시청자별 프레임 건너뛰기를 확인한다.
+
+실행: python -m benchmarks.bench_mjpeg [--frames 200 --viewers 1,20 --seconds 4 --fps 15 --slow-fps 3]
+(객체 수는 BENCH_STUB_OBJECTS, 기본 8)
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+os.environ.setdefault("BENCH_STUB_OBJECTS", "8")
+
+import numpy as np
+
+from benchmarks.load_test import make_jpegs
+from benchmarks.stubs import load_stub_detector
+from vision_service.core.frames import decode_frame
+from vision_service.core.mjpeg import MjpegBroadcaster, OverlayRenderer, class_palette
+
+
+def naive_render(frame: np.ndarray, objects: List[Dict[str, Any]], palette: np.ndarray) -> np.ndarray:
+    """매 프레임 새 버퍼 + 객체마다 라벨 문자열을 putText 로 그림"""
+    import cv2
+
+    out = frame.copy()
+    for obj in objects:
+        bbox = obj["bbox"]
+        color = tuple(int(c) for c in palette[obj["metadata"]["class_id"] % len(palette)])
+        x, y = int(bbox["x"]), int(bbox["y"])
+        cv2.rectangle(out, (x, y), (x + int(bbox["width"]), y + int(bbox["height"])), color, 2)
+        text = f"{obj['label']} {int(round(obj['confidence'] * 100))}%"
+        (w, h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+        cv2.rectangle(out, (x, y - h - baseline - 6), (x + w + 6, y), color, -1)
+        cv2.putText(out, text, (x + 3, y - baseline - 3), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1,
+                    cv2.LINE_AA)
+    return out
+
+
+def encode(image: np.ndarray, quality: int = 70) -> bytes:
+    import cv2
+
+    return cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+
+def per_frame_cost(frames, results):
+    palette = class_palette()
+    renderer = OverlayRenderer()
+    rows = []
+    for name, draw in (("naive", lambda f, o: naive_render(f, o, palette)),
+                       ("cached", lambda f, o: renderer.render(f, o))):
+        for frame, objects in zip(frames[:10], results[:10]):
+            draw(frame, objects)
+        started = time.perf_counter()
+        for frame, objects in zip(frames, results):
+            draw(frame, objects)
+        draw_us = (time.perf_counter() - started) / len(frames) * 1e6
+        started = time.perf_counter()
+        for frame, objects in zip(frames, results):
+            encode(draw(frame, objects))
+        total_us = (time.perf_counter() - started) / len(frames) * 1e6
+        rows.append((name, draw_us, total_us - draw_us, total_us))
+    return rows, renderer.stats()
+
+
+async def viewer(source, send_sec: float, received: List[int]):
+    """파트를 받아 send_sec 동안 '전송' (느린 클라이언트 흉내)"""
+    async for part in source:
+        received.append(len(part))
+        await asyncio.sleep(send_sec)
+
+
+async def fanout(frames, results, viewers: int, seconds: float, source_fps: float, slow_fps: float,
+                 shared: bool):
+    """
+    source_fps 로 탐지 결과를 내보내며 viewers 명이 시청
+
+    shared=True 면 MjpegBroadcaster (프레임당 한 번 인코딩), False 면 시청자마다 자기 렌더러로
+    같은 프레임을 그리고 인코딩.
+    """
+    executor = ThreadPoolExecutor(max_workers=2)
+    loop = asyncio.get_running_loop()
+    received: List[List[int]] = [[] for _ in range(viewers)]
+    send_secs = [1.0 / slow_fps if i == viewers - 1 and viewers > 1 else 0.001 for i in range(viewers)]
+
+    if shared:
+        broadcaster = MjpegBroadcaster("bench", executor, max_fps=source_fps)
+        tasks = [asyncio.create_task(viewer(broadcaster.frames(), send_secs[i], received[i]))
+                 for i in range(viewers)]
+        publish = broadcaster.publish
+    else:
+        queues = [asyncio.Queue(maxsize=1) for _ in range(viewers)]
+        renderers = [OverlayRenderer() for _ in range(viewers)]
+
+        async def own_source(i):
+            while True:
+                frame, objects = await queues[i].get()
+                yield await loop.run_in_executor(executor, lambda: encode(renderers[i].render(frame, objects)))
+
+        tasks = [asyncio.create_task(viewer(own_source(i), send_secs[i], received[i])) for i in range(viewers)]
+
+        def publish(frame, objects):
+            for queue in queues:
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait((frame, objects))
+
+    await asyncio.sleep(0.05)
+    cpu, wall = time.process_time(), time.perf_counter()
+    published = 0
+    while time.perf_counter() - wall < seconds:
+        publish(frames[published % len(frames)], results[published % len(results)])
+        published += 1
+        await asyncio.sleep(1.0 / source_fps)
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    executor.shutdown()
+    encoded = broadcaster.frames_encoded if shared else sum(len(r) for r in received)
+    fast = [len(r) for r in received[:-1]] if viewers > 1 else [len(received[0])]
+    return {
+        "cpu": cpu / wall,
+        "encoded_per_sec": encoded / wall,
+        "viewer_fps": float(np.mean(fast)) / wall,
+        "slow_fps": len(received[-1]) / wall if viewers > 1 else None,
+        "dropped": broadcaster.viewer_frames_dropped if shared else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--viewers", default="1,20")
+    parser.add_argument("--seconds", type=float, default=4.0)
+    parser.add_argument("--fps", type=float, default=15.0, help="스트림 결과 fps (= MJPEG 인코딩 fps 상한)")
+    parser.add_argument("--slow-fps", type=float, default=3.0, help="느린 시청자 한 명이 받을 수 있는 fps")
+    args = parser.parse_args()
+
+    detector = load_stub_detector()
+    frames = [decode_frame(jpeg, [640, 480]) for jpeg in make_jpegs(args.frames, 1280, 720)]
+    results = [result["objects"] for result in detector.detect_batch(frames)]
+    objects = np.mean([len(r) for r in results])
+
+    rows, glyphs = per_frame_cost(frames, results)
+    print(f"프레임당 오버레이 + JPEG 인코딩 ({frames[0].shape[1]}x{frames[0].shape[0]}, 객체 {objects:.1f} 개)")
+    print("=" * 56)
+    print(f"{'draw':>8} | {'draw µs':>9} | {'encode µs':>10} | {'total µs':>9}")
+    print("-" * 56)
+    for name, draw_us, encode_us, total_us in rows:
+        print(f"{name:>8} | {draw_us:>9.0f} | {encode_us:>10.0f} | {total_us:>9.0f}")
+    print("=" * 56)
+    print(f"라벨 패치 캐시: {glyphs}")
+
+    print(f"\n시청자 수별 CPU ({args.fps:.0f} fps 스트림 1 개, 마지막 시청자는 {args.slow_fps:.0f} fps 로만 받음)")
+    print("=" * 92)
+    print(f"{'viewers':>7} | {'mode':>10} | {'CPU':>6} | {'encodes/s':>9} | {'viewer fps':>10} | "
+          f"{'slow fps':>8} | {'slow dropped':>12}")
+    print("-" * 92)
+    for viewers in (int(v) for v in args.viewers.split(",")):
+        for shared in (False, True):
+            stats = asyncio.run(fanout(frames, results, viewers, args.seconds, args.fps, args.slow_fps, shared))
+            slow = f"{stats['slow_fps']:.1f}" if stats["slow_fps"] is not None else "-"
+            dropped = str(stats["dropped"]) if stats["dropped"] is not None else "-"
+            print(f"{viewers:>7} | {'fan-out' if shared else 'per-viewer':>10} | {stats['cpu']:>6.1%} | "
+                  f"{stats['encoded_per_sec']:>9.1f} | {stats['viewer_fps']:>10.1f} | {slow:>8} | {dropped:>12}")
+    print("=" * 92)
+    print("CPU = 프로세스 CPU 시간 / 경과 시간 (100% = 코어 하나), viewer fps = 느린 시청자를 뺀 평균")
+
+
+if __name__ == "__main__":
+    main()
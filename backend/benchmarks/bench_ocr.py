@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+ROI OCR 단계 벤치마크 (스텁 인식기)
+전체 프레임 OCR / crop 별 호출 / crop 배치 호출 / 배치 + 캐시의 프레임당 인식기 비용 비교
+
+스텁 인식기 비용 = 호출당 고정 비용 + 입력 픽셀 수 비례 비용 (아래 상수, time.sleep).
+전체 프레임 OCR 은 텍스트 영역 검출이 추가로 들어가므로 픽셀 비용을 DETECT_NS_PER_PX 로 더한다.
+시퀀스는 천천히 움직이는 객체 6 개 (OCR 대상 라벨 3 개) 이고 track_id 가 붙어 있다.
+
+실행: python -m benchmarks.bench_ocr [--frames 120]
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from vision_service.services.ocr_service import OCRStage
+
+CALL_MS = 4.0  # 인식기 호출당 고정 비용 (모델 실행 준비 / 배치 구성)
+RECOGNIZE_NS_PER_PX = 150.0  # 인식 픽셀당 비용
+DETECT_NS_PER_PX = 400.0  # 전체 프레임 텍스트 영역 검출 픽셀당 비용
+WIDTH, HEIGHT = 1280, 720
+LABELS = ["book", "person", "tv", "person", "stop sign", "person"]
+
+
+class StubRecognizer:
+    """crop 픽셀 수에 비례해 잠드는 인식기 (텍스트는 crop 평균 밝기)"""
+
+    def __init__(self):
+        self.calls = 0
+        self.pixels = 0
+
+    def recognize(self, crops):
+        self.calls += 1
+        pixels = sum(crop.size for crop in crops)
+        self.pixels += pixels
+        time.sleep((CALL_MS * 1e6 + pixels * RECOGNIZE_NS_PER_PX) / 1e9)
+        return [(f"text-{int(crop.mean())}", 0.9) for crop in crops]
+
+
+def make_sequence(frames: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    boxes = np.array([[60 + 200 * i, 100 + 60 * (i % 3), 240 + 200 * i, 220 + 60 * (i % 3)]
+                      for i in range(len(LABELS))], dtype=float)
+    velocity = rng.uniform(-1.5, 1.5, (len(LABELS), 2))
+    sequence = []
+    for _ in range(frames):
+        boxes[:, :2] += velocity
+        boxes[:, 2:] += velocity
+        frame = np.full((HEIGHT, WIDTH, 3), 30, dtype=np.uint8)
+        objects = []
+        for i, (x1, y1, x2, y2) in enumerate(boxes.astype(int)):
+            frame[y1:y2, x1:x2] = 220
+            cv2.putText(frame, f"LOT-{i}42", (x1 + 10, (y1 + y2) // 2), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2)
+            objects.append({
+                "id": i + 1, "label": LABELS[i], "confidence": 0.9 - 0.05 * i,
+                "bbox": {"x": int(x1), "y": int(y1), "width": int(x2 - x1), "height": int(y2 - y1)},
+                "metadata": {"class_id": i, "track_id": i + 1, "improved_by": ["tracker"]}
+            })
+        sequence.append((frame, {"objects": objects}))
+    return sequence
+
+
+def full_frame(sequence):
+    recognizer = StubRecognizer()
+    start = time.perf_counter()
+    for frame, _ in sequence:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        time.sleep(gray.size * DETECT_NS_PER_PX / 1e9)
+        recognizer.recognize([gray])
+    return recognizer, time.perf_counter() - start, 0.0
+
+
+def roi(sequence, batched: bool, cache_size: int):
+    recognizer = StubRecognizer()
+    stage = OCRStage(lambda: recognizer, labels={"book", "tv", "stop sign"}, cache_size=cache_size)
+    if not batched:
+        batch = recognizer.recognize
+        recognizer.recognize = lambda crops: [result for crop in crops for result in batch([crop])]
+    start = time.perf_counter()
+    for frame, result in sequence:
+        stage.run(frame, result["objects"])
+    return recognizer, time.perf_counter() - start, stage.cache.stats()["hit_rate"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=120)
+    args = parser.parse_args()
+
+    sequence = make_sequence(args.frames)
+    runs = [
+        ("full frame", full_frame(sequence)),
+        ("roi per crop", roi(sequence, batched=False, cache_size=0)),
+        ("roi batched", roi(sequence, batched=True, cache_size=0)),
+        ("roi batched+cache", roi(sequence, batched=True, cache_size=512)),
+    ]
+    frames = len(sequence)
+    print(f"frames: {frames} ({WIDTH}x{HEIGHT}, {len(LABELS)} objects, 3 OCR labels)")
+    print("=" * 76)
+    print(f"{'mode':>18} | {'calls/frame':>11} | {'px/frame':>9} | {'ms/frame':>8} | {'speedup':>7} | {'cache hit':>9}")
+    print("-" * 76)
+    base = runs[0][1][1]
+    for name, (recognizer, elapsed, hit_rate) in runs:
+        print(f"{name:>18} | {recognizer.calls / frames:>11.2f} | {recognizer.pixels / frames:>9.0f} | "
+              f"{elapsed / frames * 1000:>8.2f} | {base / elapsed:>6.1f}x | {hit_rate:>9.0%}")
+    print("=" * 76)
+    print(f"stub cost: {CALL_MS:g} ms/call + {RECOGNIZE_NS_PER_PX:g} ns/px (full frame +{DETECT_NS_PER_PX:g} ns/px 검출)")
+
+
+if __name__ == "__main__":
+    main()
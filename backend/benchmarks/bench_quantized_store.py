@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+양자화 벡터 저장소 벤치마크 (sq8 / pq 코드 검색 + 원본 벡터 재정렬)
+
+합성 코퍼스로 인덱스를 만들어 저장하고, 설정마다 새 프로세스에서 메모리 매핑으로 열어
+FaissVectorStore.search 로 쿼리한다. 코퍼스는 기본으로 --latent 차원 잠재 공간의 클러스터를
+384 차원으로 투영한 벡터 (문장 임베딩처럼 실효 차원이 낮음), --latent 0 이면 bench_vector_index 의
+등방성 무작위 벡터 (pq 에 가장 불리한 경우).
+  - recall@k: 정확한 float32 전체 탐색 결과 대비 (rerank_factor 별)
+  - 인덱스 MB / 100만 벡터: store.stats() 의 코드 + id 크기
+  - 프로세스 메모리: 쿼리 후 익명 메모리 (프로세스 전용, 청크 메타데이터만 로드한 프로세스 기준 차이,
+    100만 개당 환산) 와 매핑 파일 중 상주 페이지 (같은 노드 워커끼리 페이지 캐시 공유) —
+    index.faiss 는 100만 개당 환산, 재정렬용 vectors.f32 는 쿼리들이 실제로 읽은 MB
+  - 쿼리 1건 p50 / p99 지연 (재정렬 포함)
+
+실행: python -m benchmarks.bench_quantized_store [--size 100000 --factors 1,4,8 --k 10 --latent 64]
+(100만 벡터는 --size 1000000, float32 기준 인덱스만 1.5 GB 이상 필요)
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List
+
+import faiss
+import numpy as np
+
+from benchmarks.bench_vector_index import recall_at_k, synthetic_corpus
+from rag_service.models.document import DocumentChunk
+from rag_service.services.vector_store import FaissVectorStore
+
+CONFIGS = [
+    ("flat", "none"),
+    ("flat", "sq8"),
+    ("flat", "pq"),
+    ("ivf", "none"),
+    ("ivf", "sq8"),
+    ("ivf", "pq"),
+    ("hnsw", "sq8"),
+]
+
+
+def memory_mb() -> Dict[str, float]:
+    """이 프로세스의 익명 (전용) 메모리와 index.faiss / vectors.f32 매핑 중 상주 페이지 MB"""
+    memory = {"anon": 0.0, FaissVectorStore.INDEX_FILE: 0.0, FaissVectorStore.VECTORS_FILE: 0.0}
+    mapping = None
+    with open("/proc/self/smaps") as f:
+        for line in f:
+            parts = line.split()
+            if not parts[0].endswith(":"):
+                mapping = os.path.basename(parts[5]) if len(parts) > 5 else None  # 매핑 헤더 줄
+            elif parts[0] == "Anonymous:":
+                memory["anon"] += int(parts[1]) / 1024.0
+            elif parts[0] == "Rss:" and mapping in memory:
+                memory[mapping] += int(parts[1]) / 1024.0
+    return memory
+
+
+def latent_corpus(n: int, dimension: int, queries: int, latent: int, seed: int = 0):
+    """latent 차원 클러스터 → 무작위 선형 투영 + 작은 잡음 (정규화) 코퍼스와 코퍼스 근처의 쿼리"""
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((latent, dimension)).astype(np.float32)
+    centers = rng.standard_normal((max(16, n // 500), latent)).astype(np.float32)
+    vectors = np.empty((n, dimension), dtype=np.float32)
+    for start in range(0, n, 100000):
+        end = min(start + 100000, n)
+        points = centers[rng.integers(0, len(centers), end - start)]
+        points += 0.7 * rng.standard_normal((end - start, latent)).astype(np.float32)
+        vectors[start:end] = points @ basis
+        vectors[start:end] += 0.1 * rng.standard_normal((end - start, dimension)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+
+    query_vectors = vectors[rng.integers(0, n, queries)]
+    query_vectors += 0.05 * rng.standard_normal((queries, dimension)).astype(np.float32)
+    faiss.normalize_L2(query_vectors)
+    return vectors, query_vectors
+
+
+def evict(path: str):
+    """파일을 페이지 캐시에서 내려 운영 중인 레플리카처럼 디스크에서 읽게 함"""
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """float32 전체 내적 탐색 상위 k (10만 개 블록별 상위 k 를 합침)"""
+    ids, scores = [], []
+    for start in range(0, len(vectors), 100000):
+        block = queries @ vectors[start:start + 100000].T
+        top = np.argpartition(-block, k, axis=1)[:, :k]
+        ids.append(top + start)
+        scores.append(np.take_along_axis(block, top, axis=1))
+    ids, scores = np.hstack(ids), np.hstack(scores)
+    order = np.argsort(-scores, axis=1)[:, :k]
+    return np.take_along_axis(ids, order, axis=1)
+
+
+def build(path: str, vectors: np.ndarray, index_type: str, quantization: str, nlist: int):
+    chunks = [DocumentChunk(id=str(i), document_id=f"doc-{i // 100}", title="", content="",
+                            domain="plant", file_path="") for i in range(len(vectors))]
+    store = FaissVectorStore(path, vectors.shape[1], index_type=index_type, quantization=quantization,
+                             nlist=nlist, nprobe=32, ef_search=128)
+    started = time.perf_counter()
+    store.add(chunks, vectors.copy())
+    store.save()
+    return time.perf_counter() - started
+
+
+def serve(path: str, dimension: int, queries: np.ndarray, k: int, factors: List[int], conn):
+    """새 프로세스: 메모리 매핑 로드 → 쿼리 → (factor 별 결과 / 지연, 메모리)"""
+    store = FaissVectorStore(path, dimension)
+    store.load()
+    runs = []
+    for factor in factors if store.index is not None else ():
+        store.rerank_factor = factor
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        latencies = []
+        for i, query in enumerate(queries):
+            started = time.perf_counter()
+            found = store.search(query, top_k=k)
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            ids[i, :len(found)] = [chunk["vector_id"] for chunk, _ in found]
+        runs.append((factor, ids, float(np.percentile(latencies, 50)), float(np.percentile(latencies, 99))))
+    conn.send((runs, memory_mb(), store.stats()))
+    conn.close()
+
+
+def in_child(path: str, dimension: int, queries: np.ndarray, k: int, factors: List[int]):
+    context = multiprocessing.get_context("spawn")  # 부모 메모리를 물려받지 않는 새 프로세스
+    parent, child = context.Pipe(duplex=False)
+    process = context.Process(target=serve, args=(path, dimension, queries, k, factors, child))
+    process.start()
+    child.close()  # 자식이 비정상 종료하면 recv 가 EOFError 로 끝나도록
+    result = parent.recv()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--factors", default="1,4,8", help="rerank_factor 목록 (1 = 재정렬 후보 추가 없음)")
+    parser.add_argument("--latent", type=int, default=64, help="코퍼스 잠재 차원 (0 이면 등방성 무작위 벡터)")
+    args = parser.parse_args()
+    factors = [int(v) for v in args.factors.split(",")]
+    n, per_million = args.size, 1e6 / args.size
+
+    if args.latent:
+        vectors, queries = latent_corpus(n, args.dimension, args.queries, args.latent)
+    else:
+        vectors, queries = synthetic_corpus(n, args.dimension, args.queries)
+    truth = exact_top_k(vectors, queries, args.k)
+    workdir = tempfile.mkdtemp(prefix="bench_quantized_")
+    try:
+        # 청크 메타데이터만 있는 저장소 (index.faiss 없음) → 인덱스가 늘린 메모리의 기준
+        reference = os.path.join(workdir, "reference")
+        build(reference, vectors[:1], "flat", "none", 1)
+        build(os.path.join(workdir, "flat-none"), vectors, "flat", "none", 1)
+        shutil.copytree(os.path.join(workdir, "flat-none"), reference, dirs_exist_ok=True)
+        os.remove(os.path.join(reference, FaissVectorStore.INDEX_FILE))
+        base = in_child(reference, args.dimension, queries, args.k, [])[1]
+
+        corpus = f"잠재 {args.latent} 차원" if args.latent else "등방성"
+        print(f"{n} 벡터 x {args.dimension} 차원 ({corpus}), 쿼리 {args.queries} 개, "
+              f"recall@{args.k} 은 float32 전체 탐색 대비")
+        print("=" * 118)
+        print(f"{'index':>5} | {'codes':>5} | {'build s':>7} | {'index MB/1M':>11} | {'private MB/1M':>13} | "
+              f"{'paged MB/1M':>11} | {'rerank MB':>9} | {'rerank':>6} | {'p50 ms':>7} | {'p99 ms':>7} | "
+              f"{f'recall@{args.k}':>9}")
+        print("-" * 118)
+        for index_type, quantization in CONFIGS:
+            path = os.path.join(workdir, f"{index_type}-{quantization}")
+            build_sec = 0.0
+            if not os.path.exists(path):
+                build_sec = build(path, vectors, index_type, quantization, int(4 * np.sqrt(n)))
+            if quantization != "none":
+                evict(os.path.join(path, FaissVectorStore.VECTORS_FILE))
+            runs, memory, stats = in_child(path, args.dimension, queries, args.k,
+                                           factors if quantization != "none" else [1])
+            private = (memory["anon"] - base["anon"]) * per_million
+            paged = memory[FaissVectorStore.INDEX_FILE] * per_million
+            rerank_mb = memory[FaissVectorStore.VECTORS_FILE]
+            for i, (factor, ids, p50, p99) in enumerate(runs):
+                if i == 0:
+                    head = (f"{index_type:>5} | {quantization:>5} | {build_sec:>7.1f} | "
+                            f"{stats['index_mb_per_million']:>11.1f} | {private:>13.1f} | {paged:>11.1f} | "
+                            f"{rerank_mb if quantization != 'none' else 0.0:>9.1f}")
+                else:
+                    head = " | ".join(" " * width for width in (5, 5, 7, 11, 13, 11, 9))
+                rerank = f"x{factor}" if quantization != "none" else "-"
+                print(f"{head} | {rerank:>6} | {p50:>7.3f} | {p99:>7.3f} | {recall_at_k(ids, truth):>9.3f}")
+        print("=" * 118)
+        print("private = 프로세스 전용 (익명) 메모리, paged = index.faiss 중 상주 페이지 (노드의 워커끼리 페이지 캐시 공유)")
+        print(f"rerank MB = 모든 rerank 설정의 쿼리 {args.queries} 개가 읽은 vectors.f32 페이지 "
+              f"(파일 전체는 100만 개당 {args.dimension * 4 * 1e6 / (1 << 20):.0f} MB, 디스크에만 있음)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+RAG 쿼리 캐시 벤치마크
+반복 질문 워크로드에서 응답 캐시 hit / 임베딩 캐시 hit / 전체 miss 경로의 지연 비교
+
+실행: python -m benchmarks.bench_query_cache
+"""
+
+import time
+from datetime import datetime
+
+import numpy as np
+
+from rag_service.models.document import Document, QueryResponse
+from rag_service.services.chunker import chunk_document
+from rag_service.services.embedder import HashEmbedder
+from rag_service.services.query_cache import LRUCache, ResponseCache
+from rag_service.services.retrieval_service import RetrievalService
+from rag_service.services.vector_store import FaissVectorStore
+
+
+class SlowEmbedder(HashEmbedder):
+    """실제 모델의 쿼리 임베딩 비용(약 10ms)을 흉내"""
+
+    def embed(self, texts):
+        time.sleep(0.01)
+        return super().embed(texts)
+
+
+def percentile_us(samples, q):
+    return np.percentile(np.array(samples) * 1e6, q)
+
+
+def main():
+    now = datetime.now()
+    documents = [
+        Document(id=f"doc{i}", title=f"manual_{i}.pdf", domain="field", file_path=f"manual_{i}.pdf",
+                 content=f"unit {i} reset procedure step {i} error E-{100 + i} " * 40,
+                 created_at=now, updated_at=now)
+        for i in range(200)
+    ]
+    service = RetrievalService(FaissVectorStore("", 384, mmap=False), SlowEmbedder(384),
+                               embedding_cache=LRUCache("embedding_cache", max_size=1024))
+    chunks = [chunk for document in documents for chunk in chunk_document(document)]
+    service.store.build(chunks, service.embedder.embed([c.content for c in chunks]))
+    responses = ResponseCache(max_size=256)
+
+    def query(text):
+        key = ResponseCache.make_key(text, None, 5, 0.1)
+        cached = responses.get(key)
+        if cached is not None:
+            return cached
+        sources = service.search(text, top_k=5, threshold=0.1)
+        response = QueryResponse(answer=sources[0].content if sources else "", sources=sources,
+                                 processing_time=0.0)
+        responses.put(key, response)
+        return response
+
+    questions = [f"How do I reset unit {i}?" for i in range(20)]
+    paths = {"miss": [], "embedding hit": [], "response hit": []}
+
+    for text in questions:
+        start = time.perf_counter()
+        query(text)
+        paths["miss"].append(time.perf_counter() - start)
+
+    responses.clear()
+    for text in questions:
+        start = time.perf_counter()
+        query(text.upper())  # 정규화 후 같은 키 → 임베딩 캐시 hit
+        paths["embedding hit"].append(time.perf_counter() - start)
+
+    for _ in range(50):
+        for text in questions:
+            start = time.perf_counter()
+            query(text)
+            paths["response hit"].append(time.perf_counter() - start)
+
+    print("=" * 56)
+    print(f"{'path':>14} | {'n':>5} | {'p50 us':>10} | {'p99 us':>10}")
+    print("-" * 56)
+    for path, samples in paths.items():
+        print(f"{path:>14} | {len(samples):>5} | {percentile_us(samples, 50):>10.1f} | {percentile_us(samples, 99):>10.1f}")
+    print("-" * 56)
+    print(f"embedding cache: {service.embedding_cache.stats()}")
+    print(f"response cache:  {responses.stats()}")
+    print("=" * 56)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+YOLO 결과 파싱 마이크로 벤치마크
+기존 박스 단위 루프 vs 배열 일괄 파싱 (parse_boxes)
+
+실행: python -m benchmarks.bench_result_parsing
+"""
+
+import time
+import numpy as np
+
+from vision_service.core.result_parser import parse_boxes
+
+NAMES = {i: f"class_{i}" for i in range(80)}
+
+
+class FakeTensor:
+    """torch.Tensor 흉내 (.cpu().numpy() 호출마다 복사 비용 발생)"""
+
+    def __init__(self, array: np.ndarray):
+        self._array = array
+
+    def cpu(self):
+        return FakeTensor(self._array.copy())
+
+    def numpy(self):
+        return self._array
+
+    def __getitem__(self, item):
+        return FakeTensor(self._array[item])
+
+
+class FakeBox:
+    """단일 박스 (ultralytics Boxes 를 iterate 할 때의 원소)"""
+
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy = FakeTensor(xyxy[None])
+        self.conf = FakeTensor(conf[None])
+        self.cls = FakeTensor(cls[None])
+
+
+class FakeBoxes:
+    """ultralytics Boxes 흉내"""
+
+    def __init__(self, n: int, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        xy = rng.uniform(0, 600, size=(n, 2)).astype(np.float32)
+        wh = rng.uniform(5, 200, size=(n, 2)).astype(np.float32)
+        self.xyxy = FakeTensor(np.concatenate([xy, xy + wh], axis=1))
+        self.conf = FakeTensor(rng.uniform(0.05, 1.0, size=n).astype(np.float32))
+        self.cls = FakeTensor(rng.integers(0, 80, size=n).astype(np.float32))
+
+    def __iter__(self):
+        xyxy, conf, cls = self.xyxy.numpy(), self.conf.numpy(), self.cls.numpy()
+        for i in range(conf.shape[0]):
+            yield FakeBox(xyxy[i], conf[i], cls[i])
+
+
+def legacy_parse(boxes, names, confidence_threshold=None, max_objects=None):
+    """기존 detect_objects 의 박스 단위 루프 (필터링은 dict 생성 후 적용)"""
+    detections = []
+    for box in boxes:
+        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
+        confidence = box.conf[0].cpu().numpy()
+        class_id = int(box.cls[0].cpu().numpy())
+        detections.append({
+            "id": len(detections) + 1,
+            "label": names[class_id],
+            "confidence": float(confidence),
+            "bbox": {
+                "x": int(x1),
+                "y": int(y1),
+                "width": int(x2 - x1),
+                "height": int(y2 - y1)
+            },
+            "center": [int((x1 + x2) / 2), int((y1 + y2) / 2)],
+            "metadata": {"class_id": class_id, "improved_by": []}
+        })
+    if confidence_threshold is not None:
+        detections = [d for d in detections if d["confidence"] >= confidence_threshold]
+    detections.sort(key=lambda d: -d["confidence"])
+    if max_objects is not None:
+        detections = detections[:max_objects]
+    return detections
+
+
+def bench(func, boxes, repeat: int, **kwargs) -> float:
+    """평균 실행 시간 (us)"""
+    func(boxes, NAMES, **kwargs)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(boxes, NAMES, **kwargs)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    print("=" * 72)
+    print(f"{'boxes':>6} | {'filter':>14} | {'legacy (us)':>12} | {'batched (us)':>12} | {'speedup':>7}")
+    print("-" * 72)
+
+    for n in (10, 100, 1000):
+        boxes = FakeBoxes(n)
+        repeat = max(20, 20000 // n)
+        for label, kwargs in (("none", {}),
+                              ("conf0.5/top10", {"confidence_threshold": 0.5, "max_objects": 10})):
+            legacy = bench(legacy_parse, boxes, repeat, **kwargs)
+            batched = bench(parse_boxes, boxes, repeat, **kwargs)
+            print(f"{n:>6} | {label:>14} | {legacy:>12.1f} | {batched:>12.1f} | {legacy / batched:>6.1f}x")
+
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
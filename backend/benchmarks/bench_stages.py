@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+단계별 마이크로벤치마크 (load_test 와 같은 결과 JSON 형식)
+
+요청 경로의 CPU 단계를 하나씩 반복 실행해 호출당 p50 / p95 (µs) 를 잰다.
+    decode:    prepare_upload (업로드), decode_frame (스트림)
+    parse:     decode_predictions (임계값 + NMS), parse_boxes (좌표 복원 + dict 생성)
+    serialize: encode_result json / msgpack / packed
+    detect:    forward 0 ms 스텁 백엔드로 detect_batch 전체 (모델 외 호스트 오버헤드)
+
+결과는 커밋 / 호스트와 함께 저장되고 --baseline 으로 이전 커밋 결과와 비교한다.
+
+실행:
+    python -m benchmarks.bench_stages [--repeat 300 --image-size 1280x720 --objects 20]
+    python -m benchmarks.bench_stages --baseline benchmarks/results/bench_stages-<이전 커밋>.json
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from benchmarks.harness import git_revision, report_comparison, write_results
+from benchmarks.load_test import make_jpegs
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 10) -> Dict[str, Any]:
+    for _ in range(warmup):
+        fn()
+    samples = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+    samples *= 1e6
+    return {"calls": repeat, "p50_us": round(float(np.percentile(samples, 50)), 2),
+            "p95_us": round(float(np.percentile(samples, 95)), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=300)
+    parser.add_argument("--image-size", type=lambda s: tuple(int(v) for v in s.split("x")), default=(1280, 720))
+    parser.add_argument("--input-size", type=int, default=640)
+    parser.add_argument("--objects", type=int, default=20, help="스텁 출력의 이미지당 물체 수")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본 benchmarks/results/bench_stages-<커밋>.json)")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    # 모델 시간은 빼고 호스트 쪽 단계만 재도록 forward 0 ms
+    os.environ["BENCH_STUB_FORWARD_MS"] = "0"
+    os.environ["BENCH_STUB_FORWARD_MS_IMAGE"] = "0"
+    os.environ["BENCH_STUB_OBJECTS"] = str(args.objects)
+
+    from benchmarks.stubs import load_stub_detector
+    from vision_service.core.backends import decode_predictions
+    from vision_service.core.encoding import available_formats, encode_result
+    from vision_service.core.frames import decode_frame, prepare_upload
+    from vision_service.core.result_parser import parse_boxes
+
+    jpeg = make_jpegs(1, *args.image_size)[0]
+    detector = load_stub_detector()
+    prepared = prepare_upload(jpeg, args.input_size)
+    output = detector.backend.infer(prepared.tensor[None])
+    boxes = decode_predictions(output)[0]
+    result = detector.detect_batch([prepared])[0]
+    print(f"image {args.image_size[0]}x{args.image_size[1]} ({len(jpeg) / 1024:.0f} KB), "
+          f"input {args.input_size}, {len(boxes.conf)} boxes → {len(result.get('objects', []))} objects")
+
+    stages = {
+        "decode.prepare_upload": lambda: prepare_upload(jpeg, args.input_size),
+        "decode.decode_frame": lambda: decode_frame(jpeg, [640, 480]),
+        "parse.decode_predictions": lambda: decode_predictions(output),
+        "parse.parse_boxes": lambda: parse_boxes(boxes, detector.backend.names, scale=prepared.scale, pad=prepared.pad,
+                                                 shape=prepared.shape),
+        **{f"serialize.{fmt}": (lambda fmt=fmt: encode_result(result, fmt)) for fmt in available_formats()},
+        "detect.detect_batch": lambda: detector.detect_batch([prepared])
+    }
+    results = {}
+    print("=" * 60)
+    print(f"{'stage':>28} | {'p50 µs':>10} | {'p95 µs':>10}")
+    print("-" * 60)
+    for name, fn in stages.items():
+        results[name] = measure(fn, args.repeat)
+        print(f"{name:>28} | {results[name]['p50_us']:>10.1f} | {results[name]['p95_us']:>10.1f}")
+    print("=" * 60)
+
+    commit = (git_revision()["commit"] or "nogit")[:8]
+    output_path = args.output or os.path.join("benchmarks", "results", f"bench_stages-{commit}.json")
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+    document = write_results(output_path, "bench_stages", config, results)
+    print(f"결과 저장: {output_path}")
+    if args.baseline:
+        regressions = report_comparison(args.baseline, document, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
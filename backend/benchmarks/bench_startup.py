@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+API 기동 시간 벤치마크
+매 실행마다 새 인터프리터에서 측정 (import 캐시 영향 제거)
+
+- import: `import main` 에 걸리는 시간과 그 시점에 이미 로드된 무거운 모듈
+- live / ready: 프로세스 시작부터 /health/live, /health/ready 가 처음 200 을 돌려줄 때까지
+
+실행: python -m benchmarks.bench_startup [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+HEAVY_MODULES = ("cv2", "faiss", "torch", "ultralytics", "sentence_transformers")
+
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+heavy = [m for m in %(heavy)r if m in sys.modules]
+
+from fastapi.testclient import TestClient
+
+times = {}
+with TestClient(main.app) as client:
+    while "ready" not in times:
+        for name in ("live", "ready"):
+            if name not in times and client.get(f"/health/{name}").status_code == 200:
+                times[name] = time.perf_counter() - started
+        time.sleep(0.005)
+
+print(json.dumps({"import": imported - started, "heavy": heavy, **times}))
+"""
+
+
+def run_once(env) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD % {"heavy": HEAVY_MODULES}],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = [run_once(dict(os.environ)) for _ in range(args.runs)]
+
+    print("=" * 52)
+    print(f"{'metric':>22} | {'p50 ms':>10} | {'max ms':>10}")
+    print("-" * 52)
+    for key, label in (("import", "import main"), ("live", "first /health/live"), ("ready", "first /health/ready")):
+        values = np.array([r[key] for r in results]) * 1000.0
+        print(f"{label:>22} | {np.percentile(values, 50):>10.1f} | {values.max():>10.1f}")
+    print("-" * 52)
+    print(f"heavy modules at import: {results[0]['heavy'] or 'none'}")
+    print("=" * 52)
+
+
+if __name__ == "__main__":
+    main()
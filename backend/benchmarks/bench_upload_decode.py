@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+업로드 디코딩 경로 벤치마크 (1 / 5 / 12 MP 합성 JPEG)
+
+- legacy: bytes 로 전체 읽기 → 원본 해상도 디코딩 → 640 letterbox
+- pooled: 풀 버퍼에 readinto → 축소 디코딩 → 640 letterbox 텐서
+
+경로 / 크기 조합마다 새 프로세스에서 실행해 요청 처리 중 peak RSS 증가량을 잰다 (Linux /proc 사용).
+
+실행: python -m benchmarks.bench_upload_decode [--requests 20]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+
+SIZES = {1: (1280, 800), 5: (2592, 1944), 12: (4000, 3000)}
+
+CHILD = r"""
+import io, json, sys, time
+import numpy as np
+import cv2
+from vision_service.core.frames import BufferPool, letterbox, prepare_upload, read_into
+
+path, mode, requests = sys.argv[1], sys.argv[2], int(sys.argv[3])
+with open(path, "rb") as f:
+    upload = io.BytesIO(f.read())
+pool = BufferPool()
+
+def legacy():
+    upload.seek(0)
+    data = upload.read()
+    frame = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    return letterbox(frame, 640)[0]
+
+def pooled():
+    upload.seek(0)
+    buffer = pool.acquire()
+    try:
+        size = read_into(upload, buffer)
+        with memoryview(buffer) as view:
+            return prepare_upload(view[:size], 640).tensor
+    finally:
+        pool.release(buffer)
+
+def peak_rss_kb():
+    with open("/proc/self/status") as f:
+        return int(f.read().split("VmHWM:")[1].split()[0])
+
+run = legacy if mode == "legacy" else pooled
+# fork 한 부모의 최대 RSS 가 이어지지 않도록 high-water mark 초기화 (Linux)
+with open("/proc/self/clear_refs", "w") as f:
+    f.write("5")
+baseline = peak_rss_kb()
+latencies = []
+for _ in range(requests):
+    start = time.perf_counter()
+    tensor = run()
+    latencies.append(time.perf_counter() - start)
+    del tensor
+peak = peak_rss_kb()
+print(json.dumps({"latencies": latencies, "peak_rss_kb": peak - baseline}))
+"""
+
+
+def synthetic_jpeg(path: str, width: int, height: int, seed: int = 0):
+    """그라디언트 + 사각형 + 약한 노이즈로 카메라 사진과 비슷한 압축률의 JPEG 생성"""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    image = np.stack([np.broadcast_to(x, (height, width)), np.broadcast_to(y, (height, width)),
+                      (x + y) / 2], axis=-1).astype(np.uint8)
+    for _ in range(40):
+        x0, y0 = int(rng.integers(0, width - 100)), int(rng.integers(0, height - 100))
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        cv2.rectangle(image, (x0, y0), (x0 + int(rng.integers(50, width // 4)),
+                                        y0 + int(rng.integers(50, height // 4))), color, -1)
+    image = cv2.add(image, rng.integers(0, 12, image.shape, dtype=np.uint8))
+    cv2.imwrite(path, image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+
+
+def run_child(path: str, mode: str, requests: int) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, path, mode, str(requests)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_upload_")
+    try:
+        print("=" * 72)
+        print(f"{'input':>6} | {'jpeg KB':>8} | {'path':>7} | {'p50 ms':>8} | {'p95 ms':>8} | {'peak RSS +MB':>12}")
+        print("-" * 72)
+        for megapixels, (width, height) in SIZES.items():
+            path = os.path.join(workdir, f"{megapixels}mp.jpg")
+            synthetic_jpeg(path, width, height)
+            for mode in ("legacy", "pooled"):
+                result = run_child(path, mode, args.requests)
+                latencies = np.array(result["latencies"]) * 1000.0
+                print(f"{megapixels:>4}MP | {os.path.getsize(path) / 1024:>8.0f} | {mode:>7} | "
+                      f"{np.percentile(latencies, 50):>8.2f} | {np.percentile(latencies, 95):>8.2f} | "
+                      f"{result['peak_rss_kb'] / 1024:>12.1f}")
+        print("=" * 72)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
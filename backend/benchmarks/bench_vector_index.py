@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+FAISS 인덱스 종류별 recall vs latency 벤치마크
+무작위 벡터 합성 코퍼스 (기본 10k / 100k / 1M) 에서 flat 대비 recall@k 측정
+
+실행: python -m benchmarks.bench_vector_index [--sizes 10000,100000,1000000]
+"""
+
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from rag_service.services.vector_store import FaissVectorStore
+
+
+def synthetic_corpus(n: int, dimension: int, queries: int, seed: int = 0):
+    """클러스터 구조가 있는 무작위 벡터 + 코퍼스 근처의 쿼리"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(16, n // 1000), dimension)).astype(np.float32)
+    vectors = np.empty((n, dimension), dtype=np.float32)
+    for start in range(0, n, 100000):
+        end = min(start + 100000, n)
+        vectors[start:end] = centers[rng.integers(0, len(centers), end - start)]
+        vectors[start:end] += rng.standard_normal((end - start, dimension)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+
+    picks = rng.integers(0, n, queries)
+    query_vectors = vectors[picks] + 0.3 * rng.standard_normal((queries, dimension)).astype(np.float32)
+    faiss.normalize_L2(query_vectors)
+    return vectors, query_vectors
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f.tolist()) & set(t.tolist())) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def measure(store: FaissVectorStore, index, queries: np.ndarray, k: int):
+    """쿼리 1건씩 검색 (API 와 같은 조건) → (ids, p50 ms, p99 ms)"""
+    params = store.search_params(None, k)
+    ids = np.empty((len(queries), k), dtype=np.int64)
+    latencies = []
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, found = index.search(query[None], k, params=params)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        ids[i] = found[0]
+    return ids, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    configs = [
+        ("flat", {}),
+        ("ivf", {"nprobe": 4}),
+        ("ivf", {"nprobe": 16}),
+        ("ivf", {"nprobe": 64}),
+        ("hnsw", {"ef_search": 32}),
+        ("hnsw", {"ef_search": 64}),
+        ("hnsw", {"ef_search": 128}),
+    ]
+
+    print("=" * 86)
+    print(f"{'n':>8} | {'index':>6} | {'params':>14} | {'build s':>8} | {'p50 ms':>7} | {'p99 ms':>7} | {f'recall@{args.k}':>9}")
+    print("-" * 86)
+
+    for n in (int(size) for size in args.sizes.split(",")):
+        vectors, queries = synthetic_corpus(n, args.dimension, args.queries)
+        truth = None
+        built = {}
+
+        for index_type, params in configs:
+            nlist = int(4 * np.sqrt(n))
+            store = FaissVectorStore("", args.dimension, index_type=index_type, nlist=nlist, **params)
+
+            # nprobe / efSearch 는 검색 파라미터이므로 같은 종류의 인덱스는 재사용
+            build_time = 0.0
+            if index_type not in built:
+                start = time.perf_counter()
+                built[index_type] = store.create_index(vectors.copy())
+                build_time = time.perf_counter() - start
+
+            ids, p50, p99 = measure(store, built[index_type], queries, args.k)
+            if truth is None:
+                truth = ids  # flat = 정확한 결과
+            label = ",".join(f"{key}={value}" for key, value in params.items()) or "-"
+            build = f"{build_time:.2f}" if build_time else "(reuse)"
+            print(f"{n:>8} | {index_type:>6} | {label:>14} | {build:>8} | {p50:>7.3f} | {p99:>7.3f} | "
+                  f"{recall_at_k(ids, truth):>9.3f}")
+
+        del vectors, built
+        print("-" * 86)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+영상 일괄 분석 작업 벤치마크 (스텁 모델)
+
+OpenCV 로 합성 영상 (움직이는 도형) 을 만들고 VideoJobManager 로 분석한다.
+  1. 디코딩만 (stride 별 grab / read) frames/sec
+  2. 작업 전체 (디코딩 + 배치 탐지 + NDJSON 기록) 분석 frames/sec, stride / batch 별
+  3. 중간 취소 → resume 후 결과의 frame_index 가 빠짐 / 중복 없이 이어지는지 확인
+  4. 실시간 스트림 (--live-fps) 프레임 지연: 단독 vs 영상 작업과 동시 실행
+스텁 지연은 BENCH_STUB_FORWARD_MS 등으로 바꿀 수 있다 (benchmarks.stubs).
+
+실행: python -m benchmarks.bench_video_jobs [--frames 600 --size 1280x720 --strides 1,2,5 --batches 1,4,8]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+from benchmarks.stubs import load_stub_detector
+from rag_service.core.metrics import StageTimings
+from vision_service.core.scheduler import DetectionTask, create_detection_scheduler
+from vision_service.core.video_jobs import ACTIVE, VideoJobManager, _open_at
+
+DETECTOR = load_stub_detector()
+
+
+def make_video(path: str, frames: int, width: int, height: int, fps: float = 30.0):
+    """배경 노이즈 위로 도형 몇 개가 움직이는 mp4v 영상"""
+    import cv2
+
+    rng = np.random.default_rng(0)
+    background = cv2.resize(rng.integers(0, 255, (height // 32, width // 32, 3), dtype=np.uint8),
+                            (width, height), interpolation=cv2.INTER_CUBIC)
+    shapes = [(rng.uniform(0, width), rng.uniform(0, height), rng.uniform(-8, 8), rng.uniform(-6, 6),
+               tuple(int(c) for c in rng.integers(0, 255, 3))) for _ in range(6)]
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    for i in range(frames):
+        image = background.copy()
+        for x, y, dx, dy, color in shapes:
+            cx, cy = int((x + dx * i) % width), int((y + dy * i) % height)
+            cv2.rectangle(image, (cx - 60, cy - 40), (cx + 60, cy + 40), color, -1)
+        cv2.putText(image, str(i), (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+        writer.write(image)
+    writer.release()
+
+
+def decode_only(video: str, stride: int) -> float:
+    """stride 간격 디코딩 frames/sec (분석 프레임 기준)"""
+    capture = _open_at(video, 0)
+    decoded, position = 0, 0
+    started = time.perf_counter()
+    while True:
+        ok = capture.read()[0] if position % stride == 0 else capture.grab()
+        if not ok:
+            break
+        decoded += position % stride == 0
+        position += 1
+    capture.release()
+    return decoded / (time.perf_counter() - started)
+
+
+def frame_indexes(manager: VideoJobManager, job) -> List[int]:
+    with open(manager.results_path(job), encoding="utf-8") as f:
+        return [json.loads(line)["frame_index"] for line in f]
+
+
+async def wait_done(manager: VideoJobManager, job_id: str):
+    while manager.get(job_id).status in ACTIVE:
+        await asyncio.sleep(0.02)
+
+
+async def copy_job(manager: VideoJobManager, video: str, **options):
+    with open(video, "rb") as f:
+        job_id, path = manager.save_upload(f, os.path.basename(video))
+    return await manager.create(job_id, path, **options)
+
+
+async def run_job(job_dir: str, video: str, stride: int, batch_size: int):
+    scheduler = create_detection_scheduler(lambda: DETECTOR, max_batch_size=8)
+    manager = VideoJobManager(job_dir, scheduler.submit, batch_size=batch_size)
+    started = time.perf_counter()
+    job = await copy_job(manager, video, stride=stride)
+    await wait_done(manager, job.job_id)
+    wall = time.perf_counter() - started
+    await scheduler.stop()
+    return job, wall
+
+
+async def check_resume(job_dir: str, video: str, stride: int):
+    """처리 중 취소 → 재개, 결과가 영상의 분석 프레임과 정확히 일치하는지"""
+    scheduler = create_detection_scheduler(lambda: DETECTOR, max_batch_size=8)
+    manager = VideoJobManager(job_dir, scheduler.submit, checkpoint_every=50)
+    job = await copy_job(manager, video, stride=stride)
+    while job.processed < job.frames_to_process // 2:
+        await asyncio.sleep(0.01)
+    await manager.cancel(job.job_id)
+    cancelled_at = job.processed
+    manager.resume(job.job_id)
+    await wait_done(manager, job.job_id)
+    await scheduler.stop()
+    indexes = frame_indexes(manager, job)
+    expected = list(range(0, job.frames_total, stride))
+    return job, cancelled_at, indexes == expected, len(indexes) - len(set(indexes))
+
+
+async def live_latency(job_dir: str, video: str, live_fps: float, seconds: float, with_job: bool):
+    """실시간 스트림 한 개가 live_fps 로 보내는 프레임의 탐지 지연 p50 / p95 (ms)"""
+    import cv2
+
+    scheduler = create_detection_scheduler(lambda: DETECTOR, max_batch_size=8)
+    manager = VideoJobManager(job_dir, scheduler.submit)
+    job = await copy_job(manager, video) if with_job else None
+    capture = cv2.VideoCapture(video)
+    frame = capture.read()[1]
+    capture.release()
+
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sent = time.perf_counter()
+        await scheduler.submit(DetectionTask(frame, timings=StageTimings("vision")))
+        latencies.append((time.perf_counter() - sent) * 1000.0)
+        await asyncio.sleep(max(0.0, 1.0 / live_fps - (time.perf_counter() - sent)))
+    processed = job.processed if job is not None else 0
+    await manager.stop()
+    await scheduler.stop()
+    return np.percentile(latencies, 50), np.percentile(latencies, 95), processed / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--strides", default="1,2,5")
+    parser.add_argument("--batches", default="1,4,8", help="작업당 한 번에 탐지에 넣는 프레임 수 목록")
+    parser.add_argument("--live-fps", type=float, default=15.0)
+    parser.add_argument("--live-seconds", type=float, default=4.0)
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.split("x"))
+    strides = [int(v) for v in args.strides.split(",")]
+    batches = [int(v) for v in args.batches.split(",")]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        video = os.path.join(workdir, "synthetic.mp4")
+        started = time.perf_counter()
+        make_video(video, args.frames, width, height)
+        print(f"합성 영상: {args.frames} 프레임 {width}x{height} mp4v "
+              f"({os.path.getsize(video) / (1 << 20):.1f} MB, 생성 {time.perf_counter() - started:.1f}s)")
+
+        print("=" * 84)
+        print(f"{'stride':>6} | {'batch':>5} | {'analyzed':>8} | {'objects':>7} | "
+              f"{'decode fps':>10} | {'job fps':>8} | {'video fps':>9} | {'wall s':>6}")
+        print("-" * 84)
+        for stride in strides:
+            decode_fps = decode_only(video, stride)
+            for batch_size in batches:
+                job, wall = asyncio.run(run_job(os.path.join(workdir, "jobs"), video, stride, batch_size))
+                print(f"{stride:>6} | {batch_size:>5} | {job.processed:>8} | {job.objects:>7} | "
+                      f"{decode_fps:>10.1f} | {job.processed / job.active_sec:>8.1f} | "
+                      f"{job.frames_total / wall:>9.1f} | {wall:>6.2f}")
+        print("=" * 84)
+        print("job fps = 분석 프레임 / 작업 실행 시간, video fps = 영상 전체 프레임 / 업로드 포함 전체 시간")
+
+        job, cancelled_at, exact, duplicates = asyncio.run(check_resume(os.path.join(workdir, "resume"), video, 2))
+        print(f"\n재개: {cancelled_at} 프레임에서 취소 → resume → {job.processed} 프레임, "
+              f"frame_index 일치 {'OK' if exact else 'FAIL'} (중복 {duplicates})")
+
+        print(f"\n실시간 스트림 {args.live_fps:.0f} fps 프레임 지연 (스케줄러 공유)")
+        for with_job in (False, True):
+            p50, p95, job_fps = asyncio.run(live_latency(os.path.join(workdir, "live"), video,
+                                                         args.live_fps, args.live_seconds, with_job))
+            label = "영상 작업 1개와 동시" if with_job else "단독"
+            print(f"  {label:<12} p50 {p50:6.1f} ms  p95 {p95:6.1f} ms"
+                  + (f"  (영상 작업 {job_fps:.1f} fps)" if with_job else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Vision 워커 풀 CPU 스케일링 벤치마크 (스텁 모델)
+in-process 스케줄러와 1 / 2 / 4 / 8 워커 풀의 처리량 / 지연 비교
+
+스텁 모델은 프레임당 고정된 양의 순수 Python 연산을 해서
+GIL 때문에 한 프로세스 안에서는 병렬화되지 않는 추론 비용을 흉내 낸다.
+
+실행: python -m benchmarks.bench_worker_pool [--frames 400 --concurrency 32 --work-ms 10]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import numpy as np
+
+from rag_service.core.metrics import StageTimings
+from vision_service.core.detector import VisionDetector
+from vision_service.core.scheduler import DetectionTask, create_detection_scheduler
+from vision_service.core.worker_pool import VisionWorkerPool
+
+
+def calibrate(work_ms: float) -> int:
+    """이 머신에서 work_ms 만큼 걸리는 반복 횟수"""
+    start, n = time.perf_counter(), 500_000
+    StubDetector._spin(n)
+    return int(n * work_ms / 1000.0 / (time.perf_counter() - start))
+
+
+class StubDetector(VisionDetector):
+    """프레임당 BENCH_STUB_ITERATIONS 번 반복하는 CPU 연산 후 빈 결과를 돌려주는 detector"""
+
+    def __init__(self):
+        super().__init__()
+        self.model_loaded = True
+        # 워커들이 동시에 보정하면 CPU 경쟁으로 값이 달라지므로 부모가 한 번 보정해 전달
+        self.iterations = int(os.environ.get("BENCH_STUB_ITERATIONS") or calibrate(10.0))
+
+    @staticmethod
+    def _spin(n: int) -> int:
+        total = 0
+        for i in range(n):
+            total += i * i
+        return total
+
+    def detect_batch(self, frames, confidence_thresholds=None, max_objects=None, timings=None, input_sizes=None):
+        timings = [t or StageTimings("vision") for t in (timings or [None] * len(frames))]
+        results = []
+        for frame, timing in zip(frames, timings):
+            with timing.stage("forward"):
+                self._spin(self.iterations)
+            results.append(self._format_result([], frame.shape, timing))
+        return results
+
+
+async def drive(scheduler, frames: int, concurrency: int) -> dict:
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    latencies = []
+    remaining = iter(range(frames))
+
+    async def client():
+        for _ in remaining:
+            start = time.perf_counter()
+            await scheduler.submit(DetectionTask(frame, timings=StageTimings("vision")))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies) * 1000.0
+    return {"fps": frames / elapsed, "p50": np.percentile(latencies, 50), "p99": np.percentile(latencies, 99)}
+
+
+async def main_async(args):
+    print(f"CPU cores available: {len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()}")
+    print("=" * 60)
+    print(f"{'mode':>14} | {'frames/s':>9} | {'p50 ms':>8} | {'p99 ms':>8} | {'speedup':>7}")
+    print("-" * 60)
+
+    detector = StubDetector()
+    scheduler = create_detection_scheduler(lambda: detector, max_batch_size=8, max_wait_ms=2.0)
+    await drive(scheduler, 20, args.concurrency)
+    base = await drive(scheduler, args.frames, args.concurrency)
+    await scheduler.stop()
+    print(f"{'in-process':>14} | {base['fps']:>9.1f} | {base['p50']:>8.1f} | {base['p99']:>8.1f} | {1.0:>6.2f}x")
+
+    for workers in args.workers:
+        pool = VisionWorkerPool("benchmarks.bench_worker_pool:StubDetector", workers=workers,
+                                slots_per_worker=max(2, args.concurrency // workers),
+                                slot_bytes=1 << 20, max_batch_size=8)
+        await asyncio.get_running_loop().run_in_executor(None, pool.start)
+        try:
+            await drive(pool, 20, args.concurrency)
+            result = await drive(pool, args.frames, args.concurrency)
+        finally:
+            await pool.stop()
+        print(f"{f'pool x{workers}':>14} | {result['fps']:>9.1f} | {result['p50']:>8.1f} | "
+              f"{result['p99']:>8.1f} | {result['fps'] / base['fps']:>6.2f}x")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--work-ms", type=float, default=10.0)
+    args = parser.parse_args()
+    # 워커 프로세스도 같은 스텁 비용을 쓰도록 환경 변수로 전달
+    os.environ["BENCH_STUB_ITERATIONS"] = str(calibrate(args.work_ms))
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
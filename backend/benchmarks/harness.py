@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+벤치마크 공통 도구
+
+- 앱을 같은 프로세스에서 띄우는 ASGI lifespan / WebSocket 드라이버 (네트워크 없이 전체 미들웨어 / 라우터 경로)
+- closed-loop (동시 요청 수 고정) / open-loop (Poisson 도착률 고정) 부하 생성
+- 처리량 / 지연 분위수 요약과 JSON 결과 파일 (커밋, 호스트, 설정 포함)
+- 두 결과 파일 비교: 처리량 감소 / 지연 증가가 임계값을 넘으면 회귀로 표시
+
+결과 비교: python -m benchmarks.harness baseline.json current.json [--threshold 0.1]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# (지연 ms, 성공 여부)
+Record = Tuple[float, bool]
+PERCENTILES = (50, 90, 95, 99)
+
+
+# ===========================================
+# in-process 앱 드라이버
+# ===========================================
+
+class AppLifespan:
+    """ASGI lifespan 이벤트로 앱 startup / shutdown 실행 (uvicorn 없이)"""
+
+    def __init__(self, app):
+        self.app = app
+        self._receive: asyncio.Queue = asyncio.Queue()
+        self._send: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self):
+        scope = {"type": "lifespan", "asgi": {"version": "3.0", "spec_version": "2.0"}, "state": {}}
+        self._task = asyncio.create_task(self.app(scope, self._receive.get, self._send.put))
+        await self._receive.put({"type": "lifespan.startup"})
+        await self._expect("lifespan.startup.complete")
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._receive.put({"type": "lifespan.shutdown"})
+        await self._expect("lifespan.shutdown.complete")
+        await self._task
+
+    async def _expect(self, message_type: str):
+        message = await self._send.get()
+        if message["type"] != message_type:
+            raise RuntimeError(f"lifespan 실패: {message}")
+
+
+class ASGIWebSocket:
+    """앱에 직접 연결하는 WebSocket 클라이언트 (text / bytes 메시지)"""
+
+    def __init__(self, app, path: str):
+        self.app = app
+        self.path = path
+        self._incoming: asyncio.Queue = asyncio.Queue()
+        self._outgoing: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+
+    async def connect(self) -> "ASGIWebSocket":
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "path": self.path,
+            "raw_path": self.path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"bench")],
+            "client": ("127.0.0.1", 0),
+            "server": ("bench", 80),
+            "subprotocols": [],
+            "state": {}
+        }
+        await self._incoming.put({"type": "websocket.connect"})
+        self._task = asyncio.create_task(self.app(scope, self._incoming.get, self._outgoing.put))
+        message = await self._outgoing.get()
+        if message["type"] != "websocket.accept":
+            raise ConnectionError(f"WebSocket 연결 거부: {message}")
+        return self
+
+    async def send_bytes(self, data: bytes):
+        await self._incoming.put({"type": "websocket.receive", "bytes": data})
+
+    async def receive(self) -> Optional[Any]:
+        """다음 메시지 (text 는 str, binary 는 bytes, 닫히면 None)"""
+        message = await self._outgoing.get()
+        if message["type"] == "websocket.close":
+            self.closed = True
+            return None
+        return message.get("text") if message.get("text") is not None else message.get("bytes")
+
+    async def close(self, timeout: float = 5.0):
+        await self._incoming.put({"type": "websocket.disconnect", "code": 1000})
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+
+
+async def wait_ready(client, path: str = "/health/ready", timeout: float = 120.0):
+    """모델 warm-up 이 끝날 때까지 readiness 확인"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = await client.get(path)
+        if response.status_code == 200:
+            return response.json()
+        await asyncio.sleep(0.2)
+    raise TimeoutError(f"{timeout:g}초 안에 준비되지 않음: {response.json()}")
+
+
+# ===========================================
+# 부하 생성
+# ===========================================
+
+async def closed_loop(call: Callable[[], Awaitable[bool]], concurrency: int, duration: float) -> List[Record]:
+    """동시 요청 concurrency 개가 duration 초 동안 쉬지 않고 요청"""
+    records: List[Record] = []
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            ok = await _safe(call)
+            records.append(((time.perf_counter() - start) * 1000.0, ok))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return records
+
+
+async def open_loop(call: Callable[[], Awaitable[bool]], rate: float, duration: float,
+                    max_in_flight: int = 1000, seed: int = 0) -> Tuple[List[Record], int]:
+    """
+    Poisson 도착 (초당 rate 건) 을 응답과 무관하게 보냄 → (기록, max_in_flight 초과로 버린 수)
+
+    지연은 예정 도착 시각부터 잰다 (서버가 밀려 보내기가 늦어진 시간도 지연에 포함, coordinated omission 방지).
+    """
+    rng = np.random.default_rng(seed)
+    records: List[Record] = []
+    tasks = set()
+    dropped = 0
+    start = time.perf_counter()
+    scheduled = start
+
+    async def one(at: float):
+        ok = await _safe(call)
+        records.append(((time.perf_counter() - at) * 1000.0, ok))
+
+    while True:
+        scheduled += rng.exponential(1.0 / rate)
+        if scheduled - start >= duration:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(tasks) >= max_in_flight:
+            dropped += 1
+            continue
+        task = asyncio.create_task(one(scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+    return records, dropped
+
+
+async def _safe(call: Callable[[], Awaitable[bool]]) -> bool:
+    try:
+        return bool(await call())
+    except Exception:
+        return False
+
+
+def summarize(records: List[Record], elapsed: float, **extra) -> Dict[str, Any]:
+    """처리량 (성공 건 / 초) 과 성공 요청의 지연 분위수"""
+    latencies = np.array([latency for latency, ok in records if ok])
+    summary: Dict[str, Any] = {
+        **extra,
+        "requests": len(records),
+        "ok": int(len(latencies)),
+        "errors": len(records) - int(len(latencies)),
+        "elapsed_sec": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {}
+    }
+    if len(latencies):
+        summary["latency_ms"] = {
+            "mean": round(float(latencies.mean()), 3),
+            **{f"p{p}": round(float(v), 3) for p, v in zip(PERCENTILES, np.percentile(latencies, PERCENTILES))},
+            "max": round(float(latencies.max()), 3)
+        }
+    return summary
+
+
+def format_table(results: Dict[str, Dict[str, Any]]) -> List[str]:
+    width = max([len(name) for name in results] + [8])
+    lines = [f"{'scenario':>{width}} | {'load':>10} | {'ok':>6} | {'err':>4} | {'rps':>8} | "
+             f"{'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8}",
+             "-" * (width + 75)]
+    for name, summary in results.items():
+        if "concurrency" in summary:
+            load = f"c={summary['concurrency']}"
+        elif "rate" in summary:
+            load = f"{summary['rate']:g}/s"
+        else:
+            load = summary.get("load", "")
+        latency = summary.get("latency_ms") or {}
+        lines.append(f"{name:>{width}} | {load:>10} | {summary.get('ok', 0):>6} | {summary.get('errors', 0):>4} | "
+                     f"{summary.get('throughput_rps', 0):>8.1f} | {latency.get('p50', 0):>8.2f} | "
+                     f"{latency.get('p95', 0):>8.2f} | {latency.get('p99', 0):>8.2f}")
+    return lines
+
+
+# ===========================================
+# 결과 파일 / 비교
+# ===========================================
+
+def git_revision() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def write_results(path: str, suite: str, config: Dict[str, Any], results: Dict[str, Any],
+                  extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """커밋 / 호스트 / 설정과 함께 결과 JSON 저장"""
+    document = {
+        "suite": suite,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git": git_revision(),
+        "host": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+        },
+        "config": config,
+        "results": results,
+        **(extra or {})
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, ensure_ascii=False, indent=2, default=str)
+    return document
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float = 0.1) -> Tuple[List[str], List[str]]:
+    """
+    같은 이름의 결과끼리 비교 → (출력 줄, 회귀 목록)
+
+    throughput_rps 는 높을수록, latency_ms.* 와 *_us / *_ms 값은 낮을수록 좋은 것으로 본다.
+    """
+    lines, regressions = [], []
+    for name, now in current.get("results", {}).items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            lines.append(f"{name}: 기준 결과 없음")
+            continue
+        for metric, old, new, higher_is_better in _metrics(before, now):
+            if not old:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            flag = ""
+            if worse > threshold:
+                flag = "  ← 회귀"
+                regressions.append(f"{name}.{metric}")
+            elif worse < -threshold:
+                flag = "  (개선)"
+            lines.append(f"{name:>24} {metric:>18}: {old:>10.3f} → {new:>10.3f} ({change:+.1%}){flag}")
+    return lines, regressions
+
+
+def _metrics(before: Dict[str, Any], now: Dict[str, Any]):
+    if "throughput_rps" in now and "throughput_rps" in before:
+        yield "throughput_rps", before["throughput_rps"], now["throughput_rps"], True
+    # max 는 한 건에 좌우되어 비교에서 제외
+    for key, value in (now.get("latency_ms") or {}).items():
+        if key != "max" and key in (before.get("latency_ms") or {}):
+            yield f"latency_ms.{key}", before["latency_ms"][key], value, False
+    for key, value in now.items():
+        if (key.endswith("_us") or key.endswith("_ms")) and isinstance(value, (int, float)) and key in before:
+            yield key, before[key], value, False
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def report_comparison(baseline_path: str, current: Dict[str, Any], threshold: float) -> List[str]:
+    """기준 결과 파일과 비교해 출력하고 회귀 목록 반환"""
+    baseline = load_results(baseline_path)
+    print(f"비교 기준: {baseline_path} ({(baseline.get('git') or {}).get('commit')}, {baseline.get('created_at')})")
+    lines, regressions = compare(baseline, current, threshold)
+    for line in lines:
+        print(line)
+    print(f"회귀 {len(regressions)}건 (임계값 {threshold:.0%})" + (f": {', '.join(regressions)}" if regressions else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1, help="회귀로 볼 상대 변화 (0.1 = 10%%)")
+    args = parser.parse_args()
+    regressions = report_comparison(args.baseline, load_results(args.current), args.threshold)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
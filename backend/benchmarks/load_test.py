@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+엔드투엔드 부하 테스트 (앱을 같은 프로세스에서 스텁 모델로 실행)
+
+main.app 을 ASGI 로 직접 구동하고 (lifespan 으로 warm-up 후 /health/ready 대기) 비동기 클라이언트로
+/vision/detect/upload, /vision/stream (WebSocket), /rag/query 에 부하를 건다.
+
+- closed-loop: --concurrency 의 각 값마다 동시 요청 수 고정
+- open-loop:   --rate 의 각 값마다 Poisson 도착률 고정 (지연은 예정 도착 시각부터)
+- stream:      --streams 개의 WebSocket 스트림이 --fps 로 JPEG 프레임 전송, seq 별 응답 지연
+
+모델은 benchmarks.stubs 의 스텁 백엔드 (고정 forward 지연 + 실제 후처리), 임베더는 hash,
+벡터 인덱스는 합성 문서로 임시 디렉터리에 만든다 (환경 변수로 지정하면 그 값을 사용).
+결과는 커밋 / 호스트 / 설정과 함께 JSON 으로 저장하고, --baseline 을 주면 비교해 회귀를 표시한다.
+
+실행:
+    python -m benchmarks.load_test [--scenarios upload,rag,stream --concurrency 1,16 --rate 50 --duration 10]
+    python -m benchmarks.load_test --baseline benchmarks/results/load_test-<이전 커밋>.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.harness import (AppLifespan, ASGIWebSocket, closed_loop, format_table, git_revision, open_loop,
+                                report_comparison, summarize, wait_ready, write_results)
+
+SCENARIOS = ("upload", "rag", "stream")
+DOMAINS = ("construction", "electric", "plant", "safety")
+WORDS = ("펌프", "밸브", "압력", "점검", "교체", "절연", "차단기", "배전반", "필터", "누수", "센서", "알람",
+         "pump", "valve", "pressure", "inspection", "breaker", "filter", "sensor", "alarm", "torque", "seal")
+
+
+# ===========================================
+# 준비
+# ===========================================
+
+def configure(args) -> List[str]:
+    """앱 import 전에 환경 변수로 스텁 모델 / 임시 인덱스 지정 → 정리할 임시 디렉터리"""
+    cleanup = []
+    if not args.real_models:
+        os.environ.setdefault("VISION_DETECTOR_FACTORY", "benchmarks.stubs:load_stub_detector")
+        os.environ.setdefault("EMBEDDING_MODEL", "hash")
+    os.environ.setdefault("BENCH_STUB_FORWARD_MS", str(args.forward_ms))
+    if "VECTOR_DB_PATH" not in os.environ:
+        path = tempfile.mkdtemp(prefix="bench_load_rag_")
+        os.environ["VECTOR_DB_PATH"] = path
+        cleanup.append(path)
+    return cleanup
+
+
+def build_rag_index(documents: int, seed: int = 0) -> int:
+    """합성 문서로 벡터 / 역색인 생성 (VECTOR_DB_PATH 에 인덱스가 없을 때만)"""
+    from rag_service.core.config import settings
+    from rag_service.models.document import Document
+    from rag_service.services.retrieval_service import create_retrieval_service
+
+    if os.path.exists(os.path.join(settings.vector_db_path, "meta.json")):
+        return 0
+    rng = np.random.default_rng(seed)
+    now = datetime.now()
+    docs = []
+    for i in range(documents):
+        words = rng.choice(WORDS, 120)
+        text = " ".join(f"{word} PX-{rng.integers(0, 5000):04d}" if j % 17 == 0 else word
+                        for j, word in enumerate(words))
+        docs.append(Document(id=f"bench-{i}", title=f"manual-{i}.txt", content=text,
+                             domain=DOMAINS[i % len(DOMAINS)], file_path=f"bench/manual-{i}.txt",
+                             created_at=now, updated_at=now))
+    return create_retrieval_service().build_index(docs)
+
+
+def make_jpegs(count: int, width: int, height: int, quality: int = 85, seed: int = 0) -> List[bytes]:
+    """서로 다른 합성 JPEG (프레임 캐시가 업로드끼리 같은 이미지로 보지 않도록 내용이 다름)"""
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    images = []
+    for _ in range(count):
+        noise = rng.integers(0, 255, (height // 32, width // 32, 3), dtype=np.uint8)
+        image = cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC)
+        for _ in range(4):
+            x, y = int(rng.integers(0, width - 160)), int(rng.integers(0, height - 160))
+            image[y:y + int(rng.integers(40, 160)), x:x + int(rng.integers(40, 160))] = rng.integers(0, 255, 3)
+        ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        images.append(encoded.tobytes())
+    return images
+
+
+def make_queries(count: int, seed: int = 1) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    queries = []
+    for i in range(count):
+        words = " ".join(rng.choice(WORDS, 3))
+        query = f"{words} PX-{rng.integers(0, 5000):04d}" if i % 3 == 0 else words
+        queries.append({"query": query, "top_k": 5, "threshold": 0.0,
+                        "domain": DOMAINS[i % len(DOMAINS)] if i % 4 == 0 else None})
+    return queries
+
+
+# ===========================================
+# 시나리오
+# ===========================================
+
+async def run_load(name: str, service: str, call, args, results: Dict[str, Any]):
+    """closed-loop (동시성별) + open-loop (도착률별) 실행, 각 실행 전에 warm-up"""
+    from rag_service.core.metrics import metrics
+
+    for concurrency in args.concurrency:
+        await closed_loop(call, concurrency, args.warmup)
+        start = time.perf_counter()
+        records = await closed_loop(call, concurrency, args.duration)
+        results[f"{name}@c{concurrency}"] = summarize(records, time.perf_counter() - start,
+                                                      mode="closed", concurrency=concurrency)
+    for rate in args.rate:
+        await closed_loop(call, 1, args.warmup)
+        start = time.perf_counter()
+        records, dropped = await open_loop(call, rate, args.duration, max_in_flight=args.max_in_flight)
+        results[f"{name}@{rate:g}rps"] = summarize(records, time.perf_counter() - start,
+                                                   mode="open", rate=rate, dropped=dropped)
+    results[f"{name}:server_stages"] = _stage_snapshot(metrics.snapshot(), service)
+
+
+async def run_stream(app, client, frames: List[bytes], args) -> Dict[str, Any]:
+    """--streams 개 스트림이 --fps 로 프레임 전송 → 응답한 프레임의 전송 → 결과 수신 지연"""
+    config = {"encoding": "json", **args.stream_config}
+    records, sent_total = [], 0
+
+    async def one(index: int):
+        nonlocal sent_total
+        response = await client.request("GET", "/vision/stream/start", json=config)
+        response.raise_for_status()
+        stream_id = response.json()["stream_id"]
+        socket = await ASGIWebSocket(app, f"/vision/stream/ws/{stream_id}").connect()
+        sent_at: Dict[int, float] = {}
+
+        async def receiver():
+            while True:
+                message = await socket.receive()
+                if message is None:
+                    return
+                result = json.loads(message)
+                seq = result.get("seq")
+                if result.get("type") == "ocr" or seq not in sent_at:
+                    continue
+                ok = result.get("status") != "error"
+                records.append(((time.perf_counter() - sent_at.pop(seq)) * 1000.0, ok))
+
+        receiving = asyncio.create_task(receiver())
+        interval = 1.0 / args.fps
+        # 스트림마다 시작 시점을 흩어 동시에 프레임이 몰리지 않게 함
+        await asyncio.sleep(interval * index / args.streams)
+        next_at = time.perf_counter()
+        deadline = next_at + args.duration
+        seq = 0
+        while next_at < deadline:
+            seq += 1
+            sent_at[seq] = time.perf_counter()
+            await socket.send_bytes(frames[(index + seq) % len(frames)])
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+        sent_total += seq
+        await asyncio.sleep(0.5)  # 마지막 프레임 결과 대기
+        await socket.close()
+        receiving.cancel()
+        await client.get("/vision/stream/stop", params={"stream_id": stream_id})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.streams)))
+    elapsed = time.perf_counter() - start
+    summary = summarize(records, elapsed, mode="stream", load=f"{args.streams}x{args.fps:g}fps",
+                        streams=args.streams, fps=args.fps, frames_sent=sent_total)
+    summary["answered_ratio"] = round(len(records) / sent_total, 3) if sent_total else 0.0
+    return summary
+
+
+def _stage_snapshot(snapshot: Dict[str, Dict[str, Dict[str, float]]], service: str) -> Dict[str, Any]:
+    """서버 단계별 지연 (최근 창 p50 / p95 ms, 앞 시나리오 값이 섞이지 않도록 해당 서비스만)"""
+    return {
+        stage: {"p50_ms": round(stats["p50"] * 1000.0, 3), "p95_ms": round(stats["p95"] * 1000.0, 3)}
+        for stage, stats in snapshot.get(service, {}).items()
+    }
+
+
+async def run(args) -> Dict[str, Any]:
+    import httpx
+
+    from main import app
+    from rag_service.core.metrics import metrics
+
+    frames = make_jpegs(args.images, *args.image_size)
+    queries = make_queries(args.queries)
+    results: Dict[str, Any] = {}
+
+    async with AppLifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60.0) as client:
+            ready = await wait_ready(client)
+            print(f"ready: {', '.join(ready['models'])}")
+
+            if "upload" in args.scenarios:
+                uploads = itertools.cycle(frames)
+
+                async def upload():
+                    response = await client.post("/vision/detect/upload",
+                                                 files={"file": ("frame.jpg", next(uploads), "image/jpeg")})
+                    return response.status_code == 200
+
+                await run_load("upload", "vision", upload, args, results)
+
+            if "rag" in args.scenarios:
+                requests = itertools.cycle(queries)
+
+                async def rag():
+                    response = await client.post("/rag/query", json=next(requests))
+                    return response.status_code == 200
+
+                await run_load("rag", "rag", rag, args, results)
+
+            if "stream" in args.scenarios:
+                results["stream"] = await run_stream(app, client, frames, args)
+                results["stream:server_stages"] = _stage_snapshot(metrics.snapshot(), "vision")
+
+            status = (await client.get("/vision/status")).json()
+    return {"results": results, "scheduler": status.get("scheduler")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="upload,rag,stream 중 실행할 것")
+    parser.add_argument("--concurrency", default="1,16", help="closed-loop 동시 요청 수 목록 (쉼표 구분, 비우면 생략)")
+    parser.add_argument("--rate", default="50", help="open-loop 초당 도착 수 목록 (쉼표 구분, 비우면 생략)")
+    parser.add_argument("--duration", type=float, default=10.0, help="실행당 측정 시간 (초)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="실행당 warm-up 시간 (초, 결과 제외)")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="open-loop 최대 동시 요청 (넘으면 버림)")
+    parser.add_argument("--streams", type=int, default=4)
+    parser.add_argument("--fps", type=float, default=15.0, help="스트림당 전송 fps")
+    parser.add_argument("--stream-config", type=json.loads, default={},
+                        help='StreamConfig 덮어쓰기 JSON (예: \'{"tracking": false}\')')
+    parser.add_argument("--image-size", type=lambda s: tuple(int(v) for v in s.split("x")), default=(1280, 720),
+                        help="업로드 / 프레임 JPEG 크기 WxH")
+    parser.add_argument("--images", type=int, default=16, help="돌려 쓰는 서로 다른 JPEG 수")
+    parser.add_argument("--queries", type=int, default=200, help="돌려 쓰는 서로 다른 RAG 쿼리 수")
+    parser.add_argument("--documents", type=int, default=2000, help="임시 RAG 인덱스 문서 수")
+    parser.add_argument("--forward-ms", type=float, default=6.0, help="스텁 모델 배치당 forward 시간")
+    parser.add_argument("--real-models", action="store_true", help="스텁 대신 설정된 모델 / 임베더 사용")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본 benchmarks/results/load_test-<커밋>.json)")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.1, help="회귀로 볼 상대 변화")
+    args = parser.parse_args()
+    args.scenarios = [s for s in args.scenarios.split(",") if s]
+    args.concurrency = [int(v) for v in args.concurrency.split(",") if v]
+    args.rate = [float(v) for v in args.rate.split(",") if v]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {sorted(unknown)}")
+
+    cleanup = configure(args)
+    try:
+        if "rag" in args.scenarios:
+            started = time.perf_counter()
+            chunks = build_rag_index(args.documents)
+            if chunks:
+                print(f"RAG 인덱스: {chunks}개 청크 ({time.perf_counter() - started:.1f}s)")
+        outcome = asyncio.run(run(args))
+    finally:
+        for path in cleanup:
+            shutil.rmtree(path, ignore_errors=True)
+
+    results = outcome["results"]
+    print("=" * 100)
+    for line in format_table({name: r for name, r in results.items() if ":" not in name}):
+        print(line)
+    print("=" * 100)
+    for name, stages in results.items():
+        if name.endswith(":server_stages"):
+            print(f"{name.split(':')[0]} 서버 단계 p50 ms: "
+                  + ", ".join(f"{stage}={values['p50_ms']:.2f}" for stage, values in stages.items()))
+
+    commit = (git_revision()["commit"] or "nogit")[:8]
+    output = args.output or os.path.join("benchmarks", "results", f"load_test-{commit}.json")
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+    document = write_results(output, "load_test", config, results, {"scheduler": outcome["scheduler"]})
+    print(f"결과 저장: {output}")
+    if args.baseline:
+        regressions = report_comparison(args.baseline, document, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
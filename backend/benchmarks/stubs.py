@@ -0,0 +1,115 @@
+"""
+벤치마크용 스텁 모델
+
+StubBackend 는 forward 를 정해진 시간만큼 대기 (GIL 을 놓는 실제 추론처럼) 한 뒤
+YOLOv8 head 와 같은 모양의 출력을 만들어 준다. 디코딩 / NMS / 파싱 / 직렬화는
+실제 코드 경로를 그대로 타므로 모델 가중치 없이 서비스 전체 경로를 잴 수 있다.
+
+    VISION_DETECTOR_FACTORY=benchmarks.stubs:load_stub_detector
+
+환경 변수 (워커 풀 프로세스에도 그대로 전달됨):
+    BENCH_STUB_FORWARD_MS        배치당 고정 forward 시간 (기본 6)
+    BENCH_STUB_FORWARD_MS_IMAGE  이미지당 추가 forward 시간 (기본 2, 640 입력 기준 면적 비례)
+    BENCH_STUB_OBJECTS           이미지당 만들 물체 수 (기본 5)
+
+cascade 의 큰 모델은 StubLargeBackend (VISION_CASCADE_DETECTOR_FACTORY=benchmarks.stubs:load_stub_large_detector):
+    BENCH_STUB_LARGE_FORWARD_MS        배치당 고정 forward 시간 (기본 24)
+    BENCH_STUB_LARGE_FORWARD_MS_IMAGE  이미지당 추가 forward 시간 (기본 8)
+    BENCH_STUB_LARGE_CONFIRM           애매한 객체를 확인해 줄 확률 (기본 0.7, 나머지는 오탐으로 제거됨)
+"""
+
+import os
+import time
+
+import numpy as np
+
+from rag_service.core.config import settings
+from vision_service.core import backends
+from vision_service.core.detector import VisionDetector
+from vision_service.core.frames import LETTERBOX_FILL
+
+STRIDES = (8, 16, 32)
+
+
+class StubBackend(backends.InferenceBackend):
+    """고정 지연 + 합성 head 출력 백엔드"""
+    name = "stub"
+
+    def load(self) -> "StubBackend":
+        self.forward_ms = float(os.environ.get("BENCH_STUB_FORWARD_MS", 6.0))
+        self.forward_ms_image = float(os.environ.get("BENCH_STUB_FORWARD_MS_IMAGE", 2.0))
+        self.objects = int(os.environ.get("BENCH_STUB_OBJECTS", 5))
+        self._fill_names(None)
+        return self
+
+    def infer(self, batch: np.ndarray) -> np.ndarray:
+        size = batch.shape[-1]
+        time.sleep((self.forward_ms + self.forward_ms_image * len(batch) * (size / 640.0) ** 2) / 1000.0)
+
+        anchors = sum((size // stride) ** 2 for stride in STRIDES)
+        output = np.zeros((len(batch), 4 + len(self.names), anchors), dtype=np.float32)
+        for i, image in enumerate(batch):
+            # 입력 내용에서 시드를 정해 같은 프레임은 같은 결과 (프레임 캐시 / 추적 동작 유지)
+            rng = np.random.default_rng(int(image[:, ::64, ::64].sum() * 1000) & 0xFFFFFFFF)
+            picks = rng.choice(anchors, self.objects, replace=False)
+            output[i, 0, picks] = rng.uniform(0.1, 0.9, self.objects) * size
+            output[i, 1, picks] = rng.uniform(0.1, 0.9, self.objects) * size
+            output[i, 2, picks] = rng.uniform(0.05, 0.2, self.objects) * size
+            output[i, 3, picks] = rng.uniform(0.05, 0.2, self.objects) * size
+            output[i, 4 + rng.integers(0, len(self.names), self.objects), picks] = rng.uniform(0.5, 0.95, self.objects)
+        return output
+
+
+class StubLargeBackend(StubBackend):
+    """
+    cascade 용 큰 모델 스텁 (더 느리고, 확인한 객체는 높은 신뢰도)
+
+    region 모드에서는 입력이 애매한 객체 주변 crop 이므로 letterbox 안 이미지 영역의
+    가운데 (context 0.25 기준 객체 크기) 에 물체 하나를 낸다. frame 모드에서는 같은 프레임을
+    작은 스텁과 같은 크기로 보므로 같은 위치의 물체를 내고, 신뢰도만 다시 뽑는다.
+    """
+    name = "stub_large"
+
+    def load(self) -> "StubLargeBackend":
+        super().load()
+        self.forward_ms = float(os.environ.get("BENCH_STUB_LARGE_FORWARD_MS", 24.0))
+        self.forward_ms_image = float(os.environ.get("BENCH_STUB_LARGE_FORWARD_MS_IMAGE", 8.0))
+        self.confirm = float(os.environ.get("BENCH_STUB_LARGE_CONFIRM", 0.7))
+        self.mode = settings.vision_cascade_mode
+        return self
+
+    def infer(self, batch: np.ndarray) -> np.ndarray:
+        output = super().infer(batch)
+        for i, image in enumerate(batch):
+            rng = np.random.default_rng(int(image[:, ::64, ::64].sum() * 1000 + 1) & 0xFFFFFFFF)
+            picks = np.flatnonzero(output[i, 4:].max(axis=0) > 0)
+            if self.mode == "region":
+                output[i, :, picks] = 0.0
+                # letterbox 패딩이 아닌 영역
+                content = np.abs(image - LETTERBOX_FILL / 255.0).max(axis=0) > 1e-3
+                rows, cols = np.flatnonzero(content.any(axis=1)), np.flatnonzero(content.any(axis=0))
+                if len(rows) == 0 or rng.random() >= self.confirm:
+                    continue
+                output[i, 0, 0] = (cols[0] + cols[-1]) / 2
+                output[i, 1, 0] = (rows[0] + rows[-1]) / 2
+                output[i, 2, 0] = (cols[-1] - cols[0]) / 1.5
+                output[i, 3, 0] = (rows[-1] - rows[0]) / 1.5
+                output[i, 4 + rng.integers(0, len(self.names)), 0] = rng.uniform(0.75, 0.95)
+            else:
+                confirmed = rng.random(len(picks)) < self.confirm
+                scores = output[i, 4:, picks]
+                scores[scores > 0] = np.where(confirmed, rng.uniform(0.75, 0.95, len(picks)), 0.0)
+                output[i, 4:, picks] = scores
+        return output
+
+
+def load_stub_detector() -> VisionDetector:
+    """StubBackend 로 로드한 detector (VISION_DETECTOR_FACTORY 용)"""
+    backends.BACKENDS[StubBackend.name] = StubBackend
+    return VisionDetector(model_path="stub", backend=StubBackend.name).load()
+
+
+def load_stub_large_detector() -> VisionDetector:
+    """StubLargeBackend 로 로드한 detector (VISION_CASCADE_DETECTOR_FACTORY 용)"""
+    backends.BACKENDS[StubLargeBackend.name] = StubLargeBackend
+    return VisionDetector(model_path="stub_large", backend=StubLargeBackend.name).load()
@@ -2,7 +2,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from rag_service.api.rag_router import router as rag_router
 from rag_service.api.health_router import router as health_router
-from vision_service.api.vision_router import router as vision_router
+from rag_service.core.config import settings
+from rag_service.core.model_registry import model_registry
+from rag_service.services.llm_gateway import llm_gateway
+from vision_service.api.vision_router import router as vision_router, inference_scheduler, video_jobs
 
 app = FastAPI(
     title="Field Intelligence Cloud Platform - Backend",
@@ -24,6 +27,25 @@ app.include_router(health_router, prefix="/health", tags=["health"])
 app.include_router(rag_router, prefix="/rag", tags=["rag"])
 app.include_router(vision_router, prefix="/vision", tags=["vision"])
 
+@app.on_event("startup")
+async def startup():
+    """
+    YOLO / 임베더 / 벡터 인덱스를 백그라운드에서 병렬 로드
+    
+    startup 은 기다리지 않으므로 /health/live 는 바로 응답하고,
+    /health/ready 는 모든 모델이 준비될 때까지 503 을 반환한다.
+    중단됐던 영상 분석 작업은 마지막 체크포인트부터 다시 실행한다.
+    """
+    model_registry.start_warm_up()
+    video_jobs.recover(resume=settings.vision_video_resume_on_start)
+
+@app.on_event("shutdown")
+async def shutdown():
+    """영상 분석 작업 (체크포인트 저장) / 추론 스케줄러 / LLM 연결 풀 정리"""
+    await video_jobs.stop()
+    await inference_scheduler.stop()
+    await llm_gateway.close()
+
 @app.get("/")
 async def root():
     return {"message": "Field Intelligence Cloud Platform Backend API"}
@@ -1,6 +1,9 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from datetime import datetime
 
+from rag_service.core.model_registry import model_registry
+
 router = APIRouter()
 
 @router.get("/")
@@ -14,17 +17,18 @@ async def health_check():
 
 @router.get("/ready")
 async def readiness_check():
-    """서비스 준비 상태 확인"""
+    """서비스 준비 상태 확인 (모델별 로딩 상태, 필수 모델 준비 전에는 503, optional 모델 실패는 degraded 로 표시)"""
     # TODO: 데이터베이스 연결, 외부 서비스 연결 상태 확인
-    return {
-        "status": "ready",
-        "timestamp": datetime.now().isoformat(),
-        "checks": {
-            "database": "ok",
-            "vector_store": "ok",
-            "llm_service": "ok"
+    ready = model_registry.ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "timestamp": datetime.now().isoformat(),
+            "degraded": model_registry.degraded(),
+            "models": model_registry.status()
         }
-    }
+    )
 
 @router.get("/live")
 async def liveness_check():
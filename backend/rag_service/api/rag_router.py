@@ -1,27 +1,59 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
+import json
 import logging
+import time
+
+from rag_service.core.config import settings
+from rag_service.core.metrics import StageTimings
+from rag_service.core.model_registry import model_registry
+from rag_service.models.document import QueryRequest, QueryResponse, SourceDocument
+from rag_service.services.llm_gateway import build_rag_messages, llm_gateway
+from rag_service.services.query_cache import ResponseCache, response_cache
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-class QueryRequest(BaseModel):
-    query: str
-    domain: Optional[str] = None
-    top_k: int = 5
-    threshold: float = 0.7
+# ===========================================
+# 모델 로더 (faiss / sentence-transformers import 는 로더 안에서만)
+# ===========================================
+
+def _load_embedder():
+    from rag_service.services.embedder import create_embedder
+    embedder = create_embedder(settings.embedding_model, settings.embedding_dimension)
+    embedder.load()
+    return embedder
+
+def _load_vector_index():
+    from rag_service.services.retrieval_service import create_vector_store
+    store = create_vector_store()
+    if store.load():
+        logger.info(f"벡터 인덱스 로드 완료: {store.size}개 청크 ({store.index_type})")
+    else:
+        logger.warning(f"벡터 인덱스 없음: {store.path}")
+    return store
 
-class SourceDocument(BaseModel):
-    document: str
-    page: Optional[int] = None
-    content: str
-    similarity: float
+def _load_retrieval_service():
+    from rag_service.services.retrieval_service import create_retrieval_service
+    return create_retrieval_service(model_registry.get("rag_vector_index"), model_registry.get("rag_embedder"))
 
-class QueryResponse(BaseModel):
-    answer: str
-    sources: List[SourceDocument]
-    processing_time: float
+# 임베더와 인덱스는 warm-up 에서 병렬로 로드되고, 검색 엔진은 둘이 준비되면 조립
+model_registry.register("rag_embedder", _load_embedder)
+model_registry.register("rag_vector_index", _load_vector_index)
+model_registry.register("rag_retrieval", _load_retrieval_service)
+
+async def get_retrieval_service():
+    """로드된 검색 엔진 (warm-up 이 끝나지 않았으면 워커 스레드에서 로드 완료 대기)"""
+    service = model_registry.peek("rag_retrieval")
+    if service is not None:
+        return service
+    try:
+        return await run_in_threadpool(model_registry.get, "rag_retrieval")
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
 @router.post("/query", response_model=QueryResponse)
 async def query_documents(request: QueryRequest):
@@ -35,34 +67,204 @@ async def query_documents(request: QueryRequest):
         QueryResponse: 검색 결과 및 LLM 응답
     """
     try:
-        # TODO: RAG 서비스 구현
+        started = time.perf_counter()
         logger.info(f"RAG Query received: {request.query}")
+        retrieval_service = await get_retrieval_service()
+        
+        # 동일 쿼리 응답 캐시 (인덱스 버전이 바뀌었으면 먼저 비움)
+        # 검색을 시작한 버전을 기억해 두고, 생성 중 인덱스가 바뀌었으면 저장하지 않음
+        index_version = retrieval_service.store.version
+        response_cache.sync_version(index_version)
+        cache_key = ResponseCache.make_key(request.query, request.domain, request.top_k, request.threshold)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached.copy(update={"processing_time": time.perf_counter() - started})
+        
+        timings = StageTimings("rag")
+        sources = await _retrieve(retrieval_service, request, timings)
+        
+        started_generate = time.perf_counter()
+        if _use_llm(sources):
+            generation = {}
+            tokens = llm_gateway.stream(build_rag_messages(request.query, sources), info=generation)
+            answer = "".join([token async for token in tokens])
+        else:
+            answer, generation = _fallback_answer(sources), None
+        timings.add("generate", (time.perf_counter() - started_generate) * 1000.0)
         
-        # 임시 응답 (실제 구현 예정)
         response = QueryResponse(
-            answer="RAG 서비스가 구현 중입니다.",
-            sources=[
-                SourceDocument(
-                    document="sample.pdf",
-                    page=1,
-                    content="샘플 문서 내용",
-                    similarity=0.95
-                )
-            ],
-            processing_time=0.1
+            answer=answer,
+            sources=sources,
+            processing_time=timings.total_ms / 1000.0,
+            generation=generation
         )
+        response_cache.put_for_version(cache_key, response, index_version)
         
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"RAG Query error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/query/stream")
+async def query_documents_stream(request: QueryRequest):
+    """
+    RAG 쿼리 스트리밍 API (Server-Sent Events)
+    
+    검색 결과를 `sources` 이벤트로 먼저 보내고, LLM 토큰을 `token` 이벤트로 받는 대로 전달한 뒤
+    `done` 이벤트에 처리 시간 / time-to-first-token / tokens/sec 를 담는다.
+    """
+    try:
+        started = time.perf_counter()
+        logger.info(f"RAG Stream Query received: {request.query}")
+        retrieval_service = await get_retrieval_service()
+        
+        index_version = retrieval_service.store.version
+        response_cache.sync_version(index_version)
+        cache_key = ResponseCache.make_key(request.query, request.domain, request.top_k, request.threshold)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            events = _cached_events(cached, started)
+        else:
+            timings = StageTimings("rag")
+            sources = await _retrieve(retrieval_service, request, timings)
+            events = _answer_events(request, sources, timings, cache_key, index_version)
+        
+        return StreamingResponse(events, media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"RAG Stream Query error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _retrieve(retrieval_service, request: QueryRequest, timings: StageTimings) -> List[SourceDocument]:
+    """쿼리 임베딩 + 벡터 / BM25 하이브리드 검색 (워커 스레드)"""
+    return await run_in_threadpool(
+        retrieval_service.search,
+        request.query,
+        top_k=request.top_k,
+        threshold=request.threshold,
+        domain=request.domain,
+        timings=timings
+    )
+
+def _use_llm(sources: List[SourceDocument]) -> bool:
+    """근거 문서가 있고 LLM 이 설정된 경우에만 생성 (아니면 최상위 검색 결과 반환)"""
+    return bool(sources) and llm_gateway.configured
+
+def _fallback_answer(sources: List[SourceDocument]) -> str:
+    return sources[0].content if sources else "관련 문서를 찾지 못했습니다."
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def _answer_events(request: QueryRequest, sources: List[SourceDocument],
+                         timings: StageTimings, cache_key: tuple,
+                         index_version: Optional[str]) -> AsyncIterator[str]:
+    """sources → token* → done 이벤트 (끝까지 받은 답변은 검색한 인덱스 버전이 아직 현재면 응답 캐시에 저장)"""
+    yield _sse("sources", [source.dict() for source in sources])
+    
+    started_generate = time.perf_counter()
+    parts: List[str] = []
+    generation: Optional[Dict[str, Any]] = None
+    try:
+        if _use_llm(sources):
+            info: Dict[str, Any] = {}
+            async for token in llm_gateway.stream(build_rag_messages(request.query, sources), info=info):
+                parts.append(token)
+                yield _sse("token", {"text": token})
+            generation = info
+        else:
+            parts.append(_fallback_answer(sources))
+            yield _sse("token", {"text": parts[0]})
+    except Exception as e:
+        logger.error(f"RAG 스트림 생성 오류: {str(e)}")
+        yield _sse("error", {"detail": str(e)})
+        return
+    timings.add("generate", (time.perf_counter() - started_generate) * 1000.0)
+    
+    response = QueryResponse(
+        answer="".join(parts),
+        sources=sources,
+        processing_time=timings.total_ms / 1000.0,
+        generation=generation
+    )
+    response_cache.put_for_version(cache_key, response, index_version)
+    yield _sse("done", {"processing_time": response.processing_time, "generation": generation, "cached": False})
+
+async def _cached_events(cached: QueryResponse, started: float) -> AsyncIterator[str]:
+    """캐시된 응답은 답변 전체를 토큰 하나로 보냄"""
+    yield _sse("sources", [source.dict() for source in cached.sources])
+    yield _sse("token", {"text": cached.answer})
+    yield _sse("done", {"processing_time": time.perf_counter() - started,
+                        "generation": cached.generation, "cached": True})
+
 @router.get("/status")
 async def get_rag_status():
     """RAG 서비스 상태 확인"""
+    retrieval_service = model_registry.peek("rag_retrieval")
+    if retrieval_service is None:
+        return {
+            "status": "loading",
+            "service": "RAG Service",
+            "version": "1.0.0",
+            "index_loaded": False,
+            "models": model_registry.status()
+        }
     return {
         "status": "active",
         "service": "RAG Service",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "index_loaded": retrieval_service.loaded,
+        "index_type": retrieval_service.store.index_type,
+        "index_size": retrieval_service.store.size,
+        "vector_index": retrieval_service.store.stats(),
+        "lexical_index": retrieval_service.store.lexical.stats() if retrieval_service.store.lexical is not None else None,
+        "cache": {
+            "embedding": retrieval_service.embedding_cache.stats(),
+            "response": response_cache.stats()
+        },
+        "llm": llm_gateway.stats()
     }
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """쿼리 임베딩 / 응답 캐시 적중률과 eviction 통계"""
+    retrieval_service = model_registry.peek("rag_retrieval")
+    return {
+        "embedding": retrieval_service.embedding_cache.stats() if retrieval_service is not None else None,
+        "response": response_cache.stats()
+    }
+
+@router.post("/index/reload")
+async def reload_index():
+    """
+    수집 파이프라인이 갱신한 벡터 인덱스 다시 로드
+
+    검색 중인 store 를 비우지 않도록 새 store 에 로드한 뒤 레지스트리의 인스턴스를 교체한다
+    (진행 중인 쿼리는 이전 store 로 끝까지 검색).
+    """
+    try:
+        from rag_service.services.retrieval_service import create_vector_store
+        current = await get_retrieval_service()
+        retrieval_service = current.with_store(create_vector_store())
+        loaded = await run_in_threadpool(retrieval_service.load)
+        model_registry.replace("rag_vector_index", retrieval_service.store)
+        model_registry.replace("rag_retrieval", retrieval_service)
+        # 이전 버전으로 검색 중인 쿼리의 응답이 새 버전 캐시에 들어가지 않도록 바로 전환
+        response_cache.sync_version(retrieval_service.store.version)
+        return {
+            "status": "reloaded" if loaded else "not_found",
+            "index_size": retrieval_service.store.size,
+            "index_version": retrieval_service.store.version
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"인덱스 재로드 오류: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -9,23 +9,182 @@ class Settings(BaseSettings):
     api_version: str = "1.0.0"
     debug: bool = False
     
+    # 모델 로딩 설정
+    model_retry_backoff_sec: float = 5.0  # 로드 실패 후 첫 재시도까지 대기 (연속 실패마다 두 배)
+    model_retry_max_backoff_sec: float = 300.0
+    
     # 벡터 데이터베이스 설정
     vector_db_type: str = "faiss"  # faiss, chroma, pinecone
     vector_db_path: str = "./rag_service/data/embeddings"
+    vector_index_type: str = "flat"  # flat, ivf, hnsw
+    vector_index_mmap: bool = True  # 인덱스를 메모리 매핑으로 로드
+    vector_ivf_nlist: int = 1024
+    vector_ivf_nprobe: int = 16
+    vector_hnsw_m: int = 32
+    vector_hnsw_ef_search: int = 64
+    vector_quantization: str = "none"  # none, sq8 (차원당 int8), pq (벡터당 vector_pq_m 바이트) — 새로 build 할 때 적용
+    vector_pq_m: int = 48  # pq 부분 벡터 수 (embedding_dimension 의 약수)
+    vector_rerank_factor: int = 4  # 양자화 인덱스에서 top_k 의 몇 배 후보를 원본 벡터로 다시 정렬할지
+    
+    # 하이브리드 검색 설정 (BM25 역색인 + 벡터, vector_db_path/lexical)
+    lexical_index_enabled: bool = True  # False 면 벡터 검색만
+    lexical_bm25_k1: float = 1.2
+    lexical_bm25_b: float = 0.75
+    lexical_common_df_ratio: float = 0.05  # 이보다 많은 문서에 나오는 용어는 드문 용어가 찾은 문서에만 점수 추가
+    lexical_min_match: float = 0.5  # 어휘 후보가 포함해야 하는 쿼리 토큰 비율 (threshold 는 벡터 후보에만 적용)
+    hybrid_candidates: int = 50  # 검색기별로 RRF 에 넘기는 후보 수
+    hybrid_rrf_k: int = 60  # RRF 상수 (클수록 하위 순위 후보의 기여가 커짐)
     
     # 임베딩 모델 설정
     embedding_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
     embedding_dimension: int = 384
     
+    # 쿼리 캐시 설정
+    query_embedding_cache_size: int = 1024  # 정규화 쿼리 → 임베딩 LRU
+    query_embedding_cache_ttl_sec: float = 3600.0
+    query_response_cache_size: int = 256  # (query, domain, top_k, threshold) → 응답
+    query_response_cache_ttl_sec: float = 300.0
+    
     # LLM 설정
     llm_provider: str = "openai"  # openai, anthropic, local
     openai_api_key: Optional[str] = None
     anthropic_api_key: Optional[str] = None
+    llm_model: str = ""  # 비우면 provider 기본 모델
+    llm_base_url: Optional[str] = None  # local (OpenAI 호환 서버) / 프록시 주소
+    llm_max_concurrency: int = 8  # provider 에 동시에 보내는 최대 요청 수
+    llm_pool_size: int = 32  # keep-alive 연결 풀 크기
+    llm_keepalive_sec: float = 30.0
+    llm_timeout_sec: float = 60.0
+    llm_max_tokens: int = 512
+    llm_temperature: float = 0.0
+    llm_coalesce_requests: bool = True  # 진행 중인 같은 프롬프트는 upstream 호출 하나를 공유
     
     # 문서 처리 설정
     chunk_size: int = 1000
     chunk_overlap: int = 200
     documents_path: str = "./rag_service/data/documents"
+    ingestion_batch_size: int = 64  # 한 번에 임베딩할 청크 수
+    ingestion_workers: int = 2  # 임베딩 워커 스레드 수 (동시에 메모리에 올라가는 배치는 2배까지)
+    
+    # Vision 추론 백엔드 설정
+    vision_backend: str = "torch"  # torch, onnxruntime, openvino
+    vision_model_path: str = "yolov8n.pt"  # onnxruntime / openvino 는 model_export 결과 (.onnx / .xml)
+    vision_backend_threads: int = 0  # 백엔드 intra-op 스레드 수 (0 이면 런타임 기본값)
+    vision_openvino_device: str = "CPU"
+    vision_detect_confidence: float = 0.25  # NMS 전 후보 최소 점수 (요청별 임계값은 그 뒤에 적용)
+    vision_nms_iou_threshold: float = 0.7
+    vision_max_detections: int = 300
+
+    # Vision 추론 스케줄러 설정
+    vision_max_batch_size: int = 8  # 한 번의 forward pass 로 묶을 최대 프레임 수
+    vision_max_batch_wait_ms: float = 5.0  # 배치를 채우기 위해 기다리는 최대 시간
+
+    # Vision 업로드 디코딩 설정
+    vision_input_size: int = 640  # 모델 입력 크기 (업로드 이미지는 이 크기의 텐서로 변환)
+    vision_reduced_decode: bool = True  # 원본이 입력의 2배 이상이면 JPEG 축소 디코딩
+    vision_upload_buffers: int = 8  # 재사용할 업로드 읽기 버퍼 수
+    vision_upload_max_mb: float = 20.0  # 업로드 이미지 최대 크기 (넘으면 413)
+    vision_upload_buffer_max_mb: float = 8.0  # 이보다 커진 읽기 버퍼는 풀에 돌려놓지 않고 버림
+
+    # Vision 워커 풀 설정
+    vision_execution_mode: str = "in_process"  # in_process, pool
+    vision_pool_workers: int = 2  # 모델 복제본을 가진 워커 프로세스 수
+    vision_pool_slots: int = 4  # 워커별 공유 메모리 링 버퍼 슬롯 수
+    vision_pool_slot_mb: float = 5.0  # 슬롯 크기 (640x640 float32 텐서 = 4.7MB)
+    vision_pool_pin_cores: bool = True  # 워커마다 threads_per_worker 개 코어 블록에 고정
+    vision_pool_threads_per_worker: int = 1  # 워커별 torch / OpenMP 스레드 수
+    vision_pool_max_restarts: int = 5  # 준비되지 못하고 연속으로 죽는 워커의 재시작 예산 (다 쓰면 풀 실패)
+    vision_pool_restart_backoff_sec: float = 0.5  # 첫 재시작 대기 시간 (연속 실패마다 두 배, 최대 30s)
+    vision_pool_dispatch_timeout_sec: float = 30.0  # 빈 슬롯을 기다리는 최대 시간
+    vision_detector_factory: str = "vision_service.core.detector:load_detector"
+
+    # Vision 스트림 세션 설정
+    vision_stream_connect_timeout_sec: float = 60.0  # 발급 후 이 시간 안에 WebSocket 연결이 없으면 세션 삭제
+
+    # Vision 추적 설정 (스트림)
+    vision_tracking_enabled: bool = True  # 스트림 기본값, StreamConfig.tracking 으로 변경 가능
+    vision_keyframe_interval: int = 5  # 최소 N 프레임마다 전체 탐지 (1 이면 매 프레임)
+    vision_keyframe_motion_threshold: float = 12.0  # 장면 변화(축소 흑백 평균 차이)가 크면 탐지
+    vision_keyframe_min_confidence: float = 0.25  # 트랙 신뢰도가 떨어지면 탐지
+    vision_tracker_iou_threshold: float = 0.3
+    vision_tracker_max_misses: int = 2  # 연속으로 놓친 keyframe 수가 이보다 많으면 트랙 삭제
+
+    # Vision 적응형 해상도 / 프레임 스킵 (스트림)
+    vision_governor_enabled: bool = True  # 스트림 기본값, StreamConfig.adaptive 로 변경 가능
+    vision_latency_slo_ms: float = 150.0  # 추론 프레임 처리 지연 목표 (디코딩 + 대기 + 추론)
+    vision_governor_input_sizes: str = "640,480,320"  # 쉼표 구분, 고정 입력 모델 (ONNX static) 은 모델 크기만 사용
+    vision_governor_max_frame_skip: int = 2  # 가장 작은 입력에서도 넘치면 추론 사이에 건너뛸 최대 프레임 수
+    vision_governor_low_watermark: float = 0.6  # 지연이 SLO 의 이 비율 아래면 한 단계 복귀
+    vision_governor_up_hold_sec: float = 3.0  # 단계 변경 후 복귀까지 최소 유지 시간
+
+    # Vision 프레임 결과 캐시 (거의 같은 프레임은 추론 생략)
+    vision_frame_cache_enabled: bool = True
+    vision_frame_cache_hash_size: int = 16  # dHash 크기 (16 → 256비트)
+    vision_frame_cache_max_distance: int = 4  # 같은 프레임으로 볼 최대 Hamming 거리
+    vision_frame_cache_max_age_sec: float = 1.0  # 캐시된 결과 재사용 최대 시간
+    vision_frame_cache_entries: int = 8  # 스트림 / 설정별 보관 결과 수
+    vision_frame_cache_max_scopes: int = 64
+
+    # Vision OCR 설정 (탐지 영역만 잘라 비동기 인식)
+    vision_ocr_enabled: bool = False
+    vision_ocr_labels: str = "stop sign,book,laptop,tv,cell phone,clock"  # 쉼표 구분, 이 라벨만 OCR
+    vision_ocr_languages: str = "ko,en"
+    vision_ocr_max_crops: int = 8  # 프레임당 최대 crop 수
+    vision_ocr_pixel_budget: int = 98304  # 프레임당 crop 픽셀 합 상한 (높이 48 기준 약 2000px 폭)
+    vision_ocr_crop_height: int = 48
+    vision_ocr_cache_size: int = 512  # (stream_id, track_id, crop hash) → 텍스트
+    vision_ocr_max_pending: int = 2  # 밀려 있는 프레임이 이만큼이면 새 프레임 OCR 생략
+    vision_ocr_recognizer_factory: str = "vision_service.services.ocr_service:load_easyocr"
+    
+    # Vision 모델 cascade 설정 (작은 모델 결과 중 애매한 객체만 큰 모델로 비동기 재확인)
+    vision_cascade_enabled: bool = False
+    vision_cascade_model_path: str = "yolov8m.pt"  # 백엔드는 vision_backend 와 같음
+    vision_cascade_detector_factory: str = "vision_service.core.cascade:load_large_detector"
+    vision_cascade_mode: str = "region"  # region (애매한 객체 주변만 crop), frame (프레임 전체)
+    vision_cascade_low: float = 0.3  # 신뢰도가 [low, high) 인 객체를 애매한 것으로 봄
+    vision_cascade_high: float = 0.6
+    vision_cascade_budget: float = 0.2  # 스트림별 escalation 프레임 비율 상한 (StreamConfig.cascade_budget 로 변경 가능)
+    vision_cascade_burst: float = 5.0  # 몰아서 escalation 할 수 있는 최대 프레임 수
+    vision_cascade_max_regions: int = 4  # 프레임당 큰 모델로 볼 최대 객체 수
+    vision_cascade_context: float = 0.25  # crop 을 박스 크기 대비 각 변으로 늘리는 비율
+    vision_cascade_crop_size: int = 320  # region crop 의 큰 모델 입력 크기 (전체 프레임보다 작게)
+    vision_cascade_match_iou: float = 0.3  # 큰 모델 탐지를 원래 객체로 볼 최소 IoU (못 찾으면 오탐으로 제거)
+    vision_cascade_max_pending: int = 2  # 밀려 있는 프레임이 이만큼이면 새 프레임 escalation 생략
+
+    # Vision 영상 일괄 분석 작업 설정 (업로드 영상 → NDJSON 결과)
+    vision_video_job_dir: str = "./vision_service/data/video_jobs"  # 작업별 영상 / job.json / results.ndjson
+    vision_video_max_concurrent_jobs: int = 1  # 동시에 실행할 작업 수 (실시간 스트림 몫을 남기도록 작게)
+    vision_video_batch_size: int = 4  # 작업당 한 번에 탐지에 넣는 프레임 수
+    vision_video_checkpoint_every: int = 200  # 체크포인트 간격 (분석한 프레임 수)
+    vision_video_max_upload_mb: float = 2048.0
+    vision_video_resume_on_start: bool = True  # 시작 시 중단된 작업을 체크포인트부터 재개
+
+    # Vision 탐지 → RAG 지식 참조 (라벨 / OCR 부품 코드별 상위 청크를 미리 검색해 결과에 inline 첨부)
+    vision_knowledge_enabled: bool = True
+    vision_knowledge_labels: str = ""  # 쉼표 구분, 모델 클래스 이름 외에 미리 검색해 둘 라벨
+    vision_knowledge_top_k: int = 3
+    vision_knowledge_threshold: float = 0.3  # 벡터 후보 최소 유사도 (라벨은 짧은 쿼리라 /rag/query 보다 낮게)
+    vision_knowledge_domain: str = ""  # 비우면 전체 도메인
+    vision_knowledge_snippet_chars: int = 160  # 참조마다 붙일 청크 앞부분 길이 (0 이면 생략)
+    vision_knowledge_max_dynamic: int = 4096  # 처음 본 라벨 / 코드로 검색해 둔 키 최대 수
+    vision_knowledge_code_pattern: str = r"\b[A-Z]{1,4}-?\d{2,}(?:[-.][A-Z0-9]+)*\b"  # OCR 텍스트의 부품 코드 형태
+
+    # Vision MJPEG 출력 설정 (오버레이를 그린 프레임을 대시보드로 스트리밍)
+    vision_mjpeg_enabled: bool = True
+    vision_mjpeg_quality: int = 70
+    vision_mjpeg_max_fps: float = 15.0  # 스트림당 인코딩 fps 상한 (시청자 수와 무관)
+    vision_mjpeg_max_viewers: int = 20  # 스트림당 최대 시청자 수
+    vision_mjpeg_workers: int = 2  # 오버레이 / JPEG 인코딩 스레드 수 (모든 스트림 공유)
+
+    # Vision 탐지 이력 설정
+    vision_history_capacity: int = 200_000  # 스트림별 메모리에 두는 최대 탐지 수 (탐지당 42 bytes)
+    vision_history_max_streams: int = 32  # 이력을 유지할 최대 스트림 수
+    vision_history_spill_dir: str = ""  # 덮어쓸 기록을 내려 둘 디렉터리 (비우면 버림)
+    vision_history_segment_size: int = 8192  # 디스크로 내리는 단위 (탐지 수)
+    
+    # 메트릭 설정
+    metrics_enabled: bool = True  # False 면 히스토그램 기록 생략
+    metrics_window_size: int = 2048  # 분위수 계산에 쓰는 최근 관측값 수
     
     # 로깅 설정
     log_level: str = "INFO"
@@ -0,0 +1,168 @@
+# 단계별 지연 시간 측정 및 Prometheus 메트릭
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from rag_service.core.config import settings
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class RollingHistogram:
+    """최근 window_size 개 관측값의 분위수 + 누적 count/sum + 최근 처리량"""
+
+    def __init__(self, window_size: int = 2048, throughput_window_sec: float = 10.0):
+        self.window_size = window_size
+        self.throughput_window_sec = throughput_window_sec
+        self._values = np.zeros(window_size, dtype=np.float64)
+        self._times = np.full(window_size, -np.inf, dtype=np.float64)
+        self._index = 0
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._values[self._index] = seconds
+            self._times[self._index] = now
+            self._index = (self._index + 1) % self.window_size
+            self.count += 1
+            self.sum += seconds
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, float]:
+        """분위수 / count / sum / 초당 처리량"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            filled = min(self.count, self.window_size)
+            values = self._values[:filled].copy()
+            recent = int((self._times >= now - self.throughput_window_sec).sum())
+            count, total = self.count, self.sum
+
+        snapshot = {"count": count, "sum": total,
+                    "throughput": recent / self.throughput_window_sec}
+        if filled:
+            for q, v in zip(QUANTILES, np.quantile(values, QUANTILES)):
+                snapshot[f"p{int(q * 100)}"] = float(v)
+        else:
+            snapshot.update({f"p{int(q * 100)}": 0.0 for q in QUANTILES})
+        return snapshot
+
+
+class MetricsRegistry:
+    """
+    서비스 전역 메트릭 저장소
+
+    enabled=False 이면 observe/inc 가 즉시 반환하므로 계측 비용이 거의 없다.
+    """
+
+    def __init__(self, enabled: bool = True, window_size: int = 2048):
+        self.enabled = enabled
+        self.window_size = window_size
+        self._histograms: Dict[Tuple[str, str], RollingHistogram] = {}
+        self._counters: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, service: str, stage: str, seconds: float):
+        """단계 소요 시간 기록"""
+        if not self.enabled:
+            return
+        key = (service, stage)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, RollingHistogram(self.window_size))
+        histogram.observe(seconds)
+
+    def inc(self, service: str, name: str, value: float = 1.0):
+        """카운터 증가"""
+        if not self.enabled:
+            return
+        key = (service, name)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """JSON 응답용 스냅샷 {service: {stage: stats}}"""
+        result: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (service, stage), histogram in list(self._histograms.items()):
+            result.setdefault(service, {})[stage] = histogram.snapshot()
+        return result
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        lines = [
+            "# HELP stage_latency_seconds Per-stage latency over a rolling window",
+            "# TYPE stage_latency_seconds summary",
+        ]
+        throughput = [
+            "# HELP stage_throughput_per_second Observations per second over the recent window",
+            "# TYPE stage_throughput_per_second gauge",
+        ]
+        for (service, stage), histogram in sorted(self._histograms.items()):
+            labels = f'service="{service}",stage="{stage}"'
+            snap = histogram.snapshot()
+            for q in QUANTILES:
+                lines.append(f'stage_latency_seconds{{{labels},quantile="{q}"}} {snap[f"p{int(q * 100)}"]:.6f}')
+            lines.append(f"stage_latency_seconds_sum{{{labels}}} {snap['sum']:.6f}")
+            lines.append(f"stage_latency_seconds_count{{{labels}}} {snap['count']}")
+            throughput.append(f"stage_throughput_per_second{{{labels}}} {snap['throughput']:.3f}")
+
+        counters = ["# HELP events_total Event counters", "# TYPE events_total counter"]
+        for (service, name), value in sorted(self._counters.items()):
+            counters.append(f'events_total{{service="{service}",name="{name}"}} {value:g}')
+
+        return "\n".join(lines + throughput + counters) + "\n"
+
+
+class _Stage:
+    """StageTimings.stage() 컨텍스트"""
+    __slots__ = ("_timings", "_name", "_start")
+
+    def __init__(self, timings: "StageTimings", name: str):
+        self._timings = timings
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._timings.add(self._name, (time.perf_counter() - self._start) * 1000.0)
+        return False
+
+
+class StageTimings:
+    """
+    요청 하나의 단계별 소요 시간 (ms)
+
+    응답 필드(processing_time_ms 등)에 쓰이는 값은 항상 측정하고,
+    전역 히스토그램 기록은 registry 가 활성화된 경우에만 한다.
+    """
+    __slots__ = ("service", "stages", "registry")
+
+    def __init__(self, service: str, registry: Optional[MetricsRegistry] = None):
+        self.service = service
+        self.stages: Dict[str, float] = {}
+        self.registry = registry if registry is not None else metrics
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def add(self, name: str, ms: float):
+        self.stages[name] = self.stages.get(name, 0.0) + ms
+        self.registry.observe(self.service, name, ms / 1000.0)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.stages.values())
+
+    def as_dict(self) -> Dict[str, float]:
+        return {name: round(ms, 3) for name, ms in self.stages.items()}
+
+
+# 전역 메트릭 인스턴스
+metrics = MetricsRegistry(enabled=settings.metrics_enabled,
+                          window_size=settings.metrics_window_size)
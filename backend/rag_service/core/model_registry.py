@@ -0,0 +1,158 @@
+# 모델 레지스트리 (지연 로딩 + 백그라운드 병렬 warm-up)
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from rag_service.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class _ModelEntry:
+    """등록된 모델 하나의 로딩 상태"""
+
+    def __init__(self, name: str, loader: Callable[[], Any], optional: bool = False):
+        self.name = name
+        self.loader = loader
+        self.optional = optional  # True 면 로드 실패해도 준비 상태를 막지 않음
+        self.state = PENDING
+        self.instance: Any = None
+        self.error: Optional[str] = None
+        self.load_time_sec: Optional[float] = None
+        self.failures = 0  # 연속 로드 실패 횟수
+        self.retry_at: Optional[float] = None  # 이 monotonic 시각 전에는 로더를 다시 부르지 않음
+        self.lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        """다음 로드 시도까지 남은 시간 (0 이면 바로 시도 가능)"""
+        return max(0.0, self.retry_at - time.monotonic()) if self.retry_at is not None else 0.0
+
+
+class ModelRegistry:
+    """
+    무거운 모델(YOLO, 임베더, 벡터 인덱스)을 import 시점이 아니라 필요할 때 로드
+
+    - get(): 로드되지 않았으면 호출한 스레드에서 한 번만 로드 (동시 호출은 대기)
+      로드에 실패하면 retry_backoff_sec 부터 두 배씩 늘어나는 대기 시간 동안은 로더를 다시 부르지 않음
+    - start_warm_up(): FastAPI startup 에서 모든 모델을 스레드 풀로 병렬 로드
+    - status(): /health/ready 용 모델별 상태 (optional 모델은 준비 여부에 포함하지 않음)
+    """
+
+    def __init__(self, retry_backoff_sec: float = 5.0, max_retry_backoff_sec: float = 300.0):
+        self.retry_backoff_sec = retry_backoff_sec
+        self.max_retry_backoff_sec = max_retry_backoff_sec
+        self._entries: Dict[str, _ModelEntry] = {}
+        self._warm_up_task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, loader: Callable[[], Any], optional: bool = False):
+        """
+        로더 등록 (loader 는 모델 인스턴스를 반환, 무거운 import 는 loader 안에서)
+
+        optional=True 인 모델 (OCR, cascade 큰 모델 등) 은 실패해도 ready() 를 막지 않는다.
+        """
+        self._entries[name] = _ModelEntry(name, loader, optional)
+
+    def get(self, name: str) -> Any:
+        """모델 인스턴스 (필요하면 동기 로드, 로드 실패 / 재시도 대기 중이면 RuntimeError)"""
+        entry = self._entries[name]
+        if entry.state == READY:
+            return entry.instance
+        if entry.state == FAILED and entry.retry_in() > 0:
+            raise RuntimeError(f"모델 로드 실패 ({name}): {entry.error} (재시도까지 {entry.retry_in():.1f}s)")
+
+        with entry.lock:
+            # 기다리는 동안 다른 스레드가 로드했거나 막 실패했으면 로더를 다시 부르지 않음
+            if entry.state != READY and not (entry.state == FAILED and entry.retry_in() > 0):
+                entry.state = LOADING
+                started = time.perf_counter()
+                try:
+                    entry.instance = entry.loader()
+                    entry.state = READY
+                    entry.error = None
+                    entry.failures = 0
+                    entry.retry_at = None
+                except Exception as e:
+                    entry.state = FAILED
+                    entry.error = str(e)
+                    entry.failures += 1
+                    backoff = min(self.retry_backoff_sec * 2 ** (entry.failures - 1), self.max_retry_backoff_sec)
+                    entry.retry_at = time.monotonic() + backoff
+                    logger.error(f"모델 로드 실패 ({name}, {entry.failures}회 연속, {backoff:.1f}s 후 재시도): {e}")
+                finally:
+                    entry.load_time_sec = time.perf_counter() - started
+
+        if entry.state != READY:
+            raise RuntimeError(f"모델 로드 실패 ({name}): {entry.error}")
+        return entry.instance
+
+    def replace(self, name: str, instance: Any):
+        """로드된 인스턴스를 한 번의 대입으로 교체 (기존 인스턴스를 쓰던 요청은 그대로 끝까지 사용)"""
+        entry = self._entries[name]
+        with entry.lock:
+            entry.instance = instance
+            entry.state = READY
+            entry.error = None
+            entry.failures = 0
+            entry.retry_at = None
+
+    def peek(self, name: str) -> Any:
+        """이미 로드된 경우에만 인스턴스 반환 (블로킹 없음)"""
+        entry = self._entries[name]
+        return entry.instance if entry.state == READY else None
+
+    async def warm_up(self, names: Optional[List[str]] = None):
+        """등록된 모델을 병렬로 로드 (실패해도 나머지는 계속)"""
+        names = names or list(self._entries)
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, len(names)), thread_name_prefix="model-warmup") as pool:
+            await asyncio.gather(
+                *(loop.run_in_executor(pool, self._try_get, name) for name in names)
+            )
+        logger.info(f"모델 warm-up 완료 ({time.perf_counter() - started:.2f}s): {self.status()}")
+
+    def start_warm_up(self) -> asyncio.Task:
+        """startup 을 막지 않도록 백그라운드 태스크로 warm-up 시작"""
+        if self._warm_up_task is None or self._warm_up_task.done():
+            self._warm_up_task = asyncio.get_running_loop().create_task(self.warm_up())
+        return self._warm_up_task
+
+    def ready(self) -> bool:
+        """필수 모델이 모두 로드되었는지 (optional 모델은 제외)"""
+        return all(entry.state == READY for entry in self._entries.values() if not entry.optional)
+
+    def degraded(self) -> List[str]:
+        """로드에 실패한 optional 모델 (서비스는 준비 상태지만 해당 기능은 꺼짐)"""
+        return [name for name, entry in self._entries.items() if entry.optional and entry.state == FAILED]
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "state": entry.state,
+                "optional": entry.optional,
+                "load_time_sec": round(entry.load_time_sec, 3) if entry.load_time_sec is not None else None,
+                "error": entry.error,
+                "failures": entry.failures,
+                "retry_in_sec": round(entry.retry_in(), 1) if entry.state == FAILED else None
+            }
+            for name, entry in self._entries.items()
+        }
+
+    def _try_get(self, name: str):
+        try:
+            self.get(name)
+        except RuntimeError:
+            pass
+
+
+# 전역 모델 레지스트리
+model_registry = ModelRegistry(retry_backoff_sec=settings.model_retry_backoff_sec,
+                               max_retry_backoff_sec=settings.model_retry_max_backoff_sec)
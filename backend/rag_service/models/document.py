@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 
 class Document(BaseModel):
@@ -13,6 +13,17 @@ class Document(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+class DocumentChunk(BaseModel):
+    """검색 단위 청크 모델"""
+    id: str
+    document_id: str
+    title: str
+    content: str
+    domain: str
+    file_path: str
+    page_number: Optional[int] = None
+    chunk_index: int = 0
+
 class QueryRequest(BaseModel):
     """쿼리 요청 모델"""
     query: str
@@ -32,3 +43,4 @@ class QueryResponse(BaseModel):
     answer: str
     sources: List[SourceDocument]
     processing_time: float
+    generation: Optional[Dict[str, Any]] = None  # LLM 생성 지표 (provider, ttft_ms, tokens_per_sec 등)
@@ -0,0 +1,58 @@
+# 문서 청킹
+from typing import Iterator, List
+
+from rag_service.models.document import Document, DocumentChunk
+
+# 청크 경계로 우선 사용할 구분자 (앞에 있을수록 우선)
+SEPARATORS = ("\n\n", "\n", ". ", "다. ", " ")
+
+
+def split_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[str]:
+    """
+    chunk_size 이내로 텍스트 분할 (chunk_overlap 만큼 앞 청크와 겹침)
+
+    청크 끝은 뒤쪽 20% 구간 안에서 문단/문장/공백 경계를 찾아 자른다.
+    """
+    text = text.strip()
+    if not text:
+        return []
+    if chunk_overlap >= chunk_size:
+        chunk_overlap = chunk_size // 5
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            window_start = start + int(chunk_size * 0.8)
+            for separator in SEPARATORS:
+                cut = text.rfind(separator, window_start, end)
+                if cut != -1:
+                    end = cut + len(separator)
+                    break
+
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(end - chunk_overlap, start + 1)
+
+    return chunks
+
+
+def chunk_document(document: Document,
+                   chunk_size: int = 1000,
+                   chunk_overlap: int = 200) -> Iterator[DocumentChunk]:
+    """Document 를 DocumentChunk 들로 분할"""
+    for index, content in enumerate(split_text(document.content, chunk_size, chunk_overlap)):
+        yield DocumentChunk(
+            id=f"{document.id}#{index}",
+            document_id=document.id,
+            title=document.title,
+            content=content,
+            domain=document.domain,
+            file_path=document.file_path,
+            page_number=document.page_number,
+            chunk_index=index
+        )
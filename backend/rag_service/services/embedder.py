@@ -0,0 +1,75 @@
+# 텍스트 임베딩
+import hashlib
+import re
+from typing import List
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[0-9A-Za-z가-힣]+(?:[-_][0-9A-Za-z가-힣]+)*")
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2 정규화 (내적 = 코사인 유사도가 되도록)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder:
+    """sentence-transformers 모델 임베더 (첫 사용 시 모델 로드)"""
+
+    def __init__(self, model_name: str, dimension: int, batch_size: int = 64):
+        self.model_name = model_name
+        self.dimension = dimension
+        self.batch_size = batch_size
+        self._model = None
+
+    def load(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self.load().encode(
+            list(texts),
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        return vectors.astype(np.float32, copy=False)
+
+
+class HashEmbedder:
+    """
+    결정적 로컬 스텁 임베더 (오프라인 테스트 / 벤치마크용)
+
+    토큰을 해시해 고정 차원에 부호와 함께 누적하는 bag-of-words 임베딩.
+    같은 토큰을 공유하는 텍스트끼리 유사도가 높게 나온다.
+    """
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+
+    def _embed_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.dimension] += 1.0 if (value >> 63) else -1.0
+        return vector
+
+    def load(self):
+        return self
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return normalize(np.stack([self._embed_one(text) for text in texts]))
+
+
+def create_embedder(model_name: str, dimension: int):
+    """설정의 embedding_model 에 맞는 임베더 생성 ("hash" 는 로컬 스텁)"""
+    if model_name == "hash":
+        return HashEmbedder(dimension)
+    return SentenceTransformerEmbedder(model_name, dimension)
@@ -0,0 +1,275 @@
+# 증분 문서 수집 파이프라인
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from rag_service.core.config import settings
+from rag_service.models.document import Document, DocumentChunk
+from rag_service.services.chunker import chunk_document
+from rag_service.services.embedder import create_embedder
+from rag_service.services.retrieval_service import create_lexical_index
+from rag_service.services.vector_store import FaissVectorStore
+
+logger = logging.getLogger(__name__)
+
+TEXT_EXTENSIONS = (".txt", ".md")
+PDF_EXTENSIONS = (".pdf",)
+DEFAULT_DOMAIN = "general"
+
+
+class IngestionReport(BaseModel):
+    """수집 실행 결과"""
+    files_scanned: int = 0
+    files_skipped: int = 0
+    files_updated: int = 0
+    files_removed: int = 0
+    documents: int = 0
+    chunks: int = 0
+    chunks_removed: int = 0
+    elapsed_sec: float = 0.0
+    documents_per_sec: float = 0.0
+    chunks_per_sec: float = 0.0
+
+
+def file_digest(path: str, block_size: int = 1 << 20) -> str:
+    """파일 내용 sha256 (블록 단위로 읽어 큰 파일도 메모리에 올리지 않음)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestionPipeline:
+    """
+    documents_path → 벡터 인덱스 증분 수집
+
+    scan → 변경 감지 → 읽기 → 청킹 → 배치 → 임베딩(워커 풀) → 인덱스 추가 순의
+    제너레이터 체인으로 파일을 하나씩 흘려보낸다. 내용 해시를 manifest 에 저장해
+    바뀌지 않은 파일은 건너뛰고, 바뀐 파일은 기존 청크를 지운 뒤 다시 넣으며,
+    사라진 파일의 청크는 삭제한다.
+
+    도메인은 documents_path 바로 아래 디렉터리 이름을 사용한다
+    (예: documents/construction/manual.pdf → "construction").
+    """
+
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self,
+                 store: FaissVectorStore,
+                 embedder,
+                 documents_path: str,
+                 batch_size: int = 64,
+                 workers: int = 2,
+                 chunk_size: int = 1000,
+                 chunk_overlap: int = 200):
+        self.store = store
+        self.embedder = embedder
+        self.documents_path = documents_path
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.manifest_path = os.path.join(store.path, self.MANIFEST_FILE)
+
+    def run(self) -> IngestionReport:
+        """증분 수집 실행 후 인덱스 / manifest 저장"""
+        report = IngestionReport()
+        started = time.perf_counter()
+
+        self.store.load()
+        manifest = self._load_manifest()
+        if not manifest and self.store.size:
+            # manifest 없이 남은 인덱스는 어떤 파일에서 왔는지 알 수 없으므로 새로 만듦
+            self.store.reset()
+        seen = set()
+
+        files = self._scan(report, seen)
+        changed = self._changed(files, manifest, report)
+        documents = self._read(changed, manifest, report)
+        chunks = self._chunk(documents, report)
+        batches = self._batch(chunks)
+        for batch, vectors in self._embed(batches):
+            self.store.add(batch, vectors)
+
+        # 사라진 파일 정리
+        for rel_path in [path for path in manifest if path not in seen]:
+            report.chunks_removed += self.store.remove_documents(manifest.pop(rel_path)["document_ids"])
+            report.files_removed += 1
+
+        # 역색인이 없던 인덱스는 load 에서 청크로 다시 만들었으므로 파일이 그대로여도 저장
+        lexical_stale = self.store.lexical is not None and self.store.lexical.version != self.store.version
+        if report.files_updated or report.files_removed or lexical_stale:
+            self.store.compact()
+            self.store.save()
+            self._save_manifest(manifest)
+
+        report.elapsed_sec = time.perf_counter() - started
+        if report.elapsed_sec > 0:
+            report.documents_per_sec = report.documents / report.elapsed_sec
+            report.chunks_per_sec = report.chunks / report.elapsed_sec
+        logger.info(f"문서 수집 완료: {report.dict()}")
+        return report
+
+    # ---------- 제너레이터 체인 ----------
+
+    def _scan(self, report: IngestionReport, seen: set) -> Iterator[Tuple[str, str]]:
+        """지원 확장자 파일 (상대 경로, 절대 경로)"""
+        for root, _, names in os.walk(self.documents_path):
+            for name in sorted(names):
+                if not name.lower().endswith(TEXT_EXTENSIONS + PDF_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                rel_path = os.path.relpath(path, self.documents_path).replace(os.sep, "/")
+                seen.add(rel_path)
+                report.files_scanned += 1
+                yield rel_path, path
+
+    def _changed(self, files, manifest: Dict[str, Any],
+                 report: IngestionReport) -> Iterator[Tuple[str, str, str]]:
+        """내용 해시가 manifest 와 같은 파일은 건너뜀"""
+        for rel_path, path in files:
+            digest = file_digest(path)
+            entry = manifest.get(rel_path)
+            if entry is not None and entry["sha256"] == digest:
+                report.files_skipped += 1
+                continue
+            yield rel_path, path, digest
+
+    def _read(self, files, manifest: Dict[str, Any],
+              report: IngestionReport) -> Iterator[Document]:
+        """바뀐 파일의 기존 청크를 지우고 Document 로 읽음"""
+        for rel_path, path, digest in files:
+            entry = manifest.get(rel_path)
+            if entry is not None:
+                report.chunks_removed += self.store.remove_documents(entry["document_ids"])
+
+            documents = list(self._load_file(rel_path, path))
+            manifest[rel_path] = {
+                "sha256": digest,
+                "document_ids": [document.id for document in documents]
+            }
+            report.files_updated += 1
+            for document in documents:
+                report.documents += 1
+                yield document
+
+    def _chunk(self, documents, report: IngestionReport) -> Iterator[DocumentChunk]:
+        for document in documents:
+            for chunk in chunk_document(document, self.chunk_size, self.chunk_overlap):
+                report.chunks += 1
+                yield chunk
+
+    def _batch(self, chunks) -> Iterator[List[DocumentChunk]]:
+        batch = []
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _embed(self, batches) -> Iterator[Tuple[List[DocumentChunk], np.ndarray]]:
+        """
+        워커 풀에서 배치 임베딩 (입력 순서 유지)
+
+        진행 중인 배치를 workers * 2 개로 제한해 앞 단계가 파일을 무한정
+        읽어 들이지 않도록 한다.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rag-embed") as pool:
+            pending = deque()
+            for batch in batches:
+                pending.append((batch, pool.submit(self.embedder.embed, [c.content for c in batch])))
+                if len(pending) >= self.workers * 2:
+                    batch, future = pending.popleft()
+                    yield batch, future.result()
+            while pending:
+                batch, future = pending.popleft()
+                yield batch, future.result()
+
+    # ---------- 파일 / manifest ----------
+
+    def _load_file(self, rel_path: str, path: str) -> Iterator[Document]:
+        """파일 → Document (PDF 는 페이지 단위)"""
+        parts = rel_path.split("/")
+        domain = parts[0] if len(parts) > 1 else DEFAULT_DOMAIN
+        title = os.path.basename(rel_path)
+        modified = datetime.fromtimestamp(os.path.getmtime(path))
+
+        if rel_path.lower().endswith(PDF_EXTENSIONS):
+            from pypdf import PdfReader
+            pages = ((f"{rel_path}#p{number}", number, page.extract_text() or "")
+                     for number, page in enumerate(PdfReader(path).pages, start=1))
+        else:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages = [(rel_path, None, f.read())]
+
+        for document_id, page_number, content in pages:
+            if not content.strip():
+                continue
+            yield Document(
+                id=document_id,
+                title=title,
+                content=content,
+                domain=domain,
+                file_path=rel_path,
+                page_number=page_number,
+                created_at=modified,
+                updated_at=modified
+            )
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        # 인덱스가 없으면 manifest 도 무효 (전체 재수집)
+        if self.store.index is None or not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest: Dict[str, Any]):
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        with open(self.manifest_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        os.replace(self.manifest_path + ".tmp", self.manifest_path)
+
+
+def create_pipeline(store: Optional[FaissVectorStore] = None, embedder=None) -> IngestionPipeline:
+    """설정값으로 파이프라인 생성 (수집 중 인덱스를 수정하므로 mmap 없이 로드)"""
+    store = store or FaissVectorStore(
+        settings.vector_db_path,
+        settings.embedding_dimension,
+        index_type=settings.vector_index_type,
+        nlist=settings.vector_ivf_nlist,
+        nprobe=settings.vector_ivf_nprobe,
+        hnsw_m=settings.vector_hnsw_m,
+        ef_search=settings.vector_hnsw_ef_search,
+        quantization=settings.vector_quantization,
+        pq_m=settings.vector_pq_m,
+        rerank_factor=settings.vector_rerank_factor,
+        mmap=False,
+        lexical=create_lexical_index(mmap=False)
+    )
+    return IngestionPipeline(
+        store,
+        embedder or create_embedder(settings.embedding_model, settings.embedding_dimension),
+        settings.documents_path,
+        batch_size=settings.ingestion_batch_size,
+        workers=settings.ingestion_workers,
+        chunk_size=settings.chunk_size,
+        chunk_overlap=settings.chunk_overlap
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=settings.log_level)
+    result = create_pipeline().run()
+    print(json.dumps(result.dict(), ensure_ascii=False, indent=2))
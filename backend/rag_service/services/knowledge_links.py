@@ -0,0 +1,327 @@
+# 탐지 라벨 / OCR 부품 코드 → RAG 청크 참조 인덱스 (Vision ↔ RAG 연결)
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from rag_service.core.metrics import metrics
+from rag_service.services.lexical_index import tokenize
+from rag_service.services.query_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# 부품 번호 / 에러 코드 형태 (PX-2201, E102, AB-12-C)
+DEFAULT_CODE_PATTERN = r"\b[A-Z]{1,4}-?\d{2,}(?:[-.][A-Z0-9]+)*\b"
+
+
+class KnowledgeLinkIndex:
+    """
+    탐지 라벨 / OCR 로 읽은 부품 코드 → RAG 상위 top_k 청크 참조
+
+    모델 클래스 이름 (label_source) 과 labels 는 미리 검색해 두고 (pinned), 처음 보는 라벨 / 코드는
+    조회 시 빈손으로 돌려준 뒤 백그라운드에서 한 번 검색해 채운다 (dynamic, 최대 max_dynamic 개).
+    조회는 정규화한 키로 dict 한 번 찾는 것이라 프레임 / 객체마다 불러도 된다.
+
+    문서 인덱스 버전이 바뀌면 (증분 수집 후 /rag/index/reload 등) 바뀐 부분만 다시 검색한다.
+    벡터 id 는 단조 증가하므로 지난 동기화 때의 next_id 이후 id 가 새 청크이고,
+    - 참조한 청크가 사라진 키
+    - 새 청크와의 코사인 유사도가 현재 top_k 의 최저 점수 (모자라면 threshold) 이상인 키
+    - 새 청크에 키의 토큰이 모두 들어 있는 키 (BM25 쪽으로 순위가 바뀔 수 있음)
+    만 다시 검색한다. 새 청크가 전체의 full_rebuild_ratio 를 넘으면 전부 다시 검색한다.
+    (삭제로 BM25 통계 / RRF 순위가 조금 바뀌어 점수가 비슷한 청크끼리 순서가 달라지는 것은
+    다음 전체 검색 때 맞춰진다.)
+    결과는 vector_db_path/knowledge_links.json 에 인덱스 버전과 함께 저장한다.
+    """
+
+    FILE = "knowledge_links.json"
+
+    def __init__(self,
+                 get_retrieval: Callable[[], Any],
+                 label_source: Optional[Callable[[], Iterable[str]]] = None,
+                 labels: Iterable[str] = (),
+                 top_k: int = 3,
+                 threshold: Optional[float] = 0.3,
+                 domain: Optional[str] = None,
+                 snippet_chars: int = 160,
+                 max_dynamic: int = 4096,
+                 max_pending: int = 64,
+                 code_pattern: str = DEFAULT_CODE_PATTERN,
+                 full_rebuild_ratio: float = 0.5):
+        """
+        Args:
+            get_retrieval: 로드된 RetrievalService 또는 아직 없으면 None (블로킹하지 않아야 함)
+            label_source: 모델 클래스 이름 목록 (모델이 아직 없으면 빈 목록)
+            labels: 미리 검색해 둘 추가 라벨
+        """
+        self.get_retrieval = get_retrieval
+        self.label_source = label_source
+        self.labels = [label for label in labels if label.strip()]
+        self.top_k = top_k
+        self.threshold = threshold
+        self.domain = domain
+        self.snippet_chars = snippet_chars
+        self.max_dynamic = max_dynamic
+        self.max_pending = max_pending
+        self.code_pattern = re.compile(code_pattern)
+        self.full_rebuild_ratio = full_rebuild_ratio
+
+        self.entries: Dict[str, List[Dict[str, Any]]] = {}
+        self.pinned: Set[str] = set()
+        self._dynamic: "OrderedDict[str, None]" = OrderedDict()
+        self.version: Optional[str] = None  # entries 가 반영한 문서 인덱스 버전
+        self.next_id: Optional[int] = None
+        self.synced = False
+        self._seeded = False
+        self._refreshing = False
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-knowledge")
+
+        self.hits = 0
+        self.misses = 0
+        self.searches = 0
+        self.refreshes = 0
+        self.last_refresh: Optional[Dict[str, Any]] = None
+
+    # -------------------------------------------
+    # 조회 (이벤트 루프에서 호출, 블로킹 없음)
+    # -------------------------------------------
+
+    def lookup(self, text: str) -> Optional[List[Dict[str, Any]]]:
+        """라벨 / 코드 → 청크 참조 (처음 보는 키면 None 을 돌려주고 백그라운드 검색 예약)"""
+        key = normalize_query(text)
+        refs = self.entries.get(key)
+        if refs is not None:
+            self.hits += 1
+            return refs
+        self.misses += 1
+        if key:
+            self._schedule_key(key)
+        return None
+
+    def codes(self, text: str) -> List[str]:
+        """OCR 텍스트에서 부품 코드 후보 추출"""
+        return self.code_pattern.findall(unicodedata.normalize("NFKC", text).upper())
+
+    def lookup_text(self, text: str) -> List[Dict[str, Any]]:
+        """OCR 텍스트의 코드들에 연결된 청크 참조 (중복 청크 제거)"""
+        refs, seen = [], set()
+        for code in self.codes(text):
+            for ref in self.lookup(code) or ():
+                if ref["chunk_id"] not in seen:
+                    seen.add(ref["chunk_id"])
+                    refs.append(ref)
+        return refs
+
+    def enrich(self, objects: List[Dict[str, Any]]) -> int:
+        """
+        탐지 객체에 knowledge 참조를 붙임 (라벨 + metadata.ocr 텍스트의 코드)
+
+        Returns:
+            참조를 붙인 객체 수
+        """
+        self.maybe_refresh()
+        linked = 0
+        for obj in objects:
+            refs = self.lookup(obj.get("label", ""))
+            ocr = obj.get("metadata", {}).get("ocr")
+            if ocr and ocr.get("text"):
+                code_refs = self.lookup_text(ocr["text"])
+                if code_refs:
+                    refs = code_refs + [ref for ref in refs or () if ref not in code_refs]
+            if refs:
+                obj["knowledge"] = refs
+                linked += 1
+        if linked:
+            metrics.inc("vision", "knowledge_linked_objects", linked)
+        return linked
+
+    def maybe_refresh(self) -> bool:
+        """문서 인덱스가 바뀌었거나 모델 라벨을 아직 못 넣었으면 백그라운드 갱신 예약"""
+        if self._refreshing:
+            return False
+        retrieval = self.get_retrieval()
+        if retrieval is None or not retrieval.loaded:
+            return False
+        changed = not self.synced or retrieval.store.version != self.version
+        unseeded = not self._seeded and self.label_source is not None and bool(self.label_source())
+        if not (changed or unseeded):
+            return False
+        self._refreshing = True
+        self._executor.submit(self._refresh_safely)
+        return True
+
+    # -------------------------------------------
+    # 갱신 (백그라운드 스레드)
+    # -------------------------------------------
+
+    def refresh(self) -> Dict[str, Any]:
+        """
+        문서 인덱스와 동기화 (필요한 키만 다시 검색) 후 저장
+
+        Returns:
+            갱신 요약 (keys, searched, full, version)
+        """
+        retrieval = self.get_retrieval()
+        store = retrieval.store
+        version, next_id = store.version, store.next_id
+        if not self.synced:
+            self._load(store.path)
+
+        model_labels = list(self.label_source()) if self.label_source is not None else []
+        labels = {normalize_query(label) for label in self.labels + model_labels} - {""}
+        full = self.next_id is None
+        stale: Set[str] = set()
+        if full or version != self.version:
+            stale, full = self._stale_keys(retrieval, full)
+        stale |= {label for label in labels if label not in self.entries}
+
+        for key in sorted(stale):
+            self.entries[key] = self._search(retrieval, key)
+        with self._lock:
+            self.pinned |= labels
+        self.version, self.next_id, self.synced = version, next_id, True
+        self._seeded = self._seeded or bool(model_labels)
+        self._save(store.path)
+        self.refreshes += 1
+        self.last_refresh = {"keys": len(self.entries), "searched": len(stale), "full": full, "version": version}
+        logger.info(f"지식 참조 인덱스 갱신: {self.last_refresh}")
+        return self.last_refresh
+
+    def _refresh_safely(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            # 같은 인덱스 버전으로 매 프레임 다시 시도하지 않음 (다음 버전 변경 때 재시도)
+            logger.error(f"지식 참조 인덱스 갱신 오류: {str(e)}")
+            self.version, self.synced, self._seeded = self.get_retrieval().store.version, True, True
+        finally:
+            self._refreshing = False
+
+    def _stale_keys(self, retrieval, full: bool):
+        """다시 검색할 키 (full 이면 전부)"""
+        store = retrieval.store
+        keys = list(self.entries)
+        added = [] if full else [i for i in range(self.next_id, store.next_id) if i in store.chunks]
+        if full or len(added) > self.full_rebuild_ratio * max(store.size, 1):
+            return set(keys), True
+
+        stale = {key for key in keys if any(ref["chunk_id"] not in store.chunks for ref in self.entries[key])}
+        candidates = [key for key in keys if key not in stale]
+        if not added or not candidates:
+            return stale, False
+
+        try:
+            vectors = store.vectors(added)
+        except RuntimeError:
+            return set(keys), True  # 벡터를 복원할 수 없는 인덱스
+        queries = np.stack([retrieval.embed_query(key) for key in candidates]).astype(np.float32)
+        queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        best = (queries @ vectors.T).max(axis=1)
+        added_tokens = [set(tokenize(store.chunks[i].get("content", ""))) for i in added]
+        for key, score in zip(candidates, best):
+            refs = self.entries[key]
+            floor = refs[-1]["score"] if len(refs) >= self.top_k else (self.threshold or 0.0)
+            tokens = set(tokenize(key))
+            if score >= floor or (tokens and any(tokens <= chunk_tokens for chunk_tokens in added_tokens)):
+                stale.add(key)
+        return stale, False
+
+    def _search(self, retrieval, key: str) -> List[Dict[str, Any]]:
+        self.searches += 1
+        return [
+            {
+                "chunk_id": chunk["vector_id"],
+                "document": chunk.get("title") or chunk.get("file_path", ""),
+                "page": chunk.get("page_number"),
+                "score": round(float(score), 4),
+                "snippet": chunk.get("content", "")[:self.snippet_chars]
+            }
+            for chunk, score in retrieval.search_chunks(key, top_k=self.top_k, threshold=self.threshold,
+                                                        domain=self.domain)
+        ]
+
+    def _schedule_key(self, key: str):
+        """처음 보는 키 백그라운드 검색 (같은 키는 한 번만, 밀려 있으면 생략)"""
+        with self._lock:
+            if key in self._pending or len(self._pending) >= self.max_pending:
+                return
+            retrieval = self.get_retrieval()
+            if retrieval is None or not retrieval.loaded:
+                return
+            self._pending.add(key)
+        self._executor.submit(self._fill_key, key)
+
+    def _fill_key(self, key: str):
+        try:
+            retrieval = self.get_retrieval()
+            if key not in self.entries:
+                self.entries[key] = self._search(retrieval, key)
+                with self._lock:
+                    if key not in self.pinned:
+                        self._dynamic[key] = None
+                        while len(self._dynamic) > self.max_dynamic:
+                            self.entries.pop(self._dynamic.popitem(last=False)[0], None)
+        except Exception as e:
+            logger.debug(f"지식 참조 검색 생략 ({key}): {str(e)}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    # -------------------------------------------
+    # 저장 / 로드
+    # -------------------------------------------
+
+    def _load(self, directory: str):
+        path = os.path.join(directory, self.FILE)
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"지식 참조 인덱스 로드 실패, 새로 만듦: {str(e)}")
+            return
+        if data.get("top_k") != self.top_k or data.get("threshold") != self.threshold or data.get("domain") != self.domain:
+            return  # 검색 조건이 바뀌면 전부 다시 검색
+        self.entries.update(data.get("entries", {}))
+        self.pinned |= set(data.get("pinned", []))
+        self._dynamic.update((key, None) for key in self.entries if key not in self.pinned)
+        self.version, self.next_id = data.get("version"), data.get("next_id")
+
+    def _save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "version": self.version,
+                "next_id": self.next_id,
+                "top_k": self.top_k,
+                "threshold": self.threshold,
+                "domain": self.domain,
+                "pinned": sorted(self.pinned),
+                "entries": self.entries
+            }, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "keys": len(self.entries),
+            "pinned": len(self.pinned),
+            "dynamic": len(self._dynamic),
+            "pending": len(self._pending),
+            "hits": self.hits,
+            "misses": self.misses,
+            "searches": self.searches,
+            "refreshes": self.refreshes,
+            "version": self.version,
+            "last_refresh": self.last_refresh
+        }
+
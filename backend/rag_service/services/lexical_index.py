@@ -0,0 +1,379 @@
+# BM25 역색인 (하이브리드 검색의 어휘 검색기)
+import json
+import math
+import os
+import re
+import unicodedata
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 영문 / 숫자 토큰은 부품 번호, 에러 코드처럼 구분자로 이어진 형태를 하나로 묶음 (E-102, PX-2201.B)
+_TOKEN_PATTERN = re.compile(r"[0-9a-z]+(?:[-_./:#][0-9a-z]+)*|[가-힣]+")
+_CODE_SEPARATORS = re.compile(r"[-_./:#]")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    한국어 / 영어 토큰화
+
+    - 영문 / 숫자: 소문자 단어, 구분자가 있는 코드는 원형 + 구분자를 뺀 형태 + 두 글자 이상 부분
+      ("E-102" → e-102, e102, 102) 이라 쿼리에서 구분자를 생략해도 일치한다.
+      숫자가 섞인 코드의 영문 부분 ("PX", "E") 은 거의 모든 코드에 붙는 접두어라 따로 내지 않는다
+      ("valve-seat" 처럼 숫자 없는 복합어는 부분도 냄)
+    - 한글: 어절을 음절 bigram 으로 ("점검절차를" → 점검, 검절, 절차, 차를) 조사가 붙어도 일치
+    """
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(unicodedata.normalize("NFKC", text).lower()):
+        token = match.group()
+        if "가" <= token[0] <= "힣":
+            if len(token) == 1:
+                tokens.append(token)
+            else:
+                tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+            continue
+        tokens.append(token)
+        parts = _CODE_SEPARATORS.split(token)
+        if len(parts) > 1:
+            tokens.append("".join(parts))
+            digits = any(c.isdigit() for c in token)
+            tokens.extend(part for part in parts
+                          if len(part) > 1 and (not digits or any(c.isdigit() for c in part)))
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = 60) -> List[Tuple[int, float]]:
+    """
+    순위 목록들을 RRF 로 합침: score(d) = Σ 1 / (k + rank)
+
+    점수 척도가 다른 검색기 (코사인 유사도, BM25) 를 정규화 없이 섞을 수 있다.
+    """
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class LexicalIndex:
+    """
+    배열 기반 BM25 역색인
+
+    postings 는 (용어, 도메인) 순서로 이어 붙인 문서 id (int32) 배열이고 구간은 offsets 로 찾는다
+    (CSR, offsets[용어 * 도메인 수 + 도메인]). 용어 하나의 postings 는 연속이므로 전체 검색은
+    용어 구간을, 도메인 필터 검색은 그 안의 도메인 구간만 읽는다.
+
+    문서 id 는 벡터 스토어의 vector_id 를 그대로 쓰고, 문서 길이 / 도메인 코드는 vector_id 로
+    인덱싱하는 배열에 둔다. BM25 의 tf 포화 항 tf·(k1+1) / (tf + k1·(1-b+b·dl/avgdl)) 은 병합 때
+    impacts (float16) 로 미리 계산해 두어 검색은 idf 곱 + 누적만 한다.
+
+    추가 / 삭제는 바로 배열에 반영하지 않고 모아 두었다가 다음 검색 / 저장 때 한 번에 병합한다
+    (수집 파이프라인은 배치를 여러 번 추가한 뒤 한 번 저장).
+
+    디렉터리 구성 (vector_db_path/lexical):
+        meta.json      문서 수 / 전체 길이 / 도메인 목록 / 벡터 스토어 버전
+        terms.json     용어 목록 (위치 = 용어 id)
+        offsets.npy    (용어, 도메인) 별 postings 시작 위치 (int64)
+        postings.npy   문서 id (int32, 메모리 매핑)
+        tfs.npy        용어 빈도 (uint16, 메모리 매핑, 재병합용)
+        impacts.npy    BM25 tf 포화 항 (float16, 메모리 매핑)
+        doc_len.npy    문서 길이 (int32, 삭제된 문서는 0)
+        doc_domain.npy 도메인 코드 (int16, 없으면 -1)
+    """
+
+    META_FILE = "meta.json"
+    TERMS_FILE = "terms.json"
+    ARRAYS = ("offsets", "postings", "tfs", "impacts", "doc_len", "doc_domain")
+    MMAP_ARRAYS = ("postings", "tfs", "impacts")
+
+    def __init__(self, path: str, k1: float = 1.2, b: float = 0.75, common_df_ratio: float = 0.05,
+                 mmap: bool = True):
+        """
+        Args:
+            path: 저장 디렉터리
+            k1, b: BM25 파라미터
+            common_df_ratio: 문서 비율이 이보다 높은 용어는 드문 용어와 함께 쿼리되면
+                드문 용어가 찾은 문서에만 점수를 더함 (흔한 용어의 긴 postings 를 다 읽지 않음)
+            mmap: 로드 시 postings 를 메모리 매핑
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.common_df_ratio = common_df_ratio
+        self.mmap = mmap
+        self.reset()
+
+    def reset(self):
+        """비어 있는 상태로 초기화"""
+        self.terms: List[str] = []
+        self.vocabulary: Dict[str, int] = {}
+        self.domains: List[str] = []
+        self._domain_codes: Dict[str, int] = {}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.postings = np.zeros(0, dtype=np.int32)
+        self.tfs = np.zeros(0, dtype=np.uint16)
+        self.impacts = np.zeros(0, dtype=np.float16)
+        self.partitions = 1  # offsets 의 용어당 도메인 구간 수
+        self.doc_len = np.zeros(0, dtype=np.int32)
+        self.doc_domain = np.zeros(0, dtype=np.int16)
+        self.documents = 0
+        self.total_len = 0
+        self.version: Optional[str] = None
+        self._pending_terms = array("i")
+        self._pending_docs = array("i")
+        self._pending_tfs = array("H")
+        self._removed = False
+
+    @property
+    def size(self) -> int:
+        """색인된 문서 수"""
+        return self.documents
+
+    # ---------- 갱신 ----------
+
+    def add(self, doc_ids: Sequence[int], texts: Sequence[str], domains: Sequence[Optional[str]]):
+        """문서 추가 (병합은 다음 검색 / 저장 때)"""
+        if not doc_ids:
+            return
+        self._reserve(max(doc_ids) + 1)
+        vocabulary = self.vocabulary
+        for doc_id, text, domain in zip(doc_ids, texts, domains):
+            counts = Counter(tokenize(text))
+            for term, tf in counts.items():
+                term_id = vocabulary.get(term)
+                if term_id is None:
+                    term_id = vocabulary[term] = len(self.terms)
+                    self.terms.append(term)
+                self._pending_terms.append(term_id)
+                self._pending_docs.append(doc_id)
+                self._pending_tfs.append(min(tf, 65535))
+            length = sum(counts.values())
+            self.doc_len[doc_id] = length
+            self.doc_domain[doc_id] = self._domain_code(domain or "")
+            self.documents += 1
+            self.total_len += length
+
+    def remove(self, doc_ids: Iterable[int]):
+        """문서 삭제 (postings 는 다음 병합에서 제거)"""
+        for doc_id in doc_ids:
+            if doc_id < len(self.doc_len) and self.doc_domain[doc_id] >= 0:
+                self.documents -= 1
+                self.total_len -= int(self.doc_len[doc_id])
+                self.doc_len[doc_id] = 0
+                self.doc_domain[doc_id] = -1
+                self._removed = True
+
+    # ---------- 저장 / 로드 ----------
+
+    def save(self, version: Optional[str] = None):
+        """병합 후 배열 / 용어 목록 저장 (임시 파일 후 교체, 기존 메모리 매핑은 그대로 유효)"""
+        self._merge()
+        self.version = version
+        os.makedirs(self.path, exist_ok=True)
+        for name in self.ARRAYS:
+            target = os.path.join(self.path, f"{name}.npy")
+            with open(target + ".tmp", "wb") as f:
+                np.save(f, getattr(self, name))
+            os.replace(target + ".tmp", target)
+        self._write_json(self.TERMS_FILE, self.terms)
+        # meta 를 마지막에 써서 중간에 실패하면 버전 불일치로 다시 만들게 함
+        self._write_json(self.META_FILE, {
+            "documents": self.documents,
+            "total_len": self.total_len,
+            "domains": self.domains,
+            "partitions": self.partitions,
+            "k1": self.k1,
+            "b": self.b,
+            "version": version
+        })
+
+    def load(self) -> bool:
+        """저장된 역색인 로드 (없으면 False), postings 는 mmap 설정 시 메모리 매핑"""
+        meta_path = os.path.join(self.path, self.META_FILE)
+        if not os.path.exists(meta_path):
+            return False
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+
+        self.reset()
+        with open(os.path.join(self.path, self.TERMS_FILE), encoding="utf-8") as f:
+            self.terms = json.load(f)
+        self.vocabulary = {term: term_id for term_id, term in enumerate(self.terms)}
+        for domain in meta["domains"]:
+            self._domain_code(domain)
+        for name in self.ARRAYS:
+            mmap_mode = "r" if self.mmap and name in self.MMAP_ARRAYS else None
+            setattr(self, name, np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode=mmap_mode))
+        self.partitions = meta["partitions"]
+        self.documents = meta["documents"]
+        self.total_len = meta["total_len"]
+        self.version = meta.get("version")
+        return True
+
+    # ---------- 검색 ----------
+
+    def search(self,
+               query: str,
+               top_k: int = 50,
+               domain: Optional[str] = None,
+               min_match: float = 0.0) -> List[Tuple[int, float]]:
+        """
+        BM25 상위 top_k 문서
+
+        Args:
+            query: 쿼리 텍스트
+            top_k: 반환할 최대 개수
+            domain: 지정 시 해당 도메인 문서의 postings 만 점수 계산
+            min_match: 쿼리 토큰 (중복 제외) 중 이 비율 이상을 포함한 문서만 반환
+
+        Returns:
+            List[(vector_id, BM25 점수)] 점수 내림차순
+        """
+        self._merge()
+        query_terms = set(tokenize(query))
+        term_ids = [self.vocabulary[term] for term in query_terms if term in self.vocabulary]
+        if not term_ids or self.documents == 0 or top_k <= 0:
+            return []
+
+        code = None
+        if domain is not None:
+            code = self._domain_codes.get(domain)
+            if code is None:
+                return []
+
+        n = self.documents
+        rare, common = [], []
+        for term_id in term_ids:
+            base = term_id * self.partitions
+            df = int(self.offsets[base + self.partitions] - self.offsets[base])
+            if code is not None:
+                ranges = [(int(self.offsets[base + code]), int(self.offsets[base + code + 1]))]
+            else:
+                ranges = [(int(self.offsets[base]), int(self.offsets[base + self.partitions]))]
+            if ranges[0][0] == ranges[0][1]:
+                continue
+            idf = math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+            (common if df > self.common_df_ratio * n else rare).append((term_id, ranges, np.float32(idf)))
+        if not rare:
+            rare, common = common, []
+        if not rare:
+            return []
+
+        docs = np.concatenate([self.postings[start:end] for _, ranges, _ in rare for start, end in ranges])
+        weights = np.concatenate([self.impacts[start:end] * idf for _, ranges, idf in rare for start, end in ranges])
+        if not common and len(docs) * 16 > len(self.doc_len):
+            # postings 가 많으면 vector_id 배열에 바로 누적, 적으면 등장 문서만 정렬해 누적
+            candidates, index = None, docs
+        else:
+            candidates, index = np.unique(docs, return_inverse=True)
+        scores = np.bincount(index, weights, minlength=len(self.doc_len) if candidates is None else 0)
+        matched = np.bincount(index, minlength=len(scores))
+        for term_id, _, idf in common:
+            self._score_candidates(term_id, code, idf, candidates, scores, matched)
+
+        required = max(1, math.ceil(min_match * len(query_terms)))
+        if required > 1:
+            scores[matched < required] = 0.0
+        top = np.flatnonzero(scores)
+        if len(top) > top_k:
+            top = top[np.argpartition(-scores[top], top_k - 1)[:top_k]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        ids = top if candidates is None else candidates[top]
+        return [(int(doc_id), float(score)) for doc_id, score in zip(ids, scores[top])]
+
+    def _score_candidates(self, term_id: int, code: Optional[int], idf: np.float32,
+                          candidates: np.ndarray, scores: np.ndarray, matched: np.ndarray):
+        """흔한 용어는 후보 문서만 postings 에서 이진 탐색 ((용어, 도메인) 구간 안은 문서 id 순)"""
+        base = term_id * self.partitions
+        codes = [code] if code is not None else range(self.partitions)
+        for partition in codes:
+            start, end = int(self.offsets[base + partition]), int(self.offsets[base + partition + 1])
+            if start == end:
+                continue
+            segment = self.postings[start:end]
+            positions = np.minimum(np.searchsorted(segment, candidates), end - start - 1)
+            hit = segment[positions] == candidates
+            scores[hit] += self.impacts[start:end][positions[hit]] * idf
+            matched[hit] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        self._merge()
+        return {
+            "documents": self.documents,
+            "terms": len(self.terms),
+            "postings": int(len(self.postings)),
+            "bytes": int(sum(getattr(self, name).nbytes for name in self.ARRAYS)),
+            "mmap": isinstance(self.postings, np.memmap)
+        }
+
+    # ---------- 내부 ----------
+
+    def _merge(self):
+        """
+        모아 둔 추가 / 삭제를 CSR 배열에 반영
+
+        (용어, 도메인, 문서 id) 순으로 정렬해 구간 안의 문서 id 를 오름차순으로 두고
+        (흔한 용어 이진 탐색), 문서 수 / 평균 길이가 바뀌므로 impacts 는 전부 다시 계산한다.
+        """
+        if not self._pending_docs and not self._removed:
+            return
+        base_terms = np.repeat(np.arange(len(self.offsets) - 1, dtype=np.int32) // self.partitions,
+                               np.diff(self.offsets))
+        terms = np.concatenate([base_terms, np.frombuffer(self._pending_terms, dtype=np.int32)])
+        docs = np.concatenate([self.postings, np.frombuffer(self._pending_docs, dtype=np.int32)])
+        tfs = np.concatenate([self.tfs, np.frombuffer(self._pending_tfs, dtype=np.uint16)])
+        del base_terms
+        domains = self.doc_domain[docs]
+        if self._removed:
+            keep = domains >= 0
+            terms, docs, tfs, domains = terms[keep], docs[keep], tfs[keep], domains[keep]
+
+        partitions = max(1, len(self.domains))
+        keys = (terms.astype(np.int64) * partitions + domains) << 31 | docs
+        del terms, domains
+        order = np.argsort(keys)
+        offsets = np.zeros(len(self.terms) * partitions + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys >> 31, minlength=len(self.terms) * partitions), out=offsets[1:])
+        del keys
+        self.offsets = offsets
+        self.partitions = partitions
+        self.postings = docs[order]
+        self.tfs = tfs[order]
+        self.impacts = self._impacts(self.postings, self.tfs)
+        self._pending_terms = array("i")
+        self._pending_docs = array("i")
+        self._pending_tfs = array("H")
+        self._removed = False
+
+    def _impacts(self, docs: np.ndarray, tfs: np.ndarray) -> np.ndarray:
+        """BM25 tf 포화 항 (idf 제외)"""
+        average_len = self.total_len / self.documents if self.documents else 1.0
+        norm = (self.k1 * (1.0 - self.b + self.b * self.doc_len / average_len)).astype(np.float32)
+        tf = tfs.astype(np.float32)
+        return (tf * np.float32(self.k1 + 1.0) / (tf + norm[docs])).astype(np.float16)
+
+    def _reserve(self, size: int):
+        """vector_id 로 인덱싱하는 문서 배열 확장 (두 배씩)"""
+        if size <= len(self.doc_len):
+            return
+        capacity = max(size, len(self.doc_len) * 2, 1024)
+        doc_len = np.zeros(capacity, dtype=np.int32)
+        doc_len[:len(self.doc_len)] = self.doc_len
+        doc_domain = np.full(capacity, -1, dtype=np.int16)
+        doc_domain[:len(self.doc_domain)] = self.doc_domain
+        self.doc_len, self.doc_domain = doc_len, doc_domain
+
+    def _domain_code(self, domain: str) -> int:
+        code = self._domain_codes.get(domain)
+        if code is None:
+            code = self._domain_codes[domain] = len(self.domains)
+            self.domains.append(domain)
+        return code
+
+    def _write_json(self, name: str, data: Any):
+        target = os.path.join(self.path, name)
+        with open(target + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(target + ".tmp", target)
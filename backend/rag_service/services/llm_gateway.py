@@ -0,0 +1,381 @@
+# RAG LLM Gateway (비동기 스트리밍 + 연결 풀 + 동일 요청 합치기)
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+
+from rag_service.core.config import settings
+from rag_service.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+Messages = List[Dict[str, str]]
+
+DEFAULT_MODELS = {
+    "openai": "gpt-4o-mini",
+    "anthropic": "claude-3-5-haiku-latest",
+    "local": "local"
+}
+
+SYSTEM_PROMPT = (
+    "당신은 현장 작업자를 돕는 스마트 글래스 어시스턴트입니다. "
+    "주어진 문서 내용만 근거로 짧고 정확하게 한국어로 답하고, 문서에 없는 내용은 모른다고 답하세요."
+)
+
+
+def build_rag_messages(query: str, sources: List[Any], max_context_chars: int = 6000) -> Messages:
+    """검색 결과를 근거 문서로 붙인 채팅 메시지"""
+    parts, used = [], 0
+    for i, source in enumerate(sources, 1):
+        header = f"[{i}] {source.document}" + (f" (p.{source.page})" if source.page is not None else "")
+        body = source.content[:max(0, max_context_chars - used)]
+        if not body:
+            break
+        parts.append(f"{header}\n{body}")
+        used += len(body)
+    context = "\n\n".join(parts) if parts else "(관련 문서 없음)"
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"문서:\n{context}\n\n질문: {query}"}
+    ]
+
+
+class LLMResult(NamedTuple):
+    """한 번의 생성 결과와 지연 지표"""
+    text: str
+    tokens: int
+    ttft_ms: float  # 요청 → 첫 토큰
+    total_ms: float
+    tokens_per_sec: float  # 첫 토큰 이후 생성 속도
+    coalesced: bool  # 이미 진행 중인 같은 요청에 합류했는지
+
+
+# ===========================================
+# Provider (요청 형식 / 스트림 이벤트 파싱)
+# ===========================================
+
+class OpenAIProvider:
+    """OpenAI Chat Completions 스트리밍 (local 은 같은 형식의 OpenAI 호환 서버)"""
+
+    def __init__(self, name: str, base_url: str, api_key: Optional[str] = None):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+
+    def request(self, messages: Messages, model: str, max_tokens: int,
+                temperature: float) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        payload = {"model": model, "messages": messages, "max_tokens": max_tokens,
+                   "temperature": temperature, "stream": True}
+        return f"{self.base_url}/chat/completions", headers, payload
+
+    @staticmethod
+    def parse(event: Dict[str, Any]) -> Optional[str]:
+        choices = event.get("choices") or [{}]
+        return (choices[0].get("delta") or {}).get("content")
+
+
+class AnthropicProvider:
+    """Anthropic Messages API 스트리밍"""
+
+    def __init__(self, name: str, base_url: str, api_key: Optional[str] = None):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+
+    def request(self, messages: Messages, model: str, max_tokens: int,
+                temperature: float) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        headers = {"Content-Type": "application/json", "anthropic-version": "2023-06-01"}
+        if self.api_key:
+            headers["x-api-key"] = self.api_key
+        system = "\n".join(m["content"] for m in messages if m["role"] == "system")
+        payload = {"model": model, "max_tokens": max_tokens, "temperature": temperature, "stream": True,
+                   "messages": [m for m in messages if m["role"] != "system"]}
+        if system:
+            payload["system"] = system
+        return f"{self.base_url}/v1/messages", headers, payload
+
+    @staticmethod
+    def parse(event: Dict[str, Any]) -> Optional[str]:
+        if event.get("type") == "content_block_delta":
+            return (event.get("delta") or {}).get("text")
+        return None
+
+
+def create_provider(name: str):
+    """설정의 llm_provider 로 provider 생성"""
+    if name == "openai":
+        return OpenAIProvider(name, settings.llm_base_url or "https://api.openai.com/v1", settings.openai_api_key)
+    if name == "anthropic":
+        return AnthropicProvider(name, settings.llm_base_url or "https://api.anthropic.com",
+                                 settings.anthropic_api_key)
+    if name == "local":
+        return OpenAIProvider(name, settings.llm_base_url or "http://localhost:8080/v1")
+    raise ValueError(f"지원하지 않는 LLM provider: {name} (가능: openai, anthropic, local)")
+
+
+# ===========================================
+# Gateway
+# ===========================================
+
+class _Flight:
+    """진행 중인 upstream 호출 하나 (같은 요청의 구독자들이 토큰을 함께 읽음)"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.tokens: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.started_at = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+
+class LLMGateway:
+    """
+    비동기 LLM 게이트웨이
+
+    - keep-alive 연결 풀 (aiohttp ClientSession 하나를 이벤트 루프 동안 재사용)
+    - provider 별 동시 호출 수 제한 (넘치는 요청은 대기)
+    - 같은 요청 (provider / 모델 / 메시지 / 파라미터) 이 진행 중이면 upstream 호출 하나를 공유하고,
+      늦게 합류한 요청은 이미 받은 토큰부터 다시 읽는다
+    - 구독자가 모두 끊기면 upstream 호출도 취소
+    """
+
+    def __init__(self, provider, model: str, max_concurrency: int = 8, pool_size: int = 32,
+                 keepalive_sec: float = 30.0, timeout_sec: float = 60.0,
+                 max_tokens: int = 512, temperature: float = 0.0, coalesce: bool = True):
+        """
+        Args:
+            provider: OpenAIProvider / AnthropicProvider
+            model: 모델 이름
+            max_concurrency: provider 에 동시에 보내는 최대 요청 수
+            pool_size: 연결 풀 크기
+            keepalive_sec: 유휴 연결 유지 시간
+            timeout_sec: 요청 전체 제한 시간
+            max_tokens, temperature: 생성 파라미터 기본값
+            coalesce: 진행 중인 같은 요청에 합류할지
+        """
+        self.provider = provider
+        self.model = model
+        self.max_concurrency = max(1, max_concurrency)
+        self.pool_size = pool_size
+        self.keepalive_sec = keepalive_sec
+        self.timeout_sec = timeout_sec
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.coalesce = coalesce
+
+        self._session = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._flights: Dict[str, _Flight] = {}
+
+        self.requests = 0
+        self.upstream_calls = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.tokens = 0
+
+    @property
+    def configured(self) -> bool:
+        """API 키 / 서버 주소가 있어 호출할 수 있는지"""
+        return self.provider.name == "local" or bool(self.provider.api_key)
+
+    async def stream(self, messages: Messages, max_tokens: Optional[int] = None,
+                     temperature: Optional[float] = None,
+                     info: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """
+        토큰 스트림
+
+        Args:
+            info: 넘기면 끝난 뒤 tokens / ttft_ms / total_ms / tokens_per_sec / coalesced 를 채움
+        """
+        max_tokens = max_tokens or self.max_tokens
+        temperature = self.temperature if temperature is None else temperature
+        key = self._key(messages, max_tokens, temperature)
+        self._ensure_loop()
+        self.requests += 1
+
+        flight = self._flights.get(key) if self.coalesce else None
+        coalesced = flight is not None
+        if flight is None:
+            flight = _Flight(key)
+            if self.coalesce:
+                self._flights[key] = flight
+            flight.task = asyncio.get_running_loop().create_task(
+                self._call(flight, messages, max_tokens, temperature))
+        else:
+            self.coalesced += 1
+            metrics.inc("llm", "coalesced")
+        flight.subscribers += 1
+        joined_at = time.perf_counter()
+        first_at = None
+
+        try:
+            index = 0
+            while True:
+                async with flight.changed:
+                    await flight.changed.wait_for(lambda: len(flight.tokens) > index or flight.done)
+                    tokens = flight.tokens[index:]
+                    done, error = flight.done, flight.error
+                for token in tokens:
+                    if first_at is None:
+                        first_at = time.perf_counter()
+                    yield token
+                index += len(tokens)
+                if done and index >= len(flight.tokens):
+                    if error is not None:
+                        raise error
+                    break
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done and flight.task is not None:
+                flight.task.cancel()
+
+        finished_at = time.perf_counter()
+        ttft_ms = ((first_at or finished_at) - joined_at) * 1000.0
+        generation = (flight.finished_at or finished_at) - (flight.first_token_at or finished_at)
+        metrics.observe("llm", "ttft", ttft_ms / 1000.0)
+        if info is not None:
+            info.update({
+                "tokens": len(flight.tokens),
+                "ttft_ms": round(ttft_ms, 1),
+                "total_ms": round((finished_at - joined_at) * 1000.0, 1),
+                "tokens_per_sec": round(len(flight.tokens) / generation, 1) if generation > 0 else 0.0,
+                "coalesced": coalesced,
+                "provider": self.provider.name,
+                "model": self.model
+            })
+
+    async def complete(self, messages: Messages, max_tokens: Optional[int] = None,
+                       temperature: Optional[float] = None) -> LLMResult:
+        """스트림을 끝까지 받아 한 번에 반환"""
+        info: Dict[str, Any] = {}
+        text = "".join([token async for token in self.stream(messages, max_tokens, temperature, info)])
+        return LLMResult(text, info["tokens"], info["ttft_ms"], info["total_ms"],
+                         info["tokens_per_sec"], info["coalesced"])
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider.name,
+            "model": self.model,
+            "configured": self.configured,
+            "max_concurrency": self.max_concurrency,
+            "coalesce": self.coalesce,
+            "in_flight": len(self._flights),
+            "requests": self.requests,
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "tokens": self.tokens
+        }
+
+    # ---------- 내부 ----------
+
+    def _key(self, messages: Messages, max_tokens: int, temperature: float) -> str:
+        raw = json.dumps([self.provider.name, self.model, messages, max_tokens, temperature],
+                         ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _ensure_loop(self):
+        """세션 / 세마포어는 만든 이벤트 루프에서만 쓸 수 있으므로 루프가 바뀌면 새로 만듦"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._session = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._flights = {}
+
+    def _get_session(self):
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=self.keepalive_sec,
+                                             ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout_sec, sock_connect=5.0)
+            )
+        return self._session
+
+    async def _call(self, flight: _Flight, messages: Messages, max_tokens: int, temperature: float):
+        """upstream 호출 → 토큰을 flight 에 쌓음"""
+        url, headers, payload = self.provider.request(messages, self.model, max_tokens, temperature)
+        try:
+            waited = time.perf_counter()
+            async with self._semaphore:
+                metrics.observe("llm", "queue", time.perf_counter() - waited)
+                self.upstream_calls += 1
+                metrics.inc("llm", "upstream_calls")
+                async with self._get_session().post(url, headers=headers, json=payload) as response:
+                    if response.status >= 400:
+                        detail = (await response.text())[:200]
+                        raise RuntimeError(f"LLM {self.provider.name} 오류 {response.status}: {detail}")
+                    async for data in _sse_data(response.content):
+                        if data == "[DONE]":
+                            break
+                        token = self.provider.parse(json.loads(data))
+                        if not token:
+                            continue
+                        if flight.first_token_at is None:
+                            flight.first_token_at = time.perf_counter()
+                        async with flight.changed:
+                            flight.tokens.append(token)
+                            flight.changed.notify_all()
+        except asyncio.CancelledError:
+            flight.error = RuntimeError("LLM 요청이 취소됨")
+        except Exception as e:
+            self.errors += 1
+            metrics.inc("llm", "errors")
+            logger.error(f"LLM 호출 오류 ({self.provider.name}): {str(e)}")
+            flight.error = e
+        finally:
+            flight.finished_at = time.perf_counter()
+            self.tokens += len(flight.tokens)
+            if flight.first_token_at is not None:
+                metrics.observe("llm", "generate", flight.finished_at - flight.first_token_at)
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+            async with flight.changed:
+                flight.done = True
+                flight.changed.notify_all()
+
+
+async def _sse_data(content) -> AsyncIterator[str]:
+    """Server-Sent Events 의 data 줄만 꺼냄 (event: 줄은 provider 가 data 의 type 으로 구분)"""
+    async for raw in content:
+        line = raw.decode("utf-8").strip()
+        if line.startswith("data:"):
+            yield line[5:].strip()
+
+
+def create_llm_gateway() -> LLMGateway:
+    return LLMGateway(
+        create_provider(settings.llm_provider),
+        model=settings.llm_model or DEFAULT_MODELS.get(settings.llm_provider, ""),
+        max_concurrency=settings.llm_max_concurrency,
+        pool_size=settings.llm_pool_size,
+        keepalive_sec=settings.llm_keepalive_sec,
+        timeout_sec=settings.llm_timeout_sec,
+        max_tokens=settings.llm_max_tokens,
+        temperature=settings.llm_temperature,
+        coalesce=settings.llm_coalesce_requests
+    )
+
+
+# 전역 게이트웨이 (세션은 첫 요청 때 생성)
+llm_gateway = create_llm_gateway()
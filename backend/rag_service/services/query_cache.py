@@ -0,0 +1,122 @@
+# RAG 쿼리 캐시 (임베딩 LRU + 응답 캐시)
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from rag_service.core.config import settings
+from rag_service.core.metrics import metrics
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """캐시 키용 쿼리 정규화 (유니코드 NFKC, 소문자, 공백 정리)"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", query)).strip().lower()
+
+
+class LRUCache:
+    """크기 / TTL 제한이 있는 스레드 안전 LRU 캐시"""
+
+    def __init__(self, name: str, max_size: int = 1024, ttl_sec: Optional[float] = None):
+        self.name = name
+        self.max_size = max_size
+        self.ttl_sec = ttl_sec
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and self.ttl_sec is not None and now - item[1] > self.ttl_sec:
+                del self._data[key]
+                self.expirations += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                hit = False
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                hit = True
+        metrics.inc("rag", f"{self.name}_{'hit' if hit else 'miss'}")
+        return item[0] if hit else None
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_size <= 0:
+            return
+        evicted = 0
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                evicted += 1
+            self.evictions += evicted
+        if evicted:
+            metrics.inc("rag", f"{self.name}_eviction", evicted)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_sec": self.ttl_sec,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+class ResponseCache(LRUCache):
+    """
+    (query, domain, top_k, threshold) → QueryResponse 캐시
+
+    인덱스 버전이 바뀌면 이전 버전으로 만든 응답을 모두 버린다.
+    검색 / 생성 도중 버전이 바뀐 응답은 put_for_version 이 저장하지 않는다.
+    """
+
+    def __init__(self, max_size: int = 256, ttl_sec: Optional[float] = None):
+        super().__init__("response_cache", max_size, ttl_sec)
+        self.index_version: Optional[str] = None
+
+    @staticmethod
+    def make_key(query: str, domain: Optional[str], top_k: int, threshold: float) -> tuple:
+        return normalize_query(query), domain, top_k, threshold
+
+    def sync_version(self, index_version: Optional[str]):
+        """인덱스 버전이 바뀌었으면 전체 무효화"""
+        if index_version != self.index_version:
+            self.clear()
+            self.index_version = index_version
+
+    def put_for_version(self, key: Hashable, value: Any, index_version: Optional[str]) -> bool:
+        """index_version 인덱스로 만든 응답을 그 버전이 아직 현재일 때만 저장"""
+        if index_version != self.index_version:
+            metrics.inc("rag", f"{self.name}_stale")
+            return False
+        self.put(key, value)
+        return True
+
+
+# 전역 응답 캐시 (인덱스 버전이 바뀌면 자동 무효화)
+response_cache = ResponseCache(
+    max_size=settings.query_response_cache_size,
+    ttl_sec=settings.query_response_cache_ttl_sec
+)
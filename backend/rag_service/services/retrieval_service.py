@@ -0,0 +1,183 @@
+# RAG 검색 엔진
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from rag_service.core.config import settings
+from rag_service.core.metrics import StageTimings
+from rag_service.models.document import Document, SourceDocument
+from rag_service.services.chunker import chunk_document
+from rag_service.services.embedder import create_embedder
+from rag_service.services.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from rag_service.services.query_cache import LRUCache, normalize_query
+from rag_service.services.vector_store import FaissVectorStore
+
+logger = logging.getLogger(__name__)
+
+
+class RetrievalService:
+    """
+    쿼리 임베딩 + FAISS 검색 (인덱스는 시작 시 한 번만 로드)
+
+    store 에 BM25 역색인이 있으면 벡터 / 어휘 검색기에서 각각 candidates 개 후보를 뽑아
+    RRF 로 합친다. threshold 는 벡터 후보에만 적용하고, 어휘 후보는 쿼리 토큰의
+    lexical_min_match 비율 이상을 포함해야 한다 (부품 번호처럼 임베딩 유사도는 낮지만
+    정확히 일치하는 청크를 살리기 위함).
+    """
+
+    def __init__(self, store: FaissVectorStore, embedder,
+                 embedding_cache: Optional[LRUCache] = None,
+                 candidates: int = 50,
+                 rrf_k: int = 60,
+                 lexical_min_match: float = 0.5):
+        self.store = store
+        self.embedder = embedder
+        self.embedding_cache = embedding_cache if embedding_cache is not None else LRUCache("embedding_cache", max_size=0)
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self.lexical_min_match = lexical_min_match
+        self.loaded = store.version is not None  # 이미 로드/생성된 store 를 넘겨받은 경우
+
+    def load(self) -> bool:
+        """
+        vector_db_path 의 인덱스 로드
+
+        store 를 비운 뒤 다시 채우므로 검색 중인 서비스에는 쓰지 않는다
+        (운영 중 재로드는 with_store 로 새 서비스를 만들어 교체).
+        """
+        self.loaded = self.store.load()
+        if self.loaded:
+            logger.info(f"벡터 인덱스 로드 완료: {self.store.size}개 청크 ({self.store.index_type})")
+        else:
+            logger.warning(f"벡터 인덱스 없음: {self.store.path}")
+        return self.loaded
+
+    def with_store(self, store: FaissVectorStore) -> "RetrievalService":
+        """같은 임베더 / 임베딩 캐시 / 검색 설정으로 store 만 바꾼 새 서비스"""
+        return RetrievalService(store, self.embedder, embedding_cache=self.embedding_cache,
+                                candidates=self.candidates, rrf_k=self.rrf_k,
+                                lexical_min_match=self.lexical_min_match)
+
+    def build_index(self, documents: Iterable[Document]) -> int:
+        """Document 들을 청킹/임베딩해 인덱스를 새로 만들고 저장"""
+        chunks = [
+            chunk
+            for document in documents
+            for chunk in chunk_document(document, settings.chunk_size, settings.chunk_overlap)
+        ]
+        vectors = self.embedder.embed([chunk.content for chunk in chunks])
+        self.store.build(chunks, vectors)
+        self.store.save()
+        self.loaded = True
+        return len(chunks)
+
+    def search(self,
+               query: str,
+               top_k: int = 5,
+               threshold: Optional[float] = None,
+               domain: Optional[str] = None,
+               timings: Optional[StageTimings] = None) -> List[SourceDocument]:
+        """쿼리와 유사한 청크를 SourceDocument 로 반환"""
+        return [
+            SourceDocument(
+                document=chunk.get("title") or chunk.get("file_path", ""),
+                page=chunk.get("page_number"),
+                content=chunk.get("content", ""),
+                similarity=score
+            )
+            for chunk, score in self.search_chunks(query, top_k, threshold, domain, timings)
+        ]
+
+    def search_chunks(self,
+                      query: str,
+                      top_k: int = 5,
+                      threshold: Optional[float] = None,
+                      domain: Optional[str] = None,
+                      timings: Optional[StageTimings] = None) -> List[Tuple[Dict[str, Any], float]]:
+        """search 와 같은 검색, 청크 메타데이터 (vector_id 포함) 와 코사인 유사도로 반환"""
+        timings = timings or StageTimings("rag")
+
+        with timings.stage("embed"):
+            vector = self.embed_query(query)
+
+        if self.store.lexical is None:
+            with timings.stage("retrieve"):
+                hits = self.store.search(vector, top_k=top_k, threshold=threshold, domain=domain)
+        else:
+            depth = max(top_k, self.candidates)
+            with timings.stage("retrieve"):
+                vector_hits = self.store.search(vector, top_k=depth, threshold=threshold, domain=domain)
+            with timings.stage("lexical"):
+                lexical_hits = self.store.lexical.search(query, top_k=depth, domain=domain,
+                                                         min_match=self.lexical_min_match)
+                hits = self._fuse(vector, vector_hits, lexical_hits, top_k)
+        return hits
+
+    def _fuse(self, vector, vector_hits, lexical_hits, top_k: int):
+        """RRF 상위 top_k → [(청크, 코사인 유사도)] (어휘 검색에서만 나온 청크는 유사도를 따로 계산)"""
+        similarities: Dict[int, float] = {chunk["vector_id"]: score for chunk, score in vector_hits}
+        fused = reciprocal_rank_fusion(
+            [[chunk["vector_id"] for chunk, _ in vector_hits], [vector_id for vector_id, _ in lexical_hits]],
+            k=self.rrf_k
+        )
+        ids = [vector_id for vector_id, _ in fused if vector_id in self.store.chunks][:top_k]
+        missing = [vector_id for vector_id in ids if vector_id not in similarities]
+        if missing:
+            similarities.update(zip(missing, self.store.similarities(vector, missing)))
+        return [(self.store.chunks[vector_id], similarities[vector_id]) for vector_id in ids]
+
+    def embed_query(self, query: str):
+        """정규화한 쿼리 텍스트 기준으로 임베딩 캐시 조회 후 없으면 임베딩"""
+        key = normalize_query(query)
+        vector = self.embedding_cache.get(key)
+        if vector is None:
+            vector = self.embedder.embed([key])[0]
+            self.embedding_cache.put(key, vector)
+        return vector
+
+
+def create_lexical_index(mmap: bool = True) -> Optional[LexicalIndex]:
+    """설정 기반 BM25 역색인 (vector_db_path/lexical, 비활성화면 None)"""
+    if not settings.lexical_index_enabled:
+        return None
+    return LexicalIndex(
+        os.path.join(settings.vector_db_path, "lexical"),
+        k1=settings.lexical_bm25_k1,
+        b=settings.lexical_bm25_b,
+        common_df_ratio=settings.lexical_common_df_ratio,
+        mmap=mmap
+    )
+
+
+def create_vector_store() -> FaissVectorStore:
+    """설정(vector_db_path, vector_index_*) 기반 벡터 스토어 생성 (로드는 하지 않음)"""
+    return FaissVectorStore(
+        settings.vector_db_path,
+        settings.embedding_dimension,
+        index_type=settings.vector_index_type,
+        nlist=settings.vector_ivf_nlist,
+        nprobe=settings.vector_ivf_nprobe,
+        hnsw_m=settings.vector_hnsw_m,
+        ef_search=settings.vector_hnsw_ef_search,
+        quantization=settings.vector_quantization,
+        pq_m=settings.vector_pq_m,
+        rerank_factor=settings.vector_rerank_factor,
+        mmap=settings.vector_index_mmap,
+        lexical=create_lexical_index(settings.vector_index_mmap)
+    )
+
+
+def create_retrieval_service(store: Optional[FaissVectorStore] = None, embedder=None) -> RetrievalService:
+    """설정 기반 검색 엔진 생성 (이미 로드된 store / embedder 를 넘기면 그대로 사용)"""
+    return RetrievalService(
+        store if store is not None else create_vector_store(),
+        embedder if embedder is not None else create_embedder(settings.embedding_model, settings.embedding_dimension),
+        embedding_cache=LRUCache(
+            "embedding_cache",
+            max_size=settings.query_embedding_cache_size,
+            ttl_sec=settings.query_embedding_cache_ttl_sec
+        ),
+        candidates=settings.hybrid_candidates,
+        rrf_k=settings.hybrid_rrf_k,
+        lexical_min_match=settings.lexical_min_match
+    )
@@ -0,0 +1,534 @@
+# FAISS 벡터 저장소
+import json
+import mmap
+import os
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import faiss
+import numpy as np
+
+from rag_service.models.document import DocumentChunk
+from rag_service.services.lexical_index import LexicalIndex
+
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+QUANTIZATIONS = ("none", "sq8", "pq")
+PQ_MIN_TRAIN = 256  # 부분 벡터당 8비트 코드북 (256 중심) 학습에 필요한 최소 벡터 수
+
+
+class FaissVectorStore:
+    """
+    FAISS 인덱스 + 청크 메타데이터 저장소
+
+    벡터는 L2 정규화된 상태로 내적(METRIC_INNER_PRODUCT) 인덱스에 저장하므로
+    검색 점수가 곧 코사인 유사도다. 도메인 필터는 검색 후 거르는 대신
+    IDSelector 로 인덱스 탐색 단계에서 적용한다.
+
+    각 청크는 고정 벡터 id 를 가지므로 문서 단위로 추가/삭제할 수 있다.
+    삭제를 지원하지 않는 인덱스(HNSW)는 tombstone 으로 검색에서 제외하고
+    compact() 에서 정리한다.
+
+    lexical 을 넘기면 같은 vector_id 로 BM25 역색인을 함께 갱신 / 저장한다.
+
+    quantization 이 sq8 (차원당 int8) / pq (벡터당 pq_m 바이트) 이면 인덱스에는 압축 코드만 두고
+    top_k * rerank_factor 개 후보를 코드로 찾은 뒤, vectors.f32 에서 그 후보의 원본 벡터만 읽어
+    정확한 코사인 유사도로 다시 정렬한다. 두 파일 모두 메모리 매핑이라 같은 노드의 워커 / 레플리카가
+    페이지 캐시를 나눠 쓰고, 프로세스마다 상주하는 것은 검색 중 실제로 읽은 페이지뿐이다.
+    vectors.f32 는 vector_id 번째 행에 벡터를 두므로 추가는 파일 끝에 이어 쓰고, 삭제된 행은
+    build 로 새로 만들 때까지 디스크에만 남는다.
+
+    디렉터리 구성:
+        index.faiss   FAISS 인덱스 (가능하면 메모리 매핑으로 로드)
+        vectors.f32   정규화한 원본 벡터 (quantization 사용 시, 재정렬용)
+        chunks.jsonl  청크 메타데이터 (vector_id 포함)
+        meta.json     인덱스 종류 / 양자화 / 차원 / 버전 / tombstone
+        lexical/      BM25 역색인 (LexicalIndex)
+    """
+
+    INDEX_FILE = "index.faiss"
+    CHUNKS_FILE = "chunks.jsonl"
+    META_FILE = "meta.json"
+    VECTORS_FILE = "vectors.f32"
+
+    def __init__(self,
+                 path: str,
+                 dimension: int,
+                 index_type: str = "flat",
+                 nlist: int = 1024,
+                 nprobe: int = 16,
+                 hnsw_m: int = 32,
+                 ef_search: int = 64,
+                 mmap: bool = True,
+                 lexical: Optional[LexicalIndex] = None,
+                 quantization: str = "none",
+                 pq_m: int = 48,
+                 rerank_factor: int = 4):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"지원하지 않는 인덱스 종류: {index_type} (지원: {', '.join(INDEX_TYPES)})")
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"지원하지 않는 양자화: {quantization} (지원: {', '.join(QUANTIZATIONS)})")
+        if quantization == "pq" and dimension % pq_m:
+            raise ValueError(f"pq_m({pq_m})은 임베딩 차원({dimension})의 약수여야 합니다")
+        self.path = path
+        self.dimension = dimension
+        self.index_type = index_type
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.hnsw_m = hnsw_m
+        self.ef_search = ef_search
+        self.mmap = mmap
+        self.lexical = lexical
+        self.quantization = quantization
+        self.pq_m = pq_m
+        self.rerank_factor = max(1, rerank_factor)
+
+        self.index: Optional[faiss.Index] = None
+        self.chunks: Dict[int, Dict[str, Any]] = {}
+        self.version: Optional[str] = None
+        self.next_id = 0
+        self.deleted: Set[int] = set()
+        self._document_ids: Dict[str, List[int]] = {}
+        self._domain_ids: Dict[str, Set[int]] = {}
+        self._selectors: Optional[Dict[Optional[str], Any]] = None
+        self._selector_refs: List[Any] = []
+        # 재정렬용 원본 벡터: 저장된 행 (메모리 매핑) + 아직 저장하지 않은 추가분
+        self._vectors: Optional[np.ndarray] = None
+        self._saved_rows = 0
+        self._new_vectors: List[np.ndarray] = []
+
+    @property
+    def size(self) -> int:
+        """검색 가능한 청크 수"""
+        return len(self.chunks)
+
+    @property
+    def quantized(self) -> bool:
+        return self.quantization != "none"
+
+    # ---------- 생성 / 갱신 ----------
+
+    def build(self, chunks: Sequence[DocumentChunk], vectors: np.ndarray):
+        """청크와 임베딩으로 인덱스를 새로 생성"""
+        self.reset()
+        self.add(chunks, vectors)
+
+    def reset(self):
+        """비어 있는 상태로 초기화"""
+        self.index = None
+        self.chunks = {}
+        self.next_id = 0
+        self.deleted = set()
+        self._document_ids = {}
+        self._domain_ids = {}
+        self._vectors = None
+        self._saved_rows = 0
+        self._new_vectors = []
+        if self.lexical is not None:
+            self.lexical.reset()
+        self._touch()
+
+    def add(self, chunks: Sequence[DocumentChunk], vectors: np.ndarray) -> List[int]:
+        """청크 추가 (첫 추가 시 인덱스 생성/학습)"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape != (len(chunks), self.dimension):
+            raise ValueError(f"임베딩 shape 불일치: {vectors.shape} != ({len(chunks)}, {self.dimension})")
+        if not chunks:
+            return []
+
+        ids = np.arange(self.next_id, self.next_id + len(chunks), dtype=np.int64)
+        if self.quantized:
+            normalized = np.array(vectors, dtype=np.float32)
+            faiss.normalize_L2(normalized)
+            self._new_vectors.append(normalized)
+        if self.index is None:
+            self.index = self.create_index(vectors, ids)
+        else:
+            vectors = np.ascontiguousarray(vectors)
+            faiss.normalize_L2(vectors)
+            self.index.add_with_ids(vectors, ids)
+        self.next_id += len(chunks)
+
+        for vector_id, chunk in zip(ids.tolist(), chunks):
+            data = chunk.dict()
+            data["vector_id"] = vector_id
+            self._register(vector_id, data)
+        if self.lexical is not None:
+            self.lexical.add(ids.tolist(), [chunk.content for chunk in chunks], [chunk.domain for chunk in chunks])
+        self._touch()
+        return ids.tolist()
+
+    def remove_documents(self, document_ids: Iterable[str]) -> int:
+        """문서에 속한 청크 전부 삭제, 삭제된 청크 수 반환"""
+        ids = [vector_id
+               for document_id in document_ids
+               for vector_id in self._document_ids.pop(document_id, [])]
+        if not ids:
+            return 0
+
+        for vector_id in ids:
+            chunk = self.chunks.pop(vector_id)
+            self._domain_ids.get(chunk.get("domain") or "", set()).discard(vector_id)
+        if self.lexical is not None:
+            self.lexical.remove(ids)
+
+        try:
+            self.index.remove_ids(np.array(ids, dtype=np.int64))
+        except RuntimeError:
+            # HNSW 등 삭제 미지원 인덱스는 tombstone 처리
+            self.deleted.update(ids)
+        self._touch()
+        return len(ids)
+
+    def compact(self):
+        """tombstone 이 남아 있으면 살아 있는 벡터만으로 인덱스 재생성"""
+        if not self.deleted or self.index is None:
+            return
+        ids = np.array(sorted(self.chunks), dtype=np.int64)
+        if len(ids):
+            vectors = self.vectors(ids)
+            self.index = self.create_index(vectors, ids)
+        else:
+            self.index = None
+        self.deleted = set()
+        self._touch()
+
+    def document_ids(self) -> List[str]:
+        return list(self._document_ids)
+
+    # ---------- 저장 / 로드 ----------
+
+    def save(self):
+        """인덱스 / 메타데이터를 vector_db_path 에 저장 (임시 파일 후 교체)"""
+        os.makedirs(self.path, exist_ok=True)
+        if self.quantized:
+            # 메타데이터보다 먼저 저장 (로드는 meta.json 의 next_id 만큼만 매핑)
+            self._save_vectors()
+
+        index_path = os.path.join(self.path, self.INDEX_FILE)
+        if self.index is not None:
+            faiss.write_index(self.index, index_path + ".tmp")
+            os.replace(index_path + ".tmp", index_path)
+        elif os.path.exists(index_path):
+            os.remove(index_path)
+
+        chunks_path = os.path.join(self.path, self.CHUNKS_FILE)
+        with open(chunks_path + ".tmp", "w", encoding="utf-8") as f:
+            for chunk in self.chunks.values():
+                f.write(json.dumps(chunk, ensure_ascii=False, default=str) + "\n")
+        os.replace(chunks_path + ".tmp", chunks_path)
+
+        meta_path = os.path.join(self.path, self.META_FILE)
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "index_type": self.index_type,
+                "quantization": self.quantization,
+                "pq_m": self.pq_m,
+                "dimension": self.dimension,
+                "count": self.size,
+                "next_id": self.next_id,
+                "deleted": sorted(self.deleted),
+                "version": self.version
+            }, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+        if self.lexical is not None:
+            self.lexical.save(self.version)
+
+    def load(self) -> bool:
+        """저장된 인덱스 로드 (없으면 False)"""
+        meta_path = os.path.join(self.path, self.META_FILE)
+        if not os.path.exists(meta_path):
+            return False
+
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["dimension"] != self.dimension:
+            raise ValueError(f"인덱스 차원({meta['dimension']})이 설정({self.dimension})과 다릅니다")
+
+        self.reset()
+        index_path = os.path.join(self.path, self.INDEX_FILE)
+        self.index = self._read_index(index_path) if os.path.exists(index_path) else None
+        self.index_type = meta.get("index_type", self.index_type)
+        self.quantization = meta.get("quantization", "none")
+        self.pq_m = meta.get("pq_m", self.pq_m)
+        self.next_id = meta.get("next_id", 0)
+        if self.quantized:
+            self._saved_rows = self.next_id
+            self._vectors = self._open_vectors()
+        self.deleted = set(meta.get("deleted", []))
+
+        with open(os.path.join(self.path, self.CHUNKS_FILE), encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    chunk = json.loads(line)
+                    self._register(chunk["vector_id"], chunk)
+        self.version = meta.get("version")
+
+        if self.lexical is not None and (not self.lexical.load() or self.lexical.version != self.version):
+            # 역색인이 없거나 다른 버전이면 저장된 청크로 다시 만듦 (다음 save 때 저장)
+            self.lexical.reset()
+            ids = sorted(self.chunks)
+            self.lexical.add(ids, [self.chunks[i].get("content", "") for i in ids],
+                             [self.chunks[i].get("domain") for i in ids])
+        return True
+
+    # ---------- 검색 ----------
+
+    def search(self,
+               query: np.ndarray,
+               top_k: int = 5,
+               threshold: Optional[float] = None,
+               domain: Optional[str] = None) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        코사인 유사도 상위 top_k 청크 검색
+
+        Args:
+            query: 쿼리 임베딩 (dimension,)
+            top_k: 반환할 최대 개수
+            threshold: 최소 유사도
+            domain: 지정 시 해당 도메인 청크 안에서만 검색
+
+        Returns:
+            List[(청크 메타데이터, 유사도)]
+        """
+        if self.size == 0 or top_k <= 0:
+            return []
+
+        selectors = self._get_selectors()
+        if domain is not None:
+            selector = selectors.get(domain)
+            if selector is None:
+                return []
+        else:
+            selector = selectors.get(None)
+
+        query = np.array(query, dtype=np.float32).reshape(1, -1)
+        faiss.normalize_L2(query)
+        if self.quantized:
+            depth = top_k * self.rerank_factor
+            _, candidates = self.index.search(query, depth, params=self.search_params(selector, depth))
+            ids, scores = self._rerank(query[0], candidates[0], top_k)
+        else:
+            scores, ids = self.index.search(query, top_k, params=self.search_params(selector, top_k))
+            ids, scores = ids[0].tolist(), scores[0].tolist()
+
+        results = []
+        for vector_id, score in zip(ids, scores):
+            chunk = self.chunks.get(vector_id)
+            if chunk is None:
+                continue
+            if threshold is not None and score < threshold:
+                break
+            results.append((chunk, score))
+        return results
+
+    def similarities(self, query: np.ndarray, ids: Sequence[int]) -> List[float]:
+        """
+        쿼리와 지정 청크의 코사인 유사도 (벡터 검색 후보 밖의 청크용)
+
+        벡터를 복원할 수 없는 인덱스 (direct map 없는 IVF) 는 0.0
+        """
+        query = np.array(query, dtype=np.float32).reshape(1, -1)
+        faiss.normalize_L2(query)
+        if self.quantized:
+            return (self.vectors(ids) @ query[0]).tolist()
+        scores = []
+        for vector_id in ids:
+            try:
+                scores.append(float(self.index.reconstruct(int(vector_id)) @ query[0]))
+            except RuntimeError:
+                scores.append(0.0)
+        return scores
+
+    def vectors(self, ids: Sequence[int]) -> np.ndarray:
+        """
+        정규화한 원본 벡터 (quantization 이면 vectors.f32 에서 해당 행만 읽음)
+
+        Raises:
+            RuntimeError: 벡터를 복원할 수 없는 인덱스 (direct map 없는 IVF)
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if not self.quantized:
+            if not len(ids):
+                return np.zeros((0, self.dimension), dtype=np.float32)
+            return np.vstack([self.index.reconstruct(int(i)) for i in ids]).astype(np.float32, copy=False)
+        out = np.empty((len(ids), self.dimension), dtype=np.float32)
+        saved = ids < self._saved_rows
+        if saved.any():
+            rows = ids[saved]
+            order = np.argsort(rows)  # 파일 순서로 읽어 페이지 접근을 모음
+            out[np.flatnonzero(saved)[order]] = self._vectors[rows[order]]
+        if not saved.all():
+            pending = np.vstack(self._new_vectors)
+            out[~saved] = pending[ids[~saved] - self._saved_rows]
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        """인덱스 종류 / 양자화 / 벡터 100만 개당 메모리 (MB)"""
+        bytes_per_vector = self._index_bytes_per_vector()
+        return {
+            "index_type": self.index_type,
+            "quantization": self.quantization,
+            "vectors": int(self.index.ntotal) if self.index is not None else 0,
+            "index_bytes_per_vector": bytes_per_vector,
+            "index_mb_per_million": round(bytes_per_vector * 1e6 / (1 << 20), 1) if bytes_per_vector else None,
+            # 재정렬용 원본 벡터는 메모리 매핑 파일 (후보 행만 페이지 캐시로 읽힘)
+            "rerank_mb_per_million": round(self.dimension * 4 * 1e6 / (1 << 20), 1) if self.quantized else None,
+            "rerank_factor": self.rerank_factor if self.quantized else None
+        }
+
+    def create_index(self, vectors: np.ndarray, ids: Optional[np.ndarray] = None) -> faiss.Index:
+        """정규화한 벡터로 학습/추가까지 마친 인덱스 생성 (float32 입력은 제자리 정규화)"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        faiss.normalize_L2(vectors)
+        if ids is None:
+            ids = np.arange(vectors.shape[0], dtype=np.int64)
+        index = self._new_index(vectors.shape[0])
+        if not index.is_trained:
+            index.train(self._training_sample(vectors))
+        index.add_with_ids(vectors, ids)
+        return index
+
+    def search_params(self, selector=None, top_k: int = 1):
+        """인덱스 종류별 검색 파라미터 (nprobe / efSearch / 도메인 selector)"""
+        if self.index_type == "ivf" or isinstance(self.index, faiss.IndexIVF):
+            return faiss.SearchParametersIVF(sel=selector, nprobe=self.nprobe)
+        if self.index_type == "hnsw":
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=max(self.ef_search, top_k))
+        return faiss.SearchParameters(sel=selector) if selector is not None else None
+
+    # ---------- 내부 ----------
+
+    def _new_index(self, n: int) -> faiss.Index:
+        # pq 코드북은 학습 벡터가 모자라면 만들 수 없으므로 작은 코퍼스에서는 sq8 로 대신함
+        codes = self.quantization
+        if codes == "pq" and n < PQ_MIN_TRAIN:
+            codes = "sq8"
+        metric = faiss.METRIC_INNER_PRODUCT
+        sq8 = faiss.ScalarQuantizer.QT_8bit
+        if self.index_type == "ivf":
+            # 클러스터당 최소 39개 학습 벡터가 필요하므로 작은 코퍼스에서는 nlist 를 줄임
+            nlist = max(1, min(self.nlist, n // 39))
+            quantizer = faiss.IndexFlatIP(self.dimension)
+            if codes == "sq8":
+                index = faiss.IndexIVFScalarQuantizer(quantizer, self.dimension, nlist, sq8, metric)
+            elif codes == "pq":
+                index = faiss.IndexIVFPQ(quantizer, self.dimension, nlist, self.pq_m, 8, metric)
+            else:
+                index = faiss.IndexIVFFlat(quantizer, self.dimension, nlist, metric)
+            index.nprobe = min(self.nprobe, nlist)
+            return index
+        if self.index_type == "hnsw":
+            if codes == "sq8":
+                index = faiss.IndexHNSWSQ(self.dimension, sq8, self.hnsw_m, metric)
+            elif codes == "pq":
+                index = faiss.IndexHNSWPQ(self.dimension, self.pq_m, self.hnsw_m, 8, metric)
+            else:
+                index = faiss.IndexHNSWFlat(self.dimension, self.hnsw_m, metric)
+            index.hnsw.efSearch = self.ef_search
+        elif codes == "sq8":
+            index = faiss.IndexScalarQuantizer(self.dimension, sq8, metric)
+        elif codes == "pq":
+            # IndexPQ 는 IDSelector (도메인 필터) 를 받지 않으므로 리스트 하나짜리 IVF-PQ (전체 코드 스캔) 로 만듦
+            index = faiss.IndexIVFPQ(faiss.IndexFlatIP(self.dimension), self.dimension, 1, self.pq_m, 8, metric)
+            return index
+        else:
+            index = faiss.IndexFlatIP(self.dimension)
+        # 양자화 인덱스는 원본 벡터를 vectors.f32 에서 읽으므로 역방향 id 맵 (IDMap2) 이 필요 없음
+        return faiss.IndexIDMap(index) if self.quantized else faiss.IndexIDMap2(index)
+
+    def _index_bytes_per_vector(self) -> Optional[int]:
+        """벡터 하나가 인덱스에서 차지하는 바이트 (코드 + id, HNSW 는 0층 링크 포함)"""
+        if self.index is None:
+            return None
+        index = self.index
+        if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+            index = faiss.downcast_index(index.index)
+        if isinstance(index, faiss.IndexHNSW):
+            return faiss.downcast_index(index.storage).code_size + 2 * self.hnsw_m * 4 + 8
+        return index.code_size + 8
+
+    def _rerank(self, query: np.ndarray, candidates: np.ndarray, top_k: int) -> Tuple[List[int], List[float]]:
+        """압축 코드로 찾은 후보를 원본 벡터의 코사인 유사도로 다시 정렬해 상위 top_k"""
+        ids = np.array([i for i in candidates.tolist() if i in self.chunks], dtype=np.int64)
+        if not len(ids):
+            return [], []
+        scores = self.vectors(ids) @ query
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return ids[order].tolist(), scores[order].tolist()
+
+    def _save_vectors(self):
+        """추가분을 vectors.f32 끝에 이어 씀 (reset 이후 처음이면 새 파일로 교체)"""
+        path = os.path.join(self.path, self.VECTORS_FILE)
+        pending = np.vstack(self._new_vectors) if self._new_vectors else np.zeros((0, self.dimension), np.float32)
+        if self._saved_rows == 0 or not os.path.exists(path):
+            # 다른 프로세스가 매핑 중인 기존 파일은 건드리지 않도록 새 파일로 교체
+            with open(path + ".tmp", "wb") as f:
+                f.write(pending.tobytes())
+            os.replace(path + ".tmp", path)
+        elif len(pending):
+            with open(path, "r+b") as f:
+                # 이전 저장이 중간에 끊겨 남은 꼬리가 있으면 잘라내고 이어 씀
+                f.truncate(self._saved_rows * self.dimension * 4)
+                f.seek(0, os.SEEK_END)
+                f.write(pending.tobytes())
+        self._saved_rows += len(pending)
+        self._new_vectors = []
+        self._vectors = self._open_vectors()
+
+    def _open_vectors(self) -> Optional[np.ndarray]:
+        """vectors.f32 읽기 전용 매핑 (후보 행만 흩어 읽으므로 미리 읽기 끔)"""
+        if self._saved_rows == 0:
+            return None
+        with open(os.path.join(self.path, self.VECTORS_FILE), "rb") as f:
+            mapped = mmap.mmap(f.fileno(), self._saved_rows * self.dimension * 4, access=mmap.ACCESS_READ)
+        if hasattr(mmap, "MADV_RANDOM"):
+            mapped.madvise(mmap.MADV_RANDOM)
+        return np.frombuffer(mapped, dtype=np.float32).reshape(self._saved_rows, self.dimension)
+
+    def _training_sample(self, vectors: np.ndarray, per_list: int = 256) -> np.ndarray:
+        limit = max(self.nlist * per_list, 10000)
+        if vectors.shape[0] <= limit:
+            return vectors
+        rng = np.random.default_rng(0)
+        return vectors[rng.choice(vectors.shape[0], limit, replace=False)]
+
+    def _read_index(self, index_path: str) -> faiss.Index:
+        if self.mmap:
+            for flag in ("IO_FLAG_MMAP_IFC", "IO_FLAG_MMAP"):
+                if not hasattr(faiss, flag):
+                    continue
+                try:
+                    return faiss.read_index(index_path, getattr(faiss, flag) | faiss.IO_FLAG_READ_ONLY)
+                except RuntimeError:
+                    continue
+        return faiss.read_index(index_path)
+
+    def _register(self, vector_id: int, chunk: Dict[str, Any]):
+        self.chunks[vector_id] = chunk
+        self._document_ids.setdefault(chunk["document_id"], []).append(vector_id)
+        self._domain_ids.setdefault(chunk.get("domain") or "", set()).add(vector_id)
+
+    def _touch(self):
+        """내용이 바뀌면 버전을 갱신하고 selector 를 다시 만들도록 표시"""
+        self.version = uuid.uuid4().hex
+        self._selectors = None
+
+    def _get_selectors(self) -> Dict[Optional[str], Any]:
+        """도메인별 IDSelector 와 tombstone 제외용 selector (None 키)"""
+        if self._selectors is None:
+            selectors: Dict[Optional[str], Any] = {}
+            refs = []  # selector 가 참조하는 배열/객체가 GC 되지 않도록 보관
+            for domain, ids in self._domain_ids.items():
+                if ids:
+                    array = np.fromiter(ids, dtype=np.int64, count=len(ids))
+                    refs.append(array)
+                    selectors[domain] = faiss.IDSelectorBatch(array)
+            if self.deleted:
+                array = np.fromiter(self.deleted, dtype=np.int64, count=len(self.deleted))
+                inner = faiss.IDSelectorBatch(array)
+                refs.extend([array, inner])
+                selectors[None] = faiss.IDSelectorNot(inner)
+            self._selector_refs = refs
+            self._selectors = selectors
+        return self._selectors
@@ -1,22 +1,185 @@
 # Vision AI API Router
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, UploadFile, File, WebSocket, WebSocketDisconnect, Header, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse, Response, PlainTextResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-import cv2
-import numpy as np
-import json
-import io
+import os
+import time
+import asyncio
+import uuid
+from collections import OrderedDict
 from datetime import datetime
 import logging
 
-from vision_service.core.detector import VisionDetector
+from rag_service.core.config import settings
+from rag_service.core.metrics import StageTimings, metrics
+from rag_service.core.model_registry import model_registry
+from rag_service.services.knowledge_links import KnowledgeLinkIndex
+from vision_service.core.cascade import CascadeStage, attach_refinement
+from vision_service.core.encoding import JSON, MEDIA_TYPES, MSGPACK, available_formats, encode_result, negotiate_format
+from vision_service.core.frame_cache import FrameResultCache
+from vision_service.core.frames import BufferPool, decode_frame, mock_frame, prepare_upload, read_into
+from vision_service.core.governor import LatencyGovernor
+from vision_service.core.history import HistoryManager
+from vision_service.core.mjpeg import MEDIA_TYPE as MJPEG_MEDIA_TYPE, MjpegHub
+from vision_service.core.scheduler import DetectionTask, create_detection_scheduler
+from vision_service.core.stream import StreamManager, StreamSession
+from vision_service.core.tracker import StreamTracker
+from vision_service.core.video_jobs import VideoJobManager
+from vision_service.core.worker_pool import VisionWorkerPool, resolve_factory
+from vision_service.services.ocr_service import OCRStage, attach_texts
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# 전역 Vision Detector 인스턴스
-vision_detector = VisionDetector()
+def _load_vision_detector():
+    """YOLO 모델 로더 (ultralytics import 는 팩토리 안에서만)"""
+    return resolve_factory(settings.vision_detector_factory)()
+
+def _load_ocr_recognizer():
+    """OCR 인식기 로더 (easyocr import 는 팩토리 안에서만)"""
+    return resolve_factory(settings.vision_ocr_recognizer_factory)()
+
+def _load_cascade_detector():
+    """cascade 큰 모델 로더"""
+    return resolve_factory(settings.vision_cascade_detector_factory)()
+
+if settings.vision_execution_mode == "pool":
+    # 모델 복제본을 가진 워커 프로세스 N 개에 공유 메모리로 프레임 전달
+    inference_scheduler = VisionWorkerPool(
+        settings.vision_detector_factory,
+        workers=settings.vision_pool_workers,
+        slots_per_worker=settings.vision_pool_slots,
+        slot_bytes=int(settings.vision_pool_slot_mb * (1 << 20)),
+        max_batch_size=settings.vision_max_batch_size,
+        pin_cores=settings.vision_pool_pin_cores,
+        threads_per_worker=settings.vision_pool_threads_per_worker,
+        max_restarts=settings.vision_pool_max_restarts,
+        restart_backoff=settings.vision_pool_restart_backoff_sec,
+        dispatch_timeout=settings.vision_pool_dispatch_timeout_sec
+    )
+    model_registry.register("vision_workers", inference_scheduler.start)
+else:
+    # Vision Detector 는 모델 레지스트리가 시작 시 백그라운드로 로드
+    model_registry.register("vision_detector", _load_vision_detector)
+    
+    # 동시 요청을 배치로 묶어 워커 스레드에서 추론하는 스케줄러
+    inference_scheduler = create_detection_scheduler(
+        lambda: model_registry.get("vision_detector"),
+        max_batch_size=settings.vision_max_batch_size,
+        max_wait_ms=settings.vision_max_batch_wait_ms
+    )
+
+# 활성 스트림 세션 레지스트리
+stream_manager = StreamManager(connect_timeout_sec=settings.vision_stream_connect_timeout_sec)
+
+# 스트림별 입력 크기 / 프레임 스킵을 지연 SLO 에 맞춰 조절 (StreamConfig.adaptive 인 스트림만)
+latency_governor = LatencyGovernor(
+    slo_ms=settings.vision_latency_slo_ms,
+    input_sizes=[int(size) for size in settings.vision_governor_input_sizes.split(",") if size.strip()],
+    max_frame_skip=settings.vision_governor_max_frame_skip,
+    low_watermark=settings.vision_governor_low_watermark,
+    up_hold_sec=settings.vision_governor_up_hold_sec
+)
+
+# 업로드 바이트를 읽어 들이는 재사용 버퍼
+upload_buffers = BufferPool(max_buffers=settings.vision_upload_buffers,
+                            max_pooled_size=int(settings.vision_upload_buffer_max_mb * (1 << 20)))
+
+# 스트림별 탐지 이력 (업로드 / 단일 이미지 탐지는 "uploads" 로 기록)
+history_manager = HistoryManager(
+    capacity=settings.vision_history_capacity,
+    max_streams=settings.vision_history_max_streams,
+    spill_dir=settings.vision_history_spill_dir or None,
+    segment_size=settings.vision_history_segment_size
+)
+UPLOAD_HISTORY_ID = "uploads"
+
+# 거의 같은 프레임의 탐지 결과 재사용 (scope = 스트림 / 업로드 + 탐지 설정)
+frame_cache = FrameResultCache(
+    hash_size=settings.vision_frame_cache_hash_size,
+    max_distance=settings.vision_frame_cache_max_distance,
+    max_age_sec=settings.vision_frame_cache_max_age_sec,
+    entries_per_scope=settings.vision_frame_cache_entries,
+    max_scopes=settings.vision_frame_cache_max_scopes
+) if settings.vision_frame_cache_enabled else None
+
+# 탐지 영역 OCR (응답 이후 비동기로 실행, 업로드는 /ocr/{ocr_id} 로 조회)
+ocr_stage = None
+if settings.vision_ocr_enabled:
+    model_registry.register("vision_ocr", _load_ocr_recognizer, optional=True)
+    ocr_stage = OCRStage(
+        lambda: model_registry.get("vision_ocr"),
+        labels=[label.strip() for label in settings.vision_ocr_labels.split(",") if label.strip()],
+        max_crops=settings.vision_ocr_max_crops,
+        pixel_budget=settings.vision_ocr_pixel_budget,
+        crop_height=settings.vision_ocr_crop_height,
+        cache_size=settings.vision_ocr_cache_size,
+        max_pending=settings.vision_ocr_max_pending
+    )
+ocr_jobs: "OrderedDict[str, asyncio.Future]" = OrderedDict()
+JOBS_MAX = 256
+
+# 신뢰도가 애매한 객체만 큰 모델로 재확인 (응답 이후 비동기, 업로드는 /cascade/{cascade_id} 로 조회)
+cascade_stage = None
+if settings.vision_cascade_enabled:
+    model_registry.register("vision_detector_large", _load_cascade_detector, optional=True)
+    cascade_stage = CascadeStage(
+        lambda: model_registry.get("vision_detector_large"),
+        low=settings.vision_cascade_low,
+        high=settings.vision_cascade_high,
+        mode=settings.vision_cascade_mode,
+        budget=settings.vision_cascade_budget,
+        burst=settings.vision_cascade_burst,
+        max_regions=settings.vision_cascade_max_regions,
+        context=settings.vision_cascade_context,
+        crop_size=settings.vision_cascade_crop_size,
+        match_iou=settings.vision_cascade_match_iou,
+        max_pending=settings.vision_cascade_max_pending
+    )
+cascade_jobs: "OrderedDict[str, asyncio.Future]" = OrderedDict()
+_background_tasks = set()
+
+# 스트림별 오버레이 MJPEG (프레임당 한 번 인코딩해 모든 시청자에게 같은 bytes 전송)
+mjpeg_hub = MjpegHub(
+    quality=settings.vision_mjpeg_quality,
+    max_fps=settings.vision_mjpeg_max_fps,
+    max_viewers=settings.vision_mjpeg_max_viewers,
+    workers=settings.vision_mjpeg_workers
+) if settings.vision_mjpeg_enabled else None
+
+def _model_labels() -> List[str]:
+    """로드된 탐지 모델의 클래스 이름 (pool 모드 / 로드 전이면 빈 목록 → 처음 볼 때 검색)"""
+    if isinstance(inference_scheduler, VisionWorkerPool):
+        return []
+    detector = model_registry.peek("vision_detector")
+    if detector is None or detector.backend is None:
+        return []
+    return list(detector.backend.names.values())
+
+# 탐지 라벨 / OCR 부품 코드 → RAG 청크 참조 (미리 검색해 둔 것을 결과 객체에 inline 으로 붙임)
+knowledge_links = KnowledgeLinkIndex(
+    lambda: model_registry.peek("rag_retrieval"),
+    label_source=_model_labels,
+    labels=[label.strip() for label in settings.vision_knowledge_labels.split(",") if label.strip()],
+    top_k=settings.vision_knowledge_top_k,
+    threshold=settings.vision_knowledge_threshold,
+    domain=settings.vision_knowledge_domain or None,
+    snippet_chars=settings.vision_knowledge_snippet_chars,
+    max_dynamic=settings.vision_knowledge_max_dynamic,
+    code_pattern=settings.vision_knowledge_code_pattern
+) if settings.vision_knowledge_enabled else None
+
+# 녹화 영상 일괄 분석 작업 (같은 추론 스케줄러 / 워커 풀을 실시간 스트림과 나눠 씀)
+video_jobs = VideoJobManager(
+    settings.vision_video_job_dir,
+    inference_scheduler.submit,
+    max_concurrent=settings.vision_video_max_concurrent_jobs,
+    batch_size=settings.vision_video_batch_size,
+    checkpoint_every=settings.vision_video_checkpoint_every,
+    max_upload_bytes=int(settings.vision_video_max_upload_mb * (1 << 20))
+)
 
 # ===========================================
 # Pydantic 모델 정의
@@ -37,6 +200,7 @@ class DetectionResponse(BaseModel):
     scene_context: str
     objects: List[Dict[str, Any]]
     processing_time_ms: float
+    timings_ms: Dict[str, float] = {}
     model_version: str
     status: str
 
@@ -47,6 +211,11 @@ class StreamConfig(BaseModel):
     confidence_threshold: float = 0.5
     show_bbox: bool = True
     show_labels: bool = True
+    tracking: bool = settings.vision_tracking_enabled  # 객체 ID 유지 + keyframe 사이 프레임은 추적으로 대체
+    keyframe_interval: int = settings.vision_keyframe_interval
+    adaptive: bool = settings.vision_governor_enabled  # 지연 SLO 에 맞춰 입력 크기 / 프레임 스킵 자동 조절
+    encoding: str = JSON  # 결과 메시지 형식: json (텍스트) / msgpack / packed (바이너리)
+    cascade_budget: Optional[float] = None  # 큰 모델 escalation 프레임 비율 상한 (None 이면 설정값)
 
 # ===========================================
 # API 엔드포인트
@@ -55,98 +224,478 @@ class StreamConfig(BaseModel):
 @router.get("/status")
 async def get_vision_status():
     """Vision AI 서비스 상태 확인"""
+    if isinstance(inference_scheduler, VisionWorkerPool):
+        model_loaded = inference_scheduler.started
+    else:
+        vision_detector = model_registry.peek("vision_detector")
+        model_loaded = vision_detector is not None and vision_detector.model_loaded
     return {
         "status": "active",
         "service": "Vision AI Service",
         "version": "1.0.0",
-        "model_loaded": vision_detector.model_loaded,
-        "model_version": "yolov8n"
+        "model_loaded": model_loaded,
+        "execution_mode": settings.vision_execution_mode,
+        "model_version": os.path.splitext(os.path.basename(settings.vision_model_path))[0],
+        "backend": settings.vision_backend,
+        "scheduler": inference_scheduler.stats(),
+        "active_streams": len(stream_manager.list()),
+        "governor": latency_governor.stats(),
+        "history": history_manager.stats(),
+        "frame_cache": frame_cache.stats() if frame_cache is not None else None,
+        "ocr": ocr_stage.stats() if ocr_stage is not None else None,
+        "cascade": cascade_stage.stats() if cascade_stage is not None else None,
+        "video_jobs": video_jobs.stats(),
+        "mjpeg": mjpeg_hub.stats() if mjpeg_hub is not None else None,
+        "knowledge": knowledge_links.stats() if knowledge_links is not None else None
     }
 
 @router.post("/detect/image", response_model=DetectionResponse)
-async def detect_image(request: DetectionRequest):
+async def detect_image(request: DetectionRequest,
+                       accept: Optional[str] = Header(None),
+                       response_format: Optional[str] = Query(None, alias="format")):
     """단일 이미지 객체 탐지 (목업)"""
     try:
         logger.info("이미지 탐지 요청 받음")
+        fmt = _negotiate(accept, response_format)
         
         # 목업용 더미 이미지 생성
-        dummy_frame = np.zeros((480, 640, 3), dtype=np.uint8)
-        cv2.putText(dummy_frame, "Mock Image", (200, 240), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+        dummy_frame = mock_frame("Mock Image", scale=2, thickness=3, origin=(200, 240))
         
         # 객체 탐지 실행
-        result = vision_detector.detect_objects(dummy_frame)
+        timings = StageTimings("vision")
+        result = await inference_scheduler.submit(DetectionTask(
+            dummy_frame,
+            confidence_threshold=request.confidence_threshold,
+            max_objects=request.max_objects,
+            timings=timings
+        ))
+        history_manager.record(UPLOAD_HISTORY_ID, result)
         
-        return DetectionResponse(**result)
+        # 결과는 탐지기가 만든 dict 그대로 직렬화 (DetectionResponse 는 문서용, 재검증하지 않음)
+        return _encoded_response(result, timings, fmt)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"이미지 탐지 오류: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/detect/upload")
-async def detect_uploaded_image(file: UploadFile = File(...)):
+async def detect_uploaded_image(file: UploadFile = File(...),
+                                confidence_threshold: Optional[float] = None,
+                                max_objects: Optional[int] = None,
+                                accept: Optional[str] = Header(None),
+                                response_format: Optional[str] = Query(None, alias="format")):
     """업로드된 이미지 파일 탐지"""
     try:
-        # 업로드된 파일 읽기
-        contents = await file.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        fmt = _negotiate(accept, response_format)
+        timings = StageTimings("vision")
+        
+        # 업로드된 파일을 풀 버퍼로 바로 읽고, 디코딩과 동시에 모델 입력 텐서로 변환
+        buffer = upload_buffers.acquire()
+        try:
+            try:
+                size = await run_in_threadpool(read_into, file.file, buffer,
+                                               int(settings.vision_upload_max_mb * (1 << 20)))
+            except ValueError as e:
+                raise HTTPException(status_code=413, detail=str(e))
+            with memoryview(buffer) as view:
+                frame = await run_in_threadpool(
+                    prepare_upload, view[:size], settings.vision_input_size,
+                    timings, settings.vision_reduced_decode
+                )
+        finally:
+            upload_buffers.release(buffer)
         
         if frame is None:
             raise HTTPException(status_code=400, detail="유효하지 않은 이미지 파일")
         
-        # 객체 탐지 실행
-        result = vision_detector.detect_objects(frame)
+        # 객체 탐지 실행 (업로드는 서로 무관한 요청이므로 프레임 캐시를 공유하지 않음)
+        result = await inference_scheduler.submit(
+            DetectionTask(frame, confidence_threshold=confidence_threshold,
+                          max_objects=max_objects, timings=timings)
+        )
+        history_manager.record(UPLOAD_HISTORY_ID, result)
+        if knowledge_links is not None:
+            knowledge_links.enrich(result.get("objects", []))
+        
+        # OCR 은 응답을 기다리게 하지 않음 (결과는 /ocr/{ocr_id} 로 조회)
+        ocr = ocr_stage.submit(frame, result, UPLOAD_HISTORY_ID) if ocr_stage is not None else None
+        if ocr is not None:
+            ocr_id = _keep_job(ocr_jobs, ocr)
+            result["ocr"] = {"status": "pending", "ocr_id": ocr_id, "url": f"/vision/ocr/{ocr_id}"}
+        
+        # 애매한 객체의 큰 모델 재확인도 응답 이후 (보정 결과는 /cascade/{cascade_id} 로 조회)
+        refinement = (cascade_stage.submit(frame, result, UPLOAD_HISTORY_ID, confidence_threshold)
+                      if cascade_stage is not None else None)
+        if refinement is not None:
+            cascade_id = _keep_job(cascade_jobs, refinement)
+            result["cascade"] = {"status": "pending", "cascade_id": cascade_id,
+                                 "url": f"/vision/cascade/{cascade_id}"}
         
-        return result
+        return _encoded_response(result, timings, fmt)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"업로드 이미지 탐지 오류: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/stream/start")
 async def start_stream(config: StreamConfig = StreamConfig()):
-    """실시간 스트림 시작 (목업)"""
+    """실시간 스트림 시작 - WebSocket 연결용 stream_id 발급"""
     try:
         logger.info(f"스트림 시작: {config.resolution} @ {config.fps}fps")
+        if config.encoding not in available_formats():
+            raise HTTPException(status_code=400,
+                                detail=f"지원하지 않는 encoding: {config.encoding} (가능: {available_formats()})")
+        
+        tracker = None
+        if config.tracking:
+            tracker = StreamTracker(
+                keyframe_interval=config.keyframe_interval,
+                motion_threshold=settings.vision_keyframe_motion_threshold,
+                min_confidence=settings.vision_keyframe_min_confidence,
+                iou_threshold=settings.vision_tracker_iou_threshold,
+                max_misses=settings.vision_tracker_max_misses
+            )
+        # 발급만 받고 연결하지 않은 세션 정리 (세션마다 governor 등 상태가 쌓이지 않도록)
+        for expired in stream_manager.expire():
+            _discard_stream_state(expired.stream_id)
+        
+        session = stream_manager.create(config.dict(), tracker,
+                                        latency_governor.register if config.adaptive else None)
         
         return {
             "status": "started",
-            "stream_id": f"stream_{int(datetime.now().timestamp())}",
-            "config": config.dict(),
-            "message": "실시간 스트림이 시작되었습니다 (목업 모드)"
+            "stream_id": session.stream_id,
+            "config": session.config,
+            "websocket_url": f"/vision/stream/ws/{session.stream_id}",
+            "message": "실시간 스트림이 시작되었습니다. JPEG 프레임을 WebSocket 바이너리 메시지로 전송하세요"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"스트림 시작 오류: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.websocket("/stream/ws/{stream_id}")
+async def stream_websocket(websocket: WebSocket, stream_id: str):
+    """
+    실시간 프레임 스트림 WebSocket
+    
+    디바이스는 JPEG 프레임을 바이너리 메시지로 보내고, 서버는 같은 소켓으로
+    탐지 결과(JSON)를 돌려준다. 추론이 밀리면 오래된 프레임은 버린다.
+    """
+    session = stream_manager.get(stream_id)
+    if session is None:
+        await websocket.close(code=1008)
+        return
+    
+    session.connected = True
+    await websocket.accept()
+    logger.info(f"스트림 연결: {stream_id}")
+    processor = asyncio.create_task(_process_stream(websocket, session))
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes") is not None:
+                session.put_frame(message["bytes"])
+    except WebSocketDisconnect:
+        pass
+    finally:
+        stream_manager.close(stream_id)
+        _discard_stream_state(stream_id)
+        processor.cancel()
+        logger.info(f"스트림 연결 종료: {stream_id} ({session.stats()})")
+
+def _discard_stream_state(stream_id: str):
+    """끝난 스트림의 프레임 캐시 / governor / cascade 예산 / MJPEG 상태 삭제"""
+    if frame_cache is not None:
+        frame_cache.discard(stream_id)
+    latency_governor.discard(stream_id)
+    if cascade_stage is not None:
+        cascade_stage.discard(stream_id)
+    if mjpeg_hub is not None:
+        mjpeg_hub.discard(stream_id)
+
+async def _process_stream(websocket: WebSocket, session: StreamSession):
+    """
+    최신 프레임만 골라 디코딩 → 탐지 → 결과 전송
+
+    프레임 하나의 처리 오류는 error 메시지로 알리고 다음 프레임을 계속 처리한다.
+    결과를 보낼 수도 없는 오류면 연결을 1011 로 닫아 디바이스가 다시 연결하게 한다
+    (처리 태스크만 끝나고 소켓이 열려 있으면 디바이스는 응답 없이 프레임만 계속 보냄).
+    """
+    try:
+        while True:
+            item = await session.next_frame()
+            if item is None:
+                break
+            seq, data = item
+            try:
+                await _process_frame(websocket, session, seq, data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"스트림 프레임 처리 오류 ({session.stream_id}, seq={seq}): {str(e)}")
+                metrics.inc("vision", "stream_frame_errors")
+                await websocket.send_json({
+                    "status": "error",
+                    "stream_id": session.stream_id,
+                    "seq": seq,
+                    "detail": str(e)
+                })
+                
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        logger.error(f"스트림 처리 오류 ({session.stream_id}): {str(e)}")
+        try:
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+
+async def _process_frame(websocket: WebSocket, session: StreamSession, seq: int, data: bytes):
+    """프레임 하나 처리 후 결과 전송 (설정 fps 보다 빠르면 남은 시간만큼 대기)"""
+    config = session.config
+    min_interval = 1.0 / config["fps"] if config.get("fps") else 0.0
+    fmt = config.get("encoding", JSON)
+    
+    # 과부하로 프레임 스킵 단계면 디코딩 전에 건너뜀
+    governor = session.governor
+    if governor is not None and not governor.admit():
+        return
+    started = time.monotonic()
+    operating_point = governor.describe() if governor is not None else None
+    
+    timings = StageTimings("vision")
+    frame = await run_in_threadpool(decode_frame, data, config.get("resolution"), timings,
+                                    settings.vision_reduced_decode)
+    if frame is None:
+        await websocket.send_json({
+            "status": "error",
+            "stream_id": session.stream_id,
+            "seq": seq,
+            "detail": "유효하지 않은 이미지 프레임"
+        })
+        return
+    
+    # keyframe 에서만 전체 탐지, 그 사이는 트랙 예측으로 결과 생성
+    tracker = session.tracker
+    if tracker is None or tracker.needs_detection(frame):
+        input_size = governor.point.input_size if governor is not None else None
+        result = await _detect(
+            DetectionTask(frame, confidence_threshold=config.get("confidence_threshold"),
+                          timings=timings, input_size=input_size),
+            scope=(session.stream_id, config.get("confidence_threshold"), input_size)
+        )
+        # 실제로 추론한 프레임의 지연만 조절 근거로 사용 (캐시 hit 은 제외)
+        if governor is not None and "frame_cache" not in result:
+            governor.observe((time.monotonic() - started) * 1000.0)
+        if tracker is not None:
+            result = tracker.update(result, frame)
+        # 이력에는 실제 탐지 결과만 기록 (추적 예측 프레임은 제외)
+        history_manager.record(session.stream_id, result)
+        ocr = ocr_stage.submit(frame, result, session.stream_id) if ocr_stage is not None else None
+        refinement = (cascade_stage.submit(frame, result, session.stream_id,
+                                           config.get("confidence_threshold"), config.get("cascade_budget"))
+                      if cascade_stage is not None else None)
+    else:
+        ocr = refinement = None
+        result = tracker.propagate(frame.shape, timings)
+    if knowledge_links is not None:
+        knowledge_links.enrich(result.get("objects", []))
+    session.record_result(result)
+    if mjpeg_hub is not None:
+        mjpeg_hub.publish(session.stream_id, frame, result.get("objects", []))
+    result["stream_id"] = session.stream_id
+    result["seq"] = seq
+    result["fps"] = round(session.fps_meter.fps, 2)
+    result["frames_dropped"] = session.frames_dropped
+    if operating_point is not None:
+        result["operating_point"] = operating_point
+    with timings.stage("serialize"):
+        body = encode_result(result, fmt)
+    if fmt == JSON:
+        await websocket.send_text(body.decode("utf-8"))
+    else:
+        await websocket.send_bytes(body)
+    if ocr is not None:
+        _spawn(_send_ocr(websocket, session, seq, result, ocr))
+    if refinement is not None:
+        _spawn(_send_refinement(websocket, session, seq, result, refinement))
+    
+    # 설정된 fps 보다 빠르게 처리하지 않음 (그 사이 도착한 프레임은 최신 것만 남음)
+    remaining = min_interval - (time.monotonic() - started)
+    if remaining > 0:
+        await asyncio.sleep(remaining)
+
+def _spawn(coro):
+    """참조를 유지하는 백그라운드 태스크"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+async def _send_ocr(websocket: WebSocket, session: StreamSession, seq: int,
+                    result: Dict[str, Any], ocr: asyncio.Future):
+    """OCR 이 끝나면 후속 메시지 전송 (결과는 마지막 탐지 결과에도 붙임)"""
+    try:
+        texts = await ocr
+        _link_texts(texts)
+        attach_texts(result, texts)
+        message = {"type": "ocr", "stream_id": session.stream_id, "seq": seq,
+                   "frame_id": result.get("frame_id"), "objects": texts}
+        # packed 는 텍스트를 담을 수 없으므로 JSON 텍스트 메시지로 보냄
+        if session.config.get("encoding", JSON) == MSGPACK:
+            await websocket.send_bytes(encode_result(message, MSGPACK))
+        else:
+            await websocket.send_text(encode_result(message, JSON).decode("utf-8"))
+    except Exception as e:
+        logger.debug(f"OCR 후속 메시지 전송 생략 ({session.stream_id}): {str(e)}")
+
+async def _send_refinement(websocket: WebSocket, session: StreamSession, seq: int,
+                           result: Dict[str, Any], refinement: asyncio.Future):
+    """큰 모델 재확인이 끝나면 보정된 객체 목록을 후속 메시지로 전송 (마지막 탐지 결과에도 반영)"""
+    try:
+        refined = await refinement
+        if refined is None:
+            return
+        attach_refinement(result, refined)
+        message = {"type": "cascade", "stream_id": session.stream_id, "seq": seq,
+                   "frame_id": result.get("frame_id"), "objects": refined["objects"], **result["cascade"]}
+        # packed 는 추가 필드를 담을 수 없으므로 JSON 텍스트 메시지로 보냄
+        if session.config.get("encoding", JSON) == MSGPACK:
+            await websocket.send_bytes(encode_result(message, MSGPACK))
+        else:
+            await websocket.send_text(encode_result(message, JSON).decode("utf-8"))
+    except Exception as e:
+        logger.debug(f"cascade 후속 메시지 전송 생략 ({session.stream_id}): {str(e)}")
+
+def _link_texts(texts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """OCR 텍스트에 부품 코드가 있으면 연결된 RAG 청크 참조를 knowledge 로 붙임"""
+    if knowledge_links is not None:
+        for item in texts:
+            refs = knowledge_links.lookup_text(item["text"]) if item.get("text") else None
+            if refs:
+                item["knowledge"] = refs
+    return texts
+
+def _keep_job(jobs: "OrderedDict[str, asyncio.Future]", future: asyncio.Future) -> str:
+    """조회용으로 future 보관 (최근 JOBS_MAX 개까지)"""
+    job_id = uuid.uuid4().hex[:12]
+    jobs[job_id] = future
+    while len(jobs) > JOBS_MAX:
+        jobs.popitem(last=False)
+    return job_id
+
+async def _detect(task: DetectionTask, scope: Optional[tuple] = None) -> Dict[str, Any]:
+    """
+    프레임 캐시를 먼저 확인하고, 없으면 추론 후 결과 저장
+
+    dHash 는 해상도와 무관하므로 원본 프레임 크기를 scope 에 넣어,
+    크기가 다른 프레임이 다른 좌표계의 박스를 받지 않게 한다.
+    """
+    if frame_cache is None or scope is None:
+        return await inference_scheduler.submit(task)
+    scope = scope + (tuple(task.frame.shape[:2]),)
+    if task.timings is None:
+        task = task._replace(timings=StageTimings("vision"))
+    timings = task.timings
+    frame_hash = await run_in_threadpool(_frame_hash, task.frame, timings)
+    cached = frame_cache.lookup(scope, frame_hash, timings)
+    if cached is not None:
+        return cached
+    before_ms = timings.total_ms
+    result = await inference_scheduler.submit(task)
+    frame_cache.store(scope, frame_hash, result, timings.total_ms - before_ms)
+    return result
+
+def _frame_hash(frame: Any, timings: StageTimings) -> int:
+    with timings.stage("hash"):
+        return frame_cache.hash(frame)
+
+def _negotiate(accept: Optional[str], response_format: Optional[str]) -> str:
+    """?format= 또는 Accept 헤더로 응답 형식 결정 (제공할 수 없으면 406)"""
+    fmt = negotiate_format(accept, response_format)
+    if fmt is None:
+        raise HTTPException(status_code=406, detail=f"지원하는 응답 형식: {available_formats()}")
+    return fmt
+
+def _encoded_response(result: Dict[str, Any], timings: StageTimings, fmt: str = JSON) -> Response:
+    """직렬화 시간을 기록하며 협상된 형식으로 응답 생성"""
+    with timings.stage("serialize"):
+        body = encode_result(result, fmt)
+    return Response(content=body, media_type=MEDIA_TYPES[fmt], headers={"Vary": "Accept"})
+
 @router.get("/stream/frame")
-async def get_current_frame():
-    """현재 프레임 정보 조회 (목업)"""
+async def get_current_frame(stream_id: Optional[str] = None,
+                            accept: Optional[str] = Header(None),
+                            response_format: Optional[str] = Query(None, alias="format")):
+    """현재 프레임 정보 조회 (stream_id 가 없으면 목업 프레임 탐지)"""
     try:
+        fmt = _negotiate(accept, response_format)
+        if stream_id is not None:
+            session = stream_manager.get(stream_id)
+            if session is None:
+                raise HTTPException(status_code=404, detail="존재하지 않는 스트림")
+            if session.last_result is None:
+                return {"status": "waiting", **session.stats()}
+            return _encoded_response({**session.last_result, "fps": round(session.fps_meter.fps, 2)},
+                                     StageTimings("vision"), fmt)
+        
         # 목업용 더미 프레임 생성
-        dummy_frame = np.zeros((480, 640, 3), dtype=np.uint8)
-        cv2.putText(dummy_frame, f"Mock Frame {int(datetime.now().timestamp())}", 
-                   (150, 240), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        dummy_frame = mock_frame(f"Mock Frame {int(datetime.now().timestamp())}")
         
         # 객체 탐지 실행
-        result = vision_detector.detect_objects(dummy_frame)
+        timings = StageTimings("vision")
+        result = await inference_scheduler.submit(DetectionTask(dummy_frame, timings=timings))
         
-        return result
+        return _encoded_response(result, timings, fmt)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"프레임 조회 오류: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/stream/mjpeg/{stream_id}")
+async def stream_mjpeg(stream_id: str):
+    """
+    탐지 박스 / 라벨을 그린 스트림 프레임 MJPEG (multipart/x-mixed-replace, 대시보드 <img> 로 표시)
+
+    인코딩은 스트림당 프레임마다 한 번이며 (VISION_MJPEG_MAX_FPS 이내), 느린 시청자는 최신 프레임으로 건너뛴다.
+    """
+    if mjpeg_hub is None:
+        raise HTTPException(status_code=404, detail="MJPEG 출력이 비활성화되어 있습니다 (VISION_MJPEG_ENABLED)")
+    session = stream_manager.get(stream_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="존재하지 않는 스트림")
+    try:
+        broadcaster = mjpeg_hub.open(stream_id, show_bbox=session.config.get("show_bbox", True),
+                                     show_labels=session.config.get("show_labels", True))
+    except OverflowError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return StreamingResponse(broadcaster.frames(), media_type=MJPEG_MEDIA_TYPE,
+                             headers={"Cache-Control": "no-cache, no-store"})
+
 @router.get("/stream/stop")
-async def stop_stream():
+async def stop_stream(stream_id: Optional[str] = None):
     """실시간 스트림 종료"""
     try:
-        logger.info("스트림 종료 요청")
+        logger.info(f"스트림 종료 요청: {stream_id}")
+        
+        session = stream_manager.close(stream_id) if stream_id is not None else None
+        if session is not None:
+            _discard_stream_state(stream_id)
         
         return {
             "status": "stopped",
+            "stream": session.stats() if session is not None else None,
             "message": "실시간 스트림이 종료되었습니다"
         }
         
@@ -154,26 +703,169 @@ async def stop_stream():
         logger.error(f"스트림 종료 오류: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/ocr/{ocr_id}")
+async def get_ocr_result(ocr_id: str, wait_ms: int = 0):
+    """업로드 탐지의 OCR 결과 조회 (wait_ms 동안 완료를 기다림)"""
+    try:
+        job = ocr_jobs.get(ocr_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="존재하지 않거나 만료된 OCR 작업")
+        if not job.done() and wait_ms > 0:
+            await asyncio.wait({job}, timeout=wait_ms / 1000.0)
+        if not job.done():
+            return {"status": "pending", "ocr_id": ocr_id}
+        return {"status": "success", "ocr_id": ocr_id, "objects": _link_texts(job.result())}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"OCR 결과 조회 오류: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cascade/{cascade_id}")
+async def get_cascade_result(cascade_id: str, wait_ms: int = 0):
+    """업로드 탐지의 큰 모델 재확인 결과 조회 (wait_ms 동안 완료를 기다림)"""
+    try:
+        job = cascade_jobs.get(cascade_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="존재하지 않거나 만료된 cascade 작업")
+        if not job.done() and wait_ms > 0:
+            await asyncio.wait({job}, timeout=wait_ms / 1000.0)
+        if not job.done():
+            return {"status": "pending", "cascade_id": cascade_id}
+        refined = job.result()
+        if refined is None:
+            return {"status": "unavailable", "cascade_id": cascade_id, "detail": "큰 모델이 로드되지 않았습니다"}
+        return {"status": "success", "cascade_id": cascade_id, **refined}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"cascade 결과 조회 오류: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/video/jobs")
+async def create_video_job(file: UploadFile = File(...),
+                           stride: int = 1,
+                           confidence_threshold: Optional[float] = None,
+                           max_objects: Optional[int] = None,
+                           max_frames: Optional[int] = None):
+    """녹화 영상 업로드 후 일괄 분석 작업 생성 (stride 프레임마다 1장 분석, 결과는 /video/jobs/{job_id}/results)"""
+    try:
+        if stride < 1 or (max_frames is not None and max_frames < 1):
+            raise HTTPException(status_code=400, detail="stride / max_frames 는 1 이상이어야 합니다")
+        try:
+            job_id, path = await run_in_threadpool(video_jobs.save_upload, file.file, file.filename or "")
+        except ValueError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        try:
+            job = await video_jobs.create(job_id, path, filename=file.filename or "", stride=stride,
+                                          confidence_threshold=confidence_threshold,
+                                          max_objects=max_objects, max_frames=max_frames)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        logger.info(f"영상 분석 작업 생성: {job_id} ({job.frames_total} 프레임, stride {stride})")
+        return {**job.describe(), "url": f"/vision/video/jobs/{job_id}/results"}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"영상 분석 작업 생성 오류: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/video/jobs")
+async def list_video_jobs():
+    """영상 분석 작업 목록 (최신순)"""
+    return {"jobs": video_jobs.list(), **video_jobs.stats()}
+
+@router.get("/video/jobs/{job_id}")
+async def get_video_job(job_id: str):
+    """영상 분석 작업 상태 (진행률 / 처리 속도)"""
+    try:
+        return video_jobs.get(job_id).describe()
+    except KeyError:
+        raise HTTPException(status_code=404, detail="존재하지 않는 영상 분석 작업")
+
+@router.get("/video/jobs/{job_id}/results")
+async def get_video_job_results(job_id: str, offset: int = 0, follow: bool = True):
+    """
+    영상 분석 결과 NDJSON 스트림
+
+    job → frame (offset 번째부터) → progress (follow 중 주기적으로) → end 순서로 한 줄씩 보낸다.
+    follow=false 면 지금까지의 결과만 보내고 끝낸다.
+    """
+    try:
+        video_jobs.get(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="존재하지 않는 영상 분석 작업")
+    return StreamingResponse(video_jobs.stream(job_id, offset=max(0, offset), follow=follow),
+                             media_type="application/x-ndjson")
+
+@router.post("/video/jobs/{job_id}/resume")
+async def resume_video_job(job_id: str):
+    """실패 / 취소 / 중단된 작업을 마지막 체크포인트부터 재개"""
+    try:
+        return video_jobs.resume(job_id).describe()
+    except KeyError:
+        raise HTTPException(status_code=404, detail="존재하지 않는 영상 분석 작업")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/video/jobs/{job_id}/cancel")
+async def cancel_video_job(job_id: str):
+    """실행 / 대기 중인 작업 취소 (resume 으로 이어서 실행 가능)"""
+    try:
+        return (await video_jobs.cancel(job_id)).describe()
+    except KeyError:
+        raise HTTPException(status_code=404, detail="존재하지 않는 영상 분석 작업")
+
+@router.delete("/video/jobs/{job_id}")
+async def delete_video_job(job_id: str):
+    """작업 취소 후 영상 / 결과 삭제"""
+    try:
+        await video_jobs.delete(job_id)
+        return {"status": "deleted", "job_id": job_id}
+    except KeyError:
+        raise HTTPException(status_code=404, detail="존재하지 않는 영상 분석 작업")
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """단계별 지연 시간 히스토그램 (Prometheus text format)"""
+    return PlainTextResponse(metrics.render_prometheus(),
+                             media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @router.get("/objects/history")
-async def get_object_history(limit: int = 10):
-    """객체 탐지 히스토리 조회 (목업)"""
-    try:
-        # 목업용 히스토리 데이터
-        history = []
-        for i in range(min(limit, 5)):
-            history.append({
-                "frame_id": int(datetime.now().timestamp() * 1000) - i * 1000,
-                "timestamp": datetime.now().isoformat(),
-                "objects_count": i + 1,
-                "detected_objects": ["person", "laptop", "cup"][:i+1]
-            })
+async def get_object_history(stream_id: Optional[str] = None,
+                             since: Optional[datetime] = None,
+                             until: Optional[datetime] = None,
+                             label: Optional[str] = None,
+                             limit: int = 10,
+                             offset: int = 0):
+    """객체 탐지 히스토리 조회 (최신순, stream_id 가 없으면 전체 스트림)"""
+    try:
+        if limit < 0 or offset < 0:
+            raise HTTPException(status_code=400, detail="limit / offset 은 0 이상이어야 합니다")
+        
+        history, total_count, class_counts = history_manager.query(
+            stream_id=stream_id,
+            since=since.timestamp() if since is not None else None,
+            until=until.timestamp() if until is not None else None,
+            label=label,
+            offset=offset,
+            limit=limit
+        )
         
         return {
             "status": "success",
             "history": history,
-            "total_count": len(history)
+            "total_count": total_count,
+            "offset": offset,
+            "limit": limit,
+            "class_counts": class_counts
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"히스토리 조회 오류: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
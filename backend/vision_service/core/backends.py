@@ -0,0 +1,215 @@
+# Vision AI Inference Backends
+import ast
+import json
+import os
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+# 가로 / 세로 최대 좌표보다 큰 값 (클래스별 NMS 를 한 번에 하기 위한 박스 오프셋)
+_CLASS_OFFSET = 7680.0
+
+
+class Boxes(NamedTuple):
+    """한 이미지의 NMS 후 탐지 결과 (letterbox 텐서 좌표, parse_boxes 입력 형식)"""
+    xyxy: np.ndarray  # (N, 4) float32
+    conf: np.ndarray  # (N,) float32
+    cls: np.ndarray  # (N,) int64
+
+
+def decode_predictions(pred: np.ndarray, conf_threshold: float = 0.25, iou_threshold: float = 0.7,
+                       max_det: int = 300) -> List[Boxes]:
+    """
+    YOLOv8 head 원시 출력 → 이미지별 Boxes
+
+    모든 백엔드가 같은 (B, 4 + 클래스 수, 앵커 수) 출력을 내고 이 함수로 후처리하므로
+    백엔드가 달라도 임계값 / NMS / 정렬이 완전히 같다.
+
+    Args:
+        pred: (B, 4 + nc, N), 앞 4 채널은 입력 픽셀 단위 cx, cy, w, h
+        conf_threshold: 후보로 남길 최소 클래스 점수
+        iou_threshold: 클래스별 NMS IoU
+        max_det: 이미지당 최대 탐지 수
+    """
+    import cv2
+
+    pred = np.asarray(pred, dtype=np.float32)
+    results = []
+    for image in pred:
+        scores = image[4:]
+        cls = scores.argmax(axis=0)
+        conf = scores[cls, np.arange(scores.shape[1])]
+        keep = conf > conf_threshold
+        if not keep.any():
+            results.append(Boxes(np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int64)))
+            continue
+
+        cx, cy, w, h = image[:4, keep]
+        conf, cls = conf[keep], cls[keep]
+        xyxy = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        # 클래스마다 다른 영역으로 옮겨 한 번의 NMS 로 클래스별 NMS 수행
+        offset = (cls * _CLASS_OFFSET).astype(np.float32)
+        shifted = np.stack([xyxy[:, 0] + offset, xyxy[:, 1] + offset, w, h], axis=1)
+        indices = cv2.dnn.NMSBoxes(shifted.tolist(), conf.tolist(), conf_threshold, iou_threshold, top_k=max_det)
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)[:max_det]
+        results.append(Boxes(xyxy[indices], conf[indices], cls[indices].astype(np.int64)))
+    return results
+
+
+def load_metadata(model_path: str) -> Dict[str, Any]:
+    """model_export 가 모델 옆에 남긴 메타데이터 (<모델 이름>.json, 없으면 빈 dict)"""
+    path = os.path.splitext(model_path)[0] + ".json"
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def _parse_names(value: Any) -> Optional[Dict[int, str]]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = ast.literal_eval(value)  # ultralytics 는 dict 의 repr 로 저장
+    if isinstance(value, (list, tuple)):
+        value = dict(enumerate(value))
+    return {int(k): str(v) for k, v in value.items()}
+
+
+class InferenceBackend:
+    """
+    추론 백엔드 공통 인터페이스
+
+    입력은 letterbox 된 (B, 3, S, S) float32 RGB 0~1 배치, 출력은 YOLOv8 head 원시 출력.
+    후처리 (decode_predictions → parse_boxes) 는 VisionDetector 가 공통으로 한다.
+    """
+    name = "base"
+
+    def __init__(self, model_path: str, threads: int = 0):
+        self.model_path = model_path
+        self.threads = threads
+        self.names: Dict[int, str] = {}
+        self.input_size: Optional[int] = None  # 고정 입력 크기 (None 이면 가변)
+        self.metadata = load_metadata(model_path)
+
+    def load(self) -> "InferenceBackend":
+        raise NotImplementedError
+
+    def infer(self, batch: np.ndarray) -> np.ndarray:
+        """(B, 3, S, S) float32 → (B, 4 + nc, N)"""
+        raise NotImplementedError
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "model_path": self.model_path,
+            "input_size": self.input_size,
+            "precision": self.metadata.get("precision", "fp32"),
+            "classes": len(self.names)
+        }
+
+    def _fill_names(self, names: Any):
+        self.names = (_parse_names(self.metadata.get("names")) or _parse_names(names)
+                      or {i: f"class_{i}" for i in range(80)})
+
+
+class UltralyticsBackend(InferenceBackend):
+    """ultralytics YOLO (PyTorch), NMS 전 head 출력을 직접 사용"""
+    name = "torch"
+
+    def load(self) -> "UltralyticsBackend":
+        import torch
+        from ultralytics import YOLO
+
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        yolo = YOLO(self.model_path)
+        self.module = yolo.model.fuse().eval()
+        self.torch = torch
+        self._fill_names(yolo.names)
+        return self
+
+    def infer(self, batch: np.ndarray) -> np.ndarray:
+        with self.torch.inference_mode():
+            output = self.module(self.torch.from_numpy(batch))
+        if isinstance(output, (list, tuple)):
+            output = output[0]  # eval 모드 Detect head 는 (예측, 특징맵)
+        return output.cpu().numpy()
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """ONNX Runtime CPU (FP32 / FP16 / INT8 QDQ 모델 모두 같은 경로)"""
+    name = "onnxruntime"
+
+    def load(self) -> "OnnxRuntimeBackend":
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.threads:
+            options.intra_op_num_threads = self.threads
+        self.session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_dtype = np.float16 if model_input.type == "tensor(float16)" else np.float32
+        self.fixed_batch = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+        size = model_input.shape[-1]
+        self.input_size = size if isinstance(size, int) else None
+        self._fill_names(self.session.get_modelmeta().custom_metadata_map.get("names"))
+        return self
+
+    def infer(self, batch: np.ndarray) -> np.ndarray:
+        batch = batch.astype(self.input_dtype, copy=False)
+        if self.fixed_batch == 1 and batch.shape[0] > 1:
+            # 배치 축이 고정된 모델은 한 장씩 실행
+            return np.concatenate([self.infer(batch[i:i + 1]) for i in range(batch.shape[0])])
+        return self.session.run(None, {self.input_name: batch})[0].astype(np.float32, copy=False)
+
+
+class OpenVINOBackend(InferenceBackend):
+    """OpenVINO CPU (.xml IR 또는 .onnx 를 바로 컴파일)"""
+    name = "openvino"
+
+    def __init__(self, model_path: str, threads: int = 0, device: str = "CPU"):
+        super().__init__(model_path, threads)
+        self.device = device
+
+    def load(self) -> "OpenVINOBackend":
+        import openvino as ov
+
+        core = ov.Core()
+        model = core.read_model(self.model_path)
+        config = {"PERFORMANCE_HINT": "LATENCY"}
+        if self.threads:
+            config["INFERENCE_NUM_THREADS"] = self.threads
+        self.compiled = core.compile_model(model, self.device, config)
+        self.output = self.compiled.output(0)
+        shape = self.compiled.input(0).get_partial_shape()
+        self.fixed_batch = shape[0].get_length() if shape[0].is_static else None
+        self.input_size = shape[3].get_length() if shape[3].is_static else None
+        names = None
+        if model.has_rt_info(["model_info", "names"]):
+            names = model.get_rt_info(["model_info", "names"]).astype(str)
+        self._fill_names(names)
+        return self
+
+    def infer(self, batch: np.ndarray) -> np.ndarray:
+        if self.fixed_batch == 1 and batch.shape[0] > 1:
+            return np.concatenate([self.infer(batch[i:i + 1]) for i in range(batch.shape[0])])
+        return np.asarray(self.compiled([batch])[self.output], dtype=np.float32)
+
+
+BACKENDS = {
+    UltralyticsBackend.name: UltralyticsBackend,
+    OnnxRuntimeBackend.name: OnnxRuntimeBackend,
+    OpenVINOBackend.name: OpenVINOBackend
+}
+
+
+def create_backend(name: str, model_path: str, **options) -> InferenceBackend:
+    """설정 이름 (torch / onnxruntime / openvino) 으로 백엔드 생성 (로드는 load())"""
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"지원하지 않는 추론 백엔드: {name} (가능: {sorted(BACKENDS)})")
+    if backend_class is not OpenVINOBackend:
+        options.pop("device", None)
+    return backend_class(model_path, **options)
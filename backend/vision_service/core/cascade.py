@@ -0,0 +1,390 @@
+# Vision AI Model Cascade (작은 모델 결과 중 애매한 것만 큰 모델로 재확인)
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from rag_service.core.config import settings
+from rag_service.core.metrics import StageTimings, metrics
+from vision_service.core.detector import VisionDetector
+from vision_service.core.frames import source_image
+from vision_service.core.tracker import greedy_match, iou_matrix
+
+REGION, FRAME = "region", "frame"
+
+# 모델 비용으로 합산하는 탐지 단계 (디코딩 / 직렬화 제외)
+MODEL_STAGES = ("preprocess", "forward", "nms", "parse")
+
+# 매 프레임 큰 모델 비용을 직선으로 추정하기 위한 최소 escalation 호출 수
+MIN_FIT_CALLS = 10
+
+
+def load_large_detector() -> VisionDetector:
+    """기본 큰 모델 팩토리 (settings.vision_cascade_model_path, 백엔드는 작은 모델과 같음)"""
+    return VisionDetector(model_path=settings.vision_cascade_model_path).load()
+
+
+class EscalationBudget:
+    """
+    스트림별 escalation 비율 상한 (토큰 버킷)
+
+    프레임마다 rate 만큼 적립하고 escalation 한 번에 1 을 쓰므로
+    길게 보면 escalation 프레임 비율이 rate 를 넘지 않고, burst 만큼은 몰아서 쓸 수 있다.
+    """
+
+    def __init__(self, rate: float, burst: float = 5.0):
+        self.rate = max(0.0, rate)
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.frames = 0
+        self.escalations = 0
+
+    def tick(self):
+        self.frames += 1
+        self.tokens = min(self.burst, self.tokens + self.rate)
+
+    def try_spend(self) -> bool:
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        self.escalations += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "budget": self.rate,
+            "frames": self.frames,
+            "escalations": self.escalations,
+            "escalation_rate": self.escalations / self.frames if self.frames else 0.0
+        }
+
+
+def crop_region(frame: Any, box: Tuple[int, int, int, int]) -> Tuple[np.ndarray, Tuple[float, float, float]]:
+    """
+    원본 좌표 box (x1, y1, x2, y2) 영역을 BGR uint8 이미지로 잘라냄
+
+    PreparedFrame 은 letterbox 텐서가 아니라 디코딩된 프레임에서 잘라
+    큰 모델이 작은 모델보다 적은 픽셀을 보지 않도록 한다.
+
+    Returns:
+        (crop, (offset_x, offset_y, factor)) — 원본 좌표 = offset + crop 좌표 / factor
+    """
+    x1, y1, x2, y2 = box
+    image, factor = source_image(frame)
+    if factor == 1.0:
+        return np.ascontiguousarray(image[y1:y2, x1:x2]), (float(x1), float(y1), 1.0)
+
+    # 축소 디코딩된 프레임 좌표로 변환
+    ix1, iy1 = max(int(x1 * factor), 0), max(int(y1 * factor), 0)
+    ix2, iy2 = int(math.ceil(x2 * factor)), int(math.ceil(y2 * factor))
+    return np.ascontiguousarray(image[iy1:iy2, ix1:ix2]), (ix1 / factor, iy1 / factor, factor)
+
+
+def _to_source(obj: Dict[str, Any], transform: Tuple[float, float, float]) -> Dict[str, Any]:
+    """crop 좌표 탐지 → 원본 좌표 탐지"""
+    ox, oy, factor = transform
+    box = obj["bbox"]
+    x, y = ox + box["x"] / factor, oy + box["y"] / factor
+    w, h = box["width"] / factor, box["height"] / factor
+    return {**obj, "bbox": {"x": int(x), "y": int(y), "width": int(w), "height": int(h)},
+            "center": [int(x + w / 2), int(y + h / 2)]}
+
+
+def _xyxy(objects: List[Dict[str, Any]]) -> np.ndarray:
+    boxes = np.array([[o["bbox"]["x"], o["bbox"]["y"], o["bbox"]["x"] + o["bbox"]["width"],
+                       o["bbox"]["y"] + o["bbox"]["height"]] for o in objects], dtype=np.float64)
+    return boxes.reshape(-1, 4)
+
+
+class CascadeStage:
+    """
+    confidence 기반 모델 cascade (탐지 이후 비동기 단계)
+
+    작은 모델은 모든 프레임을 처리하고, 결과 중 신뢰도가 [low, high) 인 애매한 객체가 있는
+    프레임만 큰 모델로 다시 본다. region 모드는 애매한 객체 주변만 잘라 한 배치로,
+    frame 모드는 프레임 전체를 재탐지한다. 응답을 막지 않도록 전용 스레드에서 실행하고,
+    호출자는 돌려받은 future 로 보정된 객체 목록을 나중에 붙이거나 후속 메시지로 보낸다.
+
+    스트림(scope)마다 EscalationBudget 으로 escalation 비율을 제한하고,
+    진행 중인 작업이 max_pending 개면 새 프레임은 건너뛴다.
+    """
+
+    def __init__(self, get_detector: Callable[[], Any], low: float = 0.3, high: float = 0.6,
+                 mode: str = REGION, budget: float = 0.2, burst: float = 5.0, max_regions: int = 4,
+                 context: float = 0.25, crop_size: int = 320, match_iou: float = 0.3, max_pending: int = 2,
+                 max_scopes: int = 64):
+        """
+        Args:
+            get_detector: detect_batch 를 가진 큰 모델 detector 를 돌려주는 함수 (cascade 스레드에서 호출)
+            low, high: 애매한 것으로 볼 신뢰도 구간 [low, high)
+            mode: region (애매한 객체 주변 crop) / frame (프레임 전체)
+            budget: scope 별 escalation 프레임 비율 상한 기본값
+            burst: 몰아서 escalation 할 수 있는 최대 프레임 수
+            max_regions: 프레임당 큰 모델로 볼 최대 객체 수 (region 모드)
+            context: crop 을 박스 크기 대비 각 변으로 늘리는 비율
+            crop_size: region crop 의 모델 입력 크기 (고정 입력 모델은 무시)
+            match_iou: 큰 모델 탐지를 원래 객체와 같은 것으로 볼 최소 IoU
+            max_pending: 동시에 대기 / 실행 중인 프레임 수 상한
+            max_scopes: 예산을 유지할 최대 scope 수
+        """
+        if mode not in (REGION, FRAME):
+            raise ValueError(f"지원하지 않는 cascade 모드: {mode} (가능: {REGION}, {FRAME})")
+        self.get_detector = get_detector
+        self.low = low
+        self.high = high
+        self.mode = mode
+        self.budget = budget
+        self.burst = burst
+        self.max_regions = max(1, max_regions)
+        self.context = context
+        self.crop_size = crop_size
+        self.match_iou = match_iou
+        self.max_pending = max_pending
+        self.max_scopes = max(1, max_scopes)
+        # 큰 모델도 스레드 안전하지 않으므로 워커 스레드는 하나만 사용
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vision-cascade")
+        self._budgets: "OrderedDict[Hashable, EscalationBudget]" = OrderedDict()
+        self.pending = 0
+        self.frames = 0
+        self.escalated = 0
+        self.skipped_budget = 0
+        self.skipped_pending = 0
+        self.unavailable = 0
+        self.regions = 0
+        self.refined = 0
+        self.dropped = 0
+        self.added = 0
+        # 비용 (모델 단계 ms 합): 작은 모델은 전체 프레임, 큰 모델은 escalation 만
+        self.small_ms = 0.0
+        self.large_ms = 0.0
+        # 큰 모델 호출 시간 ~ a + b × 입력 면적 (전체 프레임 장 수 단위) 최소제곱 합
+        self._fit = np.zeros(5)  # n, Σx, Σy, Σx², Σxy
+
+    def ambiguous(self, objects: List[Dict[str, Any]]) -> List[int]:
+        """애매한 객체 인덱스 (구간 가운데에 가까운 것부터 max_regions 개)"""
+        middle = (self.low + self.high) / 2
+        indices = [i for i, obj in enumerate(objects) if self.low <= obj["confidence"] < self.high]
+        return sorted(indices, key=lambda i: abs(objects[i]["confidence"] - middle))[:self.max_regions]
+
+    def submit(self, frame: Any, result: Dict[str, Any], scope: Hashable,
+               confidence_threshold: Optional[float] = None,
+               budget: Optional[float] = None) -> Optional["asyncio.Future"]:
+        """
+        escalation 예약 (애매한 객체가 없거나 예산 / 대기 한도를 넘으면 None)
+
+        프레임 캐시 결과는 이미 본 프레임이므로 비용만 세고 escalation 하지 않는다.
+
+        Returns:
+            {objects, refined, dropped, added, model} 로 완료되는 future (큰 모델이 없으면 None 으로 완료)
+        """
+        self.frames += 1
+        metrics.inc("vision", "cascade_frames")
+        if "frame_cache" not in result:
+            timings = result.get("timings_ms", {})
+            self.small_ms += sum(timings.get(stage, 0.0) for stage in MODEL_STAGES)
+        scope_budget = self._budget(scope, budget)
+        scope_budget.tick()
+        objects = list(result.get("objects", []))
+        if "frame_cache" in result or not self.ambiguous(objects):
+            return None
+        if self.pending >= self.max_pending:
+            self.skipped_pending += 1
+            metrics.inc("vision", "cascade_skipped_pending")
+            return None
+        if not scope_budget.try_spend():
+            self.skipped_budget += 1
+            metrics.inc("vision", "cascade_skipped_budget")
+            return None
+        self.pending += 1
+        self.escalated += 1
+        metrics.inc("vision", "cascade_escalations")
+        threshold = self.low if confidence_threshold is None else confidence_threshold
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, self.run, frame, objects, tuple(result.get("resolution", ())), threshold)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, _):
+        self.pending -= 1
+
+    def _budget(self, scope: Hashable, rate: Optional[float]) -> EscalationBudget:
+        scope_budget = self._budgets.get(scope)
+        rate = self.budget if rate is None else rate
+        if scope_budget is None:
+            scope_budget = self._budgets[scope] = EscalationBudget(rate, self.burst)
+            while len(self._budgets) > self.max_scopes:
+                self._budgets.popitem(last=False)
+        scope_budget.rate = max(0.0, rate)
+        self._budgets.move_to_end(scope)
+        return scope_budget
+
+    def discard(self, scope: Hashable):
+        """스트림이 끝나면 예산 삭제"""
+        self._budgets.pop(scope, None)
+
+    def run(self, frame: Any, objects: List[Dict[str, Any]], resolution: Tuple[int, ...],
+            confidence_threshold: float, timings: Optional[StageTimings] = None) -> Optional[Dict[str, Any]]:
+        """큰 모델로 재탐지 → 작은 모델 결과와 병합 (동기, 큰 모델을 쓸 수 없으면 None)"""
+        try:
+            detector = self.get_detector()
+        except RuntimeError:
+            # 레지스트리는 로드 실패를 RuntimeError 로 알림 → 500 대신 "unavailable" 로 처리
+            detector = None
+        if detector is None or not getattr(detector, "model_loaded", False):
+            self.unavailable += 1
+            metrics.inc("vision", "cascade_unavailable")
+            return None
+        timings = timings or StageTimings("vision")
+        width, height = resolution if len(resolution) == 2 else frame.shape[1::-1]
+        ambiguous = self.ambiguous(objects)
+
+        if self.mode == FRAME:
+            boxes = [(0, 0, width, height)]
+        else:
+            boxes = [self._context_box(objects[i]["bbox"], width, height) for i in ambiguous]
+        crops = [crop_region(frame, box) for box in boxes]
+
+        # crop 은 전체 프레임보다 작은 입력으로
+        full_size = size = detector.input_size or self.crop_size
+        if self.mode == REGION and getattr(detector.backend, "input_size", None) is None:
+            size = self.crop_size
+        start = time.perf_counter()
+        with timings.stage("cascade"):
+            detected = detector.detect_batch([crop for crop, _ in crops],
+                                             confidence_thresholds=[confidence_threshold] * len(crops),
+                                             input_sizes=[size] * len(crops))
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        self.large_ms += elapsed_ms
+        area = len(crops) * (size / full_size) ** 2
+        self._fit += (1.0, area, elapsed_ms, area * area, area * elapsed_ms)
+        self.regions += len(crops) if self.mode == REGION else 0
+        candidates = [[_to_source(obj, transform) for obj in result.get("objects", [])]
+                      for (_, transform), result in zip(crops, detected)]
+
+        merged = list(objects)
+        matched: Dict[int, Dict[str, Any]] = {}
+        added: List[Dict[str, Any]] = []
+        if self.mode == FRAME:
+            found = candidates[0]
+            pairs = greedy_match(iou_matrix(_xyxy([objects[i] for i in ambiguous]), _xyxy(found)), self.match_iou)
+            matched = {ambiguous[row]: found[col] for row, col in pairs}
+            # 작은 모델이 놓친 확실한 객체는 추가
+            overlap = iou_matrix(_xyxy(found), _xyxy(objects))
+            added = [obj for k, obj in enumerate(found)
+                     if obj["confidence"] >= self.high and not (overlap[k] >= self.match_iou).any()]
+        else:
+            for i, found in zip(ambiguous, candidates):
+                if found:
+                    iou = iou_matrix(_xyxy([objects[i]]), _xyxy(found))[0]
+                    best = int(iou.argmax())
+                    if iou[best] >= self.match_iou:
+                        matched[i] = found[best]
+
+        model = getattr(detector, "model_version", "large")
+        for i in ambiguous:
+            if i in matched:
+                merged[i] = _refine(objects[i], matched[i], model)
+            else:
+                # 큰 모델이 확인하지 못한 애매한 객체는 오탐으로 보고 제거
+                merged[i] = None
+        next_id = max([obj.get("id", 0) for obj in objects] + [0]) + 1
+        for k, obj in enumerate(added):
+            metadata = {**obj.get("metadata", {}), "improved_by": ["cascade"], "cascade": {"model": model}}
+            merged.append({**obj, "id": next_id + k, "metadata": metadata})
+
+        self.refined += len(matched)
+        self.dropped += len(ambiguous) - len(matched)
+        self.added += len(added)
+        return {
+            "objects": [obj for obj in merged if obj is not None],
+            "refined": len(matched),
+            "dropped": len(ambiguous) - len(matched),
+            "added": len(added),
+            "model": model
+        }
+
+    def _context_box(self, bbox: Dict[str, int], width: int, height: int,
+                     min_side: int = 32) -> Tuple[int, int, int, int]:
+        """객체 박스를 context 비율만큼 넓힌 crop 영역 (최소 min_side, 이미지 안으로 자름)"""
+        pad_x = max(bbox["width"] * self.context, (min_side - bbox["width"]) / 2, 0)
+        pad_y = max(bbox["height"] * self.context, (min_side - bbox["height"]) / 2, 0)
+        x1, y1 = max(int(bbox["x"] - pad_x), 0), max(int(bbox["y"] - pad_y), 0)
+        x2 = min(int(bbox["x"] + bbox["width"] + pad_x), width)
+        y2 = min(int(bbox["y"] + bbox["height"] + pad_y), height)
+        return x1, y1, max(x2, x1 + 1), max(y2, y1 + 1)
+
+    def cost(self) -> Dict[str, float]:
+        """
+        프레임당 평균 모델 비용 (ms)
+
+        매 프레임 큰 모델을 돌렸을 때의 비용은 escalation 호출 시간을 입력 면적 (전체 프레임 장 수)
+        에 대해 직선으로 맞춘 값 (호출당 고정 비용 + 면적 비례 비용) 을 전체 프레임 한 장에서 읽는다.
+        frame 모드처럼 면적이 늘 같거나 호출이 적으면 면적당 평균이다.
+        """
+        small = self.small_ms / self.frames if self.frames else 0.0
+        cascade = (self.small_ms + self.large_ms) / self.frames if self.frames else 0.0
+        n, sx, sy, sxx, sxy = self._fit
+        always_large = 0.0
+        if n and sx:
+            variance = n * sxx - sx * sx
+            if n >= MIN_FIT_CALLS and variance > 1e-9 * n * sxx:
+                slope = (n * sxy - sx * sy) / variance
+                always_large = (sy - slope * sx) / n + slope
+            else:
+                always_large = sy / sx
+        return {
+            "small_only_ms": round(small, 3),
+            "cascade_ms": round(cascade, 3),
+            "always_large_ms": round(max(always_large, 0.0), 3),
+            "savings": round(1.0 - cascade / always_large, 3) if always_large > 0 else 0.0
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "band": [self.low, self.high],
+            "frames": self.frames,
+            "escalated": self.escalated,
+            "escalation_rate": self.escalated / self.frames if self.frames else 0.0,
+            "skipped_budget": self.skipped_budget,
+            "skipped_pending": self.skipped_pending,
+            "unavailable": self.unavailable,
+            "regions": self.regions,
+            "refined": self.refined,
+            "dropped": self.dropped,
+            "added": self.added,
+            "pending": self.pending,
+            "cost_per_frame": self.cost(),
+            "streams": {str(scope): budget.stats() for scope, budget in self._budgets.items()}
+        }
+
+
+def _refine(obj: Dict[str, Any], found: Dict[str, Any], model: str) -> Dict[str, Any]:
+    """큰 모델 탐지로 라벨 / 신뢰도 / 박스 교체 (id / track_id 는 유지)"""
+    metadata = obj.get("metadata", {})
+    return {
+        **obj,
+        "label": found["label"],
+        "confidence": found["confidence"],
+        "bbox": found["bbox"],
+        "center": found["center"],
+        "metadata": {
+            **metadata,
+            "class_id": found.get("metadata", {}).get("class_id", metadata.get("class_id")),
+            "improved_by": [*metadata.get("improved_by", []), "cascade"],
+            "cascade": {"model": model, "small_label": obj["label"],
+                        "small_confidence": round(obj["confidence"], 4)}
+        }
+    }
+
+
+def attach_refinement(result: Dict[str, Any], refinement: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """cascade 결과를 탐지 결과에 반영 (objects 교체 + 요약)"""
+    if refinement is not None:
+        result["objects"] = refinement["objects"]
+        result["cascade"] = {key: refinement[key] for key in ("refined", "dropped", "added", "model")}
+    return result
@@ -1,80 +1,169 @@
 # Vision AI Core Module
-from ultralytics import YOLO
-import cv2
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 import json
+import os
+import time
 from datetime import datetime
 
+from rag_service.core.config import settings
+from rag_service.core.metrics import StageTimings
+from vision_service.core.backends import InferenceBackend, create_backend, decode_predictions
+from vision_service.core.frames import PreparedFrame, prepare_frame
+from vision_service.core.result_parser import parse_boxes
+
 class VisionDetector:
-    """Vision AI 핵심 탐지 모듈 (목업 버전)"""
+    """
+    Vision AI 핵심 탐지 모듈
+
+    torch / onnxruntime / openvino 백엔드로 letterbox → forward → NMS → 결과 파싱을 배치로 실행하고
+    단계별 시간을 StageTimings 에 기록한다. 백엔드 로드에 실패했거나 추론 중 오류가 나면
+    목업 결과 (status "mock_mode") 를 돌려준다.
+    """
+    
+    def __init__(self, model_path: Optional[str] = None, backend: Optional[str] = None,
+                 input_size: Optional[int] = None):
+        """
+        모델은 load() 에서 로드 (torch / onnxruntime / openvino import 가 무거움)
+        
+        Args:
+            model_path: 모델 파일 (기본값 settings.vision_model_path)
+            backend: torch / onnxruntime / openvino (기본값 settings.vision_backend)
+            input_size: letterbox 크기 (기본값: 모델 고정 입력 크기 → export 메타데이터 → settings.vision_input_size)
+        """
+        self.model_path = model_path or settings.vision_model_path
+        self.backend_name = backend or settings.vision_backend
+        self.model_version = os.path.splitext(os.path.basename(self.model_path))[0]
+        self.input_size = input_size
+        self.backend: Optional[InferenceBackend] = None
+        self.model_loaded = False
     
-    def __init__(self):
-        """YOLO 모델 초기화"""
+    def load(self) -> "VisionDetector":
+        """추론 백엔드 로드 (실패 시 목업 결과로 동작)"""
         try:
-            self.model = YOLO('yolov8n.pt')  # nano 버전 (빠른 처리)
+            self.backend = create_backend(
+                self.backend_name, self.model_path,
+                threads=settings.vision_backend_threads,
+                device=settings.vision_openvino_device
+            ).load()
+            self.input_size = (self.input_size or self.backend.input_size
+                               or self.backend.metadata.get("input_size") or settings.vision_input_size)
             self.model_loaded = True
-            print("✅ YOLO 모델 로드 완료")
+            print(f"✅ {self.backend_name} 모델 로드 완료 ({self.model_path})")
         except Exception as e:
-            print(f"❌ YOLO 모델 로드 실패: {e}")
+            print(f"❌ {self.backend_name} 모델 로드 실패: {e}")
             self.model_loaded = False
+        return self
+    
+    def detect_objects(self, frame: np.ndarray,
+                       confidence_threshold: Optional[float] = None,
+                       max_objects: Optional[int] = None) -> Dict[str, Any]:
+        """
+        실시간 객체 탐지
+        
+        Args:
+            frame: BGR 이미지
+            confidence_threshold: 최소 신뢰도 (None 이면 모델 기본값)
+            max_objects: 최대 객체 수 (신뢰도 상위 순, None 이면 제한 없음)
+        """
+        return self.detect_batch(
+            [frame],
+            confidence_thresholds=[confidence_threshold],
+            max_objects=[max_objects]
+        )[0]
     
-    def detect_objects(self, frame: np.ndarray) -> Dict[str, Any]:
-        """실시간 객체 탐지 (목업)"""
+    def detect_batch(self, frames: List[Union[np.ndarray, PreparedFrame]],
+                     confidence_thresholds: Optional[List[Optional[float]]] = None,
+                     max_objects: Optional[List[Optional[int]]] = None,
+                     timings: Optional[List[Optional[StageTimings]]] = None,
+                     input_sizes: Optional[List[Optional[int]]] = None) -> List[Dict[str, Any]]:
+        """
+        여러 프레임을 한 번의 forward pass 로 탐지
+        
+        Args:
+            frames: BGR 이미지 또는 이미 letterbox 된 PreparedFrame 목록
+            confidence_thresholds: 프레임별 최소 신뢰도
+            max_objects: 프레임별 최대 객체 수
+            timings: 프레임별 단계 시간 기록기 (디코딩 등 앞 단계 시간이 들어 있을 수 있음)
+            input_sizes: 프레임별 letterbox 크기 (None 이면 기본 크기, 고정 입력 모델은 무시)
+            
+        Returns:
+            List[Dict]: 프레임 순서대로의 탐지 결과
+        """
         if not self.model_loaded:
-            return self._get_mock_result()
+            return [self._get_mock_result() for _ in frames]
+        
+        confidence_thresholds = confidence_thresholds or [None] * len(frames)
+        max_objects = max_objects or [None] * len(frames)
+        timings = [t or StageTimings("vision") for t in (timings or [None] * len(frames))]
+        input_sizes = input_sizes or [None] * len(frames)
+        if self.backend.input_size is not None:
+            input_sizes = [None] * len(frames)
         
         try:
-            # YOLO 탐지 실행
-            results = self.model(frame, verbose=False)
+            # 원본 프레임은 letterbox, 업로드처럼 이미 준비된 텐서는 그대로
+            prepared: List[PreparedFrame] = []
+            for frame, timing, input_size in zip(frames, timings, input_sizes):
+                if isinstance(frame, PreparedFrame):
+                    prepared.append(frame)
+                else:
+                    with timing.stage("preprocess"):
+                        prepared.append(prepare_frame(frame, input_size or self.input_size))
             
-            # 결과 파싱
-            detections = []
-            for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        # 바운딩 박스 좌표
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        confidence = box.conf[0].cpu().numpy()
-                        class_id = int(box.cls[0].cpu().numpy())
-                        class_name = self.model.names[class_id]
-                        
-                        detection = {
-                            "id": len(detections) + 1,
-                            "label": class_name,
-                            "confidence": float(confidence),
-                            "bbox": {
-                                "x": int(x1),
-                                "y": int(y1),
-                                "width": int(x2 - x1),
-                                "height": int(y2 - y1)
-                            },
-                            "center": [int((x1 + x2) / 2), int((y1 + y2) / 2)],
-                            "metadata": {
-                                "class_id": class_id,
-                                "improved_by": []
-                            }
-                        }
-                        detections.append(detection)
+            # 텐서 크기가 같은 프레임끼리 한 배치로 forward
+            groups: Dict[tuple, List[int]] = {}
+            for i, frame in enumerate(prepared):
+                groups.setdefault(frame.tensor.shape, []).append(i)
             
-            return self._format_result(detections, frame.shape)
+            formatted: List[Optional[Dict[str, Any]]] = [None] * len(frames)
+            for indices in groups.values():
+                start = time.perf_counter()
+                output = self.backend.infer(np.stack([prepared[i].tensor for i in indices]))
+                forward_ms = (time.perf_counter() - start) * 1000.0
+                
+                # 백엔드와 무관하게 같은 후처리 (임계값 / NMS / 좌표 복원)
+                start = time.perf_counter()
+                boxes = decode_predictions(output, settings.vision_detect_confidence,
+                                           settings.vision_nms_iou_threshold, settings.vision_max_detections)
+                nms_ms = (time.perf_counter() - start) * 1000.0
+                
+                for i, image_boxes in zip(indices, boxes):
+                    frame, timing = prepared[i], timings[i]
+                    timing.add("forward", forward_ms)
+                    timing.add("nms", nms_ms / len(indices))
+                    with timing.stage("parse"):
+                        detections = parse_boxes(
+                            image_boxes,
+                            self.backend.names,
+                            confidence_threshold=confidence_thresholds[i],
+                            max_objects=max_objects[i],
+                            scale=frame.scale,
+                            pad=frame.pad,
+                            shape=frame.shape
+                        )
+                    formatted[i] = self._format_result(detections, frame.shape, timing)
+            
+            return formatted
             
         except Exception as e:
             print(f"❌ 탐지 오류: {e}")
-            return self._get_mock_result()
+            return [self._get_mock_result() for _ in frames]
     
-    def _format_result(self, detections: List[Dict], frame_shape: tuple) -> Dict[str, Any]:
+    def _format_result(self, detections: List[Dict], frame_shape: tuple,
+                       timings: StageTimings) -> Dict[str, Any]:
         """결과 포맷팅"""
+        processing_time_ms = timings.total_ms
         return {
             "frame_id": int(datetime.now().timestamp() * 1000),
             "timestamp": datetime.now().isoformat(),
-            "fps": 30.0,  # 목업용 고정값
+            # 스트림이 아닌 단일 요청은 처리 시간 기준 FPS (스트림은 실측 FPS 로 덮어씀)
+            "fps": round(1000.0 / processing_time_ms, 2) if processing_time_ms > 0 else 0.0,
             "resolution": [frame_shape[1], frame_shape[0]],  # [width, height]
             "scene_context": "general",
             "objects": detections,
-            "processing_time_ms": 50.0,  # 목업용 고정값
-            "model_version": "yolov8n",
+            "processing_time_ms": round(processing_time_ms, 3),
+            "timings_ms": timings.as_dict(),
+            "model_version": self.model_version,
             "status": "success"
         }
     
@@ -100,3 +189,8 @@ class VisionDetector:
             "model_version": "mock",
             "status": "mock_mode"
         }
+
+
+def load_detector() -> VisionDetector:
+    """설정된 백엔드로 detector 생성 + 로드 (워커 풀의 detector_factory 기본값)"""
+    return VisionDetector().load()
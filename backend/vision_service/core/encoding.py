@@ -0,0 +1,166 @@
+# Vision AI Result Encoding
+import json
+import struct
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # 없으면 표준 json 으로 대체
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # 없으면 msgpack 형식을 제공하지 않음
+    msgpack = None
+
+JSON, MSGPACK, PACKED = "json", "msgpack", "packed"
+
+MEDIA_TYPES = {
+    JSON: "application/json",
+    MSGPACK: "application/msgpack",
+    PACKED: "application/vnd.smartglass.detections"
+}
+_MEDIA_ALIASES = {
+    "application/json": JSON,
+    "application/msgpack": MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.smartglass.detections": PACKED,
+    "application/octet-stream": PACKED
+}
+
+# packed 형식 (little-endian)
+#   헤더 32 bytes: magic, version, 라벨 수, 객체 수, frame_id, timestamp(epoch), width, height, 처리 시간(ms)
+#   라벨 테이블: (길이 u8 + UTF-8) × 라벨 수  — 이 프레임에 나온 라벨만
+#   객체 배열: PACKED_DTYPE × 객체 수 (label 은 라벨 테이블 인덱스)
+PACKED_MAGIC = b"SGD1"
+PACKED_VERSION = 1
+PACKED_HEADER = struct.Struct("<4sBBHqdHHf")
+PACKED_DTYPE = np.dtype([
+    ("id", "<u4"),  # 객체 / 추적 ID
+    ("label", "u1"),
+    ("confidence", "<f4"),
+    ("xyxy", "<i2", (4,))
+])
+PACKED_RECORD = struct.Struct("<IBf4h")  # PACKED_DTYPE 과 같은 레이아웃
+
+
+def available_formats() -> List[str]:
+    return [fmt for fmt in (JSON, MSGPACK, PACKED) if fmt != MSGPACK or msgpack is not None]
+
+
+def negotiate_format(accept: Optional[str] = None, requested: Optional[str] = None) -> Optional[str]:
+    """
+    응답 형식 결정
+
+    Args:
+        accept: Accept 헤더 (q 값이 높은 순, 같으면 먼저 나온 순)
+        requested: ?format= 으로 명시한 형식 (Accept 보다 우선)
+
+    Returns:
+        json / msgpack / packed, 제공할 수 있는 형식이 없으면 None
+    """
+    formats = available_formats()
+    if requested:
+        return requested if requested in formats else None
+    if not accept:
+        return JSON
+
+    candidates = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, *params = [token.strip() for token in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if media_type in ("*/*", "application/*"):
+            fmt = JSON
+        else:
+            fmt = _MEDIA_ALIASES.get(media_type.lower())
+        if fmt in formats and quality > 0:
+            candidates.append((-quality, position, fmt))
+    return min(candidates)[2] if candidates else None
+
+
+def encode_result(result: Dict[str, Any], fmt: str = JSON) -> bytes:
+    """탐지 결과(detect_objects 형식) 직렬화"""
+    if fmt == PACKED:
+        return pack_detections(result)
+    if fmt == MSGPACK:
+        return msgpack.packb(result, use_bin_type=True)
+    return dump_json(result)
+
+
+def dump_json(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# ---------- packed ----------
+
+def pack_detections(result: Dict[str, Any]) -> bytes:
+    """
+    고정 레이아웃 바이너리로 직렬화 (객체당 17 bytes)
+
+    center / metadata / improved_by 등 부가 정보는 담지 않는다.
+    좌표는 정수 픽셀 xyxy 이다.
+    """
+    objects = result.get("objects") or []
+    labels: Dict[str, int] = {}
+    pack_record = PACKED_RECORD.pack
+    records = b"".join(
+        pack_record(obj.get("id", 0), labels.setdefault(obj["label"], len(labels)), obj["confidence"],
+                    b["x"], b["y"], b["x"] + b["width"], b["y"] + b["height"])
+        for obj, b in ((obj, obj["bbox"]) for obj in objects)
+    )
+
+    width, height = result.get("resolution") or (0, 0)
+    timestamp = result.get("timestamp")
+    header = PACKED_HEADER.pack(
+        PACKED_MAGIC, PACKED_VERSION, len(labels), len(objects),
+        int(result.get("frame_id", 0)),
+        datetime.fromisoformat(timestamp).timestamp() if timestamp else 0.0,
+        width, height, float(result.get("processing_time_ms", 0.0))
+    )
+    table = b"".join(bytes((len(encoded),)) + encoded
+                     for encoded in (label.encode("utf-8")[:255] for label in labels))
+    return header + table + records
+
+
+def unpack_detections(data: bytes) -> Dict[str, Any]:
+    """pack_detections 의 역변환 (클라이언트 / 테스트용)"""
+    magic, version, label_count, object_count, frame_id, timestamp, width, height, processing_ms = \
+        PACKED_HEADER.unpack_from(data)
+    if magic != PACKED_MAGIC or version != PACKED_VERSION:
+        raise ValueError("packed 탐지 결과 형식이 아닙니다")
+
+    offset = PACKED_HEADER.size
+    labels = []
+    for _ in range(label_count):
+        length = data[offset]
+        labels.append(data[offset + 1:offset + 1 + length].decode("utf-8"))
+        offset += 1 + length
+    records = np.frombuffer(data, dtype=PACKED_DTYPE, count=object_count, offset=offset)
+
+    objects = []
+    for object_id, label, confidence, (x1, y1, x2, y2) in records.tolist():
+        objects.append({
+            "id": object_id,
+            "label": labels[label],
+            "confidence": round(confidence, 4),
+            "bbox": {"x": int(x1), "y": int(y1), "width": int(x2 - x1), "height": int(y2 - y1)}
+        })
+    return {
+        "frame_id": frame_id,
+        "timestamp": datetime.fromtimestamp(timestamp).isoformat(),
+        "resolution": [width, height],
+        "objects": objects,
+        "processing_time_ms": round(processing_ms, 3)
+    }
+
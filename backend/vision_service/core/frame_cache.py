@@ -0,0 +1,171 @@
+# Vision AI Frame Result Cache (perceptual hash)
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from rag_service.core.metrics import StageTimings, metrics
+
+
+def dhash(frame: Any, hash_size: int = 8) -> int:
+    """
+    difference hash (hash_size² 비트)
+
+    축소 흑백 이미지에서 가로로 이웃한 픽셀의 밝기 대소를 비트로 만든다.
+    JPEG 노이즈나 약한 밝기 변화에는 거의 바뀌지 않는다.
+    PreparedFrame 은 letterbox 된 텐서로 계산한다.
+    """
+    import cv2
+
+    tensor = getattr(frame, "tensor", None)
+    image = tensor[:, ::4, ::4].mean(axis=0) if tensor is not None else frame
+    # 큰 프레임은 최근접 샘플링으로 먼저 줄여 INTER_AREA 비용을 고정
+    coarse = (16 * (hash_size + 1), 16 * hash_size)
+    if image.shape[1] > coarse[0] and image.shape[0] > coarse[1]:
+        image = cv2.resize(image, coarse, interpolation=cv2.INTER_NEAREST)
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = small.mean(axis=2)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class FrameResultCache:
+    """
+    거의 같은 프레임의 탐지 결과 재사용 캐시
+
+    scope (스트림 + 탐지 설정) 마다 최근 결과를 frame hash 와 함께 보관하고,
+    새 프레임의 hash 가 max_distance 이내인 결과가 있으면 추론 없이 돌려준다.
+    결과는 max_age_sec 가 지나면 쓰지 않는다 (천천히 변하는 장면이 계속 재사용되지 않도록).
+    """
+
+    def __init__(self, hash_size: int = 16, max_distance: int = 4, max_age_sec: float = 1.0,
+                 entries_per_scope: int = 8, max_scopes: int = 64,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            hash_size: dHash 크기 (hash_size² 비트, 8 은 작은 이동을 놓치기 쉬움)
+            max_distance: 같은 프레임으로 볼 최대 Hamming 거리
+            max_age_sec: 캐시된 결과를 재사용할 수 있는 최대 시간
+            entries_per_scope: scope 별로 보관하는 최근 결과 수 (LRU)
+            max_scopes: 보관하는 최대 scope 수 (LRU)
+            clock: 결과 나이 계산용 시계 (초)
+        """
+        self.hash_size = hash_size
+        self.max_distance = max_distance
+        self.max_age_sec = max_age_sec
+        self.entries_per_scope = max(1, entries_per_scope)
+        self.max_scopes = max(1, max_scopes)
+        self.clock = clock
+        # scope → {hash: (결과, 추론 시간 ms, 저장 시각)}
+        self._scopes: "OrderedDict[Hashable, OrderedDict[int, Tuple[Dict[str, Any], float, float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+
+    def hash(self, frame: Any) -> int:
+        return dhash(frame, self.hash_size)
+
+    def lookup(self, scope: Hashable, frame_hash: int,
+               timings: Optional[StageTimings] = None) -> Optional[Dict[str, Any]]:
+        """가장 가까운 유효 결과의 사본 (없으면 None, 처리 시간은 timings 기준으로 다시 채움)"""
+        now = self.clock()
+        best = None
+        with self._lock:
+            entries = self._scopes.get(scope)
+            if entries is not None:
+                self._scopes.move_to_end(scope)
+                for key in [key for key, (_, _, stored_at) in entries.items() if now - stored_at > self.max_age_sec]:
+                    del entries[key]
+                for key, entry in entries.items():
+                    distance = hamming(key, frame_hash)
+                    if distance <= self.max_distance and (best is None or distance < best[0]):
+                        best = (distance, key, entry)
+            if best is None:
+                self.misses += 1
+            else:
+                entries.move_to_end(best[1])
+                self.hits += 1
+                self.saved_ms += best[2][1]
+
+        if best is None:
+            metrics.inc("vision", "frame_cache_miss")
+            return None
+        distance, _, (result, inference_ms, stored_at) = best
+        metrics.inc("vision", "frame_cache_hit")
+        metrics.inc("vision", "frame_cache_saved_ms", inference_ms)
+        return _reuse(result, distance, (now - stored_at) * 1000.0, timings or StageTimings("vision"))
+
+    def store(self, scope: Hashable, frame_hash: int, result: Dict[str, Any],
+              inference_ms: Optional[float] = None):
+        """
+        추론 결과 저장 (이후 호출자가 결과를 수정해도 영향 없도록 사본 보관)
+
+        Args:
+            inference_ms: hit 때 아끼는 시간 (없으면 processing_time_ms)
+        """
+        if result.get("status") != "success":
+            return
+        with self._lock:
+            entries = self._scopes.get(scope)
+            if entries is None:
+                entries = self._scopes[scope] = OrderedDict()
+                while len(self._scopes) > self.max_scopes:
+                    self._scopes.popitem(last=False)
+            self._scopes.move_to_end(scope)
+            if inference_ms is None:
+                inference_ms = float(result.get("processing_time_ms", 0.0))
+            entries[frame_hash] = (_clone(result), inference_ms, self.clock())
+            entries.move_to_end(frame_hash)
+            while len(entries) > self.entries_per_scope:
+                entries.popitem(last=False)
+
+    def discard(self, stream_id: str):
+        """스트림이 끝나면 해당 스트림의 scope 전부 삭제 (scope 는 (stream_id, ...) 튜플)"""
+        with self._lock:
+            for scope in [scope for scope in self._scopes if scope[0] == stream_id]:
+                del self._scopes[scope]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "scopes": len(self._scopes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "inference_ms_saved": round(self.saved_ms, 1)
+        }
+
+
+def _clone(result: Dict[str, Any]) -> Dict[str, Any]:
+    """객체 dict 까지 복사 (bbox / metadata 는 하위 단계가 새 dict 로 바꿔 끼움)"""
+    return {**result, "objects": [
+        {**obj, "bbox": dict(obj["bbox"]), "metadata": dict(obj.get("metadata", {}))}
+        for obj in result.get("objects", [])
+    ]}
+
+
+def _reuse(result: Dict[str, Any], distance: int, age_ms: float, timings: StageTimings) -> Dict[str, Any]:
+    reused = _clone(result)
+    for obj in reused["objects"]:
+        metadata = obj["metadata"]
+        metadata["improved_by"] = [*metadata.get("improved_by", []), "frame_cache"]
+    now = datetime.now()
+    processing_time_ms = timings.total_ms
+    reused.update({
+        "frame_id": int(now.timestamp() * 1000),
+        "timestamp": now.isoformat(),
+        "fps": round(1000.0 / processing_time_ms, 2) if processing_time_ms > 0 else 0.0,
+        "processing_time_ms": round(processing_time_ms, 3),
+        "timings_ms": timings.as_dict(),
+        "frame_cache": {"hit": True, "distance": distance, "age_ms": round(age_ms, 1)}
+    })
+    return reused
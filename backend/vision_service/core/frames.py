@@ -0,0 +1,222 @@
+# 프레임 디코딩 / 전처리 / 목업 프레임 유틸
+# cv2 는 첫 호출 시 import 한다 (라우터 import 시 OpenCV 로딩 비용을 내지 않도록)
+import threading
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from rag_service.core.metrics import StageTimings
+
+# SOF 마커 중 DHT(C4) / JPG(C8) / DAC(CC) 는 프레임 헤더가 아님
+_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# 축소 배율 → cv2.IMREAD_REDUCED_COLOR_* 플래그 값 (cv2 import 없이 사용)
+_REDUCED_FLAGS = {1: 1, 2: 17, 4: 33, 8: 65}  # IMREAD_COLOR, IMREAD_REDUCED_COLOR_2/4/8
+
+LETTERBOX_FILL = 114
+
+
+class PreparedFrame(NamedTuple):
+    """모델 입력 크기로 letterbox 된 CHW float32 텐서와 원본 좌표 복원 정보"""
+    tensor: np.ndarray  # (3, size, size) RGB, 0~1
+    shape: Tuple[int, int, int]  # 원본 이미지 (height, width, channels)
+    scale: float  # 원본 1px 이 텐서에서 차지하는 px
+    pad: Tuple[int, int]  # 텐서 안 이미지의 (x, y) 오프셋
+    image: Optional[np.ndarray] = None  # 디코딩된 BGR 프레임 (축소 디코딩이면 원본보다 작음, OCR / cascade crop 용)
+
+
+class BufferPool:
+    """
+    업로드 바이트를 읽어 들일 재사용 bytearray 풀
+
+    요청마다 새 bytes 를 만들지 않고, 커진 버퍼는 그대로 다음 요청에 재사용한다.
+    max_pooled_size 보다 커진 버퍼는 큰 업로드 한 번이 메모리를 계속 잡고 있지 않도록 버린다.
+    """
+
+    def __init__(self, max_buffers: int = 8, initial_size: int = 1 << 20, max_pooled_size: int = 8 << 20):
+        self.max_buffers = max_buffers
+        self.initial_size = initial_size
+        self.max_pooled_size = max_pooled_size
+        self._free: List[bytearray] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bytearray:
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+        return bytearray(self.initial_size)
+
+    def release(self, buffer: bytearray):
+        if len(buffer) > self.max_pooled_size:
+            return
+        with self._lock:
+            if len(self._free) < self.max_buffers:
+                self._free.append(buffer)
+
+
+def read_into(fileobj, buffer: bytearray, limit: Optional[int] = None) -> int:
+    """
+    파일 객체를 buffer 에 직접 읽고 읽은 바이트 수 반환 (부족하면 buffer 를 두 배로 키움)
+
+    limit 바이트를 넘으면 ValueError (buffer 는 limit + 1 바이트 이상으로 키우지 않음)
+    """
+    size = 0
+    while True:
+        if size == len(buffer):
+            grow = len(buffer) or 1 << 16
+            if limit is not None:
+                grow = min(grow, limit + 1 - size)
+            buffer.extend(bytes(grow))
+        with memoryview(buffer) as view:
+            n = fileobj.readinto(view[size:])
+        if not n:
+            return size
+        size += n
+        if limit is not None and size > limit:
+            raise ValueError(f"업로드 파일이 너무 큽니다 (최대 {limit / (1 << 20):g} MB)")
+
+
+def jpeg_dimensions(data) -> Optional[Tuple[int, int]]:
+    """JPEG 헤더(SOF)에서 (width, height) 를 읽음 (JPEG 가 아니면 None)"""
+    view = memoryview(data)
+    if len(view) < 4 or view[0] != 0xFF or view[1] != 0xD8:
+        return None
+    i = 2
+    while i + 9 < len(view):
+        if view[i] != 0xFF:
+            return None
+        marker = view[i + 1]
+        if marker == 0xFF:  # 채움 바이트
+            i += 1
+            continue
+        if marker in _SOF_MARKERS:
+            height = (view[i + 5] << 8) | view[i + 6]
+            width = (view[i + 7] << 8) | view[i + 8]
+            return width, height
+        i += 2 + ((view[i + 2] << 8) | view[i + 3])
+    return None
+
+
+def reduction_factor(width: int, height: int, target: int) -> int:
+    """긴 변이 target 아래로 내려가지 않는 가장 큰 JPEG 축소 배율 (1, 2, 4, 8)"""
+    longest = max(width, height)
+    factor = 1
+    while factor < 8 and longest // (factor * 2) >= target:
+        factor *= 2
+    return factor
+
+
+def decode_frame(data, resolution: Optional[List[int]] = None,
+                 timings: Optional[StageTimings] = None,
+                 reduced: bool = True) -> Optional[np.ndarray]:
+    """
+    JPEG 디코딩 후 설정 해상도보다 크면 비율 유지하며 축소
+
+    reduced=True 이고 원본이 resolution 의 2배 이상이면 libjpeg 의 DCT 축소 디코딩
+    (IMREAD_REDUCED_COLOR_*) 으로 전체 해상도 버퍼를 만들지 않는다.
+    """
+    import cv2
+
+    timings = timings or StageTimings("vision")
+    with timings.stage("decode"):
+        flag = cv2.IMREAD_COLOR
+        if reduced and resolution:
+            dimensions = jpeg_dimensions(data)
+            if dimensions is not None:
+                flag = _REDUCED_FLAGS[reduction_factor(*dimensions, max(resolution))]
+        frame = cv2.imdecode(np.frombuffer(data, np.uint8), flag)
+    if frame is None or not resolution:
+        return frame
+
+    height, width = frame.shape[:2]
+    scale = min(resolution[0] / width, resolution[1] / height)
+    if scale < 1.0:
+        with timings.stage("resize"):
+            frame = cv2.resize(frame, (int(width * scale), int(height * scale)),
+                               interpolation=cv2.INTER_AREA)
+    return frame
+
+
+def prepare_upload(data, input_size: int = 640,
+                   timings: Optional[StageTimings] = None,
+                   reduced: bool = True) -> Optional[PreparedFrame]:
+    """
+    업로드 이미지를 디코딩해 모델 입력 텐서로 바로 변환
+
+    원본이 input_size 의 2배 이상이면 축소 디코딩하고, 한 번의 resize 와
+    한 번의 float 변환으로 letterbox 텐서를 만든다 (ultralytics 전처리 생략).
+    """
+    import cv2
+
+    timings = timings or StageTimings("vision")
+    with timings.stage("decode"):
+        dimensions = jpeg_dimensions(data)
+        factor = reduction_factor(*dimensions, input_size) if reduced and dimensions else 1
+        frame = cv2.imdecode(np.frombuffer(data, np.uint8), _REDUCED_FLAGS[factor])
+    if frame is None:
+        return None
+
+    # 축소 디코딩이면 디코딩 크기 × 배율로 원본 크기를 복원
+    # (imdecode 는 EXIF 회전을 적용하므로 SOF 헤더의 가로 / 세로와 뒤바뀔 수 있음)
+    height, width = frame.shape[0] * factor, frame.shape[1] * factor
+    shape = (height, width, frame.shape[2])
+
+    with timings.stage("preprocess"):
+        tensor, scale, pad = letterbox(frame, input_size)
+    # 디코딩된 프레임 대비 배율을 원본 대비 배율로 환산
+    scale = scale * frame.shape[1] / width
+    return PreparedFrame(tensor, shape, scale, pad, frame)
+
+
+def prepare_frame(frame: np.ndarray, input_size: int = 640) -> PreparedFrame:
+    """디코딩된 BGR 프레임 → letterbox 텐서 (좌표 복원 정보 포함)"""
+    tensor, scale, pad = letterbox(frame, input_size)
+    return PreparedFrame(tensor, frame.shape, scale, pad, frame)
+
+
+def source_image(frame) -> Tuple[np.ndarray, float]:
+    """
+    탐지 영역을 잘라낼 BGR 이미지와 원본 1px 이 그 이미지에서 차지하는 px
+
+    PreparedFrame 은 letterbox 텐서 (모델 입력 크기로 축소됨) 대신 디코딩된 프레임을 쓴다.
+    """
+    if isinstance(frame, PreparedFrame):
+        return frame.image, frame.image.shape[1] / frame.shape[1]
+    return frame, 1.0
+
+
+def letterbox(frame: np.ndarray, size: int = 640) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    BGR 프레임을 비율 유지 resize + 패딩해 (3, size, size) RGB float32 텐서로 변환
+
+    Returns:
+        (tensor, scale, (pad_x, pad_y))
+    """
+    import cv2
+
+    height, width = frame.shape[:2]
+    scale = min(size / width, size / height)
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+    canvas = np.full((size, size, 3), LETTERBOX_FILL, dtype=np.uint8)
+    if (new_w, new_h) != (width, height):
+        cv2.resize(frame, (new_w, new_h), dst=canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w],
+                   interpolation=cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR)
+    else:
+        canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = frame
+
+    # BGR→RGB, HWC→CHW, /255 를 출력 버퍼 하나에 한 번에 기록
+    tensor = np.empty((3, size, size), dtype=np.float32)
+    np.multiply(canvas[:, :, ::-1].transpose(2, 0, 1), np.float32(1.0 / 255.0), out=tensor)
+    return tensor, scale, (pad_x, pad_y)
+
+
+def mock_frame(text: str, scale: float = 1.0, thickness: int = 2,
+               origin: tuple = (150, 240)) -> np.ndarray:
+    """목업용 640x480 검은 프레임에 텍스트 표시"""
+    import cv2
+
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    cv2.putText(frame, text, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, (255, 255, 255), thickness)
+    return frame
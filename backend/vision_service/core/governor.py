@@ -0,0 +1,183 @@
+# Vision AI Adaptive Resolution / Frame-Rate Governor
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from rag_service.core.metrics import metrics
+
+
+class OperatingPoint(NamedTuple):
+    """스트림 추론 설정 한 단계"""
+    input_size: int  # letterbox 입력 크기
+    frame_skip: int  # 추론한 프레임 사이에 건너뛰는 프레임 수
+
+
+def build_ladder(input_sizes: Sequence[int], max_frame_skip: int = 2) -> List[OperatingPoint]:
+    """
+    품질 순 단계 목록
+
+    입력 크기를 먼저 줄이고 (640 → 480 → 320), 가장 작은 크기에서도 부족하면
+    프레임을 건너뛴다: [(640, 0), (480, 0), (320, 0), (320, 1), (320, 2)]
+    """
+    sizes = sorted({int(size) for size in input_sizes}, reverse=True)
+    if not sizes:
+        raise ValueError("input_sizes 가 비어 있음")
+    ladder = [OperatingPoint(size, 0) for size in sizes]
+    ladder += [OperatingPoint(sizes[-1], skip) for skip in range(1, max_frame_skip + 1)]
+    return ladder
+
+
+class StreamGovernor:
+    """스트림 하나의 단계 / 지연 상태 (결정은 LatencyGovernor 가 함)"""
+
+    def __init__(self, stream_id: str, governor: "LatencyGovernor", level: int, now: float):
+        self.stream_id = stream_id
+        self.governor = governor
+        self.level = level
+        self.latency_ms: Optional[float] = None  # 추론 프레임 지연 EWMA
+        self.changed_at = now
+        self.frames_skipped = 0
+        self.downgrades = 0
+        self.upgrades = 0
+        self._skip_left = 0
+
+    @property
+    def point(self) -> OperatingPoint:
+        return self.governor.ladder[self.level]
+
+    def admit(self) -> bool:
+        """이번 프레임을 처리할지 (frame_skip 만큼 건너뛴 뒤 한 프레임 처리)"""
+        if self._skip_left > 0:
+            self._skip_left -= 1
+            self.frames_skipped += 1
+            metrics.inc("vision", "governor_frames_skipped")
+            return False
+        self._skip_left = self.point.frame_skip
+        return True
+
+    def observe(self, latency_ms: float):
+        """추론한 프레임의 처리 지연 기록 (단계 조정은 여기서 일어남)"""
+        self.governor.observe(self, latency_ms)
+
+    def describe(self) -> Dict[str, Any]:
+        """결과에 붙이는 현재 운영 지점"""
+        point = self.point
+        return {
+            "level": self.level,
+            "input_size": point.input_size,
+            "frame_skip": point.frame_skip,
+            "latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            "slo_ms": self.governor.slo_ms
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.describe(),
+            "frames_skipped": self.frames_skipped,
+            "downgrades": self.downgrades,
+            "upgrades": self.upgrades
+        }
+
+
+class LatencyGovernor:
+    """
+    지연 SLO 기반 스트림별 해상도 / 프레임 스킵 조절기
+
+    스트림별 추론 지연 EWMA 가 SLO 를 넘으면 그 스트림을 한 단계 낮추고,
+    스트림과 전체 지연이 모두 low_watermark 아래로 내려가면 다시 올린다.
+
+    - 내리기는 down_hold_sec, 올리기는 up_hold_sec 동안 단계를 유지한 뒤에만 (진동 방지)
+    - 올리기는 전체에서 up_interval_sec 에 한 스트림씩 (동시 복귀로 다시 과부하되지 않도록)
+    - 올린 단계의 예상 지연 (입력 면적 비례) 이 SLO 에 가까우면 올리지 않음
+    """
+
+    def __init__(self, slo_ms: float = 150.0, input_sizes: Sequence[int] = (640, 480, 320),
+                 max_frame_skip: int = 2, alpha: float = 0.3, low_watermark: float = 0.6,
+                 down_hold_sec: float = 0.5, up_hold_sec: float = 3.0, up_interval_sec: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            slo_ms: 추론 프레임 처리 지연 목표 (디코딩 + 대기 + 추론)
+            input_sizes: 사용할 입력 크기 (큰 것부터 기본값)
+            max_frame_skip: 가장 작은 입력 크기에서 추가로 허용할 최대 프레임 스킵
+            alpha: 지연 EWMA 가중치
+            low_watermark: 지연이 slo_ms * low_watermark 아래면 올리기 후보
+            down_hold_sec: 단계 변경 후 다시 내리기까지 최소 시간
+            up_hold_sec: 단계 변경 후 다시 올리기까지 최소 시간
+            up_interval_sec: 전체 스트림 기준 올리기 최소 간격
+            clock: 시계 (초)
+        """
+        self.slo_ms = slo_ms
+        self.ladder = build_ladder(input_sizes, max_frame_skip)
+        self.alpha = alpha
+        self.low_watermark = low_watermark
+        self.down_hold_sec = down_hold_sec
+        self.up_hold_sec = up_hold_sec
+        self.up_interval_sec = up_interval_sec
+        self.clock = clock
+        self.global_latency_ms: Optional[float] = None
+        self._streams: Dict[str, StreamGovernor] = {}
+        self._last_upgrade = float("-inf")
+
+    def register(self, stream_id: str) -> StreamGovernor:
+        """
+        새 스트림 등록
+
+        이미 과부하면 새 스트림은 가장 많이 내려가 있는 기존 스트림 단계에서 시작한다.
+        """
+        level = 0
+        if self.global_latency_ms is not None and self.global_latency_ms > self.slo_ms * self.low_watermark:
+            level = max((state.level for state in self._streams.values()), default=0)
+        state = StreamGovernor(stream_id, self, level, self.clock())
+        self._streams[stream_id] = state
+        return state
+
+    def discard(self, stream_id: str):
+        self._streams.pop(stream_id, None)
+
+    def observe(self, state: StreamGovernor, latency_ms: float):
+        state.latency_ms = _ewma(state.latency_ms, latency_ms, self.alpha)
+        self.global_latency_ms = _ewma(self.global_latency_ms, latency_ms, self.alpha / max(1, len(self._streams)))
+
+        now = self.clock()
+        held = now - state.changed_at
+        if state.latency_ms > self.slo_ms:
+            if held >= self.down_hold_sec and state.level < len(self.ladder) - 1:
+                self._move(state, state.level + 1, now)
+                state.downgrades += 1
+                metrics.inc("vision", "governor_downgrade")
+        elif (state.level > 0
+              and held >= self.up_hold_sec
+              and now - self._last_upgrade >= self.up_interval_sec
+              and state.latency_ms < self.slo_ms * self.low_watermark
+              and self.global_latency_ms < self.slo_ms * self.low_watermark
+              and state.latency_ms * self._cost_ratio(state.level, state.level - 1) < self.slo_ms * 0.9):
+            self._move(state, state.level - 1, now)
+            self._last_upgrade = now
+            state.upgrades += 1
+            metrics.inc("vision", "governor_upgrade")
+
+    def _move(self, state: StreamGovernor, level: int, now: float):
+        # 새 단계의 예상 지연으로 EWMA 를 옮겨 두어 이전 단계 측정값에 끌려가지 않게 함
+        state.latency_ms *= self._cost_ratio(state.level, level)
+        state.level = level
+        state.changed_at = now
+
+    def _cost_ratio(self, source: int, target: int) -> float:
+        """단계 간 예상 추론 비용 비 (입력 면적 비례, 프레임 스킵은 지연에 영향 없음)"""
+        return (self.ladder[target].input_size / self.ladder[source].input_size) ** 2
+
+    def stats(self) -> Dict[str, Any]:
+        levels: Dict[int, int] = {}
+        for state in self._streams.values():
+            levels[state.level] = levels.get(state.level, 0) + 1
+        return {
+            "slo_ms": self.slo_ms,
+            "ladder": [point._asdict() for point in self.ladder],
+            "global_latency_ms": round(self.global_latency_ms, 1) if self.global_latency_ms is not None else None,
+            "streams": len(self._streams),
+            "streams_per_level": levels
+        }
+
+
+def _ewma(previous: Optional[float], value: float, alpha: float) -> float:
+    return value if previous is None else previous + alpha * (value - previous)
@@ -0,0 +1,288 @@
+# Vision AI Detection History Store
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 탐지 하나 = 42 bytes (dict 하나는 1KB 가까이 씀)
+DETECTION_DTYPE = np.dtype([
+    ("frame_id", "<i8"),
+    ("timestamp", "<f8"),  # epoch seconds
+    ("class_id", "<i2"),  # 저장소 라벨 테이블 인덱스
+    ("track_id", "<i4"),  # 추적 ID (없으면 -1)
+    ("confidence", "<f4"),
+    ("bbox", "<f4", (4,))  # x, y, width, height
+])
+
+
+class DetectionHistory:
+    """
+    스트림 하나의 탐지 이력 (고정 크기 링 버퍼)
+
+    미리 할당한 구조화 배열에 시간순으로 기록하고, 가득 차면 가장 오래된 기록을 덮어쓴다.
+    spill_dir 가 있으면 덮어쓰기 전에 segment_size 단위로 .npy 파일에 내려 두고
+    조회 시 memory-map 으로 읽는다. 기록은 시간순이므로 범위 조회는 이진 탐색이다.
+    벽시계가 뒤로 가도 (NTP 보정 등) 순서가 깨지지 않도록 timestamp 는 직전 기록보다
+    작아지지 않게 맞춘다.
+    """
+
+    def __init__(self, capacity: int = 200_000, segment_size: int = 8192,
+                 spill_dir: Optional[str] = None, max_spill_segments: int = 256):
+        """
+        Args:
+            capacity: 메모리에 두는 최대 탐지 수 (segment_size 의 배수로 올림)
+            segment_size: 디스크로 내리는 단위
+            spill_dir: 덮어쓸 기록을 보관할 디렉터리 (None 이면 버림)
+            max_spill_segments: 보관할 최대 segment 파일 수 (넘으면 오래된 것부터 삭제)
+        """
+        self.segment_size = max(1, segment_size)
+        self.capacity = -(-max(capacity, 1) // self.segment_size) * self.segment_size
+        if spill_dir:
+            # 덮어쓸 segment 는 항상 다 채워진 상태여야 하므로 최소 두 segment
+            self.capacity = max(self.capacity, 2 * self.segment_size)
+        self.spill_dir = spill_dir
+        self.max_spill_segments = max_spill_segments
+        self.records = np.zeros(self.capacity, dtype=DETECTION_DTYPE)
+        self.labels: List[str] = []
+        self._label_ids: Dict[str, int] = {}
+        self.total = 0  # 지금까지 기록한 탐지 수 (링 위치 = total % capacity)
+        self.last_timestamp = 0.0  # 기록한 timestamp 최댓값 (searchsorted 가 가정하는 비감소 순서 유지)
+        self._spilled_upto = 0
+        self._segments: List[Tuple[float, float, str]] = []  # (첫 timestamp, 마지막 timestamp, 경로)
+        self._lock = threading.Lock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    # ---------- 기록 ----------
+
+    def record(self, frame_id: int, timestamp: float, objects: List[Dict[str, Any]]):
+        """한 프레임의 탐지 결과 기록 (timestamp 가 직전 기록보다 이르면 직전 기록 시각으로)"""
+        objects = objects[:self.segment_size]
+        n = len(objects)
+        if n == 0:
+            return
+        batch = np.empty(n, dtype=DETECTION_DTYPE)
+        batch["frame_id"] = frame_id
+        batch["track_id"] = [obj.get("metadata", {}).get("track_id", -1) for obj in objects]
+        batch["confidence"] = [obj["confidence"] for obj in objects]
+        batch["bbox"] = [(b["x"], b["y"], b["width"], b["height"]) for b in (obj["bbox"] for obj in objects)]
+
+        with self._lock:
+            self.last_timestamp = max(self.last_timestamp, timestamp)
+            batch["timestamp"] = self.last_timestamp
+            batch["class_id"] = [self._label_id(obj["label"]) for obj in objects]
+            if self.spill_dir:
+                while self._spilled_upto < self.total + n - self.capacity:
+                    self._spill_segment()
+            start = self.total % self.capacity
+            first = min(n, self.capacity - start)
+            self.records[start:start + first] = batch[:first]
+            self.records[:n - first] = batch[first:]
+            self.total += n
+
+    def _label_id(self, label: str) -> int:
+        label_id = self._label_ids.get(label)
+        if label_id is None:
+            label_id = self._label_ids[label] = len(self.labels)
+            self.labels.append(label)
+        return label_id
+
+    def _spill_segment(self):
+        """가장 오래된 segment 를 덮어쓰기 전에 .npy 파일로 저장"""
+        start = self._spilled_upto % self.capacity
+        segment = self.records[start:start + self.segment_size]
+        path = os.path.join(self.spill_dir, f"segment_{self._spilled_upto:012d}.npy")
+        np.save(path, segment)
+        self._segments.append((float(segment["timestamp"][0]), float(segment["timestamp"][-1]), path))
+        self._spilled_upto += self.segment_size
+        while len(self._segments) > self.max_spill_segments:
+            os.remove(self._segments.pop(0)[2])
+
+    # ---------- 조회 ----------
+
+    def _chunks(self, since: Optional[float] = None, until: Optional[float] = None) -> List[np.ndarray]:
+        """시간순으로 이어지는 기록 조각들 (범위가 겹치는 디스크 segment + 링 버퍼의 최대 두 구간)"""
+        chunks = []
+        oldest = max(0, self.total - self.capacity)
+        for first, last, path in self._segments:
+            if (since is None or last >= since) and (until is None or first <= until):
+                chunks.append(np.load(path, mmap_mode="r"))
+        if self._segments:
+            # 디스크에 있는 기록은 링 버퍼에서 제외 (중복 방지)
+            oldest = max(oldest, self._spilled_upto)
+        if self.total > oldest:
+            start, end = oldest % self.capacity, self.total % self.capacity or self.capacity
+            if start < end:
+                chunks.append(self.records[start:end])
+            else:
+                chunks.extend([self.records[start:], self.records[:end]])
+        return chunks
+
+    def query(self, since: Optional[float] = None, until: Optional[float] = None,
+              label: Optional[str] = None, offset: int = 0, limit: int = 100,
+              newest_first: bool = True) -> Tuple[np.ndarray, int, Dict[str, int]]:
+        """
+        시간 범위 / 라벨로 조회
+
+        Returns:
+            (페이지 기록 배열, 조건에 맞는 전체 수, 라벨별 개수)
+        """
+        label_id = self._label_ids.get(label) if label is not None else None
+        if label is not None and label_id is None:
+            return np.zeros(0, dtype=DETECTION_DTYPE), 0, {}
+
+        with self._lock:
+            selected = []
+            for chunk in self._chunks(since, until):
+                timestamps = chunk["timestamp"]
+                lo = np.searchsorted(timestamps, since, "left") if since is not None else 0
+                hi = np.searchsorted(timestamps, until, "right") if until is not None else len(chunk)
+                if hi > lo:
+                    part = chunk[lo:hi]
+                    if label_id is not None:
+                        part = part[part["class_id"] == label_id]
+                    selected.append(part)
+
+            counts = np.zeros(len(self.labels), dtype=np.int64)
+            for part in selected:
+                counts += np.bincount(part["class_id"], minlength=len(self.labels))[:len(self.labels)]
+            total = int(counts.sum())
+
+            page = _paginate(selected, offset, limit, newest_first)
+        class_counts = {self.labels[i]: int(c) for i, c in enumerate(counts) if c}
+        return page, total, class_counts
+
+    def label_of(self, class_id: int) -> str:
+        return self.labels[class_id]
+
+    @property
+    def size(self) -> int:
+        """메모리에 있는 기록 수"""
+        return min(self.total, self.capacity)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "size": self.size,
+            "total_recorded": self.total,
+            "memory_bytes": self.records.nbytes,
+            "spilled_segments": len(self._segments)
+        }
+
+    def close(self):
+        """디스크 segment 삭제"""
+        with self._lock:
+            for _, _, path in self._segments:
+                if os.path.exists(path):
+                    os.remove(path)
+            self._segments = []
+
+
+def _paginate(parts: List[np.ndarray], offset: int, limit: int, newest_first: bool) -> np.ndarray:
+    """시간순 조각들을 이어 붙이지 않고 offset / limit 구간만 복사"""
+    if newest_first:
+        parts = [part[::-1] for part in reversed(parts)]
+    page = []
+    remaining = limit
+    for part in parts:
+        if remaining <= 0:
+            break
+        if offset >= len(part):
+            offset -= len(part)
+            continue
+        taken = part[offset:offset + remaining]
+        page.append(taken)
+        remaining -= len(taken)
+        offset = 0
+    return np.concatenate(page) if page else np.zeros(0, dtype=DETECTION_DTYPE)
+
+
+class HistoryManager:
+    """stream_id → DetectionHistory (기록이 가장 오래된 스트림부터 max_streams 초과분 제거)"""
+
+    def __init__(self, capacity: int = 200_000, max_streams: int = 32,
+                 spill_dir: Optional[str] = None, segment_size: int = 8192):
+        self.capacity = capacity
+        self.max_streams = max_streams
+        self.spill_dir = spill_dir
+        self.segment_size = segment_size
+        self._histories: "OrderedDict[str, DetectionHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, stream_id: str) -> Optional[DetectionHistory]:
+        return self._histories.get(stream_id)
+
+    def record(self, stream_id: str, result: Dict[str, Any]):
+        """탐지 결과(detect_objects 형식) 기록"""
+        objects = result.get("objects") or []
+        if not objects:
+            return
+        with self._lock:
+            history = self._histories.get(stream_id)
+            if history is None:
+                spill_dir = os.path.join(self.spill_dir, stream_id) if self.spill_dir else None
+                history = self._histories[stream_id] = DetectionHistory(
+                    self.capacity, self.segment_size, spill_dir
+                )
+                while len(self._histories) > self.max_streams:
+                    self._histories.popitem(last=False)[1].close()
+            self._histories.move_to_end(stream_id)
+        history.record(result.get("frame_id", 0), time.time(), objects)
+
+    def query(self, stream_id: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None, label: Optional[str] = None,
+              offset: int = 0, limit: int = 100) -> Tuple[List[Dict[str, Any]], int, Dict[str, int]]:
+        """
+        최신순 조회 (stream_id 가 없으면 모든 스트림을 시간순으로 병합)
+
+        Returns:
+            (기록 dict 목록, 조건에 맞는 전체 수, 라벨별 개수)
+        """
+        if stream_id is not None:
+            history = self._histories.get(stream_id)
+            targets = [(stream_id, history)] if history is not None else []
+        else:
+            targets = list(self._histories.items())
+
+        if len(targets) == 1:
+            sid, history = targets[0]
+            page, total, class_counts = history.query(since, until, label, offset, limit)
+            return [item for _, item in _to_items(sid, history, page)], total, class_counts
+
+        total, class_counts, pages = 0, {}, []
+        for sid, history in targets:
+            # 병합 후 잘라내야 하므로 스트림마다 최신 offset + limit 개까지 가져옴
+            page, count, counts = history.query(since, until, label, 0, offset + limit)
+            total += count
+            for name, value in counts.items():
+                class_counts[name] = class_counts.get(name, 0) + value
+            pages.append(_to_items(sid, history, page))
+
+        merged = heapq.merge(*pages, key=lambda pair: pair[0], reverse=True)
+        items = [item for _, item in itertools.islice(merged, offset, offset + limit)]
+        return items, total, class_counts
+
+    def stats(self) -> Dict[str, Any]:
+        return {stream_id: history.stats() for stream_id, history in self._histories.items()}
+
+
+def _to_items(stream_id: str, history: DetectionHistory, page: np.ndarray) -> List[Tuple[float, Dict[str, Any]]]:
+    """(timestamp, 응답 dict) 목록 (timestamp 는 스트림 간 병합 정렬용)"""
+    return [
+        (timestamp, {
+            "stream_id": stream_id,
+            "frame_id": frame_id,
+            "timestamp": datetime.fromtimestamp(timestamp).isoformat(),
+            "label": history.label_of(class_id),
+            "track_id": track_id if track_id >= 0 else None,
+            "confidence": round(confidence, 4),
+            "bbox": {"x": int(x), "y": int(y), "width": int(w), "height": int(h)}
+        })
+        for frame_id, timestamp, class_id, track_id, confidence, (x, y, w, h) in page.tolist()
+    ]
@@ -0,0 +1,267 @@
+# Vision AI MJPEG 출력 스트림 (탐지 결과 오버레이 + 시청자 fan-out)
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from rag_service.core.metrics import StageTimings, metrics
+
+BOUNDARY = "frame"
+MEDIA_TYPE = f"multipart/x-mixed-replace; boundary={BOUNDARY}"
+TEXT_COLOR = (255, 255, 255)
+SCORE_COLOR = (40, 40, 40)  # 신뢰도 패치 배경 (클래스와 무관하게 같은 패치 재사용)
+
+
+def class_palette(count: int = 256) -> np.ndarray:
+    """class_id → BGR 색 (색상환을 황금비 간격으로 돌며 이웃 클래스끼리 색이 겹치지 않게)"""
+    import cv2
+
+    hue = (np.arange(count) * 0.618033988749895 % 1.0 * 180).astype(np.uint8)
+    hsv = np.stack([hue, np.full(count, 200, np.uint8), np.full(count, 230, np.uint8)], axis=-1)
+    return cv2.cvtColor(hsv[None], cv2.COLOR_HSV2BGR)[0]
+
+
+class OverlayRenderer:
+    """
+    탐지 결과 박스 / 라벨을 프레임에 그리는 렌더러
+
+    라벨 글자는 (텍스트, 배경색) 별로 cv2.putText 로 한 번만 그려 패치로 캐시하고 이후에는
+    배열 슬라이스 대입으로 붙인다. 신뢰도는 라벨과 따로 클래스와 무관한 배경의 "85%" 패치로
+    캐시하므로 캐시 크기는 라벨 수 + 101 개 정도로 유지된다. 박스 테두리도 변마다 슬라이스 대입 한 번이다.
+    출력 버퍼는 프레임 크기가 바뀔 때만 새로 만든다 (스트림당 인코딩 스레드 하나가 사용).
+    """
+
+    def __init__(self, font_scale: float = 0.5, thickness: int = 2, cache_size: int = 1024):
+        self.font_scale = font_scale
+        self.thickness = thickness
+        self.cache_size = cache_size
+        self.palette = class_palette()
+        self._glyphs: "OrderedDict[Tuple[str, Tuple[int, int, int]], np.ndarray]" = OrderedDict()
+        self._buffer: Optional[np.ndarray] = None
+        self.glyph_hits = 0
+        self.glyph_misses = 0
+
+    def render(self, frame: np.ndarray, objects: List[Dict[str, Any]],
+               show_bbox: bool = True, show_labels: bool = True) -> np.ndarray:
+        """프레임을 재사용 버퍼로 복사한 뒤 오버레이 (반환 버퍼는 다음 render 에서 덮어씀)"""
+        if self._buffer is None or self._buffer.shape != frame.shape:
+            self._buffer = np.empty_like(frame)
+        out = self._buffer
+        np.copyto(out, frame)
+        height, width = out.shape[:2]
+        t = self.thickness
+        for obj in objects:
+            bbox = obj["bbox"]
+            x1 = min(max(int(bbox["x"]), 0), width - 1)
+            y1 = min(max(int(bbox["y"]), 0), height - 1)
+            x2 = min(max(int(bbox["x"] + bbox["width"]), x1 + 1), width)
+            y2 = min(max(int(bbox["y"] + bbox["height"]), y1 + 1), height)
+            color = self.palette[obj.get("metadata", {}).get("class_id", 0) % len(self.palette)]
+            if show_bbox:
+                out[y1:y1 + t, x1:x2] = color
+                out[max(y2 - t, y1):y2, x1:x2] = color
+                out[y1:y2, x1:x1 + t] = color
+                out[y1:y2, max(x2 - t, x1):x2] = color
+            if show_labels:
+                key = tuple(int(c) for c in color)
+                label = self._glyph(str(obj.get("label", "")), key)
+                score = self._glyph(f"{int(round(obj.get('confidence', 0.0) * 100))}%", SCORE_COLOR)
+                # 박스 위에 붙이고, 위쪽이 모자라면 박스 안쪽 위에
+                top = y1 - label.shape[0] if y1 >= label.shape[0] else y1
+                _paste(out, label, x1, top)
+                _paste(out, score, x1 + label.shape[1], top)
+        return out
+
+    def _glyph(self, text: str, color: Tuple[int, int, int]) -> np.ndarray:
+        key = (text, color)
+        patch = self._glyphs.get(key)
+        if patch is not None:
+            self.glyph_hits += 1
+            self._glyphs.move_to_end(key)
+            return patch
+        import cv2
+
+        self.glyph_misses += 1
+        (text_width, text_height), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, self.font_scale, 1)
+        pad = 3
+        patch = np.empty((text_height + baseline + 2 * pad, text_width + 2 * pad, 3), dtype=np.uint8)
+        patch[:] = color
+        cv2.putText(patch, text, (pad, pad + text_height), cv2.FONT_HERSHEY_SIMPLEX, self.font_scale,
+                    TEXT_COLOR, 1, cv2.LINE_AA)
+        self._glyphs[key] = patch
+        if len(self._glyphs) > self.cache_size:
+            self._glyphs.popitem(last=False)
+        return patch
+
+    def stats(self) -> Dict[str, Any]:
+        return {"glyphs": len(self._glyphs), "glyph_hits": self.glyph_hits, "glyph_misses": self.glyph_misses}
+
+
+def _paste(out: np.ndarray, patch: np.ndarray, x: int, y: int):
+    """patch 를 (x, y) 에 붙임 (프레임 밖으로 나가는 부분은 잘라냄)"""
+    height, width = out.shape[:2]
+    h = min(patch.shape[0], height - y)
+    w = min(patch.shape[1], width - x)
+    if h > 0 and w > 0:
+        out[y:y + h, x:x + w] = patch[:h, :w]
+
+
+class MjpegBroadcaster:
+    """
+    스트림 하나의 MJPEG 출력
+
+    새 탐지 결과가 오면 (시청자가 있을 때만, max_fps 이내로) 인코딩 스레드에서 오버레이를 그리고
+    JPEG 를 한 번 인코딩해 multipart 파트 하나로 만들어 둔다. 시청자들은 같은 bytes 를 그대로 보낸다.
+    인코딩 중에 온 결과는 가장 최신 것 하나만 남기고, 느린 시청자는 보내는 동안 지나간
+    프레임을 건너뛰고 최신 파트로 바로 넘어간다 (시청자별 큐 없음).
+    """
+
+    def __init__(self, stream_id: str, executor: ThreadPoolExecutor, quality: int = 70,
+                 max_fps: float = 15.0, show_bbox: bool = True, show_labels: bool = True):
+        self.stream_id = stream_id
+        self.executor = executor
+        self.quality = quality
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.show_bbox = show_bbox
+        self.show_labels = show_labels
+        self.renderer = OverlayRenderer()
+        self.active = True
+        self.viewers = 0
+
+        self._part: Optional[bytes] = None
+        self._seq = 0
+        self._updated = asyncio.Event()
+        self._encoding = False
+        self._pending: Optional[Tuple[np.ndarray, List[Dict[str, Any]]]] = None
+        self._last_publish = 0.0
+
+        self.frames_encoded = 0
+        self.frames_skipped = 0  # max_fps / 인코딩 중이라 인코딩하지 않은 결과
+        self.viewer_frames_dropped = 0  # 느린 시청자가 건너뛴 프레임 합계
+
+    def publish(self, frame: np.ndarray, objects: List[Dict[str, Any]]):
+        """새 프레임 / 탐지 결과 (이벤트 루프에서 호출, 프레임은 이후 수정되지 않아야 함)"""
+        if not self.active or self.viewers == 0:
+            return
+        now = time.monotonic()
+        if now - self._last_publish < self.min_interval:
+            self.frames_skipped += 1
+            return
+        self._last_publish = now
+        if self._encoding:
+            if self._pending is not None:
+                self.frames_skipped += 1
+            self._pending = (frame, objects)
+            return
+        self._encoding = True
+        asyncio.get_running_loop().create_task(self._encode_loop(frame, objects))
+
+    async def _encode_loop(self, frame: np.ndarray, objects: List[Dict[str, Any]]):
+        loop = asyncio.get_running_loop()
+        try:
+            while self.active:
+                part = await loop.run_in_executor(self.executor, self._encode, frame, objects)
+                if part is not None:
+                    self._set_part(part)
+                if self._pending is None:
+                    break
+                (frame, objects), self._pending = self._pending, None
+        finally:
+            self._encoding = False
+
+    def _encode(self, frame: np.ndarray, objects: List[Dict[str, Any]]) -> Optional[bytes]:
+        import cv2
+
+        timings = StageTimings("vision")
+        with timings.stage("overlay"):
+            image = self.renderer.render(frame, objects, self.show_bbox, self.show_labels)
+        with timings.stage("mjpeg_encode"):
+            ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            return None
+        header = (f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                  f"Content-Length: {encoded.size}\r\n\r\n").encode("ascii")
+        return b"".join((header, encoded.data, b"\r\n"))
+
+    def _set_part(self, part: bytes):
+        self._part = part
+        self._seq += 1
+        self.frames_encoded += 1
+        metrics.inc("vision", "mjpeg_frames_encoded")
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
+
+    async def frames(self) -> AsyncIterator[bytes]:
+        """시청자 한 명의 multipart 파트 스트림 (스트림이 닫히면 끝남)"""
+        self.viewers += 1
+        seen = 0
+        try:
+            while self.active:
+                if self._seq == seen:
+                    await self._updated.wait()
+                    continue
+                if seen and self._seq > seen + 1:
+                    dropped = self._seq - seen - 1
+                    self.viewer_frames_dropped += dropped
+                    metrics.inc("vision", "mjpeg_viewer_frames_dropped", dropped)
+                seen = self._seq
+                yield self._part
+        finally:
+            self.viewers -= 1
+
+    def close(self):
+        self.active = False
+        self._updated.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "viewers": self.viewers,
+            "frames_encoded": self.frames_encoded,
+            "frames_skipped": self.frames_skipped,
+            "viewer_frames_dropped": self.viewer_frames_dropped,
+            **self.renderer.stats()
+        }
+
+
+class MjpegHub:
+    """stream_id → MjpegBroadcaster (인코딩 스레드 풀은 모든 스트림이 공유)"""
+
+    def __init__(self, quality: int = 70, max_fps: float = 15.0, max_viewers: int = 20, workers: int = 2):
+        self.quality = quality
+        self.max_fps = max_fps
+        self.max_viewers = max_viewers
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="vision-mjpeg")
+        self._broadcasters: Dict[str, MjpegBroadcaster] = {}
+
+    def open(self, stream_id: str, show_bbox: bool = True, show_labels: bool = True) -> MjpegBroadcaster:
+        """스트림의 broadcaster (없으면 생성, 시청자 수가 max_viewers 면 OverflowError)"""
+        broadcaster = self._broadcasters.get(stream_id)
+        if broadcaster is None:
+            broadcaster = MjpegBroadcaster(stream_id, self.executor, self.quality, self.max_fps,
+                                           show_bbox, show_labels)
+            self._broadcasters[stream_id] = broadcaster
+        if broadcaster.viewers >= self.max_viewers:
+            raise OverflowError(f"스트림당 최대 시청자 수 ({self.max_viewers}) 초과")
+        return broadcaster
+
+    def publish(self, stream_id: str, frame: np.ndarray, objects: List[Dict[str, Any]]):
+        """시청자가 없는 스트림은 아무것도 하지 않음"""
+        broadcaster = self._broadcasters.get(stream_id)
+        if broadcaster is not None:
+            broadcaster.publish(frame, objects)
+
+    def discard(self, stream_id: str):
+        broadcaster = self._broadcasters.pop(stream_id, None)
+        if broadcaster is not None:
+            broadcaster.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "streams": len(self._broadcasters),
+            "viewers": sum(b.viewers for b in self._broadcasters.values()),
+            "frames_encoded": sum(b.frames_encoded for b in self._broadcasters.values()),
+            "viewer_frames_dropped": sum(b.viewer_frames_dropped for b in self._broadcasters.values())
+        }
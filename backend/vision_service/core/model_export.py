@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Vision 모델 export / compile (ONNX Runtime / OpenVINO CPU 용)
+
+ultralytics 가중치 (.pt) 를 NMS 없는 ONNX 로 내보낸 뒤 정밀도별 변형을 만들고,
+백엔드가 읽는 메타데이터 (<모델 이름>.json: 클래스 이름 / 입력 크기 / 정밀도) 를 옆에 남긴다.
+
+    fp32: ONNX 그대로 (OpenVINO 는 IR 로 변환)
+    fp16: 가중치 FP16 (입출력은 FP32 유지)
+    int8: 보정 이미지로 정적 양자화 (ONNX Runtime QDQ / OpenVINO NNCF)
+
+실행:
+    python -m vision_service.core.model_export --model yolov8n.pt --format onnx --precision int8 \\
+        --calibration data/calibration --output models/
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from vision_service.core.frames import letterbox
+
+FORMATS = ("onnx", "openvino")
+PRECISIONS = ("fp32", "fp16", "int8")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def calibration_batches(calibration_dir: Optional[str], input_size: int,
+                        limit: int = 300, seed: int = 0) -> Iterator[np.ndarray]:
+    """
+    INT8 보정용 (1, 3, S, S) 입력 (추론 때와 같은 letterbox 전처리)
+
+    보정 디렉터리가 없으면 무작위 이미지를 쓰지만 정확도가 크게 떨어지므로 실제 프레임을 권장한다.
+    """
+    import cv2
+
+    paths: List[str] = []
+    if calibration_dir:
+        paths = sorted(path for path in glob.glob(os.path.join(calibration_dir, "**", "*"), recursive=True)
+                       if path.lower().endswith(IMAGE_EXTENSIONS))[:limit]
+    if not paths:
+        print("⚠️ 보정 이미지 없음: 무작위 이미지로 보정 (정확도 손실 큼)")
+        rng = np.random.default_rng(seed)
+        for _ in range(min(limit, 32)):
+            frame = rng.integers(0, 255, (input_size, input_size, 3), dtype=np.uint8)
+            yield letterbox(frame, input_size)[0][None]
+        return
+    for path in paths:
+        frame = cv2.imread(path, cv2.IMREAD_COLOR)
+        if frame is not None:
+            yield letterbox(frame, input_size)[0][None]
+
+
+def export_onnx(model_path: str, output_dir: str, input_size: int) -> Dict[str, Any]:
+    """ultralytics 가중치 → NMS 없는 FP32 ONNX (배치 / 입력 크기 가변)"""
+    from ultralytics import YOLO
+
+    yolo = YOLO(model_path)
+    exported = yolo.export(format="onnx", imgsz=input_size, dynamic=True, simplify=True)
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    target = os.path.join(output_dir, f"{stem}.onnx")
+    if os.path.abspath(exported) != os.path.abspath(target):
+        shutil.move(exported, target)
+    names = yolo.names
+    return {"path": target, "names": {int(k): v for k, v in names.items()}}
+
+
+def convert_onnx(source: str, target: str, precision: str, calibration_dir: Optional[str],
+                 input_size: int):
+    """FP32 ONNX → ONNX Runtime 용 정밀도 변형"""
+    if precision == "fp32":
+        if source != target:
+            shutil.copyfile(source, target)
+    elif precision == "fp16":
+        import onnx
+        from onnxconverter_common import float16
+
+        model = float16.convert_float_to_float16(onnx.load(source), keep_io_types=True)
+        onnx.save(model, target)
+    else:
+        from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType,
+                                              quantize_static)
+        from onnxruntime.quantization.shape_inference import quant_pre_process
+
+        class Reader(CalibrationDataReader):
+            def __init__(self, input_name: str):
+                self.input_name = input_name
+                self.batches = calibration_batches(calibration_dir, input_size)
+
+            def get_next(self):
+                batch = next(self.batches, None)
+                return None if batch is None else {self.input_name: batch}
+
+        import onnxruntime as ort
+
+        preprocessed = target + ".pre.onnx"
+        quant_pre_process(source, preprocessed)
+        input_name = ort.InferenceSession(source, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+        # Detect head 의 마지막 Concat / 좌표 디코딩은 양자화하면 박스 오차가 커서 제외
+        quantize_static(preprocessed, target, Reader(input_name),
+                        quant_format=QuantFormat.QDQ, per_channel=True,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+                        nodes_to_exclude=_head_nodes(preprocessed))
+        os.remove(preprocessed)
+
+
+def _head_nodes(onnx_path: str) -> List[str]:
+    """출력 직전 box 디코딩 구간 (/model.22/ 의 Concat 이후) 노드 이름"""
+    import onnx
+
+    graph = onnx.load(onnx_path).graph
+    return [node.name for node in graph.node
+            if "/model.22/" in node.name and node.op_type in ("Concat", "Mul", "Add", "Sub", "Div", "Sigmoid", "Split")]
+
+
+def convert_openvino(source: str, target: str, precision: str, calibration_dir: Optional[str],
+                     input_size: int):
+    """FP32 ONNX → OpenVINO IR (.xml / .bin)"""
+    import openvino as ov
+
+    model = ov.convert_model(source)
+    if precision == "int8":
+        import nncf
+
+        dataset = nncf.Dataset(list(calibration_batches(calibration_dir, input_size)))
+        model = nncf.quantize(model, dataset, preset=nncf.QuantizationPreset.MIXED,
+                              ignored_scope=nncf.IgnoredScope(patterns=[".*/model.22/.*/(Concat|Mul|Add|Sub|Div)"]))
+    ov.save_model(model, target, compress_to_fp16=precision == "fp16")
+
+
+def write_metadata(model_path: str, metadata: Dict[str, Any]) -> str:
+    path = os.path.splitext(model_path)[0] + ".json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def export(model_path: str, fmt: str = "onnx", precision: str = "fp32", input_size: int = 640,
+           output_dir: str = "models", calibration_dir: Optional[str] = None) -> str:
+    """
+    모델 변환 후 결과 경로 반환
+
+    Args:
+        model_path: ultralytics 가중치 (.pt) 또는 이미 내보낸 FP32 .onnx
+        fmt: onnx (ONNX Runtime) / openvino (IR)
+        precision: fp32 / fp16 / int8
+        input_size: export 입력 크기 (VISION_INPUT_SIZE 와 맞출 것)
+        output_dir: 출력 디렉터리
+        calibration_dir: INT8 보정 이미지 디렉터리
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식: {fmt} (가능: {FORMATS})")
+    if precision not in PRECISIONS:
+        raise ValueError(f"지원하지 않는 정밀도: {precision} (가능: {PRECISIONS})")
+    os.makedirs(output_dir, exist_ok=True)
+
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    if model_path.endswith(".onnx"):
+        from vision_service.core.backends import load_metadata
+        source, names = model_path, load_metadata(model_path).get("names")
+    else:
+        exported = export_onnx(model_path, output_dir, input_size)
+        source, names = exported["path"], exported["names"]
+        write_metadata(source, _metadata(model_path, "onnx", "fp32", input_size, names))
+
+    suffix = "" if precision == "fp32" else f"-{precision}"
+    if fmt == "onnx":
+        target = os.path.join(output_dir, f"{stem}{suffix}.onnx")
+        convert_onnx(source, target, precision, calibration_dir, input_size)
+    else:
+        target = os.path.join(output_dir, f"{stem}{suffix}.xml")
+        convert_openvino(source, target, precision, calibration_dir, input_size)
+
+    write_metadata(target, _metadata(model_path, fmt, precision, input_size, names))
+    return target
+
+
+def _metadata(model_path: str, fmt: str, precision: str, input_size: int, names: Any) -> Dict[str, Any]:
+    return {
+        "source": os.path.basename(model_path),
+        "format": fmt,
+        "precision": precision,
+        "input_size": input_size,
+        "names": names
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vision 모델 export / compile")
+    parser.add_argument("--model", default="yolov8n.pt", help="ultralytics 가중치 또는 FP32 .onnx")
+    parser.add_argument("--format", choices=FORMATS, default="onnx")
+    parser.add_argument("--precision", choices=PRECISIONS, nargs="+", default=["fp32"])
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--calibration", default=None, help="INT8 보정 이미지 디렉터리")
+    parser.add_argument("--output", default="models")
+    args = parser.parse_args()
+
+    for precision in args.precision:
+        target = export(args.model, args.format, precision, args.imgsz, args.output, args.calibration)
+        backend = "onnxruntime" if args.format == "onnx" else "openvino"
+        print(f"✅ {precision}: {target}  (VISION_BACKEND={backend} VISION_MODEL_PATH={target})")
+
+
+if __name__ == "__main__":
+    main()
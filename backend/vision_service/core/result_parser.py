@@ -0,0 +1,101 @@
+# Vision AI Result Parser
+import numpy as np
+from typing import List, Dict, Any, Optional, Sequence, Mapping, Tuple, Union
+
+Names = Union[Mapping[int, str], Sequence[str]]
+
+
+def _to_numpy(value) -> np.ndarray:
+    """torch.Tensor / np.ndarray 를 numpy 배열로 변환 (한 번의 device→host 복사)"""
+    if hasattr(value, "cpu"):
+        value = value.cpu()
+    if hasattr(value, "numpy"):
+        value = value.numpy()
+    return np.asarray(value)
+
+
+def select_indices(conf: np.ndarray,
+                   confidence_threshold: Optional[float] = None,
+                   max_objects: Optional[int] = None) -> np.ndarray:
+    """신뢰도 마스크 + top-k 로 남길 박스 인덱스 계산 (신뢰도 내림차순)"""
+    idx = np.arange(conf.shape[0])
+    if confidence_threshold is not None:
+        idx = idx[conf >= confidence_threshold]
+
+    if max_objects is not None and max_objects < idx.shape[0]:
+        if max_objects <= 0:
+            return idx[:0]
+        # 전체 정렬 대신 argpartition 으로 top-k 만 추림
+        top = np.argpartition(-conf[idx], max_objects - 1)[:max_objects]
+        idx = idx[top]
+
+    return idx[np.argsort(-conf[idx], kind="stable")]
+
+
+def parse_boxes(boxes,
+                names: Names,
+                confidence_threshold: Optional[float] = None,
+                max_objects: Optional[int] = None,
+                start_id: int = 1,
+                scale: float = 1.0,
+                pad: Tuple[int, int] = (0, 0),
+                shape: Optional[Tuple[int, ...]] = None) -> List[Dict[str, Any]]:
+    """
+    YOLO Boxes 결과를 배열 단위로 파싱
+
+    xyxy / conf / cls 를 한 번에 꺼내고, 필터링과 top-k 를 배열 연산으로 끝낸 뒤
+    남은 객체에 대해서만 dict 를 생성한다.
+
+    Args:
+        boxes: ultralytics Boxes (xyxy, conf, cls 속성을 가진 객체)
+        names: class_id → 라벨 이름 매핑
+        confidence_threshold: 최소 신뢰도 (None 이면 필터링 안 함)
+        max_objects: 최대 객체 수 (None 이면 제한 없음)
+        start_id: 첫 객체에 부여할 id
+        scale, pad: letterbox 텐서 좌표 → 원본 좌표 복원 ((xy - pad) / scale)
+        shape: 복원한 좌표를 자를 원본 이미지 (height, width)
+
+    Returns:
+        List[Dict]: 기존 detect_objects 와 동일한 형식의 객체 목록
+    """
+    if boxes is None:
+        return []
+
+    conf = _to_numpy(boxes.conf).reshape(-1).astype(np.float32, copy=False)
+    if conf.shape[0] == 0:
+        return []
+
+    idx = select_indices(conf, confidence_threshold, max_objects)
+    if idx.shape[0] == 0:
+        return []
+
+    xyxy = _to_numpy(boxes.xyxy).reshape(-1, 4)[idx]
+    if scale != 1.0 or pad != (0, 0):
+        xyxy = (xyxy - np.array([pad[0], pad[1], pad[0], pad[1]], dtype=np.float32)) / scale
+        if shape is not None:
+            xyxy = np.clip(xyxy, 0, [shape[1], shape[0], shape[1], shape[0]])
+    cls = _to_numpy(boxes.cls).reshape(-1)[idx].astype(np.int64)
+    conf = conf[idx]
+
+    # int() 와 같은 0 방향 절삭을 배열 단위로 수행
+    corners = xyxy.astype(np.int64)
+    sizes = (xyxy[:, 2:] - xyxy[:, :2]).astype(np.int64)
+    centers = ((xyxy[:, :2] + xyxy[:, 2:]) / 2).astype(np.int64)
+
+    detections = []
+    for i, (class_id, confidence, (x, y), (w, h), center) in enumerate(zip(
+            cls.tolist(), conf.tolist(), corners[:, :2].tolist(),
+            sizes.tolist(), centers.tolist())):
+        detections.append({
+            "id": start_id + i,
+            "label": names[class_id],
+            "confidence": confidence,
+            "bbox": {"x": x, "y": y, "width": w, "height": h},
+            "center": center,
+            "metadata": {
+                "class_id": class_id,
+                "improved_by": []
+            }
+        })
+
+    return detections
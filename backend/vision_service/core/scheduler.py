@@ -0,0 +1,167 @@
+# Vision AI Inference Scheduler
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from rag_service.core.metrics import StageTimings
+
+
+class DetectionTask(NamedTuple):
+    """스케줄러에 제출되는 단일 프레임 탐지 요청"""
+    frame: np.ndarray
+    confidence_threshold: Optional[float] = None
+    max_objects: Optional[int] = None
+    timings: Optional[StageTimings] = None
+    input_size: Optional[int] = None  # 모델 입력 크기 (None 이면 detector 기본값)
+
+
+class InferenceScheduler:
+    """
+    동적 마이크로 배칭 추론 스케줄러
+
+    여러 요청에서 들어온 프레임을 큐에 모아 max_batch_size 에 도달하거나
+    max_wait_ms 가 지나면 하나의 배치로 묶어 전용 워커 스레드에서 실행한다.
+    이벤트 루프는 추론 동안 블로킹되지 않는다.
+    """
+
+    def __init__(self,
+                 batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 8,
+                 max_wait_ms: float = 5.0):
+        """
+        Args:
+            batch_fn: 요청 목록을 받아 같은 순서의 결과 목록을 반환하는 함수
+            max_batch_size: 배치 최대 크기
+            max_wait_ms: 첫 요청 이후 배치를 채우기 위해 기다리는 최대 시간
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        # 모델은 스레드 안전하지 않으므로 워커 스레드는 하나만 사용
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vision-infer")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # 큐에서 꺼내 모으는 중이거나 실행 중인 배치 (종료 시 실패 처리용)
+        self._batch: List[Tuple[Any, asyncio.Future]] = []
+
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """요청을 큐에 넣고 배치 실행 결과를 기다림"""
+        self._ensure_running()
+        future = self._loop.create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def stop(self):
+        """배치 루프 종료 (대기 / 실행 중인 요청은 RuntimeError 로 끝내 호출자가 멈춰 있지 않도록)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        pending = [future for _, future in self._batch]
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait()[1])
+        for future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("vision 추론 스케줄러가 종료됨"))
+        self._batch = []
+        self._task = None
+        self._queue = None
+        self._loop = None
+
+    def stats(self) -> Dict[str, Any]:
+        """배치 통계"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "queue_size": self._queue.qsize() if self._queue is not None else 0
+        }
+
+    def _ensure_running(self):
+        """현재 이벤트 루프에서 배치 루프가 돌고 있도록 보장"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._task = loop.create_task(self._run())
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future]]:
+        """첫 요청을 기다린 뒤 크기/시간 한도까지 배치를 채움"""
+        batch = self._batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # 이미 취소된 요청(클라이언트 연결 종료 등)은 추론하지 않음
+        return [(item, future) for item, future in batch if not future.cancelled()]
+
+    async def _run(self):
+        """배치 수집 → 워커 스레드 실행 → 결과 전달 루프"""
+        while True:
+            batch = self._batch = await self._collect()
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            try:
+                results = await self._loop.run_in_executor(self._executor, self.batch_fn, items)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                self._batch = []
+                continue
+
+            self.batches += 1
+            self.items += len(items)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+            self._batch = []
+
+
+def create_detection_scheduler(get_detector: Callable[[], Any],
+                               max_batch_size: int = 8,
+                               max_wait_ms: float = 5.0) -> InferenceScheduler:
+    """
+    VisionDetector.detect_batch 를 사용하는 스케줄러 생성
+
+    get_detector 는 워커 스레드에서 호출되므로 모델이 아직 로드 중이면
+    이벤트 루프가 아니라 워커가 로드 완료를 기다린다.
+    """
+
+    def batch_fn(tasks: List[DetectionTask]) -> List[Dict[str, Any]]:
+        return get_detector().detect_batch(
+            [task.frame for task in tasks],
+            confidence_thresholds=[task.confidence_threshold for task in tasks],
+            max_objects=[task.max_objects for task in tasks],
+            timings=[task.timings for task in tasks],
+            input_sizes=[task.input_size for task in tasks]
+        )
+
+    return InferenceScheduler(batch_fn, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
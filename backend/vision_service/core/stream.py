@@ -0,0 +1,153 @@
+# Vision AI Stream Session Management
+import asyncio
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from rag_service.core.metrics import metrics
+from vision_service.core.governor import StreamGovernor
+from vision_service.core.tracker import StreamTracker
+
+
+class FpsMeter:
+    """최근 window_sec 동안 처리된 프레임 기준 실측 FPS"""
+
+    def __init__(self, window_sec: float = 2.0):
+        self.window_sec = window_sec
+        self._ticks = deque()
+
+    def tick(self, now: Optional[float] = None):
+        """프레임 하나 처리 완료 기록"""
+        now = time.monotonic() if now is None else now
+        self._ticks.append(now)
+        while self._ticks and now - self._ticks[0] > self.window_sec:
+            self._ticks.popleft()
+
+    @property
+    def fps(self) -> float:
+        if len(self._ticks) < 2:
+            return 0.0
+        span = self._ticks[-1] - self._ticks[0]
+        return (len(self._ticks) - 1) / span if span > 0 else 0.0
+
+
+class StreamSession:
+    """
+    스마트 글래스 한 대의 프레임 스트림 상태
+
+    수신한 프레임은 단일 슬롯에 보관한다. 추론이 밀리면 처리되지 않은 이전 프레임은
+    새 프레임으로 덮어써져 버려지므로, 큐가 쌓이지 않고 지연이 한 프레임 이내로 유지된다.
+    """
+
+    def __init__(self, stream_id: str, config: Dict[str, Any],
+                 tracker: Optional[StreamTracker] = None,
+                 governor: Optional[StreamGovernor] = None):
+        self.stream_id = stream_id
+        self.config = config
+        self.tracker = tracker  # None 이면 매 프레임 전체 탐지
+        self.governor = governor  # None 이면 고정 입력 크기 / 프레임 스킵 없음
+        self.created_at = time.time()
+        self.issued_at = time.monotonic()
+        self.connected = False  # WebSocket 이 한 번이라도 연결되었는지 (연결 기한 판단용)
+        self.active = True
+
+        self._pending: Optional[bytes] = None
+        self._pending_seq = 0
+        self._event = asyncio.Event()
+
+        self.frames_received = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self.fps_meter = FpsMeter()
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    def put_frame(self, data: bytes):
+        """최신 프레임으로 슬롯 교체 (처리 전 프레임은 drop)"""
+        self.frames_received += 1
+        if self._pending is not None:
+            self.frames_dropped += 1
+            metrics.inc("vision", "stream_frames_dropped")
+        self._pending = data
+        self._pending_seq = self.frames_received
+        self._event.set()
+
+    async def next_frame(self) -> Optional[tuple]:
+        """처리할 최신 프레임 (seq, bytes) 대기, 세션 종료 시 None"""
+        while self.active:
+            if self._pending is not None:
+                data, seq = self._pending, self._pending_seq
+                self._pending = None
+                self._event.clear()
+                return seq, data
+            await self._event.wait()
+        return None
+
+    def record_result(self, result: Dict[str, Any]):
+        """처리 결과 기록 및 FPS 갱신"""
+        self.frames_processed += 1
+        self.fps_meter.tick()
+        self.last_result = result
+
+    def close(self):
+        """세션 종료 (대기 중인 처리 루프를 깨움)"""
+        self.active = False
+        self._event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """스트림 통계"""
+        return {
+            "stream_id": self.stream_id,
+            "active": self.active,
+            "config": self.config,
+            "fps": round(self.fps_meter.fps, 2),
+            "frames_received": self.frames_received,
+            "frames_processed": self.frames_processed,
+            "frames_dropped": self.frames_dropped,
+            "tracking": self.tracker.stats() if self.tracker is not None else None,
+            "governor": self.governor.stats() if self.governor is not None else None
+        }
+
+
+class StreamManager:
+    """
+    stream_id → StreamSession 레지스트리
+
+    세션은 WebSocket 연결이 끊기거나 /stream/stop 으로 지워진다. 발급만 받고
+    connect_timeout_sec 안에 연결하지 않은 세션은 expire() 가 지운다.
+    """
+
+    def __init__(self, connect_timeout_sec: float = 60.0):
+        self.connect_timeout_sec = connect_timeout_sec
+        self._sessions: Dict[str, StreamSession] = {}
+
+    def create(self, config: Dict[str, Any], tracker: Optional[StreamTracker] = None,
+               governor_factory: Optional[Callable[[str], StreamGovernor]] = None) -> StreamSession:
+        stream_id = f"stream_{int(time.time())}_{uuid.uuid4().hex[:8]}"
+        governor = governor_factory(stream_id) if governor_factory is not None else None
+        session = StreamSession(stream_id, config, tracker, governor)
+        self._sessions[stream_id] = session
+        return session
+
+    def get(self, stream_id: str) -> Optional[StreamSession]:
+        return self._sessions.get(stream_id)
+
+    def close(self, stream_id: str) -> Optional[StreamSession]:
+        session = self._sessions.pop(stream_id, None)
+        if session is not None:
+            session.close()
+        return session
+
+    def expire(self, now: Optional[float] = None) -> List[StreamSession]:
+        """연결 기한이 지난 미연결 세션 삭제 (호출자가 스트림별 부가 상태를 정리하도록 반환)"""
+        now = time.monotonic() if now is None else now
+        expired = [session for session in self._sessions.values()
+                   if not session.connected and now - session.issued_at > self.connect_timeout_sec]
+        for session in expired:
+            self.close(session.stream_id)
+        if expired:
+            metrics.inc("vision", "stream_sessions_expired", len(expired))
+        return expired
+
+    def list(self):
+        return list(self._sessions.values())
@@ -0,0 +1,352 @@
+# Vision AI Temporal Tracking (SORT 방식 IoU + Kalman)
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from rag_service.core.metrics import StageTimings, metrics
+
+# 등속 모델 상태: [cx, cy, s(면적), r(가로/세로), vcx, vcy, vs]
+_F = np.eye(7, dtype=np.float64)
+_F[0, 4] = _F[1, 5] = _F[2, 6] = 1.0
+_H = np.eye(4, 7, dtype=np.float64)
+_Q = np.eye(7, dtype=np.float64)
+_Q[4:, 4:] *= 0.01
+_Q[6, 6] *= 0.01
+_R = np.eye(4, dtype=np.float64)
+_R[2:, 2:] *= 10.0
+
+# 트랙 예측 결과가 마지막 keyframe 결과에서 그대로 이어받는 필드 (나머지는 프레임마다 새로 만듦)
+_PROPAGATED_FIELDS = ("scene_context", "model_version", "status")
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """xyxy 박스 집합 간 IoU 행렬 (len(a), len(b))"""
+    if a.shape[0] == 0 or b.shape[0] == 0:
+        return np.zeros((a.shape[0], b.shape[0]), dtype=np.float32)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def greedy_match(iou: np.ndarray, threshold: float) -> List[Tuple[int, int]]:
+    """IoU 가 큰 쌍부터 1:1 매칭 (threshold 미만은 매칭하지 않음)"""
+    if iou.size == 0:
+        return []
+    rows, cols = np.nonzero(iou >= threshold)
+    order = np.argsort(-iou[rows, cols], kind="stable")
+    used_rows, used_cols, pairs = set(), set(), []
+    for k in order:
+        r, c = int(rows[k]), int(cols[k])
+        if r not in used_rows and c not in used_cols:
+            used_rows.add(r)
+            used_cols.add(c)
+            pairs.append((r, c))
+    return pairs
+
+
+def _to_z(box: np.ndarray) -> np.ndarray:
+    w, h = box[2] - box[0], box[3] - box[1]
+    return np.array([box[0] + w / 2, box[1] + h / 2, w * h, w / max(h, 1e-6)])
+
+
+def _to_box(x: np.ndarray) -> np.ndarray:
+    s, r = max(x[2], 0.0), max(x[3], 1e-6)
+    w = np.sqrt(s * r)
+    h = s / max(w, 1e-6)
+    return np.array([x[0] - w / 2, x[1] - h / 2, x[0] + w / 2, x[1] + h / 2])
+
+
+class Track:
+    """Kalman 필터로 위치를 예측하는 객체 하나"""
+
+    def __init__(self, track_id: int, box: np.ndarray, detection: Dict[str, Any]):
+        self.track_id = track_id
+        self.x = np.zeros(7)
+        self.x[:4] = _to_z(box)
+        self.P = np.eye(7) * 10.0
+        self.P[4:, 4:] *= 1000.0  # 초기 속도는 모름
+        self.detection = detection
+        self.hits = 1
+        self.misses = 0  # 연속으로 매칭되지 않은 keyframe 수
+        self.frames_since_update = 0
+
+    @property
+    def box(self) -> np.ndarray:
+        return _to_box(self.x)
+
+    def predict(self):
+        if self.x[2] + self.x[6] <= 0:
+            self.x[6] = 0.0
+        self.x = _F @ self.x
+        self.P = _F @ self.P @ _F.T + _Q
+        self.frames_since_update += 1
+
+    def update(self, box: np.ndarray, detection: Dict[str, Any]):
+        y = _to_z(box) - _H @ self.x
+        S = _H @ self.P @ _H.T + _R
+        K = self.P @ _H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(7) - K @ _H) @ self.P
+        self.detection = detection
+        self.hits += 1
+        self.misses = 0
+        self.frames_since_update = 0
+
+
+class ObjectTracker:
+    """
+    SORT 방식 다중 객체 추적기
+
+    매 프레임 predict() 로 모든 트랙을 한 스텝 전진시키고, 탐지 결과가 있는 프레임에서는
+    update() 로 IoU 매칭해 트랙을 보정한다. 매칭된 탐지는 트랙의 ID 를 물려받으므로
+    스트림 안에서 같은 객체는 같은 ID 를 유지한다.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_misses: int = 2,
+                 confidence_decay: float = 0.95):
+        """
+        Args:
+            iou_threshold: 트랙-탐지 매칭 최소 IoU
+            max_misses: 연속으로 이 횟수보다 많이 탐지에서 빠지면 트랙 삭제
+            confidence_decay: 탐지 없이 예측만 한 프레임마다 신뢰도에 곱하는 값
+        """
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.confidence_decay = confidence_decay
+        self.tracks: List[Track] = []
+        self._next_id = 1
+
+    def predict(self):
+        for track in self.tracks:
+            track.predict()
+
+    def update(self, detections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """predict() 이후 호출. 탐지 결과에 트랙 ID 를 붙여 반환"""
+        boxes = _boxes_of(detections)
+        predicted = np.array([t.box for t in self.tracks]).reshape(-1, 4)
+        iou = iou_matrix(predicted, boxes)
+        # 다른 클래스끼리는 매칭하지 않음
+        same_label = np.array([[t.detection["label"] == d["label"] for d in detections] for t in self.tracks],
+                              dtype=bool).reshape(iou.shape)
+        pairs = greedy_match(np.where(same_label, iou, 0.0), self.iou_threshold)
+        pairs += self._match_by_distance(predicted, boxes, same_label, pairs)
+
+        assigned: Dict[int, Track] = {}
+        for t, d in pairs:
+            self.tracks[t].update(boxes[d], detections[d])
+            assigned[d] = self.tracks[t]
+        for track in self.tracks:
+            if track.frames_since_update > 0:
+                track.misses += 1
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+
+        for d, detection in enumerate(detections):
+            if d not in assigned:
+                assigned[d] = Track(self._next_id, boxes[d], detection)
+                self.tracks.append(assigned[d])
+                self._next_id += 1
+
+        # 탐지 결과 순서(신뢰도 내림차순) 유지
+        return [self._render(assigned[d]) for d in range(len(detections))]
+
+    @staticmethod
+    def _match_by_distance(predicted: np.ndarray, boxes: np.ndarray, same_label: np.ndarray,
+                           pairs: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+        IoU 로 못 맞춘 나머지를 중심 거리로 한 번 더 매칭
+
+        keyframe 간격이 길면 방향이 바뀐 객체(벽에 튕김 등)의 예측 박스가 실제와
+        겹치지 않을 수 있다. 예측 박스 대각선 길이 안에 있는 같은 라벨 탐지를 잇는다.
+        """
+        rows = sorted(set(range(predicted.shape[0])) - {t for t, _ in pairs})
+        cols = sorted(set(range(boxes.shape[0])) - {d for _, d in pairs})
+        if not rows or not cols:
+            return []
+        p, b = predicted[rows], boxes[cols]
+        p_center = (p[:, :2] + p[:, 2:]) / 2
+        b_center = (b[:, :2] + b[:, 2:]) / 2
+        diagonal = np.linalg.norm(p[:, 2:] - p[:, :2], axis=1)
+        distance = np.linalg.norm(p_center[:, None] - b_center[None], axis=2) / np.maximum(diagonal[:, None], 1e-6)
+        # 가까울수록 큰 점수 (1 - 거리/대각선), 다른 라벨은 0
+        score = np.where(same_label[np.ix_(rows, cols)], 1.0 - distance, 0.0)
+        return [(rows[r], cols[c]) for r, c in greedy_match(score, 1e-6)]
+
+    def propagate(self, frame_shape: Optional[Tuple[int, ...]] = None) -> List[Dict[str, Any]]:
+        """predict() 이후 호출. 탐지 없이 예측 위치로 객체 목록 생성"""
+        objects = []
+        for track in self.tracks:
+            obj = self._render(track, frame_shape)
+            if obj is not None:
+                objects.append(obj)
+        return objects
+
+    def min_confidence(self) -> float:
+        """현재 트랙 중 가장 낮은 (감쇠 반영) 신뢰도, 트랙이 없으면 0"""
+        if not self.tracks:
+            return 0.0
+        return min(self._confidence(t) for t in self.tracks)
+
+    def _confidence(self, track: Track) -> float:
+        return track.detection["confidence"] * self.confidence_decay ** track.frames_since_update
+
+    def _render(self, track: Track, frame_shape: Optional[Tuple[int, ...]] = None) -> Optional[Dict[str, Any]]:
+        """트랙을 detect_objects 와 같은 형식의 dict 로 변환 (id 는 트랙 ID)"""
+        if track.frames_since_update == 0:
+            obj = dict(track.detection)
+            obj["id"] = track.track_id
+            obj["metadata"] = {**obj.get("metadata", {}), "track_id": track.track_id}
+            return obj
+
+        x1, y1, x2, y2 = track.box.tolist()
+        if frame_shape is not None:
+            x1, x2 = max(x1, 0.0), min(x2, float(frame_shape[1]))
+            y1, y2 = max(y1, 0.0), min(y2, float(frame_shape[0]))
+        if x2 - x1 < 1 or y2 - y1 < 1:
+            return None  # 화면 밖으로 나감
+
+        metadata = track.detection.get("metadata", {})
+        return {
+            "id": track.track_id,
+            "label": track.detection["label"],
+            "confidence": round(self._confidence(track), 4),
+            "bbox": {"x": int(x1), "y": int(y1), "width": int(x2 - x1), "height": int(y2 - y1)},
+            "center": [int((x1 + x2) / 2), int((y1 + y2) / 2)],
+            "metadata": {
+                **metadata,
+                "track_id": track.track_id,
+                "improved_by": [*metadata.get("improved_by", []), "tracker"]
+            }
+        }
+
+
+def _boxes_of(detections: List[Dict[str, Any]]) -> np.ndarray:
+    boxes = np.array([
+        [d["bbox"]["x"], d["bbox"]["y"],
+         d["bbox"]["x"] + d["bbox"]["width"], d["bbox"]["y"] + d["bbox"]["height"]]
+        for d in detections
+    ], dtype=np.float64)
+    return boxes.reshape(-1, 4)
+
+
+class StreamTracker:
+    """
+    스트림별 keyframe 추적
+
+    N 프레임마다, 또는 장면 움직임이 크거나 트랙 신뢰도가 떨어졌을 때만 YOLO 를 돌리고
+    그 사이 프레임은 트랙 예측 위치로 결과를 만든다.
+    """
+
+    def __init__(self, keyframe_interval: int = 5, motion_threshold: float = 12.0,
+                 min_confidence: float = 0.25, iou_threshold: float = 0.3, max_misses: int = 2):
+        """
+        Args:
+            keyframe_interval: 최소 이 간격마다 전체 탐지 (1 이면 매 프레임 탐지)
+            motion_threshold: 마지막 keyframe 대비 축소 흑백 이미지 평균 차이 (0~255)
+            min_confidence: 트랙 신뢰도가 이보다 떨어지면 탐지
+        """
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.motion_threshold = motion_threshold
+        self.min_confidence = min_confidence
+        self.tracker = ObjectTracker(iou_threshold=iou_threshold, max_misses=max_misses)
+
+        self.frames = 0
+        self.keyframes = 0
+        self._since_keyframe = 0
+        self._keyframe_thumb: Optional[np.ndarray] = None
+        self._last_result: Optional[Dict[str, Any]] = None
+        self.last_reason: Optional[str] = None
+
+    def needs_detection(self, frame: Optional[np.ndarray]) -> bool:
+        """이번 프레임에서 YOLO 를 돌려야 하는지 판단 (이유는 last_reason)"""
+        self.frames += 1
+        self._since_keyframe += 1
+        self.tracker.predict()
+
+        if self._last_result is None:
+            reason = "first"
+        elif self._since_keyframe >= self.keyframe_interval:
+            reason = "interval"
+        elif self.tracker.tracks and self.tracker.min_confidence() < self.min_confidence:
+            reason = "confidence"
+        elif frame is not None and self._motion(frame) > self.motion_threshold:
+            reason = "motion"
+        else:
+            reason = None
+
+        self.last_reason = reason
+        return reason is not None
+
+    def update(self, result: Dict[str, Any], frame: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """keyframe 탐지 결과에 영속 ID 를 붙임"""
+        self.keyframes += 1
+        self._since_keyframe = 0
+        if frame is not None:
+            self._keyframe_thumb = _thumbnail(frame)
+        result["objects"] = self.tracker.update(result.get("objects", []))
+        result["tracking"] = self._tracking_info(keyframe=True)
+        self._last_result = result
+        metrics.inc("vision", "tracker_keyframes")
+        return result
+
+    def propagate(self, frame_shape: Tuple[int, ...], timings: Optional[StageTimings] = None) -> Dict[str, Any]:
+        """탐지 없이 트랙 예측 위치로 결과 생성"""
+        timings = timings or StageTimings("vision")
+        with timings.stage("track"):
+            objects = self.tracker.propagate(frame_shape)
+        metrics.inc("vision", "tracker_propagated")
+        processing_time_ms = timings.total_ms
+        # keyframe 결과에서는 모델 / 장면 정보만 이어받음 (frame_cache, cascade 같은 프레임별 필드는 제외)
+        carried = {key: self._last_result[key] for key in _PROPAGATED_FIELDS if key in self._last_result}
+        return {
+            **carried,
+            "frame_id": int(datetime.now().timestamp() * 1000),
+            "timestamp": datetime.now().isoformat(),
+            "fps": round(1000.0 / processing_time_ms, 2) if processing_time_ms > 0 else 0.0,
+            "resolution": [frame_shape[1], frame_shape[0]],
+            "objects": objects,
+            "processing_time_ms": round(processing_time_ms, 3),
+            "timings_ms": timings.as_dict(),
+            "tracking": self._tracking_info(keyframe=False)
+        }
+
+    @property
+    def effective_detection_rate(self) -> float:
+        """전체 처리 프레임 중 실제로 YOLO 를 돌린 비율"""
+        return self.keyframes / self.frames if self.frames else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "frames": self.frames,
+            "keyframes": self.keyframes,
+            "effective_detection_rate": round(self.effective_detection_rate, 4),
+            "active_tracks": len(self.tracker.tracks)
+        }
+
+    def _tracking_info(self, keyframe: bool) -> Dict[str, Any]:
+        return {
+            "keyframe": keyframe,
+            "reason": self.last_reason,
+            "effective_detection_rate": round(self.effective_detection_rate, 4)
+        }
+
+    def _motion(self, frame: np.ndarray) -> float:
+        if self._keyframe_thumb is None:
+            return 0.0
+        thumb = _thumbnail(frame)
+        if thumb.shape != self._keyframe_thumb.shape:
+            return float("inf")
+        return float(np.abs(thumb - self._keyframe_thumb).mean())
+
+
+def _thumbnail(frame: np.ndarray, step: int = 16) -> np.ndarray:
+    """움직임 비교용 축소 흑백 이미지 (단순 샘플링, 복사 최소화)"""
+    sampled = frame[::step, ::step]
+    if sampled.ndim == 3:
+        return sampled.mean(axis=2, dtype=np.float32)
+    return sampled.astype(np.float32)
@@ -0,0 +1,475 @@
+# Vision AI Video Jobs (녹화 영상 일괄 분석)
+import asyncio
+import json
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from rag_service.core.metrics import StageTimings, metrics
+from vision_service.core.encoding import JSON, encode_result
+from vision_service.core.scheduler import DetectionTask
+
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED, INTERRUPTED = (
+    "queued", "running", "completed", "failed", "cancelled", "interrupted")
+ACTIVE = (QUEUED, RUNNING)
+RESUMABLE = (FAILED, CANCELLED, INTERRUPTED)
+
+JOB_FILE = "job.json"
+RESULTS_FILE = "results.ndjson"
+COPY_CHUNK = 1 << 20
+
+
+class VideoJob:
+    """
+    영상 분석 작업 상태
+
+    job.json 에 저장되는 값이 곧 체크포인트다. next_frame / processed / results_bytes 는
+    results.ndjson 의 앞 results_bytes 바이트와 항상 맞게 저장되므로, 재개할 때는
+    결과 파일을 그 길이로 자르고 영상의 next_frame 번째 프레임부터 다시 읽는다.
+    """
+
+    FIELDS = ("job_id", "filename", "video", "status", "stride", "confidence_threshold", "max_objects",
+              "max_frames", "video_fps", "frames_total", "width", "height", "next_frame", "processed",
+              "objects", "results_bytes", "active_sec", "created_at", "started_at", "finished_at", "error",
+              "resumed")
+
+    def __init__(self, **values: Any):
+        self.job_id: str = values["job_id"]
+        self.filename: str = values.get("filename", "")
+        self.video: str = values["video"]
+        self.status: str = values.get("status", QUEUED)
+        self.stride: int = max(1, int(values.get("stride", 1)))
+        self.confidence_threshold: Optional[float] = values.get("confidence_threshold")
+        self.max_objects: Optional[int] = values.get("max_objects")
+        self.max_frames: Optional[int] = values.get("max_frames")
+        self.video_fps: float = values.get("video_fps", 0.0)
+        self.frames_total: int = values.get("frames_total", 0)
+        self.width: int = values.get("width", 0)
+        self.height: int = values.get("height", 0)
+        self.next_frame: int = values.get("next_frame", 0)
+        self.processed: int = values.get("processed", 0)
+        self.objects: int = values.get("objects", 0)
+        self.results_bytes: int = values.get("results_bytes", 0)
+        self.active_sec: float = values.get("active_sec", 0.0)
+        self.created_at: str = values.get("created_at") or datetime.now().isoformat()
+        self.started_at: Optional[str] = values.get("started_at")
+        self.finished_at: Optional[str] = values.get("finished_at")
+        self.error: Optional[str] = values.get("error")
+        self.resumed: int = values.get("resumed", 0)
+
+    @property
+    def frames_to_process(self) -> int:
+        """분석할 프레임 수 (영상 헤더의 프레임 수 기준 추정)"""
+        frames = -(-self.frames_total // self.stride) if self.frames_total else 0
+        return min(frames, self.max_frames) if self.max_frames else frames
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def describe(self) -> Dict[str, Any]:
+        """API 응답용 상태 (진행률 / 처리 속도 포함)"""
+        total = self.frames_to_process
+        info = {key: value for key, value in self.to_dict().items() if key not in ("video", "results_bytes")}
+        info.update({
+            "frames_to_process": total,
+            "progress": round(min(self.processed / total, 1.0), 4) if total else None,
+            "frames_per_sec": round(self.processed / self.active_sec, 2) if self.active_sec > 0 else 0.0
+        })
+        return info
+
+
+class VideoJobManager:
+    """
+    영상 일괄 분석 작업 관리자
+
+    업로드한 영상을 디스크에 두고, 작업마다 프레임을 순서대로 디코딩해 (stride 간격으로 골라)
+    batch_size 개씩 탐지 함수 (추론 스케줄러 / 워커 풀의 submit) 에 넣는다. 다음 묶음 디코딩은
+    현재 묶음 추론과 겹쳐 진행하므로 메모리에는 최대 두 묶음의 프레임만 있다.
+
+    동시에 실행하는 작업은 max_concurrent 개로 제한하고 작업당 대기 중인 프레임도 batch_size 개라,
+    실시간 스트림 프레임이 같은 스케줄러 배치에 계속 들어갈 수 있다.
+    결과는 프레임마다 NDJSON 한 줄로 results.ndjson 에 추가하고, checkpoint_every 프레임마다
+    job.json 에 체크포인트를 남긴다.
+    """
+
+    def __init__(self, job_dir: str, detect: Callable[[DetectionTask], Awaitable[Dict[str, Any]]],
+                 max_concurrent: int = 1, batch_size: int = 4, checkpoint_every: int = 200,
+                 max_upload_bytes: int = 2 << 30):
+        """
+        Args:
+            job_dir: 작업별 디렉터리 (영상 / job.json / results.ndjson) 를 둘 곳
+            detect: DetectionTask → 탐지 결과 코루틴 함수
+            max_concurrent: 동시에 실행할 작업 수
+            batch_size: 작업당 한 번에 탐지에 넣는 프레임 수
+            checkpoint_every: 체크포인트 간격 (분석한 프레임 수)
+            max_upload_bytes: 업로드 영상 최대 크기
+        """
+        self.job_dir = job_dir
+        self.detect = detect
+        self.max_concurrent = max(1, max_concurrent)
+        self.batch_size = max(1, batch_size)
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.max_upload_bytes = max_upload_bytes
+        self.jobs: Dict[str, VideoJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._stopping = False
+        # 디코딩 스레드 (작업마다 자기 VideoCapture 를 순서대로 사용)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="vision-video")
+
+    # -------------------------------------------
+    # 작업 생성 / 조회
+    # -------------------------------------------
+
+    def save_upload(self, source: BinaryIO, filename: str) -> Tuple[str, str]:
+        """
+        업로드 스트림을 새 작업 디렉터리로 복사 (동기, 크기 초과면 ValueError)
+
+        Returns:
+            (job_id, 영상 경로)
+        """
+        job_id = uuid.uuid4().hex[:12]
+        directory = os.path.join(self.job_dir, job_id)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "video" + (os.path.splitext(filename)[1].lower() or ".mp4"))
+        size = 0
+        try:
+            with open(path, "wb") as f:
+                while True:
+                    chunk = source.read(COPY_CHUNK)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_upload_bytes:
+                        raise ValueError(f"영상이 너무 큽니다 (최대 {self.max_upload_bytes >> 20} MB)")
+                    f.write(chunk)
+        except Exception:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+        return job_id, path
+
+    async def create(self, job_id: str, video: str, filename: str = "", stride: int = 1,
+                     confidence_threshold: Optional[float] = None, max_objects: Optional[int] = None,
+                     max_frames: Optional[int] = None) -> VideoJob:
+        """저장된 영상으로 작업 생성 후 실행 예약 (영상을 열 수 없으면 ValueError, 디렉터리 삭제)"""
+        try:
+            info = await asyncio.get_running_loop().run_in_executor(self._executor, probe_video, video)
+        except ValueError:
+            shutil.rmtree(os.path.dirname(video), ignore_errors=True)
+            raise
+        job = VideoJob(job_id=job_id, video=video, filename=filename, stride=stride,
+                       confidence_threshold=confidence_threshold, max_objects=max_objects,
+                       max_frames=max_frames, **info)
+        self.jobs[job.job_id] = job
+        self._save(job)
+        self._start(job)
+        return job
+
+    def get(self, job_id: str) -> VideoJob:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [job.describe() for job in sorted(self.jobs.values(), key=lambda job: job.created_at, reverse=True)]
+
+    def results_path(self, job: VideoJob) -> str:
+        return os.path.join(os.path.dirname(job.video), RESULTS_FILE)
+
+    # -------------------------------------------
+    # 실행 제어
+    # -------------------------------------------
+
+    def resume(self, job_id: str) -> VideoJob:
+        """실패 / 취소 / 중단된 작업을 마지막 체크포인트부터 다시 실행"""
+        job = self.get(job_id)
+        if job.status not in RESUMABLE:
+            raise ValueError(f"재개할 수 없는 상태입니다: {job.status}")
+        job.status = QUEUED
+        job.error = None
+        job.resumed += 1
+        self._save(job)
+        self._start(job)
+        return job
+
+    async def cancel(self, job_id: str) -> VideoJob:
+        """실행 / 대기 중인 작업 취소 (체크포인트가 남으므로 resume 가능)"""
+        job = self.get(job_id)
+        task = self._tasks.get(job_id)
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        return job
+
+    async def delete(self, job_id: str):
+        """작업 취소 후 영상 / 결과 삭제"""
+        job = self.get(job_id)
+        await self.cancel(job_id)
+        del self.jobs[job_id]
+        shutil.rmtree(os.path.dirname(job.video), ignore_errors=True)
+
+    def recover(self, resume: bool = True) -> int:
+        """
+        시작 시 job_dir 의 작업 복원
+
+        종료 (stop) 로 중단됐거나 프로세스가 죽어 실행 / 대기 상태로 남은 작업은 interrupted 로 두고,
+        resume=True 면 체크포인트부터 다시 실행한다. 사용자가 취소한 작업은 그대로 둔다.
+
+        Returns:
+            다시 실행한 작업 수
+        """
+        if os.path.isdir(self.job_dir):
+            for name in sorted(os.listdir(self.job_dir)):
+                path = os.path.join(self.job_dir, name, JOB_FILE)
+                if name in self.jobs or not os.path.exists(path):
+                    continue
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        job = VideoJob(**json.load(f))
+                except (OSError, ValueError, KeyError):
+                    continue
+                if job.status in ACTIVE:
+                    job.status = INTERRUPTED
+                    self._save(job)
+                self.jobs[job.job_id] = job
+        restarted = 0
+        for job in list(self.jobs.values()):
+            if resume and job.status == INTERRUPTED and job.job_id not in self._tasks:
+                self.resume(job.job_id)
+                restarted += 1
+        return restarted
+
+    async def stop(self):
+        """실행 중인 작업을 체크포인트를 남기고 중단 (다음 시작 때 recover 로 재개)"""
+        self._stopping = True
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._stopping = False
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "max_concurrent": self.max_concurrent,
+            "batch_size": self.batch_size,
+            "jobs_by_status": counts
+        }
+
+    def _start(self, job: VideoJob):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._tasks[job.job_id] = asyncio.get_running_loop().create_task(self._run(job))
+
+    # -------------------------------------------
+    # 작업 실행
+    # -------------------------------------------
+
+    async def _run(self, job: VideoJob):
+        loop = asyncio.get_running_loop()
+        capture, results, reading = None, None, None
+        try:
+            async with self._slots:
+                job.status = RUNNING
+                job.started_at = job.started_at or datetime.now().isoformat()
+                self._save(job)
+                capture = await loop.run_in_executor(self._executor, _open_at, job.video, job.next_frame)
+                results = open(self.results_path(job), "ab")
+                # 체크포인트 이후에 쓴 결과는 버리고 체크포인트 위치부터 다시 씀
+                results.truncate(job.results_bytes)
+                results.seek(job.results_bytes)
+
+                checkpointed = job.processed
+                reading = self._executor.submit(self._read_batch, capture, job, job.processed)
+                while True:
+                    batch, position = await asyncio.wrap_future(reading)
+                    if not batch:
+                        break
+                    started = time.perf_counter()
+                    # 다음 묶음 디코딩을 이번 묶음 추론과 겹쳐 진행
+                    reading = self._executor.submit(self._read_batch, capture, job, job.processed + len(batch))
+                    outputs = await asyncio.gather(*(
+                        self.detect(DetectionTask(frame, confidence_threshold=job.confidence_threshold,
+                                                  max_objects=job.max_objects, timings=StageTimings("vision")))
+                        for _, frame in batch
+                    ))
+                    results.write(b"".join(self._line(job, index, output)
+                                           for (index, _), output in zip(batch, outputs)))
+                    results.flush()
+                    job.processed += len(batch)
+                    job.objects += sum(len(output.get("objects", [])) for output in outputs)
+                    job.next_frame = position
+                    job.active_sec += time.perf_counter() - started
+                    metrics.inc("vision", "video_frames", len(batch))
+                    if job.processed - checkpointed >= self.checkpoint_every:
+                        job.results_bytes = results.tell()
+                        self._save(job)
+                        checkpointed = job.processed
+
+                job.status = COMPLETED
+                job.finished_at = datetime.now().isoformat()
+        except asyncio.CancelledError:
+            job.status = INTERRUPTED if self._stopping else CANCELLED
+            raise
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+        finally:
+            if results is not None:
+                results.flush()
+                job.results_bytes = results.tell()
+                results.close()
+            if capture is not None:
+                # 디코딩 스레드가 아직 읽는 중일 수 있으므로 읽기가 끝난 뒤 해제
+                if reading is not None:
+                    reading.add_done_callback(lambda _: capture.release())
+                else:
+                    capture.release()
+            self._save(job)
+            self._tasks.pop(job.job_id, None)
+
+    def _read_batch(self, capture, job: VideoJob, processed: int) -> Tuple[List[Tuple[int, np.ndarray]], int]:
+        """
+        다음 batch_size 개 분석 프레임 디코딩 (건너뛸 프레임은 grab 만 해서 디코딩 생략)
+
+        Returns:
+            ([(영상 프레임 번호, BGR 프레임)], 다음에 읽을 프레임 번호)
+        """
+        import cv2
+
+        limit = self.batch_size
+        if job.max_frames:
+            limit = min(limit, job.max_frames - processed)
+        position = int(capture.get(cv2.CAP_PROP_POS_FRAMES))
+        batch = []
+        timings = StageTimings("vision")
+        while len(batch) < limit:
+            if position % job.stride:
+                if not capture.grab():
+                    break
+                position += 1
+                continue
+            with timings.stage("video_decode"):
+                ok, frame = capture.read()
+            if not ok:
+                break
+            batch.append((position, frame))
+            position += 1
+        return batch, position
+
+    @staticmethod
+    def _line(job: VideoJob, index: int, result: Dict[str, Any]) -> bytes:
+        record = {
+            "type": "frame",
+            "frame_index": index,
+            "timestamp_sec": round(index / job.video_fps, 3) if job.video_fps else None,
+            "objects": result.get("objects", []),
+            "processing_time_ms": result.get("processing_time_ms"),
+            "status": result.get("status")
+        }
+        return encode_result(record, JSON) + b"\n"
+
+    def _save(self, job: VideoJob):
+        """job.json 원자적 저장"""
+        path = os.path.join(os.path.dirname(job.video), JOB_FILE)
+        temp = path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(job.to_dict(), f, ensure_ascii=False)
+        os.replace(temp, path)
+
+    # -------------------------------------------
+    # 결과 스트리밍
+    # -------------------------------------------
+
+    async def stream(self, job_id: str, offset: int = 0, follow: bool = True,
+                     poll_sec: float = 0.2, progress_sec: float = 1.0) -> AsyncIterator[bytes]:
+        """
+        작업 상태 + 프레임 결과 NDJSON 스트림
+
+        첫 줄은 {"type": "job"}, 이후 results.ndjson 의 offset 번째 줄부터 프레임 결과를 보내고,
+        follow=True 면 작업이 끝날 때까지 새 결과와 주기적인 {"type": "progress"} 를 보낸 뒤
+        {"type": "end"} 로 끝난다.
+        """
+        job = self.get(job_id)
+        yield _event("job", job)
+        path = self.results_path(job)
+        position, skipped, pending = 0, 0, b""
+        last_progress = time.monotonic()
+        while True:
+            finished = job.status not in ACTIVE
+            chunk = await asyncio.get_running_loop().run_in_executor(None, _read_from, path, position)
+            if chunk:
+                position += len(chunk)
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    if skipped < offset:
+                        skipped += 1
+                        continue
+                    yield line + b"\n"
+                continue
+            if finished or not follow:
+                break
+            if time.monotonic() - last_progress >= progress_sec:
+                last_progress = time.monotonic()
+                yield _event("progress", job)
+            await asyncio.sleep(poll_sec)
+        yield _event("end", job)
+
+
+def probe_video(video: str) -> Dict[str, Any]:
+    """영상 헤더 정보 (열 수 없거나 첫 프레임이 없으면 ValueError)"""
+    import cv2
+
+    capture = cv2.VideoCapture(video)
+    try:
+        if not capture.isOpened() or not capture.grab():
+            raise ValueError("영상을 열 수 없습니다 (지원하지 않는 형식이거나 손상된 파일)")
+        return {
+            "video_fps": float(capture.get(cv2.CAP_PROP_FPS) or 0.0),
+            "frames_total": int(capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0),
+            "width": int(capture.get(cv2.CAP_PROP_FRAME_WIDTH) or 0),
+            "height": int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
+        }
+    finally:
+        capture.release()
+
+
+def _open_at(video: str, frame_index: int):
+    """영상을 열고 frame_index 번째 프레임 앞에 위치 (seek 가 정확하지 않으면 처음부터 grab)"""
+    import cv2
+
+    capture = cv2.VideoCapture(video)
+    if not capture.isOpened():
+        raise RuntimeError(f"영상을 열 수 없습니다: {video}")
+    if frame_index > 0:
+        capture.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        if int(capture.get(cv2.CAP_PROP_POS_FRAMES)) != frame_index:
+            capture.release()
+            capture = cv2.VideoCapture(video)
+            for _ in range(frame_index):
+                if not capture.grab():
+                    break
+    return capture
+
+
+def _read_from(path: str, position: int, limit: int = 1 << 20) -> bytes:
+    try:
+        with open(path, "rb") as f:
+            f.seek(position)
+            return f.read(limit)
+    except FileNotFoundError:
+        return b""
+
+
+def _event(kind: str, job: VideoJob) -> bytes:
+    return encode_result({"type": kind, **job.describe()}, JSON) + b"\n"
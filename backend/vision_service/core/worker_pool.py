@@ -0,0 +1,543 @@
+# Vision AI Multi-Process Worker Pool
+import asyncio
+import importlib
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import get_context, shared_memory
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from rag_service.core.metrics import StageTimings, metrics
+from vision_service.core.frames import PreparedFrame
+from vision_service.core.scheduler import DetectionTask
+
+logger = logging.getLogger(__name__)
+
+# 워커 재시작 중이라 빈 슬롯이 없을 때 다시 확인하는 간격
+CLAIM_RETRY_SEC = 0.01
+
+
+class _FrameMessage(NamedTuple):
+    """API 프로세스 → 워커로 보내는 요청 (프레임 픽셀은 공유 메모리 슬롯에)"""
+    task_id: int
+    slot: int
+    dtype: str
+    shape: Tuple[int, ...]
+    prepared: Optional[Tuple[Tuple[int, ...], float, Tuple[int, int]]]  # (원본 shape, scale, pad)
+    confidence_threshold: Optional[float]
+    max_objects: Optional[int]
+    payload: Optional[np.ndarray] = None  # 슬롯보다 큰 프레임만 직접 전송
+    input_size: Optional[int] = None
+
+
+class _InFlight:
+    """워커가 처리 중인 요청"""
+
+    def __init__(self, worker: "_Worker", message: _FrameMessage, future: Future,
+                 timings: StageTimings):
+        self.worker = worker
+        self.message = message
+        self.future = future
+        self.timings = timings
+        self.sent_at = time.perf_counter()
+        self.attempts = 1
+
+
+def resolve_factory(spec: str) -> Callable[[], Any]:
+    """"package.module:callable" 형식의 detector 팩토리 경로를 import"""
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _frame_view(buffer, slot_bytes: int, message: _FrameMessage):
+    """공유 메모리 슬롯 위의 numpy view (복사 없음)"""
+    if message.payload is not None:
+        array = message.payload
+    else:
+        array = np.ndarray(message.shape, dtype=np.dtype(message.dtype),
+                           buffer=buffer, offset=message.slot * slot_bytes)
+    if message.prepared is None:
+        return array
+    shape, scale, pad = message.prepared
+    return PreparedFrame(array, shape, scale, pad)
+
+
+def _worker_main(index: int, factory: str, shm_name: str, slot_bytes: int,
+                 requests: Connection, results: Connection, cores: Optional[List[int]],
+                 threads: int, max_batch_size: int):
+    """워커 프로세스: 모델 복제본 하나를 로드하고 요청을 배치로 처리"""
+    if cores and hasattr(os, "sched_setaffinity"):
+        # 워커의 intra-op 스레드들이 각자 코어를 쓰도록 threads 개 코어 블록에 고정
+        os.sched_setaffinity(0, set(cores))
+    # torch / OpenMP 가 코어를 두고 서로 경쟁하지 않도록 (모델 import 전에 설정)
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[name] = str(threads)
+
+    # spawn 자식은 API 프로세스의 resource_tracker 를 공유하므로 정리는 API 프로세스의 unlink 가 담당
+    shm = shared_memory.SharedMemory(name=shm_name)
+    detector = resolve_factory(factory)()
+    results.send(("ready", index, os.getpid()))
+
+    running = True
+    while running:
+        batch = [requests.recv()]
+        while len(batch) < max_batch_size and batch[-1] is not None and requests.poll():
+            batch.append(requests.recv())
+        if batch[-1] is None:
+            running = False
+            batch.pop()
+        if not batch:
+            continue
+
+        frames = [_frame_view(shm.buf, slot_bytes, message) for message in batch]
+        try:
+            outputs = detector.detect_batch(
+                frames,
+                confidence_thresholds=[message.confidence_threshold for message in batch],
+                max_objects=[message.max_objects for message in batch],
+                input_sizes=[message.input_size for message in batch]
+            )
+            for message, output in zip(batch, outputs):
+                results.send(("result", message.task_id, output))
+        except Exception as e:
+            for message in batch:
+                results.send(("error", message.task_id, str(e)))
+        del frames
+
+    shm.close()
+
+
+class _Worker:
+    """워커 프로세스 하나와 그 공유 메모리 링 버퍼"""
+
+    def __init__(self, index: int, shm: shared_memory.SharedMemory, slots: int, cores: Optional[List[int]]):
+        self.index = index
+        self.shm = shm
+        self.cores = cores
+        self.free_slots = list(range(slots))
+        self.process = None
+        self.requests: Optional[Connection] = None
+        self.results: Optional[Connection] = None
+        self.send_lock = threading.Lock()
+        self.ready = False
+        self.pid: Optional[int] = None
+        self.inflight = 0
+        self.tasks = 0
+        self.restarts = 0
+        self.failures = 0  # 준비 완료 없이 연속으로 죽은 횟수 (재시작 예산 / 대기 시간 계산용)
+        self.restart_at: Optional[float] = None  # 재시작 대기 중이면 다시 띄울 monotonic 시각
+
+    def send(self, message: Any):
+        with self.send_lock:
+            self.requests.send(message)
+
+
+class VisionWorkerPool:
+    """
+    모델 복제본을 가진 워커 프로세스 N 개로 추론하는 풀
+
+    InferenceScheduler 와 같은 submit / stop / stats 인터페이스를 제공한다.
+    디코딩된 프레임은 워커별 공유 메모리 링 버퍼의 슬롯에 복사하고,
+    파이프로는 슬롯 번호와 shape 같은 메타데이터만 보낸다 (배열 pickle 없음).
+    워커는 코어에 고정되며, 죽으면 다시 띄우고 처리 중이던 요청을 한 번 재시도한다.
+    준비되기 전에 계속 죽는 워커는 재시작 간격을 지수적으로 늘리고, 연속 재시작 예산을
+    다 쓰면 풀 전체를 실패 상태로 두어 대기 중인 요청과 새 요청을 바로 실패시킨다.
+    """
+
+    def __init__(self,
+                 detector_factory: str,
+                 workers: int = 2,
+                 slots_per_worker: int = 4,
+                 slot_bytes: int = 5 << 20,
+                 max_batch_size: int = 8,
+                 pin_cores: bool = True,
+                 threads_per_worker: int = 1,
+                 start_timeout: float = 300.0,
+                 max_restarts: int = 5,
+                 restart_backoff: float = 0.5,
+                 max_restart_backoff: float = 30.0,
+                 dispatch_timeout: float = 30.0):
+        """
+        Args:
+            detector_factory: 워커에서 detector 를 만드는 "module:callable" 경로
+            workers: 워커 프로세스 수
+            slots_per_worker: 워커별 링 버퍼 슬롯 수 (= 워커당 최대 동시 요청)
+            slot_bytes: 슬롯 크기 (이보다 큰 프레임은 파이프로 직접 전송)
+            max_batch_size: 워커가 한 번에 묶어 처리하는 최대 프레임 수
+            pin_cores: 워커마다 threads_per_worker 개씩 겹치지 않는 CPU 코어 블록에 고정
+            threads_per_worker: 워커별 torch / OpenMP 스레드 수
+            start_timeout: 모든 워커가 모델 로드를 마칠 때까지 기다리는 시간
+            max_restarts: 워커가 준비되지 못하고 연속으로 죽을 때 허용하는 재시작 횟수
+            restart_backoff: 첫 재시작 전 대기 시간 (연속 실패마다 두 배, max_restart_backoff 까지)
+            max_restart_backoff: 재시작 대기 시간 상한
+            dispatch_timeout: 워커 재시작 등으로 빈 슬롯을 기다리는 최대 시간 (넘으면 요청 실패)
+        """
+        self.detector_factory = detector_factory
+        self.num_workers = max(1, workers)
+        self.slots_per_worker = max(1, slots_per_worker)
+        self.slot_bytes = slot_bytes
+        self.max_batch_size = max(1, max_batch_size)
+        self.pin_cores = pin_cores
+        self.threads_per_worker = threads_per_worker
+        self.start_timeout = start_timeout
+        self.max_restarts = max(0, max_restarts)
+        self.restart_backoff = restart_backoff
+        self.max_restart_backoff = max_restart_backoff
+        self.dispatch_timeout = dispatch_timeout
+
+        self._ctx = get_context("spawn")
+        self._workers: List[_Worker] = []
+        self._inflight: Dict[int, _InFlight] = {}
+        self._ids = itertools.count()
+        self._cond = threading.Condition()
+        self._start_lock = threading.RLock()
+        self._reader: Optional[threading.Thread] = None
+        self._wakeup_r: Optional[Connection] = None
+        self._wakeup_w: Optional[Connection] = None
+        self._stopping = False
+        self._failed: Optional[str] = None  # 재시작 예산을 다 쓴 이유 (None 이면 정상)
+        self._admission: Optional[asyncio.Semaphore] = None  # 이벤트 루프에서 만든 동시 요청 제한
+        self.started = False
+
+    # ---------- 수명 주기 ----------
+
+    def start(self) -> "VisionWorkerPool":
+        """공유 메모리와 워커를 만들고 모든 워커가 준비될 때까지 대기 (여러 번 호출해도 한 번만)"""
+        with self._start_lock:
+            if self.started:
+                return self
+            self._stopping = False
+            self._failed = None
+            cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+            block = min(max(1, self.threads_per_worker), len(cores))
+            for index in range(self.num_workers):
+                shm = shared_memory.SharedMemory(create=True, size=self.slots_per_worker * self.slot_bytes)
+                # 코어가 모자라면 앞에서부터 다시 돌아가며 배정
+                worker_cores = ([cores[(index * block + k) % len(cores)] for k in range(block)]
+                                if self.pin_cores and cores else None)
+                worker = _Worker(index, shm, self.slots_per_worker, worker_cores)
+                self._spawn(worker)
+                self._workers.append(worker)
+
+            self._wakeup_r, self._wakeup_w = self._ctx.Pipe(duplex=False)
+            self._reader = threading.Thread(target=self._read_loop, name="vision-pool-reader", daemon=True)
+            self._reader.start()
+
+            with self._cond:
+                ready = self._cond.wait_for(
+                    lambda: self._failed is not None or all(w.ready for w in self._workers),
+                    self.start_timeout
+                )
+                failed = self._failed
+            if failed is not None:
+                self._shutdown()
+                raise RuntimeError(failed)
+            if not ready:
+                self._shutdown()
+                raise RuntimeError(f"vision 워커가 {self.start_timeout}s 안에 준비되지 않음")
+
+            self.started = True
+            logger.info(f"vision 워커 풀 시작: {[(w.pid, w.cores) for w in self._workers]}")
+            return self
+
+    async def stop(self):
+        """워커 종료와 공유 메모리 정리"""
+        await asyncio.get_running_loop().run_in_executor(None, self._shutdown)
+
+    # ---------- 요청 ----------
+
+    async def submit(self, task: DetectionTask) -> Dict[str, Any]:
+        """
+        프레임을 가장 한가한 워커의 슬롯에 넣고 결과를 기다림
+
+        동시 요청은 이벤트 루프의 세마포어 (전체 슬롯 수) 로 제한하고 슬롯도 루프에서 잡으므로,
+        기본 executor 스레드는 공유 메모리 복사와 전송에만 쓰이고 슬롯을 기다리며 묶이지 않는다.
+        """
+        loop = asyncio.get_running_loop()
+        if not self.started:
+            await loop.run_in_executor(None, self.start)
+        if self._admission is None:
+            self._admission = asyncio.Semaphore(self.num_workers * self.slots_per_worker)
+        async with self._admission:
+            worker, slot = await self._claim()
+            future = await loop.run_in_executor(None, self._dispatch, task, worker, slot)
+            return await asyncio.wrap_future(future)
+
+    async def _claim(self) -> Tuple[_Worker, int]:
+        """
+        가장 한가한 준비된 워커의 빈 슬롯 확보
+
+        세마포어를 통과했으면 보통 바로 빈 슬롯이 있고, 워커 재시작 중일 때만
+        dispatch_timeout 까지 루프에서 짧게 다시 확인한다.
+        """
+        deadline = time.monotonic() + self.dispatch_timeout
+        while True:
+            with self._cond:
+                self._check_running()
+                candidates = [w for w in self._workers if w.ready and w.free_slots]
+                if candidates:
+                    worker = min(candidates, key=lambda w: w.inflight)
+                    worker.inflight += 1
+                    return worker, worker.free_slots.pop()
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"vision 워커 풀의 빈 슬롯을 {self.dispatch_timeout}s 안에 얻지 못함")
+            await asyncio.sleep(CLAIM_RETRY_SEC)
+
+    def _dispatch(self, task: DetectionTask, worker: _Worker, slot: int) -> Future:
+        """확보한 슬롯에 공유 메모리로 복사 → 메타데이터 전송"""
+        try:
+            frame = task.frame
+            prepared = isinstance(frame, PreparedFrame)
+            array = np.ascontiguousarray(frame.tensor if prepared else frame)
+            timings = task.timings or StageTimings("vision")
+            message = _FrameMessage(
+                next(self._ids), slot, array.dtype.str, array.shape,
+                (frame.shape, frame.scale, frame.pad) if prepared else None,
+                task.confidence_threshold, task.max_objects,
+                array if array.nbytes > self.slot_bytes else None,
+                task.input_size
+            )
+            future: Future = Future()
+
+            if message.payload is None:
+                with timings.stage("transfer"):
+                    np.ndarray(array.shape, dtype=array.dtype, buffer=worker.shm.buf,
+                               offset=slot * self.slot_bytes)[...] = array
+            with self._cond:
+                self._check_running()
+                # 전송 전에 등록해 두어야 워커가 그 사이 죽어도 재시작 후 다시 보낼 수 있음
+                # (sent_at 은 복사가 끝난 뒤 만든 _InFlight 에서 정해지고, 등록 이후 항목은 리더 스레드만 지움)
+                self._inflight[message.task_id] = _InFlight(worker, message, future, timings)
+        except BaseException:
+            # 등록 전에 실패하면 슬롯을 직접 돌려줌
+            with self._cond:
+                worker.free_slots.append(slot)
+                worker.inflight -= 1
+            raise
+        try:
+            worker.send(message)
+        except (OSError, ValueError):
+            # 워커가 막 죽은 경우: 리더 스레드가 재시작 후 다시 보냄
+            pass
+        return future
+
+    def _check_running(self):
+        """종료 / 실패한 풀이면 요청 거부 (self._cond 를 잡은 상태에서 호출)"""
+        if self._stopping:
+            raise RuntimeError("vision 워커 풀이 종료됨")
+        if self._failed is not None:
+            raise RuntimeError(self._failed)
+
+    # ---------- 결과 / 장애 처리 (리더 스레드) ----------
+
+    def _read_loop(self):
+        """워커 결과 파이프와 프로세스 sentinel 을 함께 감시 (재시작 대기 중인 워커는 기한이 되면 다시 띄움)"""
+        while not self._stopping and self._failed is None:
+            now = time.monotonic()
+            for worker in self._workers:
+                if worker.restart_at is not None and worker.restart_at <= now:
+                    worker.restart_at = None
+                    self._spawn(worker)
+
+            sources: Dict[Any, Tuple[str, _Worker]] = {}
+            for worker in self._workers:
+                if worker.restart_at is not None:
+                    continue
+                sources[worker.results] = ("results", worker)
+                sources[worker.process.sentinel] = ("sentinel", worker)
+            sources[self._wakeup_r] = ("wakeup", None)
+            pending = [w.restart_at for w in self._workers if w.restart_at is not None]
+            timeout = max(0.0, min(pending) - time.monotonic()) if pending else None
+
+            for ready in wait(list(sources), timeout):
+                kind, worker = sources[ready]
+                if kind == "wakeup" or self._stopping:
+                    return
+                if kind == "results":
+                    try:
+                        while worker.results.poll():
+                            self._handle_message(worker, worker.results.recv())
+                    except (EOFError, OSError):
+                        pass
+                elif worker.process.exitcode is not None:
+                    self._restart(worker)
+                    break  # sentinel / 파이프가 바뀌었으므로 감시 목록 재구성
+
+    def _handle_message(self, worker: _Worker, message: tuple):
+        kind, key, value = message
+        if kind == "ready":
+            with self._cond:
+                worker.ready = True
+                worker.pid = value
+                worker.failures = 0
+                # 재시작 전 처리 중이던 요청 다시 전송
+                pending = [entry for entry in self._inflight.values() if entry.worker is worker]
+                self._cond.notify_all()
+            for entry in pending:
+                worker.send(entry.message)
+            return
+
+        with self._cond:
+            entry = self._inflight.pop(key, None)
+            if entry is None:
+                return
+            worker.free_slots.append(entry.message.slot)
+            worker.inflight -= 1
+            worker.tasks += 1
+            self._cond.notify_all()
+
+        if kind == "error":
+            entry.future.set_exception(RuntimeError(value))
+            return
+        entry.future.set_result(self._merge_timings(value, entry))
+
+    def _merge_timings(self, result: Dict[str, Any], entry: _InFlight) -> Dict[str, Any]:
+        """워커가 잰 단계 시간을 요청의 StageTimings 에 합치고 나머지는 ipc 로 기록"""
+        timings = entry.timings
+        worker_ms = 0.0
+        for stage, ms in (result.get("timings_ms") or {}).items():
+            timings.add(stage, ms)
+            worker_ms += ms
+        timings.add("ipc", max((time.perf_counter() - entry.sent_at) * 1000.0 - worker_ms, 0.0))
+        if "timings_ms" in result:
+            result["timings_ms"] = timings.as_dict()
+            result["processing_time_ms"] = round(timings.total_ms, 3)
+            result["fps"] = round(1000.0 / timings.total_ms, 2) if timings.total_ms > 0 else 0.0
+        return result
+
+    def _restart(self, worker: _Worker):
+        """
+        죽은 워커의 재시작 예약 (연속 실패마다 대기 시간 두 배), 처리 중이던 요청은 한 번만 재시도
+
+        준비되지 못하고 max_restarts 번 넘게 연속으로 죽으면 풀을 실패 상태로 바꾼다.
+        """
+        exitcode = worker.process.exitcode
+        worker.requests.close()
+        worker.results.close()
+        worker.failures += 1
+        if worker.failures > self.max_restarts:
+            self._fail(f"vision 워커 {worker.index} 가 준비되지 못하고 {worker.failures}번 연속 종료됨 (exit={exitcode})")
+            return
+
+        delay = min(self.restart_backoff * 2 ** (worker.failures - 1), self.max_restart_backoff)
+        logger.error(f"vision 워커 {worker.index} 종료 (pid={worker.pid}, exit={exitcode}), {delay:.1f}s 후 재시작")
+        metrics.inc("vision", "worker_restarts")
+
+        with self._cond:
+            worker.ready = False
+            failed = []
+            for task_id, entry in list(self._inflight.items()):
+                if entry.worker is not worker:
+                    continue
+                if entry.attempts >= 2:
+                    # 같은 프레임으로 두 번 죽으면 그 요청은 포기
+                    del self._inflight[task_id]
+                    worker.free_slots.append(entry.message.slot)
+                    worker.inflight -= 1
+                    failed.append(entry)
+                else:
+                    entry.attempts += 1
+        for entry in failed:
+            entry.future.set_exception(RuntimeError(f"vision 워커 {worker.index} 비정상 종료 (exit={exitcode})"))
+
+        worker.restarts += 1
+        worker.restart_at = time.monotonic() + delay
+
+    def _fail(self, reason: str):
+        """재시작 예산 소진: 처리 중인 요청과 슬롯 대기자를 실패시키고 이후 요청도 거부"""
+        logger.error(f"{reason}, 워커 풀 중단")
+        metrics.inc("vision", "worker_pool_failures")
+        with self._cond:
+            self._failed = reason
+            for worker in self._workers:
+                worker.ready = False
+            entries = list(self._inflight.values())
+            self._inflight.clear()
+            self._cond.notify_all()
+        for entry in entries:
+            if not entry.future.done():
+                entry.future.set_exception(RuntimeError(reason))
+
+    def _spawn(self, worker: _Worker):
+        requests_r, requests_w = self._ctx.Pipe(duplex=False)
+        results_r, results_w = self._ctx.Pipe(duplex=False)
+        worker.process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker.index, self.detector_factory, worker.shm.name, self.slot_bytes,
+                  requests_r, results_w, worker.cores, self.threads_per_worker, self.max_batch_size),
+            name=f"vision-worker-{worker.index}",
+            daemon=True
+        )
+        worker.process.start()
+        # 자식에게 넘긴 끝은 부모에서 닫아야 워커 종료 시 EOF 가 전달됨
+        requests_r.close()
+        results_w.close()
+        worker.requests = requests_w
+        worker.results = results_r
+
+    def _shutdown(self):
+        with self._start_lock:
+            with self._cond:
+                self._stopping = True
+                self._cond.notify_all()
+            if self._wakeup_w is not None:
+                self._wakeup_w.send(None)
+            if self._reader is not None:
+                self._reader.join(timeout=5)
+
+            for worker in self._workers:
+                try:
+                    worker.send(None)
+                except (OSError, ValueError):
+                    pass
+            for worker in self._workers:
+                worker.process.join(timeout=5)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+                    worker.process.join()
+                # 재시작 대기 중 / 실패한 워커의 파이프는 이미 닫힘 (두 번 닫아도 무해)
+                worker.requests.close()
+                worker.results.close()
+                worker.shm.close()
+                worker.shm.unlink()
+
+            with self._cond:
+                for entry in self._inflight.values():
+                    if not entry.future.done():
+                        entry.future.set_exception(RuntimeError("vision 워커 풀이 종료됨"))
+                self._inflight.clear()
+
+            self._workers = []
+            self._reader = None
+            self._admission = None
+            self.started = False
+
+    def stats(self) -> Dict[str, Any]:
+        """워커별 상태와 처리량"""
+        return {
+            "mode": "pool",
+            "workers": [
+                {
+                    "index": w.index,
+                    "pid": w.pid,
+                    "cores": w.cores,
+                    "ready": w.ready,
+                    "inflight": w.inflight,
+                    "tasks": w.tasks,
+                    "restarts": w.restarts,
+                    "failures": w.failures
+                }
+                for w in self._workers
+            ],
+            "slots_per_worker": self.slots_per_worker,
+            "slot_bytes": self.slot_bytes,
+            "max_batch_size": self.max_batch_size,
+            "inflight": len(self._inflight),
+            "failed": self._failed
+        }
@@ -0,0 +1 @@
+# Vision Services Package
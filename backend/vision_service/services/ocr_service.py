@@ -0,0 +1,286 @@
+# Vision AI OCR Service (탐지 영역 텍스트 인식)
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from rag_service.core.metrics import StageTimings, metrics
+from vision_service.core.frame_cache import dhash, hamming
+from vision_service.core.frames import source_image
+
+# 같은 트랙의 crop 이 이 거리 이내면 이전 인식 결과를 재사용 (64비트 dHash)
+TRACK_REUSE_DISTANCE = 6
+
+
+class EasyOCRRecognizer:
+    """
+    EasyOCR 인식기 (텍스트 영역 검출은 건너뛰고 인식만 수행)
+
+    crop 들을 세로로 이어 붙인 한 장의 이미지와 crop 별 영역 목록을
+    reader.recognize 에 넘겨 한 번의 호출로 배치 인식한다.
+    """
+
+    def __init__(self, languages: Sequence[str] = ("ko", "en"), gpu: bool = False):
+        import easyocr
+        self.reader = easyocr.Reader(list(languages), gpu=gpu, verbose=False)
+
+    def recognize(self, crops: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """흑백 uint8 crop 목록 → 같은 순서의 (텍스트, 신뢰도)"""
+        if not crops:
+            return []
+        gap = 8
+        width = max(crop.shape[1] for crop in crops)
+        height = sum(crop.shape[0] for crop in crops) + gap * (len(crops) - 1)
+        mosaic = np.zeros((height, width), dtype=np.uint8)
+        regions, starts, y = [], [], 0
+        for crop in crops:
+            h, w = crop.shape
+            mosaic[y:y + h, :w] = crop
+            regions.append([0, w, y, y + h])  # x_min, x_max, y_min, y_max
+            starts.append(y)
+            y += h + gap
+
+        results: List[Tuple[str, float]] = [("", 0.0)] * len(crops)
+        for box, text, confidence in self.reader.recognize(
+                mosaic, horizontal_list=regions, free_list=[], batch_size=len(crops)):
+            # 반환 순서 대신 세로 위치로 crop 을 찾음
+            index = int(np.searchsorted(starts, box[0][1], side="right")) - 1
+            results[max(index, 0)] = (text, float(confidence))
+        return results
+
+
+def load_easyocr():
+    """기본 인식기 팩토리 (easyocr import 는 여기서만)"""
+    from rag_service.core.config import settings
+    return EasyOCRRecognizer(_split(settings.vision_ocr_languages))
+
+
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def crop_regions(frame: Any, objects: Iterable[Dict[str, Any]], labels: Iterable[str],
+                 max_crops: int = 8, pixel_budget: int = 98_304,
+                 crop_height: int = 48, min_side: int = 12) -> List[Tuple[Dict[str, Any], np.ndarray]]:
+    """
+    텍스트가 있을 법한 탐지 영역만 흑백 crop 으로 잘라냄
+
+    labels 에 속한 객체를 신뢰도 순으로 골라 높이 crop_height 로 맞추고,
+    crop 픽셀 합이 pixel_budget 을 넘거나 max_crops 개가 되면 멈춘다.
+    PreparedFrame 은 letterbox 텐서가 아니라 디코딩된 프레임에서 자른다.
+
+    Returns:
+        (객체 dict, crop) 목록
+    """
+    import cv2
+
+    allowed = set(labels)
+    candidates = sorted((obj for obj in objects if obj["label"] in allowed),
+                        key=lambda obj: obj["confidence"], reverse=True)
+    image, factor = source_image(frame)
+
+    selected, used = [], 0
+    for obj in candidates:
+        if len(selected) >= max_crops:
+            break
+        box = obj["bbox"]
+        # 원본 좌표 → 디코딩된 프레임 좌표 (축소 디코딩이면 factor < 1)
+        x1, y1 = int(box["x"] * factor), int(box["y"] * factor)
+        x2, y2 = int((box["x"] + box["width"]) * factor), int((box["y"] + box["height"]) * factor)
+        region = image[max(y1, 0):max(y2, 0), max(x1, 0):max(x2, 0)]
+        if region.size and region.ndim == 3:
+            region = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
+        if region.size == 0 or min(region.shape[:2]) < min_side:
+            continue
+
+        h, w = region.shape
+        width = min(int(w * crop_height / h), crop_height * 16)
+        if used + width * crop_height > pixel_budget:
+            continue
+        interpolation = cv2.INTER_AREA if h > crop_height else cv2.INTER_LINEAR
+        selected.append((obj, cv2.resize(region, (width, crop_height), interpolation=interpolation)))
+        used += width * crop_height
+    return selected
+
+
+class OCRCache:
+    """
+    (stream_id, track_id, crop hash) → 인식 결과 LRU
+
+    추적 중인 객체는 crop 이 조금 달라져도 (TRACK_REUSE_DISTANCE 이내) 같은 트랙의
+    마지막 결과를 재사용한다. 트랙 ID 는 스트림마다 1 부터 다시 매겨지므로
+    캐시와 트랙별 마지막 hash 모두 스트림 ID 를 함께 키로 쓴다.
+    """
+
+    def __init__(self, max_size: int = 512):
+        self.max_size = max_size
+        self._data: "OrderedDict[Tuple[Optional[str], Optional[int], int], Tuple[str, float]]" = OrderedDict()
+        self._last_by_track: Dict[Tuple[Optional[str], int], int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, stream_id: Optional[str], track_id: Optional[int],
+            crop_hash: int) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            key = (stream_id, track_id, crop_hash)
+            if key not in self._data and track_id is not None:
+                last = self._last_by_track.get((stream_id, track_id))
+                if last is not None and hamming(last, crop_hash) <= TRACK_REUSE_DISTANCE:
+                    key = (stream_id, track_id, last)
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, stream_id: Optional[str], track_id: Optional[int], crop_hash: int,
+            value: Tuple[str, float]):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            key = (stream_id, track_id, crop_hash)
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if track_id is not None:
+                self._last_by_track[(stream_id, track_id)] = crop_hash
+            while len(self._data) > self.max_size:
+                (old_stream, old_track, old_hash), _ = self._data.popitem(last=False)
+                if old_track is not None and self._last_by_track.get((old_stream, old_track)) == old_hash:
+                    del self._last_by_track[(old_stream, old_track)]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+class OCRStage:
+    """
+    탐지 이후 비동기 OCR 단계
+
+    탐지 응답을 막지 않도록 전용 스레드에서 crop → 캐시 조회 → 한 번의 배치 인식을 하고,
+    호출자는 돌려받은 future 로 결과를 나중에 붙이거나 후속 메시지로 보낸다.
+    진행 중인 작업이 max_pending 개면 새 프레임은 건너뛴다.
+    """
+
+    def __init__(self, get_recognizer: Callable[[], Any], labels: Iterable[str],
+                 max_crops: int = 8, pixel_budget: int = 98_304, crop_height: int = 48,
+                 cache_size: int = 512, max_pending: int = 2):
+        """
+        Args:
+            get_recognizer: recognize(crops) 를 가진 인식기를 돌려주는 함수 (OCR 스레드에서 호출)
+            labels: OCR 대상 라벨 (opt-in)
+            max_crops: 프레임당 최대 crop 수
+            pixel_budget: 프레임당 crop 픽셀 합 상한 (리사이즈 후)
+            crop_height: 인식기에 넘기는 crop 높이
+            cache_size: OCR 캐시 크기
+            max_pending: 동시에 대기 / 실행 중인 프레임 수 상한
+        """
+        self.get_recognizer = get_recognizer
+        self.labels = frozenset(labels)
+        self.max_crops = max_crops
+        self.pixel_budget = pixel_budget
+        self.crop_height = crop_height
+        self.max_pending = max_pending
+        self.cache = OCRCache(cache_size)
+        # 인식 모델은 스레드 안전하지 않으므로 워커 스레드는 하나만 사용
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vision-ocr")
+        self.pending = 0
+        self.frames = 0
+        self.skipped = 0
+        self.crops = 0
+
+    def wants(self, result: Dict[str, Any]) -> bool:
+        """OCR 대상 라벨이 하나라도 있는지"""
+        return any(obj["label"] in self.labels for obj in result.get("objects", []))
+
+    def submit(self, frame: Any, result: Dict[str, Any],
+               stream_id: Optional[str] = None) -> Optional["asyncio.Future"]:
+        """
+        OCR 예약 (대상이 없거나 밀려 있으면 None)
+
+        Args:
+            stream_id: 트랙 ID 를 매긴 스트림 (캐시 키, 업로드는 업로드 이력 ID)
+
+        Returns:
+            [{object_id, track_id, label, text, confidence, cached}] 로 완료되는 future
+        """
+        if not self.wants(result):
+            return None
+        if self.pending >= self.max_pending:
+            self.skipped += 1
+            metrics.inc("vision", "ocr_skipped")
+            return None
+        self.pending += 1
+        self.frames += 1
+        objects = list(result.get("objects", []))
+        future = asyncio.get_running_loop().run_in_executor(self._executor, self.run, frame, objects, stream_id)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, _):
+        self.pending -= 1
+
+    def run(self, frame: Any, objects: List[Dict[str, Any]], stream_id: Optional[str] = None,
+            timings: Optional[StageTimings] = None) -> List[Dict[str, Any]]:
+        """crop → 캐시 → 배치 인식 (동기)"""
+        timings = timings or StageTimings("vision")
+        with timings.stage("ocr_crop"):
+            regions = crop_regions(frame, objects, self.labels, self.max_crops,
+                                   self.pixel_budget, self.crop_height)
+            keys = [(stream_id, obj.get("metadata", {}).get("track_id"), dhash(crop)) for obj, crop in regions]
+            found = [self.cache.get(*key) for key in keys]
+
+        missing = [i for i, value in enumerate(found) if value is None]
+        if missing:
+            recognizer = self.get_recognizer()
+            with timings.stage("ocr"):
+                recognized = recognizer.recognize([regions[i][1] for i in missing])
+            for i, value in zip(missing, recognized):
+                found[i] = value
+                self.cache.put(*keys[i], value)
+            self.crops += len(missing)
+
+        texts = []
+        for i, ((obj, _), (text, confidence)) in enumerate(zip(regions, found)):
+            texts.append({
+                "object_id": obj.get("id"),
+                "track_id": keys[i][1],
+                "label": obj["label"],
+                "text": text,
+                "confidence": round(confidence, 4),
+                "cached": i not in missing
+            })
+        return texts
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "labels": sorted(self.labels),
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "recognized_crops": self.crops,
+            "pending": self.pending,
+            "cache": self.cache.stats()
+        }
+
+
+def attach_texts(result: Dict[str, Any], texts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """OCR 결과를 탐지 결과 객체의 metadata.ocr 로 붙임"""
+    by_id = {item["object_id"]: item for item in texts}
+    for obj in result.get("objects", []):
+        item = by_id.get(obj.get("id"))
+        if item is not None and item["text"]:
+            metadata = obj.setdefault("metadata", {})
+            metadata["ocr"] = {"text": item["text"], "confidence": item["confidence"]}
+            metadata["improved_by"] = [*metadata.get("improved_by", []), "ocr"]
+    return result